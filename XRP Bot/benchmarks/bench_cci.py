@@ -0,0 +1,78 @@
+"""
+Бенчмарк скользящего среднего отклонения CCI: sliding_window_view против
+прежнего rolling().apply(lambda), а также потокового RollingMeanDeviation.
+
+Запуск из каталога XRP Bot:
+    python -m benchmarks.bench_cci [--sizes 200 10000 1000000]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from indicators.cci import CCIIndicator, rolling_mean_deviation
+from indicators.streaming import RollingMeanDeviation
+from benchmarks.synthetic import make_ohlcv
+from benchmarks.bench_kernels import best_time
+
+PERIOD = 20
+
+
+def legacy_mean_deviation(typical_price, period=PERIOD):
+    """Прежняя реализация: вызов lambda Python на каждый бар"""
+    return typical_price.rolling(window=period).apply(
+        lambda x: np.mean(np.abs(x - np.mean(x)))
+    ).to_numpy()
+
+
+def streaming_mean_deviation(values, period=PERIOD):
+    """Потоковый расчет по одному значению за вызов"""
+    state = RollingMeanDeviation(period)
+    return np.array([state.update(value) for value in values.tolist()])
+
+
+def run(sizes, repeat: int = 3):
+    cci = CCIIndicator({'period': PERIOD}, '15m')
+    
+    print(f"{'bars':>8}{'legacy, ms':>14}{'vectorized, ms':>16}{'speedup':>10}"
+          f"{'cci(), ms':>12}{'stream, us/bar':>16}")
+    for size in sizes:
+        data = make_ohlcv(size)
+        typical_price = (data['high'] + data['low'] + data['close']) / 3
+        values = typical_price.to_numpy()
+        
+        expected = legacy_mean_deviation(typical_price)
+        actual = rolling_mean_deviation(values, PERIOD)
+        if not np.array_equal(expected, actual, equal_nan=True):
+            raise AssertionError(f"Результаты расходятся на {size} барах")
+        streamed = streaming_mean_deviation(values)
+        if not np.allclose(expected, streamed, rtol=1e-9, atol=1e-12, equal_nan=True):
+            raise AssertionError(f"Потоковый расчет расходится на {size} барах")
+        
+        # Прежняя реализация на больших объемах слишком медленная для нескольких прогонов
+        legacy_repeat = 1 if size > 10_000 else repeat
+        legacy_time = best_time(lambda: legacy_mean_deviation(typical_price), legacy_repeat)
+        vectorized_time = best_time(lambda: rolling_mean_deviation(values, PERIOD), repeat)
+        calculate_time = best_time(lambda: cci.calculate(data), repeat)
+        stream_time = best_time(lambda: streaming_mean_deviation(values), 1)
+        print(f"{size:>8}{legacy_time * 1000:>14.2f}{vectorized_time * 1000:>16.2f}"
+              f"{legacy_time / vectorized_time:>9.1f}x{calculate_time * 1000:>12.2f}"
+              f"{stream_time / size * 1e6:>16.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Бенчмарк среднего отклонения CCI')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[200, 10_000, 1_000_000],
+                        help='Размеры истории в барах')
+    parser.add_argument('--repeat', type=int, default=3, help='Число повторов')
+    args = parser.parse_args()
+    
+    run(args.sizes, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Микро-бенчмарк векторизованных ядер Parabolic SAR, MFI и Volume Profile
+против прежних реализаций на циклах Python.
+
+Запуск из каталога XRP Bot:
+    python -m benchmarks.bench_kernels [--sizes 200 5000 100000]
+"""
+import argparse
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from indicators.parabolic_sar import ParabolicSARIndicator
+from indicators.mfi import MFIIndicator
+from indicators.volume_profile import VolumeProfileIndicator
+from benchmarks.synthetic import make_ohlcv
+
+
+def legacy_parabolic_sar(data, start=0.02, increment=0.02, max_acc=0.2):
+    """Прежняя реализация: поэлементная запись в pd.Series через .iloc"""
+    high, low, close = data['high'], data['low'], data['close']
+    sar = pd.Series(index=data.index)
+    ep = pd.Series(index=data.index)
+    acc = pd.Series(index=data.index)
+    sar.iloc[0] = low.iloc[0]
+    ep.iloc[0] = high.iloc[0]
+    acc.iloc[0] = start
+    for i in range(1, len(data)):
+        if i == 1:
+            sar.iloc[i] = sar.iloc[0]
+            ep.iloc[i] = high.iloc[i] if close.iloc[i] > close.iloc[i-1] else low.iloc[i]
+            acc.iloc[i] = start
+        else:
+            prev_sar, prev_ep, prev_acc = sar.iloc[i-1], ep.iloc[i-1], acc.iloc[i-1]
+            sar.iloc[i] = prev_sar + prev_acc * (prev_ep - prev_sar)
+            if close.iloc[i] > close.iloc[i-1]:
+                ep.iloc[i] = max(prev_ep, high.iloc[i])
+                acc.iloc[i] = min(prev_acc + increment, max_acc) if ep.iloc[i] > prev_ep else prev_acc
+            else:
+                ep.iloc[i] = min(prev_ep, low.iloc[i])
+                acc.iloc[i] = min(prev_acc + increment, max_acc) if ep.iloc[i] < prev_ep else prev_acc
+    return sar.to_numpy()
+
+
+def legacy_mfi(data, period=14):
+    """Прежняя реализация: обход типичной цены циклом с .iloc"""
+    typical_price = (data['high'] + data['low'] + data['close']) / 3
+    money_flow = typical_price * data['volume']
+    positive_flow = pd.Series(0, index=data.index)
+    negative_flow = pd.Series(0, index=data.index)
+    for i in range(1, len(typical_price)):
+        if typical_price.iloc[i] > typical_price.iloc[i-1]:
+            positive_flow.iloc[i] = money_flow.iloc[i]
+        elif typical_price.iloc[i] < typical_price.iloc[i-1]:
+            negative_flow.iloc[i] = money_flow.iloc[i]
+    money_ratio = positive_flow.rolling(window=period).sum() / negative_flow.rolling(window=period).sum()
+    return (100 - (100 / (1 + money_ratio))).to_numpy()
+
+
+def legacy_volume_profile(data, num_bins=20):
+    """Прежняя реализация: np.digitize на каждый бар в цикле"""
+    close, volume = data['close'], data['volume']
+    bins = np.linspace(close.min(), close.max(), num_bins + 1)
+    volume_profile = np.zeros(num_bins)
+    for i in range(len(close)):
+        bin_idx = np.digitize(close.iloc[i], bins) - 1
+        bin_idx = max(0, min(bin_idx, num_bins - 1))
+        volume_profile[bin_idx] += volume.iloc[i]
+    return volume_profile
+
+
+def best_time(func, repeat: int) -> float:
+    """Лучшее время из repeat запусков, секунды"""
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def run(sizes, repeat: int = 3):
+    sar = ParabolicSARIndicator({'start': 0.02, 'increment': 0.02, 'max': 0.2}, '15m')
+    mfi = MFIIndicator({'period': 14}, '15m')
+    profile = VolumeProfileIndicator({'num_bins': 20}, '15m')
+    
+    cases = [
+        ('parabolic_sar', lambda d: legacy_parabolic_sar(d), lambda d: np.asarray(sar.calculate(d)['values'])),
+        ('mfi', lambda d: legacy_mfi(d), lambda d: np.asarray(mfi.calculate(d)['values'])),
+        ('volume_profile', lambda d: legacy_volume_profile(d), lambda d: np.asarray(profile.calculate(d)['volume_profile'])),
+    ]
+    
+    print(f"{'indicator':<16}{'bars':>8}{'legacy, ms':>14}{'vectorized, ms':>16}{'speedup':>10}")
+    for size in sizes:
+        data = make_ohlcv(size)
+        # Прежние циклы на больших объемах слишком медленные для нескольких прогонов
+        legacy_repeat = 1 if size > 10_000 else repeat
+        for name, legacy, vectorized in cases:
+            expected = legacy(data)
+            actual = vectorized(data)
+            if not np.array_equal(expected, actual, equal_nan=True):
+                raise AssertionError(f"{name}: результаты расходятся на {size} барах")
+            
+            legacy_time = best_time(lambda: legacy(data), legacy_repeat)
+            vectorized_time = best_time(lambda: vectorized(data), repeat)
+            print(f"{name:<16}{size:>8}{legacy_time * 1000:>14.2f}"
+                  f"{vectorized_time * 1000:>16.2f}{legacy_time / vectorized_time:>9.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Бенчмарк ядер SAR/MFI/Volume Profile')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[200, 5000, 100000],
+                        help='Размеры истории в барах')
+    parser.add_argument('--repeat', type=int, default=3, help='Число повторов')
+    args = parser.parse_args()
+    
+    warnings.simplefilter('ignore', FutureWarning)
+    run(args.sizes, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Бенчмарк кольцевого буфера свечей OHLCVBuffer против прежнего построения
+DataFrame из списка ccxt на каждый цикл (TimeframeAnalyzer._to_frame).
+
+Меряется время цикла «ответ REST -> DataFrame» для набора символов и
+таймфреймов, объем памяти, выделенной за цикл (tracemalloc), и число
+сборок мусора на серию циклов.
+
+Запуск из каталога XRP Bot:
+    python -m benchmarks.bench_ohlcv_buffer [--symbols 20] [--bars 200] [--cycles 50]
+"""
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.ohlcv_buffer import OHLCVBuffer
+from src.timeframe_analyzer import TimeframeAnalyzer
+from benchmarks.bench_kernels import best_time
+
+TIMEFRAMES = ('1D', '4H', '1H', '15m')
+STEP_MS = 900_000
+
+
+def make_responses(symbols: int, bars: int, cycles: int):
+    """Ответы REST по циклам: окно последних bars свечей, сдвиг на бар за цикл"""
+    history = [
+        [i * STEP_MS, 1.0 + i * 1e-4, 1.1 + i * 1e-4, 0.9 + i * 1e-4, 1.0 + i * 1e-4, 1000.0 + i]
+        for i in range(bars + cycles)
+    ]
+    keys = [(f"SYM{s}", timeframe) for s in range(symbols) for timeframe in TIMEFRAMES]
+    return keys, [history[cycle:cycle + bars] for cycle in range(cycles)]
+
+
+def legacy_cycles(keys, responses):
+    for ohlcv in responses:
+        for _ in keys:
+            TimeframeAnalyzer._to_frame(ohlcv)
+
+
+def buffer_cycles(keys, responses, buffers):
+    for ohlcv in responses:
+        for key in keys:
+            buffers[key].extend(ohlcv)
+            buffers[key].to_frame()
+
+
+def measure(func):
+    """(байт выделено на пике, число сборок мусора) за один прогон func"""
+    gc.collect()
+    collections = sum(stat['collections'] for stat in gc.get_stats())
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak, sum(stat['collections'] for stat in gc.get_stats()) - collections
+
+
+def run(symbols: int, bars: int, cycles: int, repeat: int = 3):
+    keys, responses = make_responses(symbols, bars, cycles)
+    buffers = {key: OHLCVBuffer(bars) for key in keys}
+    frames = len(keys) * cycles
+    
+    legacy_time = best_time(lambda: legacy_cycles(keys, responses), repeat)
+    buffer_time = best_time(lambda: buffer_cycles(keys, responses, buffers), repeat)
+    legacy_peak, legacy_gc = measure(lambda: legacy_cycles(keys, responses))
+    buffer_peak, buffer_gc = measure(lambda: buffer_cycles(keys, responses, buffers))
+    
+    print(f"{len(keys)} рядов x {cycles} циклов по {bars} баров")
+    print(f"{'':>10}{'us/frame':>12}{'peak, KiB':>12}{'gc runs':>10}")
+    print(f"{'legacy':>10}{legacy_time / frames * 1e6:>12.1f}{legacy_peak / 1024:>12.0f}{legacy_gc:>10}")
+    print(f"{'buffer':>10}{buffer_time / frames * 1e6:>12.1f}{buffer_peak / 1024:>12.0f}{buffer_gc:>10}")
+    print(f"ускорение: {legacy_time / buffer_time:.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Бенчмарк кольцевого буфера свечей')
+    parser.add_argument('--symbols', type=int, default=20, help='Число символов')
+    parser.add_argument('--bars', type=int, default=200, help='Свечей в ответе REST')
+    parser.add_argument('--cycles', type=int, default=50, help='Число циклов')
+    parser.add_argument('--repeat', type=int, default=3, help='Число повторов')
+    args = parser.parse_args()
+    
+    run(args.symbols, args.bars, args.cycles, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Бенчмарк журнала сигналов SignalJournal против прежнего файла
+logs/signal_report_<время>.json (indent=2) на каждый цикл.
+
+Меряется время, на которое запись результата цикла блокирует вызывающий
+код (event loop), число файлов и объем на диске за период, а также чтение
+одних суток и всего периода по диапазону времени. Запись - реальный отчет
+из logs/ с подменой времени.
+
+Запуск из каталога XRP Bot:
+    python -m benchmarks.bench_signal_journal [--days 30] [--cycles-per-day 96]
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.signal_journal import SignalJournal, read_records
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE_REPORT = os.path.join(ROOT, 'logs', 'signal_report_20250825_122333.json')
+START = 1_700_000_000
+
+
+def legacy_write(directory: str, result, timestamp: float):
+    filename = os.path.join(directory, f"signal_report_{datetime.fromtimestamp(timestamp):%Y%m%d_%H%M%S}.json")
+    with open(filename, 'w') as f:
+        json.dump(result, f, indent=2, default=str)
+
+
+def legacy_read(directory: str, start: float, end: float):
+    """Отчеты за [start, end): отбор по имени файла и разбор каждого"""
+    for path in sorted(glob.glob(os.path.join(directory, 'signal_report_*.json'))):
+        stamp = datetime.strptime(os.path.basename(path)[14:29], '%Y%m%d_%H%M%S').timestamp()
+        if start <= stamp < end:
+            with open(path) as f:
+                yield json.load(f)
+
+
+def disk_usage(directory: str):
+    paths = [os.path.join(directory, name) for name in os.listdir(directory)]
+    return len(paths), sum(os.path.getsize(path) for path in paths)
+
+
+def count(records) -> int:
+    """Потоковый проход по записям (как при агрегации за период)"""
+    return sum(1 for _ in records)
+
+
+def timed(func):
+    started = time.perf_counter()
+    result = func()
+    return time.perf_counter() - started, result
+
+
+def run(days: int, cycles_per_day: int):
+    with open(SAMPLE_REPORT) as f:
+        result = json.load(f)
+    step = 86_400 / cycles_per_day
+    stamps = [START + i * step for i in range(days * cycles_per_day)]
+    day_start, day_end = START + (days // 2) * 86_400, START + (days // 2 + 1) * 86_400
+
+    with tempfile.TemporaryDirectory() as legacy_dir, tempfile.TemporaryDirectory() as journal_dir:
+        legacy_time, _ = timed(lambda: [legacy_write(legacy_dir, result, stamp) for stamp in stamps])
+
+        clock_now = [START]
+        journal = SignalJournal(journal_dir, clock=lambda: clock_now[0])
+
+        def journal_writes():
+            for stamp in stamps:
+                clock_now[0] = stamp
+                journal.write(result)
+
+        journal_time, _ = timed(journal_writes)
+        background_time, _ = timed(journal.close)
+
+        rows = [
+            ('legacy', legacy_time, disk_usage(legacy_dir),
+             timed(lambda: count(legacy_read(legacy_dir, day_start, day_end))),
+             timed(lambda: count(legacy_read(legacy_dir, START, stamps[-1] + 1)))),
+            ('journal', journal_time, disk_usage(journal_dir),
+             timed(lambda: count(read_records(journal_dir, int(day_start * 1000), int(day_end * 1000)))),
+             timed(lambda: count(read_records(journal_dir, START * 1000, int(stamps[-1] * 1000) + 1)))),
+        ]
+
+    print(f"{len(stamps)} циклов за {days} сут.; запись журнала в фоне: {background_time:.2f} s")
+    print(f"{'':>8}{'us/write':>10}{'files':>7}{'MiB':>8}{'day, ms':>10}{'period, ms':>12}")
+    for name, write_time, (files, size), (day_time, day), (period_time, period) in rows:
+        assert day == cycles_per_day and period == len(stamps)
+        print(f"{name:>8}{write_time / len(stamps) * 1e6:>10.1f}{files:>7}{size / 2 ** 20:>8.1f}"
+              f"{day_time * 1000:>10.1f}{period_time * 1000:>12.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Бенчмарк журнала сигналов')
+    parser.add_argument('--days', type=int, default=30, help='Период, сутки')
+    parser.add_argument('--cycles-per-day', type=int, default=96, help='Циклов в сутки')
+    args = parser.parse_args()
+
+    run(args.days, args.cycles_per_day)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,333 @@
+"""
+Набор бенчмарков XRP Bot: все 16 индикаторов, шаги анализа
+TimeframeAnalyzer и полный офлайн-цикл SignalEngine.analyze_all_timeframes
+на детерминированных синтетических свечах, а также холодный старт
+(импорт main.py под -X importtime в отдельном процессе).
+
+Для каждого замера сохраняется лучшее и медианное время, пропускная
+способность (бары/с или циклы/с) и пиковая память (tracemalloc). Результаты
+пишутся в JSON; команда compare сравнивает два файла и завершается с кодом 1,
+если какой-либо замер замедлился сильнее порога.
+
+Запуск из каталога XRP Bot:
+    python -m benchmarks.bench_suite run [--sizes 200 2000 20000] [--output benchmarks/results/latest.json]
+    python -m benchmarks.bench_suite compare benchmarks/results/base.json benchmarks/results/latest.json [--threshold 10]
+    python -m benchmarks.bench_suite startup [--top 20]
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from indicators.feature_store import FeatureStore
+from src.signal_engine import SignalEngine, create_indicators
+from src.timeframe_analyzer import TimeframeAnalyzer
+from benchmarks.synthetic import make_ohlcv
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONFIG_PATH = os.path.join(ROOT, 'config', 'strategy_config.json')
+DEFAULT_OUTPUT = os.path.join(ROOT, 'benchmarks', 'results', 'latest.json')
+SCHEMA_VERSION = 1
+
+# Частоты pandas для таймфреймов биржи (свечи синтетической биржи)
+EXCHANGE_FREQ = {'1d': '1D', '4h': '4h', '1h': '1h', '15m': '15min'}
+
+
+class SyntheticExchange:
+    """Офлайн-биржа: детерминированные свечи по каждому таймфрейму"""
+
+    def __init__(self, bars: int = 1000):
+        self._candles = {}
+        for seed, (timeframe, freq) in enumerate(EXCHANGE_FREQ.items()):
+            data = make_ohlcv(bars, seed=seed, freq=freq)
+            timestamps = (data.index.asi8 // 1_000_000).astype(float)
+            self._candles[timeframe] = np.column_stack([timestamps, data.to_numpy()]).tolist()
+
+    def fetch_ohlcv(self, symbol, timeframe, since=None, limit=None):
+        candles = self._candles[timeframe]
+        if since is not None:
+            candles = [c for c in candles if c[0] >= since]
+        return candles[-limit:] if limit else candles
+
+
+def measure(func: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    """Лучшее и медианное время из repeat запусков и пиковая память одного запуска"""
+    func()  # прогрев: импорты, кэши numpy/pandas
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - started)
+
+    # Память меряется отдельным запуском: tracemalloc замедляет выполнение
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'best_s': min(times),
+        'median_s': statistics.median(times),
+        'peak_kib': peak / 1024
+    }
+
+
+def bench_indicators(config: Dict[str, Any], sizes: List[int], repeat: int) -> Dict[str, Dict[str, float]]:
+    """generate_signal каждого индикатора на истории каждого размера"""
+    results = {}
+    indicators = create_indicators(config, '15m')
+    for size in sizes:
+        data = make_ohlcv(size)
+        for name, indicator in indicators.items():
+            stats = measure(lambda: indicator.generate_signal(data), repeat)
+            stats['bars_per_s'] = size / stats['best_s']
+            results[f"indicator/{name}@{size}"] = stats
+    return results
+
+
+def bench_analyzer(config: Dict[str, Any], sizes: List[int], repeat: int) -> Dict[str, Dict[str, float]]:
+    """Шаги анализа таймфрейма: структура, тренд, уровни, объем"""
+    results = {}
+    analyzer = TimeframeAnalyzer(config, exchange=SyntheticExchange(bars=1))
+    for size in sizes:
+        data = make_ohlcv(size)
+        steps = {
+            'market_structure': lambda: analyzer._analyze_market_structure(data),
+            'trend': lambda: analyzer._determine_trend(data, FeatureStore(data)),
+            'levels': lambda: analyzer._calculate_key_levels(data),
+            'volume': lambda: analyzer._analyze_volume(data),
+        }
+        for name, step in steps.items():
+            stats = measure(step, repeat)
+            stats['bars_per_s'] = size / stats['best_s']
+            results[f"analyzer/{name}@{size}"] = stats
+    return results
+
+
+def bench_cycle(config: Dict[str, Any], cycles: int, repeat: int) -> Dict[str, Dict[str, float]]:
+    """Полный цикл analyze_all_timeframes на офлайн-бирже (200 свечей на таймфрейм)
+
+    cycle/full - все таймфреймы пересчитываются каждый цикл;
+    cycle/reused - повторный цикл на тех же свечах (кэш таймфреймов).
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for name, reuse in (('full', False), ('reused', True)):
+            cycle_config = dict(config)
+            cycle_config['data'] = dict(config.get('data', {}), cache_enabled=False)
+            cycle_config['api'] = dict(config['api'], rate_limit=None)
+            cycle_config['compute'] = {'workers': 0}
+            cycle_config['schedule'] = dict(config.get('schedule', {}), reuse_timeframes=reuse)
+            path = os.path.join(directory, f"{name}.json")
+            with open(path, 'w') as f:
+                json.dump(cycle_config, f)
+
+            engine = SignalEngine(path)
+            engine.timeframe_analyzer.exchange = SyntheticExchange()
+
+            async def run_cycles():
+                for _ in range(cycles):
+                    await engine.analyze_all_timeframes('XRPUSDT')
+
+            try:
+                stats = measure(lambda: asyncio.run(run_cycles()), repeat)
+            finally:
+                engine.close()
+                engine.timeframe_analyzer.executor.shutdown()
+
+            for key in ('best_s', 'median_s'):
+                stats[key] /= cycles
+            stats['cycles_per_s'] = 1 / stats['best_s']
+            results[f"cycle/{name}"] = stats
+    return results
+
+
+def import_times(module: str = 'main') -> Dict[str, Dict[str, float]]:
+    """Время импорта модулей (с, собственное и с зависимостями) при импорте module
+    в новом интерпретаторе с -X importtime
+    """
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    times = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        own, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = {'self_s': int(own) / 1e6, 'cumulative_s': int(cumulative) / 1e6}
+    return times
+
+
+def bench_startup(repeat: int) -> Dict[str, Dict[str, float]]:
+    """Холодный старт: импорт main.py в новом процессе"""
+    cumulative = []
+    modules = 0
+    for _ in range(repeat):
+        times = import_times('main')
+        cumulative.append(times['main']['cumulative_s'])
+        modules = len(times)
+    # Пиковый RSS дочерних процессов (Linux - КиБ)
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+
+    return {
+        'startup/import_main': {
+            'best_s': min(cumulative),
+            'median_s': statistics.median(cumulative),
+            'peak_kib': float(peak),
+            'modules': modules
+        }
+    }
+
+
+def startup(top: int):
+    """Самые медленные импорты холодного старта main.py"""
+    times = import_times('main')
+    print(f"Импорт main: {times['main']['cumulative_s'] * 1000:.0f} ms, модулей: {len(times)}")
+    print(f"{'модуль':<48}{'self, ms':>10}{'cumulative, ms':>16}")
+    for name, item in sorted(times.items(), key=lambda kv: -kv[1]['self_s'])[:top]:
+        print(f"{name:<48}{item['self_s'] * 1000:>10.1f}{item['cumulative_s'] * 1000:>16.1f}")
+
+
+def run(sizes: List[int], repeat: int, cycles: int, output: str):
+    with open(CONFIG_PATH, 'r') as f:
+        config = json.load(f)
+
+    results = {}
+    for title, bench in (
+        ('индикаторы', lambda: bench_indicators(config, sizes, repeat)),
+        ('шаги анализа', lambda: bench_analyzer(config, sizes, repeat)),
+        ('полный цикл', lambda: bench_cycle(config, cycles, repeat)),
+        ('холодный старт', lambda: bench_startup(repeat)),
+    ):
+        print(f"Бенчмарк: {title}...", file=sys.stderr)
+        results.update(bench())
+
+    report = {
+        'schema': SCHEMA_VERSION,
+        'meta': {
+            'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'sizes': sizes,
+            'repeat': repeat,
+            'cycles': cycles
+        },
+        'results': results
+    }
+
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+
+    print(format_results(results))
+    print(f"\nРезультаты: {output}")
+
+
+def format_results(results: Dict[str, Dict[str, float]]) -> str:
+    lines = [f"{'замер':<36}{'best, ms':>12}{'median, ms':>12}{'throughput':>14}{'peak, KiB':>12}"]
+    for key, stats in sorted(results.items()):
+        if 'cycles_per_s' in stats:
+            throughput = f"{stats['cycles_per_s']:.1f} cyc/s"
+        elif 'modules' in stats:
+            throughput = f"{stats['modules']} modules"
+        else:
+            throughput = f"{stats['bars_per_s'] / 1000:.0f}k bar/s"
+        lines.append(f"{key:<36}{stats['best_s'] * 1000:>12.3f}{stats['median_s'] * 1000:>12.3f}"
+                     f"{throughput:>14}{stats['peak_kib']:>12.0f}")
+    return '\n'.join(lines)
+
+
+def compare(base_path: str, current_path: str, threshold: float) -> int:
+    """Сравнение двух файлов результатов; 1 - есть замедление сильнее threshold %"""
+    with open(base_path, 'r') as f:
+        base = json.load(f)
+    with open(current_path, 'r') as f:
+        current = json.load(f)
+
+    if base.get('meta', {}).get('platform') != current.get('meta', {}).get('platform'):
+        print("Внимание: результаты сняты на разных платформах", file=sys.stderr)
+
+    base_results, current_results = base['results'], current['results']
+    regressions = []
+    lines = [f"{'замер':<36}{'base, ms':>12}{'current, ms':>13}{'change':>10}{'peak Δ, KiB':>13}"]
+    for key in sorted(set(base_results) & set(current_results)):
+        before, after = base_results[key], current_results[key]
+        change = (after['best_s'] / before['best_s'] - 1) * 100
+        peak_change = after['peak_kib'] - before['peak_kib']
+        mark = ''
+        if change > threshold:
+            mark = '  ▲'
+            regressions.append(key)
+        elif change < -threshold:
+            mark = '  ▼'
+        lines.append(f"{key:<36}{before['best_s'] * 1000:>12.3f}{after['best_s'] * 1000:>13.3f}"
+                     f"{change:>+9.1f}%{peak_change:>+13.0f}{mark}")
+
+    for key in sorted(set(base_results) - set(current_results)):
+        lines.append(f"{key:<36}  нет в текущих результатах")
+    for key in sorted(set(current_results) - set(base_results)):
+        lines.append(f"{key:<36}  новый замер")
+
+    print('\n'.join(lines))
+    if regressions:
+        print(f"\nЗамедление больше {threshold:g}%: {', '.join(regressions)}")
+        return 1
+    print(f"\nЗамедлений больше {threshold:g}% нет")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Набор бенчмарков XRP Bot')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='Запуск бенчмарков и запись результатов в JSON')
+    run_parser.add_argument('--sizes', type=int, nargs='+', default=[200, 2000, 20_000],
+                            help='Размеры истории в барах')
+    run_parser.add_argument('--repeat', type=int, default=5, help='Число повторов каждого замера')
+    run_parser.add_argument('--cycles', type=int, default=10, help='Циклов анализа на повтор')
+    run_parser.add_argument('--output', default=DEFAULT_OUTPUT, help='Файл результатов')
+
+    compare_parser = commands.add_parser('compare', help='Сравнение двух файлов результатов')
+    compare_parser.add_argument('base', help='Базовые результаты (например, из main)')
+    compare_parser.add_argument('current', help='Текущие результаты')
+    compare_parser.add_argument('--threshold', type=float, default=10.0,
+                                help='Допустимое замедление, %%')
+
+    startup_parser = commands.add_parser('startup', help='Самые медленные импорты при старте main.py')
+    startup_parser.add_argument('--top', type=int, default=20, help='Число модулей в списке')
+
+    args = parser.parse_args()
+    warnings.simplefilter('ignore', FutureWarning)
+
+    if args.command == 'run':
+        run(args.sizes, args.repeat, args.cycles, args.output)
+    elif args.command == 'startup':
+        startup(args.top)
+    else:
+        sys.exit(compare(args.base, args.current, args.threshold))
+
+
+if __name__ == "__main__":
+    main()
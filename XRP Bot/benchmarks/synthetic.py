@@ -0,0 +1,24 @@
+import numpy as np
+import pandas as pd
+
+
+def make_ohlcv(n: int, seed: int = 42, freq: str = '15min',
+               start: str = '2024-01-01', price: float = 0.5) -> pd.DataFrame:
+    """Детерминированные синтетические OHLCV данные (геометрическое случайное блуждание)"""
+    rng = np.random.default_rng(seed)
+    
+    returns = rng.normal(0, 0.004, n)
+    close = price * np.exp(np.cumsum(returns))
+    open_ = np.concatenate(([price], close[:-1]))
+    spread = np.abs(rng.normal(0, 0.003, n)) * close
+    high = np.maximum(open_, close) + spread
+    low = np.minimum(open_, close) - spread
+    volume = rng.lognormal(mean=13, sigma=0.5, size=n)
+    
+    return pd.DataFrame({
+        'open': open_,
+        'high': high,
+        'low': low,
+        'close': close,
+        'volume': volume
+    }, index=pd.date_range(start=start, periods=n, freq=freq, name='timestamp'))
@@ -1,37 +1,32 @@
 import pandas as pd
 import numpy as np
-from .base_indicator import BaseIndicator
+from types import SimpleNamespace
+from .base_indicator import BaseIndicator, LONG, SHORT
+from .result import IndicatorResult
+from .streaming import RollingMean, TrueRangeState, safe_div
 from typing import Dict, Any
 
 class ADXIndicator(BaseIndicator):
     """Индикатор Average Directional Index (ADX)"""
     
-    def calculate(self, data: pd.DataFrame) -> Dict[str, Any]:
+    def calculate(self, data: pd.DataFrame) -> IndicatorResult:
         """Расчет ADX"""
         if not self.validate_data(data):
             raise ValueError("Invalid data format")
-            
-        period = self.config.get('period', 14)
         
-        high = data['high']
-        low = data['low']
-        close = data['close']
+        period = self.config.get('period', 14)
         
-        # Расчет True Range
-        tr1 = high - low
-        tr2 = abs(high - close.shift(1))
-        tr3 = abs(low - close.shift(1))
-        true_range = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
+        features = self.features(data)
         
         # Расчет Directional Movement
-        plus_dm = high.diff()
-        minus_dm = -low.diff()
+        plus_dm = features.diff('high')
+        minus_dm = -features.diff('low')
         
         plus_dm = plus_dm.where((plus_dm > minus_dm) & (plus_dm > 0), 0)
         minus_dm = minus_dm.where((minus_dm > plus_dm) & (minus_dm > 0), 0)
         
         # Сглаживание
-        atr = true_range.rolling(window=period).mean()
+        atr = features.rolling_mean('true_range', period)
         plus_di = 100 * (plus_dm.rolling(window=period).mean() / atr)
         minus_di = 100 * (minus_dm.rolling(window=period).mean() / atr)
         
@@ -39,21 +34,26 @@ class ADXIndicator(BaseIndicator):
         dx = 100 * abs(plus_di - minus_di) / (plus_di + minus_di)
         adx = dx.rolling(window=period).mean()
         
-        return {
-            'adx': adx.iloc[-1],
-            'plus_di': plus_di.iloc[-1],
-            'minus_di': minus_di.iloc[-1],
-            'adx_values': adx.tolist(),
-            'plus_di_values': plus_di.tolist(),
-            'minus_di_values': minus_di.tolist()
-        }
+        return IndicatorResult(
+            {
+                'adx': adx.iloc[-1],
+                'plus_di': plus_di.iloc[-1],
+                'minus_di': minus_di.iloc[-1]
+            },
+            adx_values=adx,
+            plus_di_values=plus_di,
+            minus_di_values=minus_di
+        )
     
     def generate_signal(self, data: pd.DataFrame) -> str:
         """Генерация сигнала на основе ADX"""
         adx_data = self.calculate(data)
-        adx_value = adx_data['adx']
-        plus_di = adx_data['plus_di']
-        minus_di = adx_data['minus_di']
+        return self._evaluate_signal(adx_data, data['close'].iloc[-1])
+    
+    def _evaluate_signal(self, values: Dict[str, Any], price: float) -> str:
+        adx_value = values['adx']
+        plus_di = values['plus_di']
+        minus_di = values['minus_di']
         
         threshold = self.config.get('threshold', 25)
         
@@ -64,3 +64,47 @@ class ADXIndicator(BaseIndicator):
                 return "SHORT"
         else:
             return "NEUTRAL"
+    
+    def _signal_array(self, data: pd.DataFrame) -> np.ndarray:
+        adx_data = self.calculate(data)
+        adx = np.asarray(adx_data['adx_values'], dtype=float)
+        plus_di = np.asarray(adx_data['plus_di_values'], dtype=float)
+        minus_di = np.asarray(adx_data['minus_di_values'], dtype=float)
+        
+        trending = adx > self.config.get('threshold', 25)
+        return self._select([trending & (plus_di > minus_di), trending], [LONG, SHORT])
+    
+    def _init_state(self) -> SimpleNamespace:
+        period = self.config.get('period', 14)
+        return SimpleNamespace(
+            true_range=TrueRangeState(),
+            prev_high=None,
+            prev_low=None,
+            atr=RollingMean(period),
+            plus_dm=RollingMean(period),
+            minus_dm=RollingMean(period),
+            dx=RollingMean(period)
+        )
+    
+    def _update(self, state: SimpleNamespace, bar: Dict[str, float]) -> Dict[str, Any]:
+        high = float(bar['high'])
+        low = float(bar['low'])
+        
+        plus_dm = minus_dm = 0.0
+        if state.prev_high is not None:
+            up_move = high - state.prev_high
+            down_move = state.prev_low - low
+            # Тот же порядок, что и в calculate(): minus_dm сравнивается с уже обнуленным plus_dm
+            plus_dm = up_move if up_move > down_move and up_move > 0 else 0.0
+            minus_dm = down_move if down_move > plus_dm and down_move > 0 else 0.0
+        state.prev_high = high
+        state.prev_low = low
+        
+        atr = state.atr.update(state.true_range.update(high, low, float(bar['close'])))
+        plus_di = 100 * safe_div(state.plus_dm.update(plus_dm), atr)
+        minus_di = 100 * safe_div(state.minus_dm.update(minus_dm), atr)
+        
+        dx = 100 * safe_div(abs(plus_di - minus_di), plus_di + minus_di)
+        adx = state.dx.update(dx)
+        
+        return {'adx': adx, 'plus_di': plus_di, 'minus_di': minus_di}
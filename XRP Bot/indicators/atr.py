@@ -1,45 +1,37 @@
 import pandas as pd
 import numpy as np
-from .base_indicator import BaseIndicator
+from types import SimpleNamespace
+from .base_indicator import BaseIndicator, LONG, SHORT
+from .result import IndicatorResult
+from .streaming import RollingMean, TrueRangeState
 from typing import Dict, Any
 
 class ATRIndicator(BaseIndicator):
     """Индикатор Average True Range (ATR)"""
     
-    def calculate(self, data: pd.DataFrame) -> Dict[str, Any]:
+    def calculate(self, data: pd.DataFrame) -> IndicatorResult:
         """Расчет ATR"""
         if not self.validate_data(data):
             raise ValueError("Invalid data format")
-            
-        period = self.config.get('period', 14)
-        
-        high = data['high']
-        low = data['low']
-        close = data['close']
         
-        # True Range
-        tr1 = high - low
-        tr2 = abs(high - close.shift(1))
-        tr3 = abs(low - close.shift(1))
-        true_range = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
+        period = self.config.get('period', 14)
         
-        # ATR
-        atr = true_range.rolling(window=period).mean()
+        # ATR (скользящее среднее True Range)
+        atr = self.features(data).rolling_mean('true_range', period)
         
-        return {
-            'atr': atr.iloc[-1],
-            'values': atr.tolist()
-        }
+        return IndicatorResult({'atr': atr.iloc[-1]}, values=atr)
     
     def generate_signal(self, data: pd.DataFrame) -> str:
         """Генерация сигнала на основе ATR"""
         atr_data = self.calculate(data)
-        atr_value = atr_data['atr']
-        current_price = data['close'].iloc[-1]
+        return self._evaluate_signal(atr_data, data['close'].iloc[-1])
+    
+    def _evaluate_signal(self, values: Dict[str, Any], price: float) -> str:
+        atr_value = values['atr']
         
         # ATR используется для определения волатильности
         # Более высокий ATR означает больше волатильности
-        atr_ratio = atr_value / current_price
+        atr_ratio = atr_value / price
         
         if atr_ratio > 0.02:  # Высокая волатильность
             return "LONG"  # Возможность для трендовой торговли
@@ -47,3 +39,19 @@ class ATRIndicator(BaseIndicator):
             return "SHORT"  # Возможный выход из позиции
         else:
             return "NEUTRAL"
+    
+    def _signal_array(self, data: pd.DataFrame) -> np.ndarray:
+        atr = np.asarray(self.calculate(data)['values'], dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            atr_ratio = atr / data['close'].to_numpy(dtype=float)
+        return self._select([atr_ratio > 0.02, atr_ratio < 0.005], [LONG, SHORT])
+    
+    def _init_state(self) -> SimpleNamespace:
+        return SimpleNamespace(
+            true_range=TrueRangeState(),
+            atr=RollingMean(self.config.get('period', 14))
+        )
+    
+    def _update(self, state: SimpleNamespace, bar: Dict[str, float]) -> Dict[str, Any]:
+        true_range = state.true_range.update(float(bar['high']), float(bar['low']), float(bar['close']))
+        return {'atr': state.atr.update(true_range)}
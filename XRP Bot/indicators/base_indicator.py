@@ -1,9 +1,27 @@
 import pandas as pd
 import numpy as np
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Tuple
+from typing import Dict, Any, Tuple, Optional
 import logging
 
+from .feature_store import FeatureStore
+from .result import IndicatorResult
+
+# Коды сигналов в массивах generate_signals()
+LONG = 1
+NEUTRAL = 0
+SHORT = -1
+SIGNAL_CODES = {"LONG": LONG, "NEUTRAL": NEUTRAL, "SHORT": SHORT}
+
+
+def signal_names(signals: np.ndarray) -> np.ndarray:
+    """Массив кодов сигналов -> массив строк LONG/SHORT/NEUTRAL"""
+    names = np.full(len(signals), "NEUTRAL", dtype=object)
+    names[signals == LONG] = "LONG"
+    names[signals == SHORT] = "SHORT"
+    return names
+
+
 class BaseIndicator(ABC):
     """Базовый абстрактный класс для всех технических индикаторов"""
     
@@ -11,9 +29,13 @@ class BaseIndicator(ABC):
         self.config = config
         self.timeframe = timeframe
         self.logger = logging.getLogger(self.__class__.__name__)
-        
+        # Общий кэш примитивов, назначается движком на время цикла
+        self.feature_store: Optional[FeatureStore] = None
+        # Состояние потокового (инкрементального) расчета
+        self._state = None
+    
     @abstractmethod
-    def calculate(self, data: pd.DataFrame) -> Dict[str, Any]:
+    def calculate(self, data: pd.DataFrame) -> IndicatorResult:
         """Расчет значения индикатора"""
         pass
     
@@ -22,11 +44,75 @@ class BaseIndicator(ABC):
         """Генерация торгового сигнала на основе индикатора"""
         pass
     
+    def generate_signals(self, data: pd.DataFrame) -> np.ndarray:
+        """Сигналы на каждом баре истории за один векторный проход
+        
+        Возвращает массив int8 длины len(data): LONG = 1, SHORT = -1,
+        NEUTRAL = 0. Элемент i - сигнал потокового расчета (update()) после
+        бара i (NEUTRAL там, где для сигнала еще не хватает истории). Он
+        совпадает с generate_signal(data.iloc[:i + 1]), если calculate()
+        не ограничен окном короче истории; VolumeProfile строит профиль
+        по последним window барам, и на более длинных префиксах его
+        generate_signal (профиль по всей истории) может отличаться.
+        """
+        if not self.validate_data(data):
+            raise ValueError("Invalid data format")
+        return self._signal_array(data)
+    
+    def _signal_array(self, data: pd.DataFrame) -> np.ndarray:
+        """Массив сигналов; по умолчанию - проход update() по барам с чистым состоянием"""
+        state = self._init_state()
+        signals = np.zeros(len(data), dtype=np.int8)
+        for i, bar in enumerate(data.to_dict('records')):
+            values = self._update(state, bar)
+            signals[i] = SIGNAL_CODES[self._evaluate_signal(values, bar['close'])]
+        return signals
+    
+    @staticmethod
+    def _select(conditions, choices) -> np.ndarray:
+        """Векторный аналог цепочки if/elif: первое истинное условие задает сигнал"""
+        return np.select(conditions, choices, NEUTRAL).astype(np.int8)
+    
+    def update(self, bar: Dict[str, float]) -> Dict[str, Any]:
+        """Инкрементальный расчет по новой закрытой свече
+        
+        bar - словарь (или строка DataFrame) с ключами open/high/low/close/volume.
+        Возвращает текущие значения индикатора и сигнал ('signal'), совпадающие
+        с calculate()/generate_signal() на всей истории, поданной через update().
+        """
+        if self._state is None:
+            self._state = self._init_state()
+        values = self._update(self._state, bar)
+        values['signal'] = self._evaluate_signal(values, bar['close'])
+        return values
+    
+    def reset(self):
+        """Сброс состояния потокового расчета"""
+        self._state = None
+    
+    def _init_state(self) -> Any:
+        """Создание состояния потокового расчета"""
+        raise NotImplementedError(f"{self.__class__.__name__} не поддерживает update()")
+    
+    def _update(self, state: Any, bar: Dict[str, float]) -> Dict[str, Any]:
+        """Обновление состояния по свече, возвращает значения индикатора"""
+        raise NotImplementedError(f"{self.__class__.__name__} не поддерживает update()")
+    
+    def _evaluate_signal(self, values: Dict[str, Any], price: float) -> str:
+        """Сигнал по значениям индикатора и текущей цене"""
+        raise NotImplementedError
+    
     def validate_data(self, data: pd.DataFrame) -> bool:
         """Проверка корректности данных"""
         required_columns = ['open', 'high', 'low', 'close', 'volume']
         return all(col in data.columns for col in required_columns)
     
+    def features(self, data: pd.DataFrame) -> FeatureStore:
+        """Хранилище примитивов для данных (общее, если назначено движком)"""
+        if self.feature_store is not None and self.feature_store.covers(data):
+            return self.feature_store
+        return FeatureStore(data)
+    
     def get_name(self) -> str:
         """Возвращает название индикатора"""
         return self.__class__.__name__.lower().replace('indicator', '')
@@ -1,47 +1,78 @@
 import pandas as pd
 import numpy as np
-from .base_indicator import BaseIndicator
+from types import SimpleNamespace
+from .base_indicator import BaseIndicator, LONG, SHORT
+from .result import IndicatorResult
+from .streaming import RollingMean, RollingStd
 from typing import Dict, Any
 
 class BollingerBandsIndicator(BaseIndicator):
     """Индикатор Bollinger Bands"""
     
-    def calculate(self, data: pd.DataFrame) -> Dict[str, Any]:
+    def calculate(self, data: pd.DataFrame) -> IndicatorResult:
         """Расчет Bollinger Bands"""
         if not self.validate_data(data):
             raise ValueError("Invalid data format")
-            
+        
         period = self.config.get('period', 20)
         std_dev = self.config.get('std_dev', 2)
         
         close = data['close']
-        sma = close.rolling(window=period).mean()
+        sma = self.features(data).rolling_mean('close', period)
         std = close.rolling(window=period).std()
         
         upper_band = sma + (std * std_dev)
         lower_band = sma - (std * std_dev)
         middle_band = sma
         
-        return {
-            'upper_band': upper_band.iloc[-1],
-            'middle_band': middle_band.iloc[-1],
-            'lower_band': lower_band.iloc[-1],
-            'upper_values': upper_band.tolist(),
-            'middle_values': middle_band.tolist(),
-            'lower_values': lower_band.tolist()
-        }
+        return IndicatorResult(
+            {
+                'upper_band': upper_band.iloc[-1],
+                'middle_band': middle_band.iloc[-1],
+                'lower_band': lower_band.iloc[-1]
+            },
+            upper_values=upper_band,
+            middle_values=middle_band,
+            lower_values=lower_band
+        )
     
     def generate_signal(self, data: pd.DataFrame) -> str:
         """Генерация сигнала на основе Bollinger Bands"""
         bb_data = self.calculate(data)
-        current_price = data['close'].iloc[-1]
-        
-        upper_band = bb_data['upper_band']
-        lower_band = bb_data['lower_band']
+        return self._evaluate_signal(bb_data, data['close'].iloc[-1])
+    
+    def _evaluate_signal(self, values: Dict[str, Any], price: float) -> str:
+        upper_band = values['upper_band']
+        lower_band = values['lower_band']
         
-        if current_price > upper_band:
+        if price > upper_band:
             return "SHORT"
-        elif current_price < lower_band:
+        elif price < lower_band:
             return "LONG"
         else:
             return "NEUTRAL"
+    
+    def _signal_array(self, data: pd.DataFrame) -> np.ndarray:
+        bb_data = self.calculate(data)
+        price = data['close'].to_numpy(dtype=float)
+        return self._select(
+            [price > np.asarray(bb_data['upper_values'], dtype=float),
+             price < np.asarray(bb_data['lower_values'], dtype=float)],
+            [SHORT, LONG]
+        )
+    
+    def _init_state(self) -> SimpleNamespace:
+        period = self.config.get('period', 20)
+        return SimpleNamespace(sma=RollingMean(period), std=RollingStd(period))
+    
+    def _update(self, state: SimpleNamespace, bar: Dict[str, float]) -> Dict[str, Any]:
+        close = float(bar['close'])
+        std_dev = self.config.get('std_dev', 2)
+        sma = state.sma.update(close)
+        std = state.std.update(close)
+        
+        return {
+            'upper_band': sma + (std * std_dev),
+            'middle_band': sma,
+            'lower_band': sma - (std * std_dev)
+        }
@@ -1,45 +1,71 @@
 import pandas as pd
 import numpy as np
-from .base_indicator import BaseIndicator
+from numpy.lib.stride_tricks import sliding_window_view
+from types import SimpleNamespace
+from .base_indicator import BaseIndicator, LONG, SHORT
+from .result import IndicatorResult
+from .streaming import RollingMean, RollingMeanDeviation, safe_div
 from typing import Dict, Any
 
+# Строк окон на блок: ограничивает временные массивы (блок x window) на длинной истории
+MAD_CHUNK_ROWS = 65536
+
+
+def rolling_mean_deviation(values: np.ndarray, window: int) -> np.ndarray:
+    """Скользящее среднее абсолютное отклонение по окнам sliding_window_view
+    
+    Значения совпадают с rolling(window).apply(lambda x: np.mean(np.abs(x - np.mean(x)))):
+    nan для первых window - 1 баров и для окон, содержащих nan.
+    """
+    values = np.asarray(values, dtype=float)
+    result = np.full(len(values), np.nan)
+    if window <= 0 or len(values) < window:
+        return result
+    
+    windows = sliding_window_view(values, window)
+    for start in range(0, len(windows), MAD_CHUNK_ROWS):
+        chunk = windows[start:start + MAD_CHUNK_ROWS]
+        mean = chunk.mean(axis=1, keepdims=True)
+        result[window - 1 + start:window - 1 + start + len(chunk)] = np.abs(chunk - mean).mean(axis=1)
+    return result
+
+
 class CCIIndicator(BaseIndicator):
     """Индикатор Commodity Channel Index (CCI)"""
     
-    def calculate(self, data: pd.DataFrame) -> Dict[str, Any]:
+    def calculate(self, data: pd.DataFrame) -> IndicatorResult:
         """Расчет CCI"""
         if not self.validate_data(data):
             raise ValueError("Invalid data format")
-            
+        
         period = self.config.get('period', 20)
         
-        high = data['high']
-        low = data['low']
-        close = data['close']
+        features = self.features(data)
         
         # Типичная цена
-        typical_price = (high + low + close) / 3
+        typical_price = features.typical_price()
         
         # Moving average of typical price
-        tp_sma = typical_price.rolling(window=period).mean()
+        tp_sma = features.rolling_mean('typical_price', period)
         
         # Mean deviation
-        mean_dev = typical_price.rolling(window=period).apply(
-            lambda x: np.mean(np.abs(x - np.mean(x)))
+        mean_dev = pd.Series(
+            rolling_mean_deviation(typical_price.to_numpy(dtype=float), period),
+            index=typical_price.index
         )
         
         # CCI
         cci = (typical_price - tp_sma) / (0.015 * mean_dev)
         
-        return {
-            'cci': cci.iloc[-1],
-            'values': cci.tolist()
-        }
+        return IndicatorResult({'cci': cci.iloc[-1]}, values=cci)
     
     def generate_signal(self, data: pd.DataFrame) -> str:
         """Генерация сигнала на основе CCI"""
         cci_data = self.calculate(data)
-        cci_value = cci_data['cci']
+        return self._evaluate_signal(cci_data, data['close'].iloc[-1])
+    
+    def _evaluate_signal(self, values: Dict[str, Any], price: float) -> str:
+        cci_value = values['cci']
         
         overbought = self.config.get('overbought', 100)
         oversold = self.config.get('oversold', -100)
@@ -50,3 +76,21 @@ class CCIIndicator(BaseIndicator):
             return "LONG"
         else:
             return "NEUTRAL"
+    
+    def _signal_array(self, data: pd.DataFrame) -> np.ndarray:
+        cci = np.asarray(self.calculate(data)['values'], dtype=float)
+        return self._select(
+            [cci > self.config.get('overbought', 100), cci < self.config.get('oversold', -100)],
+            [SHORT, LONG]
+        )
+    
+    def _init_state(self) -> SimpleNamespace:
+        period = self.config.get('period', 20)
+        return SimpleNamespace(tp_sma=RollingMean(period), mean_dev=RollingMeanDeviation(period))
+    
+    def _update(self, state: SimpleNamespace, bar: Dict[str, float]) -> Dict[str, Any]:
+        typical_price = (float(bar['high']) + float(bar['low']) + float(bar['close'])) / 3
+        tp_sma = state.tp_sma.update(typical_price)
+        mean_dev = state.mean_dev.update(typical_price)
+        
+        return {'cci': safe_div(typical_price - tp_sma, 0.015 * mean_dev)}
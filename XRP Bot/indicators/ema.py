@@ -1,6 +1,8 @@
 import pandas as pd
 import numpy as np
-from .base_indicator import BaseIndicator
+from .base_indicator import BaseIndicator, LONG, SHORT
+from .result import IndicatorResult
+from .streaming import EMAState
 from typing import Dict, Any
 
 class EMAIndicator(BaseIndicator):
@@ -10,28 +12,37 @@ class EMAIndicator(BaseIndicator):
         super().__init__(config, timeframe)
         self.period = period
     
-    def calculate(self, data: pd.DataFrame) -> Dict[str, Any]:
+    def calculate(self, data: pd.DataFrame) -> IndicatorResult:
         """Расчет EMA"""
         if not self.validate_data(data):
             raise ValueError("Invalid data format")
-            
-        close = data['close']
-        ema = close.ewm(span=self.period, adjust=False).mean()
         
-        return {
-            'ema': ema.iloc[-1],
-            'values': ema.tolist()
-        }
+        ema = self.features(data).ema('close', self.period)
+        
+        return IndicatorResult({'ema': ema.iloc[-1]}, values=ema)
     
     def generate_signal(self, data: pd.DataFrame) -> str:
         """Генерация сигнала на основе EMA"""
         ema_data = self.calculate(data)
-        ema_value = ema_data['ema']
-        current_price = data['close'].iloc[-1]
+        return self._evaluate_signal(ema_data, data['close'].iloc[-1])
+    
+    def _evaluate_signal(self, values: Dict[str, Any], price: float) -> str:
+        ema_value = values['ema']
         
-        if current_price > ema_value:
+        if price > ema_value:
             return "LONG"
-        elif current_price < ema_value:
+        elif price < ema_value:
             return "SHORT"
         else:
             return "NEUTRAL"
+    
+    def _signal_array(self, data: pd.DataFrame) -> np.ndarray:
+        ema = np.asarray(self.calculate(data)['values'], dtype=float)
+        price = data['close'].to_numpy(dtype=float)
+        return self._select([price > ema, price < ema], [LONG, SHORT])
+    
+    def _init_state(self) -> EMAState:
+        return EMAState(self.period)
+    
+    def _update(self, state: EMAState, bar: Dict[str, float]) -> Dict[str, Any]:
+        return {'ema': state.update(float(bar['close']))}
@@ -0,0 +1,98 @@
+import pandas as pd
+from typing import Dict, Any, Callable, Tuple
+
+
+class FeatureStore:
+    """Кэш общих примитивов для одного DataFrame (одного таймфрейма за цикл)
+
+    Индикаторы запрашивают именованные ряды (true range, типичная цена,
+    EMA, скользящие экстремумы, разности), и каждый ряд считается только
+    один раз. Имя ряда - это колонка данных ('close', 'high', ...) или
+    производный ряд ('true_range', 'typical_price').
+    """
+
+    DERIVED = ('true_range', 'typical_price')
+
+    def __init__(self, data: pd.DataFrame):
+        self.data = data
+        self._cache: Dict[Tuple[Any, ...], pd.Series] = {}
+
+    def covers(self, data: pd.DataFrame) -> bool:
+        """Проверка, что хранилище построено для этих данных"""
+        return self.data is data
+
+    def clear(self):
+        """Сброс всех вычисленных рядов"""
+        self._cache.clear()
+
+    def _get(self, key: Tuple[Any, ...], factory: Callable[[], pd.Series]) -> pd.Series:
+        series = self._cache.get(key)
+        if series is None:
+            series = factory()
+            self._cache[key] = series
+        return series
+
+    def series(self, name: str) -> pd.Series:
+        """Колонка данных или производный ряд по имени"""
+        if name == 'true_range':
+            return self.true_range()
+        if name == 'typical_price':
+            return self.typical_price()
+        if name in self.data.columns:
+            return self._get(('column', name), lambda: self.data[name])
+        raise KeyError(f"Неизвестный ряд: {name}")
+
+    def true_range(self) -> pd.Series:
+        """True Range"""
+        def factory():
+            high = self.series('high')
+            low = self.series('low')
+            prev_close = self.series('close').shift(1)
+            tr1 = high - low
+            tr2 = abs(high - prev_close)
+            tr3 = abs(low - prev_close)
+            return pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
+
+        return self._get(('true_range',), factory)
+
+    def typical_price(self) -> pd.Series:
+        """Типичная цена (high + low + close) / 3"""
+        return self._get(
+            ('typical_price',),
+            lambda: (self.series('high') + self.series('low') + self.series('close')) / 3
+        )
+
+    def ema(self, name: str, span: int) -> pd.Series:
+        """EMA ряда с заданным span (adjust=False)"""
+        return self._get(
+            ('ema', name, span),
+            lambda: self.series(name).ewm(span=span, adjust=False).mean()
+        )
+
+    def rolling_mean(self, name: str, window: int) -> pd.Series:
+        """Скользящее среднее ряда"""
+        return self._get(
+            ('rolling_mean', name, window),
+            lambda: self.series(name).rolling(window=window).mean()
+        )
+
+    def rolling_max(self, name: str, window: int) -> pd.Series:
+        """Скользящий максимум ряда"""
+        return self._get(
+            ('rolling_max', name, window),
+            lambda: self.series(name).rolling(window=window).max()
+        )
+
+    def rolling_min(self, name: str, window: int) -> pd.Series:
+        """Скользящий минимум ряда"""
+        return self._get(
+            ('rolling_min', name, window),
+            lambda: self.series(name).rolling(window=window).min()
+        )
+
+    def diff(self, name: str, periods: int = 1) -> pd.Series:
+        """Разность ряда"""
+        return self._get(
+            ('diff', name, periods),
+            lambda: self.series(name).diff(periods)
+        )
@@ -1,70 +1,128 @@
 import pandas as pd
 import numpy as np
-from .base_indicator import BaseIndicator
+from collections import deque
+from types import SimpleNamespace
+from .base_indicator import BaseIndicator, LONG, SHORT
+from .result import IndicatorResult
+from .streaming import RollingExtremum, NAN
 from typing import Dict, Any
 
 class IchimokuIndicator(BaseIndicator):
     """Индикатор Ichimoku Cloud"""
     
-    def calculate(self, data: pd.DataFrame) -> Dict[str, Any]:
+    def calculate(self, data: pd.DataFrame) -> IndicatorResult:
         """Расчет Ichimoku"""
         if not self.validate_data(data):
             raise ValueError("Invalid data format")
-            
+        
         tenkan_period = self.config.get('tenkan_period', 9)
         kijun_period = self.config.get('kijun_period', 26)
         senkou_b_period = self.config.get('senkou_b_period', 52)
         
-        high = data['high']
-        low = data['low']
+        features = self.features(data)
         close = data['close']
         
         # Tenkan-sen (Conversion Line)
-        tenkan_sen = (high.rolling(window=tenkan_period).max() + 
-                      low.rolling(window=tenkan_period).min()) / 2
+        tenkan_sen = (features.rolling_max('high', tenkan_period) + 
+                      features.rolling_min('low', tenkan_period)) / 2
         
         # Kijun-sen (Base Line)
-        kijun_sen = (high.rolling(window=kijun_period).max() + 
-                     low.rolling(window=kijun_period).min()) / 2
+        kijun_sen = (features.rolling_max('high', kijun_period) + 
+                     features.rolling_min('low', kijun_period)) / 2
         
         # Senkou Span A (Leading Span A)
         senkou_span_a = ((tenkan_sen + kijun_sen) / 2).shift(kijun_period)
         
         # Senkou Span B (Leading Span B)
-        senkou_span_b = ((high.rolling(window=senkou_b_period).max() + 
-                          low.rolling(window=senkou_b_period).min()) / 2).shift(kijun_period)
+        senkou_span_b = ((features.rolling_max('high', senkou_b_period) + 
+                          features.rolling_min('low', senkou_b_period)) / 2).shift(kijun_period)
         
         # Chikou Span (Lagging Span)
         chikou_span = close.shift(-kijun_period)
         
-        return {
-            'tenkan_sen': tenkan_sen.iloc[-1],
-            'kijun_sen': kijun_sen.iloc[-1],
-            'senkou_span_a': senkou_span_a.iloc[-1],
-            'senkou_span_b': senkou_span_b.iloc[-1],
-            'chikou_span': chikou_span.iloc[-1] if not pd.isna(chikou_span.iloc[-1]) else close.iloc[-1],
-            'tenkan_values': tenkan_sen.tolist(),
-            'kijun_values': kijun_sen.tolist(),
-            'senkou_a_values': senkou_span_a.tolist(),
-            'senkou_b_values': senkou_span_b.tolist()
-        }
+        return IndicatorResult(
+            {
+                'tenkan_sen': tenkan_sen.iloc[-1],
+                'kijun_sen': kijun_sen.iloc[-1],
+                'senkou_span_a': senkou_span_a.iloc[-1],
+                'senkou_span_b': senkou_span_b.iloc[-1],
+                'chikou_span': chikou_span.iloc[-1] if not pd.isna(chikou_span.iloc[-1]) else close.iloc[-1]
+            },
+            tenkan_values=tenkan_sen,
+            kijun_values=kijun_sen,
+            senkou_a_values=senkou_span_a,
+            senkou_b_values=senkou_span_b
+        )
     
     def generate_signal(self, data: pd.DataFrame) -> str:
         """Генерация сигнала на основе Ichimoku"""
         ichimoku_data = self.calculate(data)
-        current_price = data['close'].iloc[-1]
-        
-        tenkan = ichimoku_data['tenkan_sen']
-        kijun = ichimoku_data['kijun_sen']
-        senkou_a = ichimoku_data['senkou_span_a']
-        senkou_b = ichimoku_data['senkou_span_b']
+        return self._evaluate_signal(ichimoku_data, data['close'].iloc[-1])
+    
+    def _evaluate_signal(self, values: Dict[str, Any], price: float) -> str:
+        tenkan = values['tenkan_sen']
+        kijun = values['kijun_sen']
+        senkou_a = values['senkou_span_a']
+        senkou_b = values['senkou_span_b']
         
         # Сигналы на основе положения цены относительно облака
-        if current_price > senkou_a and current_price > senkou_b:
+        if price > senkou_a and price > senkou_b:
             if tenkan > kijun:
                 return "LONG"
-        elif current_price < senkou_a and current_price < senkou_b:
+        elif price < senkou_a and price < senkou_b:
             if tenkan < kijun:
                 return "SHORT"
         
         return "NEUTRAL"
+    
+    def _signal_array(self, data: pd.DataFrame) -> np.ndarray:
+        ichimoku_data = self.calculate(data)
+        tenkan = np.asarray(ichimoku_data['tenkan_values'], dtype=float)
+        kijun = np.asarray(ichimoku_data['kijun_values'], dtype=float)
+        senkou_a = np.asarray(ichimoku_data['senkou_a_values'], dtype=float)
+        senkou_b = np.asarray(ichimoku_data['senkou_b_values'], dtype=float)
+        price = data['close'].to_numpy(dtype=float)
+        
+        above_cloud = (price > senkou_a) & (price > senkou_b)
+        below_cloud = (price < senkou_a) & (price < senkou_b)
+        return self._select(
+            [above_cloud & (tenkan > kijun), ~above_cloud & below_cloud & (tenkan < kijun)],
+            [LONG, SHORT]
+        )
+    
+    def _init_state(self) -> SimpleNamespace:
+        tenkan_period = self.config.get('tenkan_period', 9)
+        kijun_period = self.config.get('kijun_period', 26)
+        senkou_b_period = self.config.get('senkou_b_period', 52)
+        return SimpleNamespace(
+            tenkan_high=RollingExtremum(tenkan_period, 'max'),
+            tenkan_low=RollingExtremum(tenkan_period, 'min'),
+            kijun_high=RollingExtremum(kijun_period, 'max'),
+            kijun_low=RollingExtremum(kijun_period, 'min'),
+            senkou_b_high=RollingExtremum(senkou_b_period, 'max'),
+            senkou_b_low=RollingExtremum(senkou_b_period, 'min'),
+            # Облако смещено вперед на kijun_period баров
+            leading=deque(maxlen=kijun_period + 1)
+        )
+    
+    def _update(self, state: SimpleNamespace, bar: Dict[str, float]) -> Dict[str, Any]:
+        high = float(bar['high'])
+        low = float(bar['low'])
+        
+        tenkan_sen = (state.tenkan_high.update(high) + state.tenkan_low.update(low)) / 2
+        kijun_sen = (state.kijun_high.update(high) + state.kijun_low.update(low)) / 2
+        senkou_b_raw = (state.senkou_b_high.update(high) + state.senkou_b_low.update(low)) / 2
+        
+        state.leading.append(((tenkan_sen + kijun_sen) / 2, senkou_b_raw))
+        senkou_span_a = senkou_span_b = NAN
+        if len(state.leading) == state.leading.maxlen:
+            senkou_span_a, senkou_span_b = state.leading[0]
+        
+        return {
+            'tenkan_sen': tenkan_sen,
+            'kijun_sen': kijun_sen,
+            'senkou_span_a': senkou_span_a,
+            'senkou_span_b': senkou_span_b,
+            # Chikou Span на последнем баре всегда равен текущему закрытию
+            'chikou_span': float(bar['close'])
+        }
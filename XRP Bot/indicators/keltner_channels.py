@@ -1,58 +1,87 @@
 import pandas as pd
 import numpy as np
-from .base_indicator import BaseIndicator
+from types import SimpleNamespace
+from .base_indicator import BaseIndicator, LONG, SHORT
+from .result import IndicatorResult
+from .streaming import EMAState, RollingMean, TrueRangeState
 from typing import Dict, Any
 
 class KeltnerChannelsIndicator(BaseIndicator):
     """Индикатор Keltner Channels"""
     
-    def calculate(self, data: pd.DataFrame) -> Dict[str, Any]:
+    def calculate(self, data: pd.DataFrame) -> IndicatorResult:
         """Расчет Keltner Channels"""
         if not self.validate_data(data):
             raise ValueError("Invalid data format")
-            
+        
         ema_period = self.config.get('ema_period', 20)
         atr_period = self.config.get('atr_period', 10)
         multiplier = self.config.get('multiplier', 2)
         
-        high = data['high']
-        low = data['low']
-        close = data['close']
+        features = self.features(data)
         
         # EMA
-        ema = close.ewm(span=ema_period, adjust=False).mean()
+        ema = features.ema('close', ema_period)
         
         # ATR для Keltner Channels
-        tr1 = high - low
-        tr2 = abs(high - close.shift(1))
-        tr3 = abs(low - close.shift(1))
-        true_range = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-        atr = true_range.rolling(window=atr_period).mean()
+        atr = features.rolling_mean('true_range', atr_period)
         
         # Keltner Channels
         upper_band = ema + (multiplier * atr)
         lower_band = ema - (multiplier * atr)
         
-        return {
-            'upper_band': upper_band.iloc[-1],
-            'lower_band': lower_band.iloc[-1],
-            'middle_line': ema.iloc[-1],
-            'upper_values': upper_band.tolist(),
-            'lower_values': lower_band.tolist(),
-            'middle_values': ema.tolist()
-        }
+        return IndicatorResult(
+            {
+                'upper_band': upper_band.iloc[-1],
+                'lower_band': lower_band.iloc[-1],
+                'middle_line': ema.iloc[-1]
+            },
+            upper_values=upper_band,
+            lower_values=lower_band,
+            middle_values=ema
+        )
     
     def generate_signal(self, data: pd.DataFrame) -> str:
         """Генерация сигнала на основе Keltner Channels"""
         kc_data = self.calculate(data)
-        current_price = data['close'].iloc[-1]
-        
-        upper_band = kc_data['upper_band']
-        lower_band = kc_data['lower_band']
+        return self._evaluate_signal(kc_data, data['close'].iloc[-1])
+    
+    def _evaluate_signal(self, values: Dict[str, Any], price: float) -> str:
+        upper_band = values['upper_band']
+        lower_band = values['lower_band']
         
-        if current_price > upper_band:
+        if price > upper_band:
             return "SHORT"
-        elif current_price < lower_band:
+        elif price < lower_band:
             return "LONG"
         else:
             return "NEUTRAL"
+    
+    def _signal_array(self, data: pd.DataFrame) -> np.ndarray:
+        kc_data = self.calculate(data)
+        price = data['close'].to_numpy(dtype=float)
+        return self._select(
+            [price > np.asarray(kc_data['upper_values'], dtype=float),
+             price < np.asarray(kc_data['lower_values'], dtype=float)],
+            [SHORT, LONG]
+        )
+    
+    def _init_state(self) -> SimpleNamespace:
+        return SimpleNamespace(
+            ema=EMAState(self.config.get('ema_period', 20)),
+            true_range=TrueRangeState(),
+            atr=RollingMean(self.config.get('atr_period', 10))
+        )
+    
+    def _update(self, state: SimpleNamespace, bar: Dict[str, float]) -> Dict[str, Any]:
+        multiplier = self.config.get('multiplier', 2)
+        close = float(bar['close'])
+        
+        ema = state.ema.update(close)
+        atr = state.atr.update(state.true_range.update(float(bar['high']), float(bar['low']), close))
+        
+        return {
+            'upper_band': ema + (multiplier * atr),
+            'lower_band': ema - (multiplier * atr),
+            'middle_line': ema
+        }
@@ -1,50 +1,62 @@
 import pandas as pd
 import numpy as np
-from .base_indicator import BaseIndicator
+from types import SimpleNamespace
+from .base_indicator import BaseIndicator, LONG, SHORT
+from .result import IndicatorResult
+from .streaming import EMAState, NAN
 from typing import Dict, Any
 
 class MACDIndicator(BaseIndicator):
     """Индикатор Moving Average Convergence Divergence (MACD)"""
     
-    def calculate(self, data: pd.DataFrame) -> Dict[str, Any]:
+    def calculate(self, data: pd.DataFrame) -> IndicatorResult:
         """Расчет MACD"""
         if not self.validate_data(data):
             raise ValueError("Invalid data format")
-            
+        
         fast_period = self.config.get('fast_period', 12)
         slow_period = self.config.get('slow_period', 26)
         signal_period = self.config.get('signal_period', 9)
         
-        close = data['close']
+        features = self.features(data)
         
         # Расчет EMA
-        ema_fast = close.ewm(span=fast_period, adjust=False).mean()
-        ema_slow = close.ewm(span=slow_period, adjust=False).mean()
+        ema_fast = features.ema('close', fast_period)
+        ema_slow = features.ema('close', slow_period)
         
         # MACD линия и сигнальная линия
         macd_line = ema_fast - ema_slow
         signal_line = macd_line.ewm(span=signal_period, adjust=False).mean()
         histogram = macd_line - signal_line
         
-        return {
-            'macd_line': macd_line.iloc[-1],
-            'signal_line': signal_line.iloc[-1],
-            'histogram': histogram.iloc[-1],
-            'macd_values': macd_line.tolist(),
-            'signal_values': signal_line.tolist(),
-            'histogram_values': histogram.tolist()
-        }
+        return IndicatorResult(
+            {
+                'macd_line': macd_line.iloc[-1],
+                'signal_line': signal_line.iloc[-1],
+                'histogram': histogram.iloc[-1]
+            },
+            macd_values=macd_line,
+            signal_values=signal_line,
+            histogram_values=histogram
+        )
     
     def generate_signal(self, data: pd.DataFrame) -> str:
         """Генерация сигнала на основе MACD"""
         macd_data = self.calculate(data)
         
-        macd_current = macd_data['macd_line']
-        signal_current = macd_data['signal_line']
+        # Значения на предыдущем баре для проверки пересечения
+        macd_data['macd_prev'] = macd_data['macd_values'][-2]
+        macd_data['signal_prev'] = macd_data['signal_values'][-2]
+        
+        return self._evaluate_signal(macd_data, data['close'].iloc[-1])
+    
+    def _evaluate_signal(self, values: Dict[str, Any], price: float) -> str:
+        macd_current = values['macd_line']
+        signal_current = values['signal_line']
         
         # Проверка пересечения
-        macd_prev = macd_data['macd_values'][-2]
-        signal_prev = macd_data['signal_values'][-2]
+        macd_prev = values['macd_prev']
+        signal_prev = values['signal_prev']
         
         if macd_current > signal_current and macd_prev <= signal_prev:
             return "LONG"
@@ -52,3 +64,43 @@ class MACDIndicator(BaseIndicator):
             return "SHORT"
         else:
             return "NEUTRAL"
+    
+    def _signal_array(self, data: pd.DataFrame) -> np.ndarray:
+        macd_data = self.calculate(data)
+        macd_line = np.asarray(macd_data['macd_values'], dtype=float)
+        signal_line = np.asarray(macd_data['signal_values'], dtype=float)
+        
+        # Значения на предыдущем баре (nan на первом баре - пересечения нет)
+        macd_prev = np.concatenate(([np.nan], macd_line[:-1]))
+        signal_prev = np.concatenate(([np.nan], signal_line[:-1]))
+        
+        return self._select(
+            [(macd_line > signal_line) & (macd_prev <= signal_prev),
+             (macd_line < signal_line) & (macd_prev >= signal_prev)],
+            [LONG, SHORT]
+        )
+    
+    def _init_state(self) -> SimpleNamespace:
+        return SimpleNamespace(
+            fast=EMAState(self.config.get('fast_period', 12)),
+            slow=EMAState(self.config.get('slow_period', 26)),
+            signal=EMAState(self.config.get('signal_period', 9)),
+            macd_prev=NAN,
+            signal_prev=NAN
+        )
+    
+    def _update(self, state: SimpleNamespace, bar: Dict[str, float]) -> Dict[str, Any]:
+        close = float(bar['close'])
+        macd_line = state.fast.update(close) - state.slow.update(close)
+        signal_line = state.signal.update(macd_line)
+        
+        values = {
+            'macd_line': macd_line,
+            'signal_line': signal_line,
+            'histogram': macd_line - signal_line,
+            'macd_prev': state.macd_prev,
+            'signal_prev': state.signal_prev
+        }
+        state.macd_prev = macd_line
+        state.signal_prev = signal_line
+        return values
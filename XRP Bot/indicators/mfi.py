@@ -1,38 +1,34 @@
 import pandas as pd
 import numpy as np
-from .base_indicator import BaseIndicator
+from types import SimpleNamespace
+from .base_indicator import BaseIndicator, LONG, SHORT
+from .result import IndicatorResult
+from .streaming import RollingSum, safe_div
 from typing import Dict, Any
 
 class MFIIndicator(BaseIndicator):
     """Индикатор Money Flow Index (MFI)"""
     
-    def calculate(self, data: pd.DataFrame) -> Dict[str, Any]:
+    def calculate(self, data: pd.DataFrame) -> IndicatorResult:
         """Расчет MFI"""
         if not self.validate_data(data):
             raise ValueError("Invalid data format")
-            
+        
         period = self.config.get('period', 14)
         
-        high = data['high']
-        low = data['low']
-        close = data['close']
         volume = data['volume']
+        features = self.features(data)
         
         # Типичная цена
-        typical_price = (high + low + close) / 3
+        typical_price = features.typical_price()
         
         # Money Flow
-        money_flow = typical_price * volume
-        
-        # Positive и Negative Money Flow
-        positive_flow = pd.Series(0, index=data.index)
-        negative_flow = pd.Series(0, index=data.index)
+        money_flow = (typical_price * volume).to_numpy()
         
-        for i in range(1, len(typical_price)):
-            if typical_price.iloc[i] > typical_price.iloc[i-1]:
-                positive_flow.iloc[i] = money_flow.iloc[i]
-            elif typical_price.iloc[i] < typical_price.iloc[i-1]:
-                negative_flow.iloc[i] = money_flow.iloc[i]
+        # Positive и Negative Money Flow по знаку изменения типичной цены
+        tp_change = features.diff('typical_price').to_numpy()
+        positive_flow = pd.Series(np.where(tp_change > 0, money_flow, 0.0), index=data.index)
+        negative_flow = pd.Series(np.where(tp_change < 0, money_flow, 0.0), index=data.index)
         
         # Money Flow Ratio
         positive_mf = positive_flow.rolling(window=period).sum()
@@ -41,15 +37,15 @@ class MFIIndicator(BaseIndicator):
         money_ratio = positive_mf / negative_mf
         mfi = 100 - (100 / (1 + money_ratio))
         
-        return {
-            'mfi': mfi.iloc[-1],
-            'values': mfi.tolist()
-        }
+        return IndicatorResult({'mfi': mfi.iloc[-1]}, values=mfi)
     
     def generate_signal(self, data: pd.DataFrame) -> str:
         """Генерация сигнала на основе MFI"""
         mfi_data = self.calculate(data)
-        mfi_value = mfi_data['mfi']
+        return self._evaluate_signal(mfi_data, data['close'].iloc[-1])
+    
+    def _evaluate_signal(self, values: Dict[str, Any], price: float) -> str:
+        mfi_value = values['mfi']
         
         overbought = self.config.get('overbought', 80)
         oversold = self.config.get('oversold', 20)
@@ -60,3 +56,36 @@ class MFIIndicator(BaseIndicator):
             return "LONG"
         else:
             return "NEUTRAL"
+    
+    def _signal_array(self, data: pd.DataFrame) -> np.ndarray:
+        mfi = np.asarray(self.calculate(data)['values'], dtype=float)
+        return self._select(
+            [mfi > self.config.get('overbought', 80), mfi < self.config.get('oversold', 20)],
+            [SHORT, LONG]
+        )
+    
+    def _init_state(self) -> SimpleNamespace:
+        period = self.config.get('period', 14)
+        return SimpleNamespace(
+            prev_typical_price=None,
+            positive_mf=RollingSum(period),
+            negative_mf=RollingSum(period)
+        )
+    
+    def _update(self, state: SimpleNamespace, bar: Dict[str, float]) -> Dict[str, Any]:
+        typical_price = (float(bar['high']) + float(bar['low']) + float(bar['close'])) / 3
+        money_flow = typical_price * float(bar['volume'])
+        
+        positive_flow = negative_flow = 0.0
+        if state.prev_typical_price is not None:
+            if typical_price > state.prev_typical_price:
+                positive_flow = money_flow
+            elif typical_price < state.prev_typical_price:
+                negative_flow = money_flow
+        state.prev_typical_price = typical_price
+        
+        money_ratio = safe_div(state.positive_mf.update(positive_flow),
+                               state.negative_mf.update(negative_flow))
+        mfi = 100 - safe_div(100, 1 + money_ratio)
+        
+        return {'mfi': mfi}
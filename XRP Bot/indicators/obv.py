@@ -1,30 +1,33 @@
 import pandas as pd
 import numpy as np
-from .base_indicator import BaseIndicator
+from collections import deque
+from types import SimpleNamespace
+from .base_indicator import BaseIndicator, LONG, SHORT
+from .result import IndicatorResult
+from .streaming import NAN
 from typing import Dict, Any
 
 class OBVIndicator(BaseIndicator):
     """Индикатор On-Balance Volume (OBV)"""
     
-    def calculate(self, data: pd.DataFrame) -> Dict[str, Any]:
+    # Глубина сравнения тренда OBV и цены (в барах, включая текущий)
+    TREND_BARS = 10
+    
+    def calculate(self, data: pd.DataFrame) -> IndicatorResult:
         """Расчет OBV"""
         if not self.validate_data(data):
             raise ValueError("Invalid data format")
         
-        close = data['close']
         volume = data['volume']
         
         # Расчет OBV
-        price_change = close.diff()
+        price_change = self.features(data).diff('close')
         volume_direction = np.where(price_change > 0, volume,
                                    np.where(price_change < 0, -volume, 0))
         
         obv = pd.Series(volume_direction).cumsum()
         
-        return {
-            'obv': obv.iloc[-1],
-            'values': obv.tolist()
-        }
+        return IndicatorResult({'obv': obv.iloc[-1]}, values=obv)
     
     def generate_signal(self, data: pd.DataFrame) -> str:
         """Генерация сигнала на основе OBV"""
@@ -33,8 +36,14 @@ class OBVIndicator(BaseIndicator):
         
         # Проверка дивергенции между ценой и OBV
         close = data['close']
-        obv_trend = obv_values[-1] - obv_values[-10]  # Тренд за последние 10 периодов
-        price_trend = close.iloc[-1] - close.iloc[-10]
+        obv_data['obv_trend'] = obv_values[-1] - obv_values[-self.TREND_BARS]  # Тренд за последние 10 периодов
+        obv_data['price_trend'] = close.iloc[-1] - close.iloc[-self.TREND_BARS]
+        
+        return self._evaluate_signal(obv_data, close.iloc[-1])
+    
+    def _evaluate_signal(self, values: Dict[str, Any], price: float) -> str:
+        obv_trend = values['obv_trend']
+        price_trend = values['price_trend']
         
         if obv_trend > 0 and price_trend <= 0:
             return "LONG"  # Бычья дивергенция
@@ -42,3 +51,47 @@ class OBVIndicator(BaseIndicator):
             return "SHORT"  # Медвежья дивергенция
         else:
             return "NEUTRAL"
+    
+    def _signal_array(self, data: pd.DataFrame) -> np.ndarray:
+        obv = np.asarray(self.calculate(data)['values'], dtype=float)
+        close = data['close'].to_numpy(dtype=float)
+        
+        # Тренд за последние TREND_BARS баров (nan, пока истории не хватает)
+        lag = self.TREND_BARS - 1
+        obv_trend = np.full(len(obv), np.nan)
+        price_trend = np.full(len(close), np.nan)
+        if len(obv) > lag:
+            obv_trend[lag:] = obv[lag:] - obv[:len(obv) - lag]
+            price_trend[lag:] = close[lag:] - close[:len(close) - lag]
+        
+        return self._select(
+            [(obv_trend > 0) & (price_trend <= 0), (obv_trend < 0) & (price_trend >= 0)],
+            [LONG, SHORT]
+        )
+    
+    def _init_state(self) -> SimpleNamespace:
+        return SimpleNamespace(
+            obv=0.0,
+            prev_close=None,
+            history=deque(maxlen=self.TREND_BARS)
+        )
+    
+    def _update(self, state: SimpleNamespace, bar: Dict[str, float]) -> Dict[str, Any]:
+        close = float(bar['close'])
+        volume = float(bar['volume'])
+        
+        if state.prev_close is not None:
+            if close > state.prev_close:
+                state.obv += volume
+            elif close < state.prev_close:
+                state.obv -= volume
+        state.prev_close = close
+        state.history.append((state.obv, close))
+        
+        # Пока истории меньше TREND_BARS, дивергенция не определена
+        obv_trend = price_trend = NAN
+        if len(state.history) == self.TREND_BARS:
+            obv_trend = state.obv - state.history[0][0]
+            price_trend = close - state.history[0][1]
+        
+        return {'obv': state.obv, 'obv_trend': obv_trend, 'price_trend': price_trend}
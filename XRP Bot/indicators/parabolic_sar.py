@@ -1,78 +1,127 @@
 import pandas as pd
 import numpy as np
-from .base_indicator import BaseIndicator
+from types import SimpleNamespace
+from .base_indicator import BaseIndicator, LONG, SHORT
+from .result import IndicatorResult
 from typing import Dict, Any
 
+
+def parabolic_sar(high: np.ndarray, low: np.ndarray, close: np.ndarray,
+                  start: float, increment: float, max_acc: float) -> np.ndarray:
+    """Рекурсия Parabolic SAR по массивам NumPy
+    
+    Рекурсия не векторизуется, поэтому цикл идет по спискам Python
+    (без .iloc и поэлементной записи в pd.Series).
+    """
+    n = len(close)
+    highs = high.tolist()
+    lows = low.tolist()
+    closes = close.tolist()
+    sar = [0.0] * n
+    
+    # Первые значения
+    sar[0] = lows[0]
+    ep = highs[0]
+    acc = start
+    
+    if n > 1:
+        sar[1] = sar[0]
+        ep = highs[1] if closes[1] > closes[0] else lows[1]
+    
+    prev_sar = sar[0]
+    for i in range(2, n):
+        # Обновление SAR
+        prev_sar = prev_sar + acc * (ep - prev_sar)
+        sar[i] = prev_sar
+        
+        # Определение направления тренда
+        if closes[i] > closes[i - 1]:
+            if highs[i] > ep:
+                ep = highs[i]
+                acc = min(acc + increment, max_acc)
+        else:
+            if lows[i] < ep:
+                ep = lows[i]
+                acc = min(acc + increment, max_acc)
+    
+    return np.array(sar, dtype=float)
+
+
 class ParabolicSARIndicator(BaseIndicator):
     """Индикатор Parabolic SAR"""
     
-    def calculate(self, data: pd.DataFrame) -> Dict[str, Any]:
+    def calculate(self, data: pd.DataFrame) -> IndicatorResult:
         """Расчет Parabolic SAR"""
         if not self.validate_data(data):
             raise ValueError("Invalid data format")
-            
+        
         start = self.config.get('start', 0.02)
         increment = self.config.get('increment', 0.02)
         max_acc = self.config.get('max', 0.2)
         
-        high = data['high']
-        low = data['low']
-        close = data['close']
+        sar = parabolic_sar(
+            data['high'].to_numpy(dtype=float),
+            data['low'].to_numpy(dtype=float),
+            data['close'].to_numpy(dtype=float),
+            start, increment, max_acc
+        )
         
-        # Инициализация
-        sar = pd.Series(index=data.index)
-        ep = pd.Series(index=data.index)
-        acc = pd.Series(index=data.index)
-        
-        # Первые значения
-        sar.iloc[0] = low.iloc[0]
-        ep.iloc[0] = high.iloc[0]
-        acc.iloc[0] = start
-        
-        # Расчет Parabolic SAR
-        for i in range(1, len(data)):
-            if i == 1:
-                sar.iloc[i] = sar.iloc[0]
-                ep.iloc[i] = high.iloc[i] if close.iloc[i] > close.iloc[i-1] else low.iloc[i]
-                acc.iloc[i] = start
-            else:
-                prev_sar = sar.iloc[i-1]
-                prev_ep = ep.iloc[i-1]
-                prev_acc = acc.iloc[i-1]
-                
-                # Обновление SAR
-                sar.iloc[i] = prev_sar + prev_acc * (prev_ep - prev_sar)
-                
-                # Определение направления тренда
-                uptrend = close.iloc[i] > close.iloc[i-1]
-                
-                if uptrend:
-                    ep.iloc[i] = max(prev_ep, high.iloc[i])
-                    if ep.iloc[i] > prev_ep:
-                        acc.iloc[i] = min(prev_acc + increment, max_acc)
-                    else:
-                        acc.iloc[i] = prev_acc
-                else:
-                    ep.iloc[i] = min(prev_ep, low.iloc[i])
-                    if ep.iloc[i] < prev_ep:
-                        acc.iloc[i] = min(prev_acc + increment, max_acc)
-                    else:
-                        acc.iloc[i] = prev_acc
-        
-        return {
-            'sar': sar.iloc[-1],
-            'values': sar.tolist()
-        }
+        return IndicatorResult({'sar': sar[-1]}, values=sar)
     
     def generate_signal(self, data: pd.DataFrame) -> str:
         """Генерация сигнала на основе Parabolic SAR"""
         sar_data = self.calculate(data)
-        sar_value = sar_data['sar']
-        current_price = data['close'].iloc[-1]
+        return self._evaluate_signal(sar_data, data['close'].iloc[-1])
+    
+    def _evaluate_signal(self, values: Dict[str, Any], price: float) -> str:
+        sar_value = values['sar']
         
-        if current_price > sar_value:
+        if price > sar_value:
             return "LONG"
-        elif current_price < sar_value:
+        elif price < sar_value:
             return "SHORT"
         else:
             return "NEUTRAL"
+    
+    def _signal_array(self, data: pd.DataFrame) -> np.ndarray:
+        sar = np.asarray(self.calculate(data)['values'], dtype=float)
+        price = data['close'].to_numpy(dtype=float)
+        return self._select([price > sar, price < sar], [LONG, SHORT])
+    
+    def _init_state(self) -> SimpleNamespace:
+        return SimpleNamespace(index=0, sar=None, ep=None, acc=None, prev_close=None)
+    
+    def _update(self, state: SimpleNamespace, bar: Dict[str, float]) -> Dict[str, Any]:
+        start = self.config.get('start', 0.02)
+        increment = self.config.get('increment', 0.02)
+        max_acc = self.config.get('max', 0.2)
+        
+        high = float(bar['high'])
+        low = float(bar['low'])
+        close = float(bar['close'])
+        
+        if state.index == 0:
+            state.sar = low
+            state.ep = high
+            state.acc = start
+        elif state.index == 1:
+            state.ep = high if close > state.prev_close else low
+            state.acc = start
+        else:
+            prev_ep = state.ep
+            prev_acc = state.acc
+            state.sar = state.sar + prev_acc * (prev_ep - state.sar)
+            
+            # Та же машина состояний, что и в calculate()
+            if close > state.prev_close:
+                state.ep = max(prev_ep, high)
+                if state.ep > prev_ep:
+                    state.acc = min(prev_acc + increment, max_acc)
+            else:
+                state.ep = min(prev_ep, low)
+                if state.ep < prev_ep:
+                    state.acc = min(prev_acc + increment, max_acc)
+        
+        state.index += 1
+        state.prev_close = close
+        return {'sar': state.sar}
@@ -0,0 +1,41 @@
+import importlib
+from typing import Any, Dict, Tuple, Type
+
+# Индикаторы конфигурации: имя -> (модуль, класс, доп. аргументы конструктора).
+# Модули импортируются только при первом создании индикатора, так что
+# выключенные в strategy_config.json индикаторы не загружаются вовсе.
+INDICATORS: Dict[str, Tuple[str, str, Tuple[Any, ...]]] = {
+    'rsi': ('indicators.rsi', 'RSIIndicator', ()),
+    'macd': ('indicators.macd', 'MACDIndicator', ()),
+    'ema_20': ('indicators.ema', 'EMAIndicator', (20,)),
+    'ema_50': ('indicators.ema', 'EMAIndicator', (50,)),
+    'ema_200': ('indicators.ema', 'EMAIndicator', (200,)),
+    'bollinger_bands': ('indicators.bollinger_bands', 'BollingerBandsIndicator', ()),
+    'stochastic': ('indicators.stochastic', 'StochasticIndicator', ()),
+    'adx': ('indicators.adx', 'ADXIndicator', ()),
+    'ichimoku': ('indicators.ichimoku', 'IchimokuIndicator', ()),
+    'atr': ('indicators.atr', 'ATRIndicator', ()),
+    'vwap': ('indicators.vwap', 'VWAPIndicator', ()),
+    'obv': ('indicators.obv', 'OBVIndicator', ()),
+    'mfi': ('indicators.mfi', 'MFIIndicator', ()),
+    'williams_r': ('indicators.williams_r', 'WilliamsRIndicator', ()),
+    'parabolic_sar': ('indicators.parabolic_sar', 'ParabolicSARIndicator', ()),
+    'cci': ('indicators.cci', 'CCIIndicator', ()),
+    'keltner_channels': ('indicators.keltner_channels', 'KeltnerChannelsIndicator', ()),
+    'volume_profile': ('indicators.volume_profile', 'VolumeProfileIndicator', ())
+}
+
+
+def indicator_class(name: str) -> Type:
+    """Класс индикатора по имени из конфигурации (модуль импортируется при первом вызове)"""
+    try:
+        module_name, class_name, _ = INDICATORS[name]
+    except KeyError:
+        raise KeyError(f"Неизвестный индикатор: {name}")
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def create_indicator(name: str, config: Dict[str, Any], timeframe: str) -> Any:
+    """Новый экземпляр индикатора name с настройками config для таймфрейма"""
+    args = INDICATORS[name][2] if name in INDICATORS else ()
+    return indicator_class(name)(config, timeframe, *args)
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+from collections.abc import MutableMapping
+from typing import Any, Callable, Dict, Iterator, Union
+
+# Источник истории: ряд, массив или функция, вычисляющая их по запросу
+SeriesSource = Union[pd.Series, np.ndarray, Callable[[], Any]]
+
+
+class IndicatorResult(MutableMapping):
+    """Результат calculate(): скалярные значения и ленивые истории
+
+    Скалярные значения (текущий RSI, линии MACD, ...) передаются готовыми.
+    Истории ('values', 'macd_values', ...) хранятся как исходные ряды
+    и превращаются в массивы NumPy float64 только при первом обращении
+    к ключу - generate_signal(), которому нужен последний бар, не платит
+    за копирование всей истории в списки Python.
+    """
+
+    __slots__ = ('_values', '_series')
+
+    def __init__(self, scalars: Dict[str, Any], /, **series: SeriesSource):
+        self._values = dict(scalars)
+        self._series = series
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._series:
+            source = self._series.pop(key)
+            if callable(source):
+                source = source()
+            self._values[key] = np.asarray(source, dtype=float)
+        return self._values[key]
+
+    def __setitem__(self, key: str, value: Any):
+        self._series.pop(key, None)
+        self._values[key] = value
+
+    def __delitem__(self, key: str):
+        if key in self._series:
+            del self._series[key]
+        else:
+            del self._values[key]
+
+    def __iter__(self) -> Iterator[str]:
+        yield from list(self._values)
+        yield from list(self._series)
+
+    def __len__(self) -> int:
+        return len(self._values) + len(self._series)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._values or key in self._series
+
+    def __repr__(self) -> str:
+        lazy = ', '.join(self._series)
+        return f"IndicatorResult({self._values!r}, lazy=[{lazy}])"
+
+    def scalars(self) -> Dict[str, Any]:
+        """Значения без историй (ничего не материализует)"""
+        return {
+            key: value for key, value in self._values.items()
+            if not isinstance(value, np.ndarray)
+        }
@@ -1,36 +1,39 @@
 import pandas as pd
 import numpy as np
-from .base_indicator import BaseIndicator
+from types import SimpleNamespace
+from .base_indicator import BaseIndicator, LONG, SHORT
+from .result import IndicatorResult
+from .streaming import RollingMean, safe_div
 from typing import Dict, Any
 
 class RSIIndicator(BaseIndicator):
     """Индикатор Relative Strength Index (RSI)"""
     
-    def calculate(self, data: pd.DataFrame) -> Dict[str, Any]:
+    def calculate(self, data: pd.DataFrame) -> IndicatorResult:
         """Расчет RSI"""
         if not self.validate_data(data):
             raise ValueError("Invalid data format")
-            
+        
         period = self.config.get('period', 14)
-        close = data['close']
+        features = self.features(data)
         
         # Расчет RSI
-        delta = close.diff()
+        delta = features.diff('close')
         gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
         loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
         
         rs = gain / loss
         rsi = 100 - (100 / (1 + rs))
         
-        return {
-            'rsi': rsi.iloc[-1],
-            'values': rsi.tolist()
-        }
+        return IndicatorResult({'rsi': rsi.iloc[-1]}, values=rsi)
     
     def generate_signal(self, data: pd.DataFrame) -> str:
         """Генерация сигнала на основе RSI"""
         rsi_data = self.calculate(data)
-        rsi_value = rsi_data['rsi']
+        return self._evaluate_signal(rsi_data, data['close'].iloc[-1])
+    
+    def _evaluate_signal(self, values: Dict[str, Any], price: float) -> str:
+        rsi_value = values['rsi']
         
         overbought = self.config.get('overbought', 70)
         oversold = self.config.get('oversold', 30)
@@ -41,3 +44,26 @@ class RSIIndicator(BaseIndicator):
             return "LONG"
         else:
             return "NEUTRAL"
+    
+    def _signal_array(self, data: pd.DataFrame) -> np.ndarray:
+        rsi = np.asarray(self.calculate(data)['values'], dtype=float)
+        return self._select(
+            [rsi > self.config.get('overbought', 70), rsi < self.config.get('oversold', 30)],
+            [SHORT, LONG]
+        )
+    
+    def _init_state(self) -> SimpleNamespace:
+        # Сглаживание простым средним, как в calculate()
+        period = self.config.get('period', 14)
+        return SimpleNamespace(prev_close=None, gain=RollingMean(period), loss=RollingMean(period))
+    
+    def _update(self, state: SimpleNamespace, bar: Dict[str, float]) -> Dict[str, Any]:
+        close = float(bar['close'])
+        delta = 0.0 if state.prev_close is None else close - state.prev_close
+        state.prev_close = close
+        
+        gain = state.gain.update(delta if delta > 0 else 0.0)
+        loss = state.loss.update(-delta if delta < 0 else 0.0)
+        rsi = 100 - safe_div(100, 1 + safe_div(gain, loss))
+        
+        return {'rsi': rsi}
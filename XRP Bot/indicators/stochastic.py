@@ -1,37 +1,43 @@
 import pandas as pd
 import numpy as np
-from .base_indicator import BaseIndicator
+from types import SimpleNamespace
+from .base_indicator import BaseIndicator, LONG, SHORT
+from .result import IndicatorResult
+from .streaming import RollingExtremum, RollingMean, safe_div
 from typing import Dict, Any
 
 class StochasticIndicator(BaseIndicator):
     """Индикатор Stochastic Oscillator"""
     
-    def calculate(self, data: pd.DataFrame) -> Dict[str, Any]:
+    def calculate(self, data: pd.DataFrame) -> IndicatorResult:
         """Расчет Stochastic"""
         if not self.validate_data(data):
             raise ValueError("Invalid data format")
-            
+        
         k_period = self.config.get('k_period', 14)
         d_period = self.config.get('d_period', 3)
         smooth_k = self.config.get('smooth_k', 3)
         
-        low_min = data['low'].rolling(window=k_period).min()
-        high_max = data['high'].rolling(window=k_period).max()
+        features = self.features(data)
+        low_min = features.rolling_min('low', k_period)
+        high_max = features.rolling_max('high', k_period)
         
         k_percent = 100 * ((data['close'] - low_min) / (high_max - low_min))
         d_percent = k_percent.rolling(window=d_period).mean()
         
-        return {
-            'k_percent': k_percent.iloc[-1],
-            'd_percent': d_percent.iloc[-1],
-            'k_values': k_percent.tolist(),
-            'd_values': d_percent.tolist()
-        }
+        return IndicatorResult(
+            {'k_percent': k_percent.iloc[-1], 'd_percent': d_percent.iloc[-1]},
+            k_values=k_percent,
+            d_values=d_percent
+        )
     
     def generate_signal(self, data: pd.DataFrame) -> str:
         """Генерация сигнала на основе Stochastic"""
         stoch_data = self.calculate(data)
-        k_current = stoch_data['k_percent']
+        return self._evaluate_signal(stoch_data, data['close'].iloc[-1])
+    
+    def _evaluate_signal(self, values: Dict[str, Any], price: float) -> str:
+        k_current = values['k_percent']
         
         overbought = self.config.get('overbought', 80)
         oversold = self.config.get('oversold', 20)
@@ -42,3 +48,27 @@ class StochasticIndicator(BaseIndicator):
             return "LONG"
         else:
             return "NEUTRAL"
+    
+    def _signal_array(self, data: pd.DataFrame) -> np.ndarray:
+        k_percent = np.asarray(self.calculate(data)['k_values'], dtype=float)
+        return self._select(
+            [k_percent > self.config.get('overbought', 80), k_percent < self.config.get('oversold', 20)],
+            [SHORT, LONG]
+        )
+    
+    def _init_state(self) -> SimpleNamespace:
+        k_period = self.config.get('k_period', 14)
+        return SimpleNamespace(
+            low_min=RollingExtremum(k_period, 'min'),
+            high_max=RollingExtremum(k_period, 'max'),
+            d=RollingMean(self.config.get('d_period', 3))
+        )
+    
+    def _update(self, state: SimpleNamespace, bar: Dict[str, float]) -> Dict[str, Any]:
+        low_min = state.low_min.update(float(bar['low']))
+        high_max = state.high_max.update(float(bar['high']))
+        
+        k_percent = 100 * safe_div(float(bar['close']) - low_min, high_max - low_min)
+        d_percent = state.d.update(k_percent)
+        
+        return {'k_percent': k_percent, 'd_percent': d_percent}
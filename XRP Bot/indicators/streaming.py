@@ -0,0 +1,189 @@
+import math
+from collections import deque
+from typing import Optional
+
+NAN = float('nan')
+
+
+def safe_div(numerator: float, denominator: float) -> float:
+    """Деление с семантикой pandas/NumPy (inf/nan вместо исключения)"""
+    if denominator == 0:
+        if numerator == 0 or math.isnan(numerator):
+            return NAN
+        return math.copysign(math.inf, numerator) * math.copysign(1.0, denominator)
+    return numerator / denominator
+
+
+class RollingMean:
+    """Скользящее среднее за O(1) на бар (аналог rolling(window).mean())
+    
+    Значение не определено (nan), пока в окне меньше `window` валидных
+    значений - так же, как при min_periods=window в pandas. Сумма
+    периодически пересчитывается по окну, чтобы не накапливать ошибку.
+    """
+    
+    def __init__(self, window: int):
+        self.window = window
+        self.values = deque(maxlen=window)
+        self.total = 0.0
+        self.nan_count = 0
+        self._updates = 0
+    
+    def update(self, value: float) -> float:
+        if len(self.values) == self.window:
+            removed = self.values[0]
+            if math.isnan(removed):
+                self.nan_count -= 1
+            else:
+                self.total -= removed
+        self.values.append(value)
+        if math.isnan(value):
+            self.nan_count += 1
+        else:
+            self.total += value
+        
+        self._updates += 1
+        if self._updates >= self.window:
+            self._updates = 0
+            self.total = math.fsum(v for v in self.values if not math.isnan(v))
+        return self.value
+    
+    @property
+    def value(self) -> float:
+        if len(self.values) < self.window or self.nan_count:
+            return NAN
+        return self.total / self.window
+
+
+class RollingSum(RollingMean):
+    """Скользящая сумма за O(1) на бар (аналог rolling(window).sum())"""
+    
+    @property
+    def value(self) -> float:
+        if len(self.values) < self.window or self.nan_count:
+            return NAN
+        return self.total
+
+
+class RollingStd:
+    """Скользящее стандартное отклонение (ddof=1) по алгоритму Уэлфорда"""
+    
+    def __init__(self, window: int):
+        self.window = window
+        self.values = deque(maxlen=window)
+        self.mean = 0.0
+        self.m2 = 0.0
+    
+    def update(self, value: float) -> float:
+        if len(self.values) == self.window:
+            removed = self.values[0]
+            count = len(self.values) - 1
+            if count:
+                delta = removed - self.mean
+                self.mean -= delta / count
+                self.m2 -= delta * (removed - self.mean)
+            else:
+                self.mean = 0.0
+                self.m2 = 0.0
+        self.values.append(value)
+        count = len(self.values)
+        delta = value - self.mean
+        self.mean += delta / count
+        self.m2 += delta * (value - self.mean)
+        return self.value
+    
+    @property
+    def value(self) -> float:
+        if len(self.values) < self.window or self.window < 2:
+            return NAN
+        return math.sqrt(max(self.m2, 0.0) / (self.window - 1))
+
+
+class RollingMeanDeviation:
+    """Скользящее среднее абсолютное отклонение (аналог rolling(window) с
+    np.mean(np.abs(x - np.mean(x))))
+    
+    Среднее окна ведется за O(1) (RollingMean), отклонения суммируются по
+    окну из `window` значений - без создания массивов NumPy на каждый бар.
+    """
+    
+    def __init__(self, window: int):
+        self.window = window
+        self.mean = RollingMean(window)
+    
+    def update(self, value: float) -> float:
+        self.mean.update(value)
+        return self.value
+    
+    @property
+    def value(self) -> float:
+        mean = self.mean.value
+        if math.isnan(mean):
+            return NAN
+        return sum(abs(v - mean) for v in self.mean.values) / self.window
+
+
+class RollingExtremum:
+    """Скользящий максимум/минимум на монотонной очереди (амортизированно O(1))"""
+    
+    def __init__(self, window: int, mode: str = 'max'):
+        self.window = window
+        self.is_max = mode == 'max'
+        self.queue = deque()
+        self.index = -1
+    
+    def update(self, value: float) -> float:
+        self.index += 1
+        queue = self.queue
+        if self.is_max:
+            while queue and queue[-1][1] <= value:
+                queue.pop()
+        else:
+            while queue and queue[-1][1] >= value:
+                queue.pop()
+        queue.append((self.index, value))
+        if queue[0][0] <= self.index - self.window:
+            queue.popleft()
+        return self.value
+    
+    @property
+    def value(self) -> float:
+        if self.index + 1 < self.window:
+            return NAN
+        return self.queue[0][1]
+
+
+class EMAState:
+    """Рекурсивная EMA (аналог ewm(span, adjust=False).mean())"""
+    
+    def __init__(self, span: int):
+        # alpha вычисляется как в pandas: com = (span - 1) / 2, alpha = 1 / (1 + com)
+        self.alpha = 1.0 / (1.0 + (span - 1) / 2.0)
+        self.old_weight = 1.0 - self.alpha
+        self.value: Optional[float] = None
+    
+    def update(self, value: float) -> float:
+        if self.value is None:
+            self.value = value
+        elif self.value != value:
+            # Та же формула, что и в pandas, чтобы значения совпадали побитово
+            self.value = ((self.old_weight * self.value + self.alpha * value) /
+                          (self.old_weight + self.alpha))
+        return self.value
+
+
+class TrueRangeState:
+    """Потоковый True Range"""
+    
+    def __init__(self):
+        self.prev_close: Optional[float] = None
+    
+    def update(self, high: float, low: float, close: float) -> float:
+        if self.prev_close is None:
+            true_range = high - low
+        else:
+            true_range = max(high - low,
+                             abs(high - self.prev_close),
+                             abs(low - self.prev_close))
+        self.prev_close = close
+        return true_range
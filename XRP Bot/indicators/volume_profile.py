@@ -1,20 +1,26 @@
 import pandas as pd
 import numpy as np
-from .base_indicator import BaseIndicator
+from collections import deque
+from types import SimpleNamespace
+from .base_indicator import BaseIndicator, LONG, SHORT
+from .result import IndicatorResult
+from numpy.lib.stride_tricks import sliding_window_view
 from typing import Dict, Any, List, Tuple
 
 class VolumeProfileIndicator(BaseIndicator):
     """Индикатор Volume Profile"""
     
-    def calculate(self, data: pd.DataFrame) -> Dict[str, Any]:
+    def calculate(self, data: pd.DataFrame) -> IndicatorResult:
         """Расчет Volume Profile"""
         if not self.validate_data(data):
             raise ValueError("Invalid data format")
-            
-        num_bins = self.config.get('num_bins', 20)
         
-        close = data['close']
-        volume = data['volume']
+        return self._profile(data['close'].to_numpy(dtype=float),
+                             data['volume'].to_numpy(dtype=float))
+    
+    def _profile(self, close: np.ndarray, volume: np.ndarray) -> IndicatorResult:
+        """Профиль объема по массивам цен закрытия и объемов"""
+        num_bins = self.config.get('num_bins', 20)
         
         # Создание bins для цен
         price_min = close.min()
@@ -23,55 +29,121 @@ class VolumeProfileIndicator(BaseIndicator):
         
         bins = np.linspace(price_min, price_max, num_bins + 1)
         
-        # Распределение объема по bins
-        volume_profile = np.zeros(num_bins)
+        # Распределение объема по bins: один digitize и один bincount на всю историю
+        bin_idx = np.clip(np.digitize(close, bins) - 1, 0, num_bins - 1)
+        volume_profile = np.bincount(bin_idx, weights=volume, minlength=num_bins)
         
-        for i in range(len(close)):
-            price = close.iloc[i]
-            vol = volume.iloc[i]
-            
-            # Определение bin для текущей цены
-            bin_idx = np.digitize(price, bins) - 1
-            bin_idx = max(0, min(bin_idx, num_bins - 1))
-            
-            volume_profile[bin_idx] += vol
+        # Середины bins
+        centers = bins[:-1] + (bins[1:] - bins[:-1]) / 2
         
         # Нахождение контрольной точки (Point of Control)
         poc_index = np.argmax(volume_profile)
-        poc_price = bins[poc_index] + (bins[poc_index + 1] - bins[poc_index]) / 2
+        poc_price = centers[poc_index]
         
         # Нахождение зон поддержки и сопротивления
-        high_volume_nodes = []
-        for i, vol in enumerate(volume_profile):
-            if vol > np.mean(volume_profile):
-                node_price = bins[i] + (bins[i + 1] - bins[i]) / 2
-                high_volume_nodes.append((node_price, vol))
+        node_indices = np.flatnonzero(volume_profile > np.mean(volume_profile))
+        high_volume_nodes = [(centers[i], volume_profile[i]) for i in node_indices]
         
         high_volume_nodes.sort(key=lambda x: x[1], reverse=True)
         
-        return {
-            'poc': poc_price,
-            'volume_profile': volume_profile.tolist(),
-            'bins': bins.tolist(),
-            'high_volume_nodes': high_volume_nodes[:5]  # Топ-5 узлов
-        }
+        return IndicatorResult(
+            {
+                'poc': poc_price,
+                'high_volume_nodes': high_volume_nodes[:5]  # Топ-5 узлов
+            },
+            volume_profile=volume_profile,
+            bins=bins
+        )
     
     def generate_signal(self, data: pd.DataFrame) -> str:
         """Генерация сигнала на основе Volume Profile"""
         vp_data = self.calculate(data)
-        current_price = data['close'].iloc[-1]
-        poc = vp_data['poc']
+        return self._evaluate_signal(vp_data, data['close'].iloc[-1])
+    
+    def _evaluate_signal(self, values: Dict[str, Any], price: float) -> str:
+        poc = values['poc']
         
         # Определение зон поддержки и сопротивления
-        high_volume_nodes = vp_data['high_volume_nodes']
+        high_volume_nodes = values['high_volume_nodes']
         
         if not high_volume_nodes:
             return "NEUTRAL"
         
         # Проверка, находится ли цена выше или ниже POC
-        if current_price > poc * 1.01:
+        if price > poc * 1.01:
             return "LONG"
-        elif current_price < poc * 0.99:
+        elif price < poc * 0.99:
             return "SHORT"
         else:
             return "NEUTRAL"
+    
+    def _signal_array(self, data: pd.DataFrame) -> np.ndarray:
+        # Профиль на каждом баре строится по окну последних `window` баров, как в update();
+        # generate_signal на истории длиннее окна считает профиль по всем барам
+        window = self.config.get('window', 200)
+        num_bins = self.config.get('num_bins', 20)
+        close = data['close'].to_numpy(dtype=float)
+        volume = data['volume'].to_numpy(dtype=float)
+        n = len(close)
+        
+        poc = np.full(n, np.nan)
+        has_nodes = np.zeros(n, dtype=bool)
+        
+        # Первые бары, пока окно не заполнено - по растущему префиксу
+        for i in range(min(window - 1, n)):
+            profile = self._profile(close[:i + 1], volume[:i + 1])
+            poc[i] = profile['poc']
+            has_nodes[i] = bool(profile['high_volume_nodes'])
+        
+        if n >= window:
+            close_windows = sliding_window_view(close, window)
+            volume_windows = sliding_window_view(volume, window)
+            offset = window - 1
+            steps = np.arange(num_bins + 1)
+            
+            # Блоками, чтобы сравнение (блок x окно x bins) не раздувало память
+            chunk = max(1, 2 ** 20 // (window * (num_bins + 1)))
+            for start in range(0, len(close_windows), chunk):
+                closes = close_windows[start:start + chunk]
+                volumes = volume_windows[start:start + chunk]
+                rows = len(closes)
+                
+                # Те же границы bins, что и np.linspace в _profile()
+                price_min = closes.min(axis=1, keepdims=True)
+                price_max = closes.max(axis=1, keepdims=True)
+                step = (price_max - price_min) / num_bins
+                bins = np.where(step != 0,
+                                steps * step + price_min,
+                                steps / num_bins * (price_max - price_min) + price_min)
+                bins[:, -1] = price_max[:, 0]
+                
+                # digitize для возрастающих bins = число границ <= цены
+                bin_idx = (bins[:, None, :] <= closes[:, :, None]).sum(axis=2) - 1
+                bin_idx = np.clip(bin_idx, 0, num_bins - 1)
+                flat_idx = bin_idx + (np.arange(rows) * num_bins)[:, None]
+                profiles = np.bincount(flat_idx.ravel(), weights=volumes.ravel(),
+                                       minlength=rows * num_bins).reshape(rows, num_bins)
+                
+                centers = bins[:, :-1] + (bins[:, 1:] - bins[:, :-1]) / 2
+                poc_index = np.argmax(profiles, axis=1)
+                positions = slice(offset + start, offset + start + rows)
+                poc[positions] = centers[np.arange(rows), poc_index]
+                has_nodes[positions] = (profiles > profiles.mean(axis=1, keepdims=True)).any(axis=1)
+        
+        return self._select(
+            [~has_nodes, close > poc * 1.01, close < poc * 0.99],
+            [0, LONG, SHORT]
+        )
+    
+    def _init_state(self) -> SimpleNamespace:
+        # Профиль определен на окне истории, поэтому хранится окно последних
+        # баров (по умолчанию 200 - глубина загрузки в TimeframeAnalyzer)
+        window = self.config.get('window', 200)
+        return SimpleNamespace(close=deque(maxlen=window), volume=deque(maxlen=window))
+    
+    def _update(self, state: SimpleNamespace, bar: Dict[str, float]) -> Dict[str, Any]:
+        state.close.append(float(bar['close']))
+        state.volume.append(float(bar['volume']))
+        
+        return self._profile(np.fromiter(state.close, dtype=float, count=len(state.close)),
+                             np.fromiter(state.volume, dtype=float, count=len(state.volume)))
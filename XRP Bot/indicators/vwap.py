@@ -1,12 +1,15 @@
 import pandas as pd
 import numpy as np
-from .base_indicator import BaseIndicator
+from types import SimpleNamespace
+from .base_indicator import BaseIndicator, LONG, SHORT
+from .result import IndicatorResult
+from .streaming import safe_div
 from typing import Dict, Any
 
 class VWAPIndicator(BaseIndicator):
     """Индикатор Volume Weighted Average Price (VWAP)"""
     
-    def calculate(self, data: pd.DataFrame) -> Dict[str, Any]:
+    def calculate(self, data: pd.DataFrame) -> IndicatorResult:
         """Расчет VWAP"""
         if not self.validate_data(data):
             raise ValueError("Invalid data format")
@@ -14,34 +17,47 @@ class VWAPIndicator(BaseIndicator):
         # Проверяем, есть ли столбец объема
         if 'volume' not in data.columns:
             raise ValueError("Volume data required for VWAP calculation")
-            
-        high = data['high']
-        low = data['low']
-        close = data['close']
+        
         volume = data['volume']
         
         # Типичная цена
-        typical_price = (high + low + close) / 3
+        typical_price = self.features(data).typical_price()
         
         # VWAP
         cumulative_tp_vol = (typical_price * volume).cumsum()
         cumulative_vol = volume.cumsum()
         vwap = cumulative_tp_vol / cumulative_vol
         
-        return {
-            'vwap': vwap.iloc[-1],
-            'values': vwap.tolist()
-        }
+        return IndicatorResult({'vwap': vwap.iloc[-1]}, values=vwap)
     
     def generate_signal(self, data: pd.DataFrame) -> str:
         """Генерация сигнала на основе VWAP"""
         vwap_data = self.calculate(data)
-        vwap_value = vwap_data['vwap']
-        current_price = data['close'].iloc[-1]
+        return self._evaluate_signal(vwap_data, data['close'].iloc[-1])
+    
+    def _evaluate_signal(self, values: Dict[str, Any], price: float) -> str:
+        vwap_value = values['vwap']
         
-        if current_price > vwap_value * 1.01:  # 1% выше VWAP
+        if price > vwap_value * 1.01:  # 1% выше VWAP
             return "LONG"
-        elif current_price < vwap_value * 0.99:  # 1% ниже VWAP
+        elif price < vwap_value * 0.99:  # 1% ниже VWAP
             return "SHORT"
         else:
             return "NEUTRAL"
+    
+    def _signal_array(self, data: pd.DataFrame) -> np.ndarray:
+        vwap = np.asarray(self.calculate(data)['values'], dtype=float)
+        price = data['close'].to_numpy(dtype=float)
+        return self._select([price > vwap * 1.01, price < vwap * 0.99], [LONG, SHORT])
+    
+    def _init_state(self) -> SimpleNamespace:
+        return SimpleNamespace(cumulative_tp_vol=0.0, cumulative_vol=0.0)
+    
+    def _update(self, state: SimpleNamespace, bar: Dict[str, float]) -> Dict[str, Any]:
+        volume = float(bar['volume'])
+        typical_price = (float(bar['high']) + float(bar['low']) + float(bar['close'])) / 3
+        
+        state.cumulative_tp_vol += typical_price * volume
+        state.cumulative_vol += volume
+        
+        return {'vwap': safe_div(state.cumulative_tp_vol, state.cumulative_vol)}
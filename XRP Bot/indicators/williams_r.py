@@ -1,36 +1,38 @@
 import pandas as pd
 import numpy as np
-from .base_indicator import BaseIndicator
+from types import SimpleNamespace
+from .base_indicator import BaseIndicator, LONG, SHORT
+from .result import IndicatorResult
+from .streaming import RollingExtremum, safe_div
 from typing import Dict, Any
 
 class WilliamsRIndicator(BaseIndicator):
     """Индикатор Williams %R"""
     
-    def calculate(self, data: pd.DataFrame) -> Dict[str, Any]:
+    def calculate(self, data: pd.DataFrame) -> IndicatorResult:
         """Расчет Williams %R"""
         if not self.validate_data(data):
             raise ValueError("Invalid data format")
-            
+        
         period = self.config.get('period', 14)
         
-        high = data['high']
-        low = data['low']
+        features = self.features(data)
         close = data['close']
         
-        highest_high = high.rolling(window=period).max()
-        lowest_low = low.rolling(window=period).min()
+        highest_high = features.rolling_max('high', period)
+        lowest_low = features.rolling_min('low', period)
         
         williams_r = -100 * ((highest_high - close) / (highest_high - lowest_low))
         
-        return {
-            'williams_r': williams_r.iloc[-1],
-            'values': williams_r.tolist()
-        }
+        return IndicatorResult({'williams_r': williams_r.iloc[-1]}, values=williams_r)
     
     def generate_signal(self, data: pd.DataFrame) -> str:
         """Генерация сигнала на основе Williams %R"""
         wr_data = self.calculate(data)
-        wr_value = wr_data['williams_r']
+        return self._evaluate_signal(wr_data, data['close'].iloc[-1])
+    
+    def _evaluate_signal(self, values: Dict[str, Any], price: float) -> str:
+        wr_value = values['williams_r']
         
         overbought = self.config.get('overbought', -20)
         oversold = self.config.get('oversold', -80)
@@ -41,3 +43,24 @@ class WilliamsRIndicator(BaseIndicator):
             return "LONG"
         else:
             return "NEUTRAL"
+    
+    def _signal_array(self, data: pd.DataFrame) -> np.ndarray:
+        williams_r = np.asarray(self.calculate(data)['values'], dtype=float)
+        return self._select(
+            [williams_r > self.config.get('overbought', -20), williams_r < self.config.get('oversold', -80)],
+            [SHORT, LONG]
+        )
+    
+    def _init_state(self) -> SimpleNamespace:
+        period = self.config.get('period', 14)
+        return SimpleNamespace(
+            highest_high=RollingExtremum(period, 'max'),
+            lowest_low=RollingExtremum(period, 'min')
+        )
+    
+    def _update(self, state: SimpleNamespace, bar: Dict[str, float]) -> Dict[str, Any]:
+        highest_high = state.highest_high.update(float(bar['high']))
+        lowest_low = state.lowest_low.update(float(bar['low']))
+        
+        williams_r = -100 * safe_div(highest_high - float(bar['close']), highest_high - lowest_low)
+        return {'williams_r': williams_r}
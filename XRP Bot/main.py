@@ -9,9 +9,11 @@ import logging
 import signal
 import sys
 import os
-from datetime import datetime
+from datetime import datetime, timezone
 import argparse
-from src.signal_engine import SignalEngine
+import json
+from src.candle_scheduler import CandleScheduler
+from src.metrics import METRICS, MetricsServer, format_summary, scrape_summary
 
 # Отключаем стандартное логирование
 logging.getLogger().setLevel(logging.CRITICAL)  # Полностью глушим логи
@@ -22,8 +24,10 @@ logging.getLogger('asyncio').setLevel(logging.CRITICAL)
 class TradingBot:
     """Основной класс торгового бота"""
 
-    def __init__(self, config_path: str = "config/strategy_config.json"):
+    def __init__(self, config_path: str = "config/strategy_config.json",
+                 symbols: list = None):
         self.config_path = config_path
+        self.symbols = symbols
         self.signal_engine = None
         self.running = False
 
@@ -35,53 +39,249 @@ class TradingBot:
         print(f"Запуск в {datetime.now()}")
         print()
 
+        # pandas и индикаторы загружаются только командами, которым нужен движок
+        from src.signal_engine import SignalEngine
+
         try:
             self.signal_engine = SignalEngine(self.config_path)
+            if self.symbols:
+                self.signal_engine.symbols = self.symbols
             print("Инициализация завершена успешно")
         except Exception as e:
             print(f"Ошибка инициализации: {e}")
             raise
 
-    async def start(self, continuous: bool = False, interval: int = 15):
+    async def start(self, continuous: bool = False, interval: int = 15, stream: bool = False):
         """Запуск бота"""
         await self.initialize()
 
-        if continuous:
-            print("Запуск непрерывного анализа...")
-            self.running = True
+        if not continuous:
+            # Журнал сигналов ведет только непрерывная работа: разовые
+            # запуски не дописывают его сегменты
+            try:
+                print(await self.run_cycle(record=False))
+            finally:
+                self.signal_engine.close()
+            return
+
+        metrics_server = await self.start_metrics_server()
+        try:
+            if stream:
+                await self.run_stream()
+            else:
+                await self.run_polling(interval)
+        finally:
+            if metrics_server is not None:
+                await metrics_server.stop()
+
+    async def start_metrics_server(self):
+        """Эндпоинт /metrics (Prometheus) по настройкам секции metrics"""
+        metrics_config = self.signal_engine.config.get('metrics', {})
+        if not metrics_config.get('enabled', False):
+            return None
+
+        server = MetricsServer(
+            self.signal_engine.metrics,
+            metrics_config.get('host', '127.0.0.1'),
+            metrics_config.get('port', 9108)
+        )
+        try:
+            await server.start()
+        except ImportError as e:
+            # aiohttp не установлен: бот работает без эндпоинта метрик
+            print(f"Метрики недоступны (нет aiohttp): {e}")
+            return None
+        except OSError as e:
+            print(f"Метрики недоступны: {e}")
+            return None
+        print(f"Метрики: http://{server.host}:{server.port}/metrics")
+        return server
+
+    async def run_polling(self, interval: int):
+        """Непрерывный анализ с опросом биржи на каждой границе interval минут"""
+        print("Запуск непрерывного анализа...")
+        self.running = True
+
+        def signal_handler(signum, frame):
+            print("\nБот остановлен пользователем")
+            self.running = False
+
+        signal.signal(signal.SIGINT, signal_handler)
+        signal.signal(signal.SIGTERM, signal_handler)
 
-            def signal_handler(signum, frame):
-                print("\nБот остановлен пользователем")
-                self.running = False
+        # Циклы по границам свечей (interval минут от начала эпохи UTC)
+        schedule_config = self.signal_engine.config.get('schedule', {})
+        scheduler = CandleScheduler(
+            interval * 60,
+            self.signal_engine.config['timeframes'],
+            offset=schedule_config.get('offset_seconds', 2.0)
+        )
 
-            signal.signal(signal.SIGINT, signal_handler)
-            signal.signal(signal.SIGTERM, signal_handler)
+        while self.running:
+            try:
+                print(await self.run_cycle())
+                print()
+            except KeyboardInterrupt:
+                break
+            except Exception as e:
+                print(f"Ошибка в цикле: {e}")
+
+            boundary, due = await scheduler.wait()
+            print(f"Свечи {datetime.fromtimestamp(boundary, timezone.utc):%Y-%m-%d %H:%M} UTC, "
+                  f"закрылись: {', '.join(due) or '-'}")
+        self.signal_engine.close()
+        print("Бот остановлен")
+
+    async def run_stream(self):
+        """Непрерывный анализ по потоку свечей WebSocket: анализ сразу после закрытия свечи"""
+        # aiohttp нужен только режиму потока - импорт при запуске потока
+        from src.kline_stream import KlineStream
+
+        engine = self.signal_engine
+        analyzer = engine.timeframe_analyzer
+        debounce = engine.config.get('stream', {}).get('debounce', 0.5)
+
+        pending = set()
+        closed = asyncio.Event()
+
+        async def on_close(symbol: str, timeframe: str):
+            pending.add(symbol)
+            closed.set()
+
+        kline_stream = KlineStream(engine.config, engine.symbols, analyzer.fetch_data, on_close)
+        print("Запуск анализа по потоку свечей...")
+        self.running = True
+
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, kline_stream.stop)
+
+        stream_task = asyncio.create_task(kline_stream.run())
+        try:
+            while not stream_task.done():
+                closed_wait = asyncio.create_task(closed.wait())
+                await asyncio.wait({closed_wait, stream_task}, return_when=asyncio.FIRST_COMPLETED)
+                closed_wait.cancel()
+                if stream_task.done():
+                    break
+
+                # Свечи разных таймфреймов закрываются одновременно - собираем их в один анализ
+                await asyncio.sleep(debounce)
+                closed.clear()
+                symbols = sorted(pending)
+                pending.clear()
 
-            while self.running:
                 try:
-                    result = await self.signal_engine.analyze_all_timeframes()
-                    report = self.signal_engine.create_signal_report(result)
-                    print(report)
+                    print(await self.run_cycle(
+                        symbols,
+                        {symbol: kline_stream.frames(symbol) for symbol in symbols}
+                    ))
                     print()
-                    await asyncio.sleep(interval * 60)
-                except KeyboardInterrupt:
-                    break
                 except Exception as e:
                     print(f"Ошибка в цикле: {e}")
-                    await asyncio.sleep(60)
+        finally:
+            kline_stream.stop()
+            await stream_task
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                loop.remove_signal_handler(signum)
+            engine.close()
+            self.running = False
             print("Бот остановлен")
-        else:
-            result = await self.signal_engine.analyze_all_timeframes()
-            report = self.signal_engine.create_signal_report(result)
-            print(report)
 
-    async def backtest(self, days: int = 30):
+    async def run_cycle(self, symbols: list = None, frames: dict = None, record: bool = True) -> str:
+        """Один цикл анализа: отчет по символу или сводка сканирования
+
+        frames - свечи по символам из потока WebSocket (без них - запрос к бирже);
+        record=False - без записи сигналов в журнал.
+        """
+        engine = self.signal_engine
+        metrics = engine.metrics
+        symbols = symbols or engine.symbols
+        with metrics.span('cycle'):
+            if len(symbols) > 1:
+                results = await engine.analyze_symbols(symbols, frames)
+                if record:
+                    engine.record_signals(results)
+                with metrics.span('report', kind='scan'):
+                    return engine.create_scan_report(results)
+
+            symbol = symbols[0]
+            result = await engine.analyze_all_timeframes(
+                symbol,
+                frames.get(symbol) if frames is not None else None
+            )
+            if record:
+                engine.record_signals([result])
+            with metrics.span('report', kind='signal'):
+                return engine.create_signal_report(result)
+
+    async def backtest(self, days: int = 30, data_path: str = None):
         """Запуск бэктеста"""
-        print(f"Бэктестинг за {days} дней пока не реализован")
+        await self.initialize()
+
+        config = self.signal_engine.config
+        data_path = data_path or config.get('backtest', {}).get('data_path')
+        if not data_path:
+            print("Не указан файл с историческими данными (--data)")
+            return
+
+        from src.backtester import Backtester
 
-    async def health_check(self):
-        """Проверка здоровья"""
+        print(f"Бэктестинг за {days} дней на данных {data_path}...")
+        backtester = Backtester(self.signal_engine)
+        data = backtester.load_candles(data_path)
+        report = await asyncio.get_running_loop().run_in_executor(
+            None, backtester.run, data, days
+        )
+        print(backtester.format_report(report))
+
+    async def health_check(self, probe: bool = False) -> bool:
+        """Проверка здоровья
+
+        Без probe - сводка задержек работающего бота с его эндпоинта
+        /metrics (секция metrics конфигурации), без запросов к бирже.
+        С probe - один живой цикл анализа в этом процессе (без записи
+        в журнал сигналов) и задержки его этапов.
+
+        Возвращает True, если система здорова.
+        """
+        if probe:
+            await self.initialize()
+            try:
+                await self.run_cycle(record=False)
+                healthy = True
+                print("Система: OK")
+            except Exception as e:
+                healthy = False
+                print(f"Система: ОШИБКА ({e})")
+            finally:
+                self.signal_engine.close()
+            print()
+            print(METRICS.format_summary())
+            return healthy
+
+        with open(self.config_path, 'r') as f:
+            metrics_config = json.load(f).get('metrics', {})
+        if not metrics_config.get('enabled', False):
+            print("Система: нет данных - эндпоинт метрик выключен (metrics.enabled); "
+                  "живая проверка: --health-check --probe")
+            return False
+
+        host = metrics_config.get('host', '127.0.0.1')
+        port = metrics_config.get('port', 9108)
+        try:
+            rows = await asyncio.to_thread(scrape_summary, host, port)
+        except OSError as e:
+            print(f"Система: ОШИБКА - бот не отвечает на http://{host}:{port}/metrics ({e})")
+            return False
+
+        if not rows:
+            print("Система: OK - бот запущен, циклов анализа еще не было")
+            return True
         print("Система: OK")
+        print()
+        print(format_summary(rows))
+        return True
 
 
 async def main():
@@ -93,24 +293,35 @@ async def main():
                        help='Запустить непрерывный анализ')
     parser.add_argument('--interval', type=int, default=15,
                        help='Интервал анализа в минутах')
+    parser.add_argument('--stream', action='store_true',
+                       help='Непрерывный анализ по потоку свечей WebSocket (вместо опроса раз в --interval)')
+    parser.add_argument('--symbols',
+                       help='Список символов через запятую для сканирования (например, XRPUSDT,BTCUSDT)')
     parser.add_argument('--backtest', type=int, metavar='DAYS',
                        help='Запустить бэктест')
+    parser.add_argument('--data', metavar='PATH',
+                       help='Файл со свечами для бэктеста (CSV или JSON)')
     parser.add_argument('--health-check', action='store_true',
                        help='Проверка здоровья')
+    parser.add_argument('--probe', action='store_true',
+                       help='С --health-check: один живой цикл анализа (запросы к бирже)')
 
     args = parser.parse_args()
 
-    bot = TradingBot(args.config)
+    symbols = [symbol.strip() for symbol in args.symbols.split(',') if symbol.strip()] if args.symbols else None
+    bot = TradingBot(args.config, symbols)
 
     if args.health_check:
-        await bot.health_check()
+        if not await bot.health_check(probe=args.probe):
+            sys.exit(1)
         return
 
     if args.backtest:
-        await bot.backtest(args.backtest)
+        await bot.backtest(args.backtest, args.data)
         return
 
-    await bot.start(continuous=args.continuous, interval=args.interval)
+    await bot.start(continuous=args.continuous or args.stream, interval=args.interval,
+                    stream=args.stream)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,350 @@
+import json
+import logging
+import os
+import time
+from typing import Dict, List, Any, Optional
+
+import numpy as np
+import pandas as pd
+
+from indicators.base_indicator import SIGNAL_CODES, signal_names
+from src.signal_engine import evaluate_indicators
+
+# Глубина истории таймфрейма в живом цикле (TimeframeAnalyzer.fetch_data)
+LIVE_HISTORY_BARS = 200
+
+# Правила ресемплинга pandas для таймфреймов конфигурации
+TIMEFRAME_RULES = {
+    '1D': '1D',
+    '4H': '4h',
+    '1H': '1h',
+    '15m': '15min'
+}
+
+
+class Backtester:
+    """Пошаговый бэктест стратегии SignalEngine на исторических свечах
+
+    Свечи базового (младшего) таймфрейма проигрываются по одной, старшие
+    таймфреймы собираются из них ресемплингом. Свеча старшего таймфрейма
+    влияет на сигнал только после своего закрытия - заглядывания в будущее
+    нет. Сигнал, полученный на закрытии бара, исполняется по цене открытия
+    следующего бара.
+
+    Как и живой движок, который видит только последние 200 свечей
+    таймфрейма, по умолчанию каждый бар оценивается по окну последних
+    history_bars свечей (backtest.history_bars) тем же evaluate_indicators.
+    history_bars = None - быстрый режим по всей истории: векторно
+    (BaseIndicator.generate_signals) или, при vectorized=False,
+    инкрементально (BaseIndicator.update), с одинаковым результатом. Он
+    расходится с живым движком у индикаторов, зависящих от пути (EMA 200,
+    накопительные VWAP/OBV, Volume Profile, уровни свингов).
+    """
+
+    def __init__(self, signal_engine, commission_pct: Optional[float] = None,
+                 vectorized: Optional[bool] = None):
+        self.engine = signal_engine
+        self.config = signal_engine.config
+        self.logger = logging.getLogger(__name__)
+
+        risk = self.config['risk_management']
+        self.position_size = risk['max_position_size']
+        self.stop_loss_pct = risk['stop_loss_pct']
+        self.take_profit_pct = risk['take_profit_pct']
+        self.max_daily_trades = risk['max_daily_trades']
+        self.max_daily_loss = risk['max_daily_loss']
+
+        backtest_config = self.config.get('backtest', {})
+        self.commission_pct = (commission_pct if commission_pct is not None
+                               else backtest_config.get('commission_pct', 0.0))
+        self.vectorized = (vectorized if vectorized is not None
+                           else backtest_config.get('vectorized', True))
+        self.history_bars = backtest_config.get('history_bars', LIVE_HISTORY_BARS)
+
+        # Таймфреймы от младшего к старшему
+        self.timeframes = sorted(
+            self.config['timeframes'],
+            key=lambda tf: pd.Timedelta(TIMEFRAME_RULES[tf])
+        )
+        self.base_timeframe = self.timeframes[0]
+
+    @staticmethod
+    def load_candles(path: str) -> pd.DataFrame:
+        """Загрузка свечей из CSV или JSON (формат ccxt: [timestamp, o, h, l, c, v])"""
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Файл с историческими данными не найден: {path}")
+
+        if path.endswith('.json'):
+            with open(path, 'r') as f:
+                df = pd.DataFrame(json.load(f), columns=[
+                    'timestamp', 'open', 'high', 'low', 'close', 'volume'
+                ])
+        else:
+            df = pd.read_csv(path)
+
+        timestamp = df['timestamp']
+        if pd.api.types.is_numeric_dtype(timestamp):
+            df['timestamp'] = pd.to_datetime(timestamp, unit='ms')
+        else:
+            df['timestamp'] = pd.to_datetime(timestamp)
+        df.set_index('timestamp', inplace=True)
+        df = df[['open', 'high', 'low', 'close', 'volume']].astype(float)
+
+        return df[~df.index.duplicated(keep='last')].sort_index()
+
+    @staticmethod
+    def resample(data: pd.DataFrame, timeframe: str) -> pd.DataFrame:
+        """Свечи таймфрейма из свечей младшего таймфрейма"""
+        return data.resample(TIMEFRAME_RULES[timeframe], label='left', closed='left').agg({
+            'open': 'first',
+            'high': 'max',
+            'low': 'min',
+            'close': 'last',
+            'volume': 'sum'
+        }).dropna()
+
+    def run(self, data: pd.DataFrame, days: Optional[int] = None) -> Dict[str, Any]:
+        """Бэктест на данных; торговля только в последние days дней, вся более
+        ранняя история используется для прогрева индикаторов"""
+        started = time.perf_counter()
+
+        frames = {tf: self.resample(data, tf) for tf in self.timeframes}
+        base = frames[self.base_timeframe]
+        trade_start = base.index[0]
+        if days:
+            trade_start = max(trade_start, base.index[-1] - pd.Timedelta(days=days))
+
+        if self.history_bars or self.vectorized:
+            signals = signal_names(self._vectorized_signals(frames, trade_start))
+        else:
+            signals = self._incremental_signals(frames)
+        trades, equity = self._simulate(base, signals, trade_start)
+
+        elapsed = time.perf_counter() - started
+        report = self._build_report(trades, equity, base, trade_start)
+        report['elapsed_sec'] = elapsed
+        report['bars_per_sec'] = len(base) / elapsed if elapsed > 0 else 0.0
+        report['trades_per_sec'] = len(trades) / elapsed if elapsed > 0 else 0.0
+        return report
+
+    def _vectorized_signals(self, frames: Dict[str, pd.DataFrame],
+                            start: Optional[pd.Timestamp] = None) -> np.ndarray:
+        """Финальные направления (int8) по барам базового таймфрейма
+
+        С history_bars сигналы считаются по окнам (_window_signal_arrays)
+        начиная со свечи, закрывшейся к start (раньше - только прогрев,
+        NEUTRAL); без него - за один векторный проход по всей истории.
+        """
+        base = frames[self.base_timeframe]
+        base_close_times = (base.index + pd.Timedelta(TIMEFRAME_RULES[self.base_timeframe])).asi8
+
+        timeframe_signals = {}
+        for tf in self.timeframes:
+            frame = frames[tf]
+            close_times = (frame.index + pd.Timedelta(TIMEFRAME_RULES[tf])).asi8
+            if self.history_bars:
+                first = 0
+                if start is not None:
+                    first = max(0, int(np.searchsorted(close_times, start.value, side='right')) - 1)
+                signal_arrays = self._window_signal_arrays(tf, frame, first)
+            else:
+                signal_arrays = self.engine.get_indicator_signal_arrays(
+                    tf, frame, self.engine.create_indicators(tf)
+                )
+            weighted = self.engine.calculate_weighted_signal_arrays(signal_arrays)
+
+            # Последняя закрывшаяся к концу базового бара свеча таймфрейма
+            position = np.searchsorted(close_times, base_close_times, side='right') - 1
+            available = position >= 0
+            position = np.maximum(position, 0)
+
+            timeframe_signals[tf] = {
+                'weight': self.config['timeframes'][tf]['weight'],
+                'weighted_signal': {
+                    'direction': np.where(available, weighted['direction'][position], 0),
+                    'long_count': np.where(available, weighted['long_count'][position], 0),
+                    'short_count': np.where(available, weighted['short_count'][position], 0)
+                }
+            }
+
+        return self.engine.generate_final_signal_arrays(timeframe_signals)['direction']
+
+    def _window_signal_arrays(self, tf: str, frame: pd.DataFrame, first: int = 0) -> Dict[str, np.ndarray]:
+        """Сигналы индикаторов (int8) на барах frame начиная с first, каждый -
+        по окну последних history_bars свечей, как в живом цикле"""
+        indicators = self.engine.create_indicators(tf)
+        arrays = {name: np.zeros(len(frame), dtype=np.int8) for name in indicators}
+        for j in range(first, len(frame)):
+            window = frame.iloc[max(0, j + 1 - self.history_bars):j + 1]
+            for name, signal in evaluate_indicators(indicators, tf, window, logger=self.logger).items():
+                arrays[name][j] = SIGNAL_CODES[signal]
+        return arrays
+
+    def _incremental_signals(self, frames: Dict[str, pd.DataFrame]):
+        """Генератор финальных направлений по барам базового таймфрейма"""
+        base = frames[self.base_timeframe]
+        base_close_times = base.index + pd.Timedelta(TIMEFRAME_RULES[self.base_timeframe])
+
+        # Для каждого таймфрейма: свежие индикаторы, бары и время их закрытия
+        feeds = {}
+        for tf in self.timeframes:
+            frame = frames[tf]
+            feeds[tf] = {
+                'indicators': self.engine.create_indicators(tf),
+                'bars': frame.to_dict('records'),
+                'close_times': (frame.index + pd.Timedelta(TIMEFRAME_RULES[tf])).asi8,
+                'position': 0,
+                'weighted_signal': None
+            }
+
+        weights = {tf: cfg['weight'] for tf, cfg in self.config['timeframes'].items()}
+        final = {'direction': "NEUTRAL"}
+
+        for close_time in base_close_times.asi8:
+            changed = False
+            for tf, feed in feeds.items():
+                close_times = feed['close_times']
+                # Подаем в индикаторы все свечи таймфрейма, закрывшиеся к этому моменту
+                while feed['position'] < len(close_times) and close_times[feed['position']] <= close_time:
+                    bar = feed['bars'][feed['position']]
+                    signals = {}
+                    for name, indicator in feed['indicators'].items():
+                        try:
+                            signals[name] = indicator.update(bar)['signal']
+                        except Exception as e:
+                            self.logger.error(f"Ошибка в {name} для {tf}: {e}")
+                            signals[name] = "NEUTRAL"
+                    feed['weighted_signal'] = self.engine._calculate_weighted_signal(signals, tf)
+                    feed['position'] += 1
+                    changed = True
+
+            if changed:
+                timeframe_signals = {
+                    tf: {'weight': weights[tf], 'weighted_signal': feed['weighted_signal']}
+                    for tf, feed in feeds.items() if feed['weighted_signal'] is not None
+                }
+                final = self.engine._generate_final_signal(timeframe_signals)
+            yield final['direction']
+
+    def _simulate(self, base: pd.DataFrame, signals, trade_start: pd.Timestamp):
+        """Исполнение сигналов с учетом stop-loss/take-profit и дневных лимитов"""
+        opens = base['open'].to_numpy(dtype=float)
+        highs = base['high'].to_numpy(dtype=float)
+        lows = base['low'].to_numpy(dtype=float)
+        closes = base['close'].to_numpy(dtype=float)
+        days = base.index.normalize().asi8
+        index = base.index
+        start_position = index.searchsorted(trade_start)
+
+        trades: List[Dict[str, Any]] = []
+        equity = [0.0]
+        position = None
+        pending = "NEUTRAL"  # сигнал предыдущего бара, исполняется по open текущего
+        day = None
+        day_trades = 0
+        day_pnl = 0.0
+
+        def close_position(i, price, reason):
+            nonlocal position, day_pnl
+            direction = 1 if position['direction'] == "LONG" else -1
+            gross = self.position_size * direction * (price / position['entry_price'] - 1)
+            commission = self.position_size * self.commission_pct / 100 * 2
+            pnl = gross - commission
+            trades.append({
+                'direction': position['direction'],
+                'entry_time': position['entry_time'],
+                'exit_time': index[i],
+                'entry_price': position['entry_price'],
+                'exit_price': price,
+                'pnl': pnl,
+                'reason': reason
+            })
+            equity.append(equity[-1] + pnl)
+            day_pnl += pnl
+            position = None
+
+        for i, direction in enumerate(signals):
+            if i < start_position:
+                pending = direction
+                continue
+
+            if days[i] != day:
+                day = days[i]
+                day_trades = 0
+                day_pnl = 0.0
+
+            # 1. Исполнение сигнала прошлого бара по цене открытия
+            if position is not None and pending != "NEUTRAL" and pending != position['direction']:
+                close_position(i, opens[i], 'reverse')
+            if (position is None and pending != "NEUTRAL"
+                    and day_trades < self.max_daily_trades and day_pnl > -self.max_daily_loss):
+                position = {'direction': pending, 'entry_price': opens[i], 'entry_time': index[i]}
+                day_trades += 1
+
+            # 2. Stop-loss / take-profit внутри бара (при касании обоих - stop-loss)
+            if position is not None:
+                entry = position['entry_price']
+                if position['direction'] == "LONG":
+                    stop = entry * (1 - self.stop_loss_pct / 100)
+                    target = entry * (1 + self.take_profit_pct / 100)
+                    if lows[i] <= stop:
+                        close_position(i, min(stop, opens[i]), 'stop_loss')
+                    elif highs[i] >= target:
+                        close_position(i, max(target, opens[i]), 'take_profit')
+                else:
+                    stop = entry * (1 + self.stop_loss_pct / 100)
+                    target = entry * (1 - self.take_profit_pct / 100)
+                    if highs[i] >= stop:
+                        close_position(i, max(stop, opens[i]), 'stop_loss')
+                    elif lows[i] <= target:
+                        close_position(i, min(target, opens[i]), 'take_profit')
+
+            pending = direction
+
+        if position is not None:
+            close_position(len(closes) - 1, closes[-1], 'end_of_data')
+
+        return trades, np.array(equity)
+
+    def _build_report(self, trades: List[Dict[str, Any]], equity: np.ndarray,
+                      base: pd.DataFrame, trade_start: pd.Timestamp) -> Dict[str, Any]:
+        """Сводка результатов бэктеста"""
+        pnl = np.array([t['pnl'] for t in trades], dtype=float)
+        wins = int((pnl > 0).sum())
+        drawdown = np.maximum.accumulate(equity) - equity
+
+        return {
+            'symbol': self.engine.symbol,
+            'start': trade_start.isoformat(),
+            'end': base.index[-1].isoformat(),
+            'bars': len(base),
+            'trades': len(trades),
+            'wins': wins,
+            'losses': len(trades) - wins,
+            'win_rate': (wins / len(trades)) * 100 if trades else 0.0,
+            'total_pnl': float(pnl.sum()),
+            'return_pct': float(pnl.sum()) / self.position_size * 100,
+            'max_drawdown': float(drawdown.max()),
+            'max_drawdown_pct': float(drawdown.max()) / self.position_size * 100,
+            'trade_log': trades
+        }
+
+    @staticmethod
+    def format_report(report: Dict[str, Any]) -> str:
+        """Текстовый отчет о бэктесте"""
+        lines = [
+            "=" * 60,
+            "          РЕЗУЛЬТАТЫ БЭКТЕСТА",
+            "",
+            f"Символ: {report['symbol']}",
+            f"Период: {report['start']} — {report['end']}",
+            f"Сделок: {report['trades']} (прибыльных {report['wins']}, убыточных {report['losses']})",
+            f"Win rate: {report['win_rate']:.1f}%",
+            f"PnL: {report['total_pnl']:,.2f} USDT ({report['return_pct']:.2f}%)",
+            f"Макс. просадка: {report['max_drawdown']:,.2f} USDT ({report['max_drawdown_pct']:.2f}%)",
+            "",
+            f"Обработано баров: {report['bars']} за {report['elapsed_sec']:.2f} с "
+            f"({report['bars_per_sec']:,.0f} бар/с, {report['trades_per_sec']:,.1f} сделок/с)",
+            "=" * 60
+        ]
+        return "\n".join(lines)
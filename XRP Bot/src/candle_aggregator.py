@@ -0,0 +1,137 @@
+from typing import Optional
+
+import numpy as np
+
+from src.ohlcv_buffer import OHLCVBuffer
+
+
+class CandleAggregator:
+    """Свечи старшего таймфрейма из свечей базового (например, 1H из 15m)
+
+    Свечи пишутся в буфер старшего таймфрейма: закрытая история берется
+    у биржи один раз (bootstrap - 200 свечей 1D одним запросом вместо
+    19 200 свечей 15m), после reset() формирующаяся свеча периода и все
+    последующие строятся из базовых свечей. Границы периодов - от начала
+    эпохи UTC, как у свечей Binance.
+
+    update() принимает окно базовых свечей (повтор уже учтенных свечей
+    допустим) и обрабатывает только новые: последняя базовая свеча может
+    формироваться и приходить несколько раз, поэтому агрегат периода
+    хранится как «префикс» из предыдущих базовых свечей плюс последняя
+    свеча - обновление формирующейся свечи O(1) без двойного учета объема.
+    """
+
+    __slots__ = ('buffer', 'period_ms', 'base_ms', '_start', '_last_base', '_latest', '_prefix')
+
+    def __init__(self, buffer: OHLCVBuffer, period_seconds: int, base_seconds: int):
+        if period_seconds % base_seconds:
+            raise ValueError(f"Период {period_seconds} с не кратен базовому {base_seconds} с")
+        self.buffer = buffer
+        self.period_ms = period_seconds * 1000
+        self.base_ms = base_seconds * 1000
+        self._start: Optional[int] = None
+        self._last_base: Optional[int] = None
+        # Последняя базовая свеча [время, o, h, l, c, v] и агрегат
+        # предыдущих базовых свечей ее периода [начало периода, o, h, l, c, v]
+        self._latest: Optional[np.ndarray] = None
+        self._prefix: Optional[np.ndarray] = None
+
+    @property
+    def ready(self) -> bool:
+        return self._start is not None
+
+    def reset(self, start: Optional[int] = None):
+        """Начало агрегации с периода start (мс; по умолчанию - последняя
+        свеча буфера, обычно формирующаяся свеча из ответа биржи)
+
+        Свеча периода start и более поздние будут построены из базовых.
+        """
+        if start is None:
+            start = self.buffer.last_timestamp
+        self._start = None if start is None else start - start % self.period_ms
+        self._last_base = None
+        self._latest = None
+        self._prefix = None
+
+    def update(self, timestamps: np.ndarray, values: np.ndarray) -> bool:
+        """Учет базовых свечей: время открытия (мс, по возрастанию) и массив
+        (5, n) колонок OHLCV, как OHLCVBuffer.timestamps и OHLCVBuffer.values
+
+        Возвращает False, если между учтенными и новыми базовыми свечами
+        есть разрыв (окно не покрывает начало периода после reset() или
+        пропущены бары) - тогда нужен повторный bootstrap и reset().
+        """
+        if self._start is None:
+            return False
+
+        covered = self._start if self._last_base is None else self._last_base
+        first = int(np.searchsorted(timestamps, covered))
+        timestamps = timestamps[first:]
+        if not len(timestamps):
+            return True
+
+        expected = self._start if self._last_base is None else self._last_base + self.base_ms
+        if timestamps[0] > expected:
+            return False
+
+        rows = np.empty((len(timestamps), 6))
+        rows[:, 0] = timestamps
+        rows[:, 1:] = np.asarray(values)[:, first:].T
+
+        if self._latest is not None and rows[0, 0] > self._latest[0]:
+            # Прежняя последняя базовая свеча закрылась - в префикс периода
+            self._fold(self._latest[np.newaxis])
+        if len(rows) > 1:
+            self._fold(rows[:-1])
+        self._latest = rows[-1].copy()
+        self._last_base = int(rows[-1, 0])
+        self._write_forming()
+        return True
+
+    def _fold(self, rows: np.ndarray):
+        """Закрытые базовые свечи в префикс; завершенные периоды - в буфер"""
+        periods = rows[:, 0] - rows[:, 0] % self.period_ms
+        starts = np.flatnonzero(np.diff(periods)) + 1
+        first = np.concatenate([[0], starts])
+        last = np.concatenate([starts - 1, [len(rows) - 1]])
+
+        groups = np.empty((len(first), 6))
+        groups[:, 0] = periods[first]
+        groups[:, 1] = rows[first, 1]
+        groups[:, 2] = np.maximum.reduceat(rows[:, 2], first)
+        groups[:, 3] = np.minimum.reduceat(rows[:, 3], first)
+        groups[:, 4] = rows[last, 4]
+        groups[:, 5] = np.add.reduceat(rows[:, 5], first)
+
+        if self._prefix is not None:
+            if self._prefix[0] == groups[0, 0]:
+                groups[0] = self._merge(self._prefix, groups[0])
+            else:
+                groups = np.vstack([self._prefix, groups])
+
+        # Все группы, кроме последней, - завершенные периоды
+        if len(groups) > 1:
+            self.buffer.extend(groups[:-1])
+        self._prefix = groups[-1]
+
+    def _write_forming(self):
+        """Запись свечи периода последней базовой свечи (префикс + последняя)"""
+        latest = self._latest
+        period = latest[0] - latest[0] % self.period_ms
+        if self._prefix is not None and self._prefix[0] == period:
+            candle = self._merge(self._prefix, latest)
+        else:
+            if self._prefix is not None:
+                # Период префикса завершился без новых базовых свечей в нем
+                self.buffer.upsert(self._prefix)
+                self._prefix = None
+            candle = latest.copy()
+        candle[0] = period
+        self.buffer.upsert(candle)
+
+    @staticmethod
+    def _merge(head: np.ndarray, tail: np.ndarray) -> np.ndarray:
+        """Свеча из двух последовательных частей периода (время - от head)"""
+        return np.array([
+            head[0], head[1], max(head[2], tail[2]), min(head[3], tail[3]), tail[4], head[5] + tail[5]
+        ])
@@ -0,0 +1,65 @@
+import asyncio
+import math
+import time
+from typing import Awaitable, Callable, Iterable, List, Tuple
+
+# Длительность свечей таймфреймов конфигурации, секунды
+TIMEFRAME_SECONDS = {
+    '1D': 86_400,
+    '4H': 14_400,
+    '1H': 3_600,
+    '15m': 900
+}
+
+
+def timeframe_seconds(timeframe: str) -> int:
+    """Длительность свечи таймфрейма в секундах"""
+    try:
+        return TIMEFRAME_SECONDS[timeframe]
+    except KeyError:
+        raise ValueError(f"Неизвестный таймфрейм: {timeframe}")
+
+
+class CandleScheduler:
+    """Пробуждения по границам свечей биржи
+
+    Вместо asyncio.sleep(interval) после цикла (время анализа и задержки
+    накапливаются, и цикл «уплывает» относительно свечей) каждое
+    пробуждение выравнивается по ближайшей следующей границе периода
+    от начала эпохи UTC - так же, как биржа открывает свечи - плюс
+    offset секунд, чтобы закрытая свеча успела появиться в API.
+    """
+
+    def __init__(self, period: int, timeframes: Iterable[str], offset: float = 2.0,
+                 clock: Callable[[], float] = time.time,
+                 sleep: Callable[[float], Awaitable[None]] = asyncio.sleep):
+        if period <= 0:
+            raise ValueError(f"Период планировщика должен быть положительным: {period}")
+        self.period = period
+        self.timeframes = list(timeframes)
+        self.offset = offset
+        self.clock = clock
+        self.sleep = sleep
+
+    def next_boundary(self, now: float) -> int:
+        """Ближайшая граница периода, пробуждение по которой (граница + offset)
+        еще не наступило к моменту now (секунды эпохи)"""
+        return (math.floor((now - self.offset) / self.period) + 1) * self.period
+
+    def due_timeframes(self, boundary: int) -> List[str]:
+        """Таймфреймы, свеча которых закрывается на границе boundary"""
+        return [
+            timeframe for timeframe in self.timeframes
+            if boundary % timeframe_seconds(timeframe) == 0
+        ]
+
+    async def wait(self) -> Tuple[int, List[str]]:
+        """Ожидание следующей границы; возвращает (граница, закрывшиеся таймфреймы)"""
+        boundary = self.next_boundary(self.clock())
+        # Сон может закончиться раньше срока (часы, переход системы в сон) - досыпаем
+        while True:
+            delay = boundary + self.offset - self.clock()
+            if delay <= 0:
+                break
+            await self.sleep(delay)
+        return boundary, self.due_timeframes(boundary)
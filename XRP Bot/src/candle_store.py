@@ -0,0 +1,83 @@
+import os
+import sqlite3
+import threading
+from typing import List, Optional, Sequence, Tuple
+
+
+class CandleStore:
+    """Локальное хранилище свечей OHLCV в SQLite (по символу и таймфрейму)
+
+    Свечи с тем же временем открытия заменяются при повторной записи, так
+    что формирующаяся свеча перезаписывается актуальной версией.
+    Методы синхронные и потокобезопасные: вызываются из пула потоков.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS candles (
+                    symbol TEXT NOT NULL,
+                    timeframe TEXT NOT NULL,
+                    timestamp INTEGER NOT NULL,
+                    open REAL, high REAL, low REAL, close REAL, volume REAL,
+                    PRIMARY KEY (symbol, timeframe, timestamp)
+                ) WITHOUT ROWID
+                """
+            )
+            self._conn.commit()
+
+    def state(self, symbol: str, timeframe: str) -> Tuple[Optional[int], int]:
+        """Время последней сохраненной свечи и число свечей"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MAX(timestamp), COUNT(*) FROM candles WHERE symbol = ? AND timeframe = ?",
+                (symbol, timeframe)
+            ).fetchone()
+        return row[0], row[1]
+
+    def upsert(self, symbol: str, timeframe: str, candles: Sequence[Sequence[float]]):
+        """Запись свечей [timestamp, open, high, low, close, volume] с заменой дубликатов"""
+        if not candles:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO candles VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(symbol, timeframe, int(c[0]), c[1], c[2], c[3], c[4], c[5]) for c in candles]
+            )
+            self._conn.commit()
+
+    def load(self, symbol: str, timeframe: str, limit: int) -> List[Tuple]:
+        """Последние limit свечей в хронологическом порядке"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT timestamp, open, high, low, close, volume FROM candles "
+                "WHERE symbol = ? AND timeframe = ? ORDER BY timestamp DESC LIMIT ?",
+                (symbol, timeframe, limit)
+            ).fetchall()
+        rows.reverse()
+        return rows
+
+    def prune(self, symbol: str, timeframe: str, keep: int):
+        """Удаление свечей старше последних keep"""
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM candles WHERE symbol = ? AND timeframe = ? AND timestamp < ("
+                "SELECT MIN(timestamp) FROM (SELECT timestamp FROM candles "
+                "WHERE symbol = ? AND timeframe = ? ORDER BY timestamp DESC LIMIT ?))",
+                (symbol, timeframe, symbol, timeframe, keep)
+            )
+            self._conn.commit()
+
+    def close(self):
+        """Закрытие соединения"""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,279 @@
+import asyncio
+import json
+import logging
+import random
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import aiohttp
+import numpy as np
+import pandas as pd
+
+from src.ohlcv_buffer import OHLCVBuffer
+from src.candle_aggregator import CandleAggregator
+from src.candle_scheduler import timeframe_seconds
+from src.timeframe_analyzer import TimeframeAnalyzer
+
+# Потоки Binance: комбинированный поток по всем символам и таймфреймам
+BINANCE_STREAM_URL = "wss://stream.binance.com:9443/stream"
+BINANCE_TESTNET_STREAM_URL = "wss://testnet.binance.vision/stream"
+
+# (символ, таймфрейм) -> None; вызывается при закрытии свечи
+CloseCallback = Callable[[str, str], Awaitable[None]]
+# (символ, таймфрейм, limit) -> DataFrame последних свечей из REST API
+RestFetch = Callable[[str, str, int], Awaitable[pd.DataFrame]]
+
+
+def stream_name(symbol: str) -> str:
+    """Имя символа в потоках Binance ('XRP/USDT' и 'XRPUSDT' -> 'xrpusdt')"""
+    return symbol.replace('/', '').lower()
+
+
+class CandleSeries:
+    """Последние limit свечей таймфрейма в памяти, по возрастанию времени
+
+    Свеча с уже известным временем открытия заменяется (формирующаяся
+    свеча обновляется каждым сообщением потока). Свечи хранятся
+    в кольцевом буфере OHLCVBuffer без выделения памяти на сообщение.
+    """
+
+    def __init__(self, limit: int = 200, dtype: Any = np.float64):
+        self.limit = limit
+        self.buffer = OHLCVBuffer(limit, dtype)
+
+    def __len__(self) -> int:
+        return len(self.buffer)
+
+    @property
+    def last_timestamp(self) -> Optional[int]:
+        return self.buffer.last_timestamp
+
+    @property
+    def candles(self) -> List[List[float]]:
+        """Свечи списками [timestamp, open, high, low, close, volume]"""
+        return [
+            [timestamp] + row
+            for timestamp, row in zip(self.buffer.timestamps.tolist(), self.buffer.values.T.tolist())
+        ]
+
+    def upsert(self, candle: List[float]):
+        """Добавление или замена свечи [timestamp, open, high, low, close, volume]"""
+        self.buffer.upsert([int(candle[0])] + [float(v) for v in candle[1:6]])
+
+    def merge_frame(self, data: pd.DataFrame):
+        """Слияние свечей из DataFrame (результат REST-запроса)"""
+        rows = np.empty((len(data), 6))
+        rows[:, 0] = data.index.asi8 // 1_000_000
+        rows[:, 1:] = data[['open', 'high', 'low', 'close', 'volume']].to_numpy(dtype=float)
+        self.buffer.extend(rows)
+
+    def frame(self) -> pd.DataFrame:
+        """Копия свечей в формате TimeframeAnalyzer.fetch_data
+
+        Копия, а не представление буфера: поток продолжает обновлять ряд,
+        пока идет анализ.
+        """
+        return self.buffer.to_frame(copy=True)
+
+
+class KlineStream:
+    """Поток свечей (kline) Binance по WebSocket для набора символов и таймфреймов
+
+    Держит в памяти актуальные ряды свечей и вызывает on_close при закрытии
+    каждой свечи. При обрыве соединения переподключается с экспоненциальной
+    задержкой, а после (пере)подключения догружает пропущенные свечи через
+    REST (rest_fetch), так что ряды не содержат разрывов.
+
+    С data.derive_timeframes подписка идет только на базовый таймфрейм,
+    а старшие строятся из его свечей (CandleAggregator); их закрытая
+    история загружается через REST при подключении.
+    """
+
+    def __init__(self, config: Dict[str, Any], symbols: List[str], rest_fetch: RestFetch,
+                 on_close: Optional[CloseCallback] = None, url: Optional[str] = None):
+        self.logger = logging.getLogger(__name__)
+        self.symbols = list(symbols)
+        self.rest_fetch = rest_fetch
+        self.on_close = on_close
+
+        stream_config = config.get('stream', {})
+        testnet = config.get('api', {}).get('testnet', False)
+        self.url = url or stream_config.get(
+            'testnet_url' if testnet else 'url',
+            BINANCE_TESTNET_STREAM_URL if testnet else BINANCE_STREAM_URL
+        )
+        self.history_bars = stream_config.get('history_bars', 200)
+        self.reconnect_min_delay = stream_config.get('reconnect_min_delay', 1.0)
+        self.reconnect_max_delay = stream_config.get('reconnect_max_delay', 60.0)
+        self.heartbeat = stream_config.get('heartbeat', 30.0)
+        data_config = config.get('data', {})
+        buffer_dtype = data_config.get('buffer_dtype', 'float64')
+
+        # Таймфреймы конфигурации и их названия в потоках Binance
+        self.timeframes = {
+            timeframe: TimeframeAnalyzer.TIMEFRAME_MAPPING[timeframe]
+            for timeframe in config['timeframes']
+        }
+        # Подписки: все таймфреймы или только базовый (старшие - из него)
+        self.base_timeframe = data_config.get('base_timeframe', '15m')
+        self.derived_timeframes = [
+            timeframe for timeframe in self.timeframes
+            if data_config.get('derive_timeframes', False) and timeframe != self.base_timeframe
+        ]
+        self.intervals = {
+            timeframe: interval for timeframe, interval in self.timeframes.items()
+            if timeframe not in self.derived_timeframes
+        }
+        self._by_interval = {interval: timeframe for timeframe, interval in self.intervals.items()}
+        self._by_stream_symbol = {stream_name(symbol): symbol for symbol in self.symbols}
+
+        self.series: Dict[Tuple[str, str], CandleSeries] = {
+            (symbol, timeframe): CandleSeries(self.history_bars, buffer_dtype)
+            for symbol in self.symbols for timeframe in self.timeframes
+        }
+        self.aggregators: Dict[Tuple[str, str], CandleAggregator] = {
+            (symbol, timeframe): CandleAggregator(
+                self.series[(symbol, timeframe)].buffer,
+                timeframe_seconds(timeframe),
+                timeframe_seconds(self.base_timeframe)
+            )
+            for symbol in self.symbols for timeframe in self.derived_timeframes
+        }
+        self.connections = 0
+        self._stopped = asyncio.Event()
+
+    @property
+    def streams_url(self) -> str:
+        """URL комбинированного потока со всеми подписками"""
+        streams = '/'.join(
+            f"{stream_name(symbol)}@kline_{interval}"
+            for symbol in self.symbols for interval in self.intervals.values()
+        )
+        return f"{self.url}?streams={streams}"
+
+    def frames(self, symbol: str) -> Dict[str, pd.DataFrame]:
+        """Текущие свечи символа по таймфреймам (для SignalEngine.analyze_all_timeframes)"""
+        return {
+            timeframe: self.series[(symbol, timeframe)].frame()
+            for timeframe in self.timeframes
+            if len(self.series[(symbol, timeframe)])
+        }
+
+    def stop(self):
+        """Остановка потока (run() завершится после текущего сообщения)"""
+        self._stopped.set()
+
+    async def run(self):
+        """Подписка на потоки с переподключением до вызова stop()"""
+        delay = self.reconnect_min_delay
+
+        async with aiohttp.ClientSession() as session:
+            while not self._stopped.is_set():
+                try:
+                    async with session.ws_connect(self.streams_url, heartbeat=self.heartbeat) as ws:
+                        self.connections += 1
+                        self.logger.info(f"Подключение к потоку свечей ({self.connections})")
+
+                        # Свечи, закрывшиеся пока соединения не было
+                        await self._fill_gaps()
+                        delay = self.reconnect_min_delay
+
+                        await self._consume(ws)
+
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    self.logger.error(f"Ошибка потока свечей: {e!r}")
+
+                if self._stopped.is_set():
+                    break
+
+                # Экспоненциальная задержка с небольшим случайным разбросом
+                self.logger.info(f"Переподключение к потоку через {delay:.1f} с")
+                try:
+                    await asyncio.wait_for(self._stopped.wait(), timeout=delay * random.uniform(0.8, 1.2))
+                except asyncio.TimeoutError:
+                    pass
+                delay = min(delay * 2, self.reconnect_max_delay)
+
+    async def _consume(self, ws: aiohttp.ClientWebSocketResponse):
+        """Обработка сообщений до закрытия соединения или stop()"""
+        stop_waiter = asyncio.ensure_future(self._stopped.wait())
+        try:
+            while not self._stopped.is_set():
+                receive = asyncio.ensure_future(ws.receive())
+                done, _ = await asyncio.wait({receive, stop_waiter}, return_when=asyncio.FIRST_COMPLETED)
+                if receive not in done:
+                    receive.cancel()
+                    return
+
+                message = receive.result()
+                if message.type == aiohttp.WSMsgType.TEXT:
+                    await self._handle_message(json.loads(message.data))
+                elif message.type in (aiohttp.WSMsgType.CLOSE, aiohttp.WSMsgType.CLOSED,
+                                      aiohttp.WSMsgType.CLOSING, aiohttp.WSMsgType.ERROR):
+                    raise ConnectionError(f"Соединение с потоком закрыто ({message.type.name})")
+        finally:
+            stop_waiter.cancel()
+
+    async def _fill_gaps(self):
+        """Догрузка истории через REST для всех символов и таймфреймов"""
+        keys = [(symbol, timeframe) for symbol, timeframe in self.series if timeframe in self.intervals]
+        await self._fetch_history(keys)
+
+        # Старшие таймфреймы: продолжение агрегации или bootstrap их истории
+        stale = [key for key, aggregator in self.aggregators.items() if not self._aggregate(key)]
+        await self._fetch_history(stale)
+        for key in stale:
+            self.aggregators[key].reset()
+            if not self._aggregate(key):
+                self.logger.warning(f"Свечи {self.base_timeframe} не покрывают текущий период {key[1]} {key[0]}")
+
+    def _aggregate(self, key: Tuple[str, str], bars: Optional[int] = None) -> bool:
+        """Учет последних bars (по умолчанию всех) базовых свечей в старшем таймфрейме"""
+        aggregator = self.aggregators[key]
+        base = self.series[(key[0], self.base_timeframe)].buffer
+        start = 0 if bars is None else max(len(base) - bars, 0)
+        return aggregator.update(base.timestamps[start:], base.values[:, start:])
+
+    async def _fetch_history(self, keys: List[Tuple[str, str]]):
+        """Последние history_bars свечей пар (символ, таймфрейм) через REST"""
+        results = await asyncio.gather(
+            *(self.rest_fetch(symbol, timeframe, self.history_bars) for symbol, timeframe in keys),
+            return_exceptions=True
+        )
+        for (symbol, timeframe), data in zip(keys, results):
+            if isinstance(data, BaseException):
+                self.logger.error(f"Ошибка догрузки {symbol} {timeframe}: {data!r}")
+                continue
+            self.series[(symbol, timeframe)].merge_frame(data)
+
+    async def _handle_message(self, message: Dict[str, Any]):
+        """Обновление ряда по сообщению kline; при закрытии свечи - on_close"""
+        data = message.get('data', message)
+        if data.get('e') != 'kline':
+            return
+
+        kline = data['k']
+        symbol = self._by_stream_symbol.get(kline['s'].lower())
+        timeframe = self._by_interval.get(kline['i'])
+        if symbol is None or timeframe is None:
+            return
+
+        self.series[(symbol, timeframe)].upsert([
+            kline['t'], kline['o'], kline['h'], kline['l'], kline['c'], kline['v']
+        ])
+
+        closed = [timeframe] if kline['x'] else []
+        if timeframe == self.base_timeframe:
+            for derived in self.derived_timeframes:
+                if not self.aggregators[(symbol, derived)].ready:
+                    continue
+                if not self._aggregate((symbol, derived), bars=1):
+                    # Разрыв закроет догрузка истории при переподключении
+                    self.logger.warning(f"Пропуск свечей {timeframe} в агрегации {derived} {symbol}")
+                elif kline['x'] and (kline['T'] + 1) % (timeframe_seconds(derived) * 1000) == 0:
+                    closed.append(derived)
+
+        if self.on_close is not None:
+            for closed_timeframe in closed:
+                await self.on_close(symbol, closed_timeframe)
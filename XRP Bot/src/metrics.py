@@ -0,0 +1,241 @@
+import bisect
+import math
+import re
+import threading
+import urllib.request
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Границы корзин гистограмм задержек, секунды
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUANTILES = (0.5, 0.95, 0.99)
+METRIC_PREFIX = 'xrpbot'
+
+# Метки ряда: упорядоченные пары (имя, значение)
+Labels = Tuple[Tuple[str, str], ...]
+
+# Строка сводки с квантилями: <prefix>_<name>_latency_seconds[_count]{метки} значение
+SUMMARY_LINE = re.compile(
+    rf'^{METRIC_PREFIX}_(\w+?)_latency_seconds(_count)?(?:\{{(.*)\}})? (\S+)$'
+)
+LABEL_PAIR = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+
+class Histogram:
+    """Гистограмма задержек одного ряда
+
+    Накопительные корзины, сумма и число наблюдений - для Prometheus;
+    квантили p50/p95/p99 считаются по последним window наблюдениям.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS, window: int = 1024):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.recent = deque(maxlen=window)
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.recent.append(value)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Квантиль по последним наблюдениям (ближайший ранг), None без наблюдений"""
+        if not self.recent:
+            return None
+        ordered = sorted(self.recent)
+        rank = min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))
+        return ordered[rank]
+
+
+class MetricsRegistry:
+    """Гистограммы задержек по именам метрик и меткам
+
+    Запись потокобезопасна: таймеры срабатывают и в event loop,
+    и в потоках пула запросов к бирже.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS, window: int = 1024):
+        self.buckets = buckets
+        self.window = window
+        self._histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, seconds: float, **labels: str):
+        """Наблюдение длительности seconds для метрики name с метками labels"""
+        key = tuple(sorted((label, str(value)) for label, value in labels.items()))
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram(self.buckets, self.window)
+            histogram.observe(seconds)
+
+    @contextmanager
+    def span(self, name: str, **labels: str) -> Iterator[None]:
+        """Замер длительности блока with (в том числе завершившегося ошибкой)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def clear(self):
+        with self._lock:
+            self._histograms.clear()
+
+    def summary(self) -> List[Dict[str, object]]:
+        """Ряды с числом наблюдений и p50/p95/p99, по убыванию p95"""
+        rows = []
+        with self._lock:
+            for name, series in self._histograms.items():
+                for labels, histogram in series.items():
+                    row = {'name': name, 'labels': dict(labels), 'count': histogram.count}
+                    for q in QUANTILES:
+                        row[f"p{int(q * 100)}"] = histogram.quantile(q)
+                    rows.append(row)
+        return sorted(rows, key=lambda row: -(row['p95'] or 0.0))
+
+    def format_summary(self, limit: Optional[int] = None) -> str:
+        """Таблица задержек для вывода в консоль (мс)"""
+        return format_summary(self.summary(), limit)
+
+    def render_prometheus(self) -> str:
+        """Метрики в текстовом формате Prometheus
+
+        Каждая метрика - гистограмма <prefix>_<name>_seconds (корзины,
+        _sum, _count) и сводка <prefix>_<name>_latency_seconds с квантилями
+        0.5/0.95/0.99 по последним наблюдениям.
+        """
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._histograms.items()):
+                metric = f"{METRIC_PREFIX}_{name}_seconds"
+                lines.append(f"# HELP {metric} Длительность {name}, секунды")
+                lines.append(f"# TYPE {metric} histogram")
+                for labels, histogram in sorted(series.items()):
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets + (float('inf'),), histogram.counts):
+                        cumulative += count
+                        le = '+Inf' if bound == float('inf') else repr(bound)
+                        lines.append(f"{metric}_bucket{_format_labels(labels + (('le', le),))} {cumulative}")
+                    lines.append(f"{metric}_sum{_format_labels(labels)} {histogram.sum!r}")
+                    lines.append(f"{metric}_count{_format_labels(labels)} {histogram.count}")
+
+                quantile_metric = f"{METRIC_PREFIX}_{name}_latency_seconds"
+                lines.append(f"# TYPE {quantile_metric} summary")
+                for labels, histogram in sorted(series.items()):
+                    for q in QUANTILES:
+                        value = histogram.quantile(q)
+                        lines.append(
+                            f"{quantile_metric}{_format_labels(labels + (('quantile', repr(q)),))} "
+                            f"{'NaN' if value is None else repr(value)}"
+                        )
+                    lines.append(f"{quantile_metric}_sum{_format_labels(labels)} {histogram.sum!r}")
+                    lines.append(f"{quantile_metric}_count{_format_labels(labels)} {histogram.count}")
+        return '\n'.join(lines) + '\n'
+
+
+def format_summary(rows: List[Dict[str, object]], limit: Optional[int] = None) -> str:
+    """Таблица задержек по строкам MetricsRegistry.summary() (мс)"""
+    rows = rows[:limit]
+    if not rows:
+        return "Метрики задержек: нет наблюдений"
+
+    lines = [f"{'метрика':<44}{'n':>6}{'p50, мс':>10}{'p95, мс':>10}{'p99, мс':>10}"]
+    for row in rows:
+        labels = ','.join(f"{key}={value}" for key, value in row['labels'].items())
+        title = f"{row['name']}{{{labels}}}" if labels else row['name']
+        lines.append(
+            f"{title:<44}{row['count']:>6}"
+            + ''.join(f"{(row[p] or 0.0) * 1000:>10.2f}" for p in ('p50', 'p95', 'p99'))
+        )
+    return '\n'.join(lines)
+
+
+def parse_summary(text: str) -> List[Dict[str, object]]:
+    """Строки сводки (как MetricsRegistry.summary()) из текста render_prometheus()"""
+    rows: Dict[Tuple[str, Labels], Dict[str, object]] = {}
+    for line in text.splitlines():
+        match = SUMMARY_LINE.match(line)
+        if not match:
+            continue
+        name, is_count, raw_labels, value = match.groups()
+        labels = dict(
+            (key, re.sub(r'\\(.)', lambda m: '\n' if m.group(1) == 'n' else m.group(1), escaped))
+            for key, escaped in LABEL_PAIR.findall(raw_labels or '')
+        )
+        quantile = labels.pop('quantile', None)
+        key = (name, tuple(sorted(labels.items())))
+        row = rows.setdefault(key, {'name': name, 'labels': dict(key[1]), 'count': 0,
+                                    **{f"p{int(q * 100)}": None for q in QUANTILES}})
+        if is_count:
+            row['count'] = int(float(value))
+        elif quantile is not None and value != 'NaN':
+            row[f"p{int(float(quantile) * 100)}"] = float(value)
+    return sorted(rows.values(), key=lambda row: -(row['p95'] or 0.0))
+
+
+def scrape_summary(host: str = '127.0.0.1', port: int = 9108, timeout: float = 5.0) -> List[Dict[str, object]]:
+    """Сводка задержек работающего бота с его эндпоинта /metrics
+
+    Запрос синхронный (urllib, без aiohttp). Ошибки соединения - OSError.
+    """
+    with urllib.request.urlopen(f"http://{host}:{port}/metrics", timeout=timeout) as response:
+        return parse_summary(response.read().decode('utf-8'))
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ''
+    escaped = (
+        (key, value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for key, value in labels
+    )
+    return '{' + ','.join(f'{key}="{value}"' for key, value in escaped) + '}'
+
+
+# Общий реестр процесса
+METRICS = MetricsRegistry()
+
+
+class MetricsServer:
+    """Локальный HTTP-эндпоинт /metrics в формате Prometheus
+
+    aiohttp импортируется при запуске сервера, а не при импорте модуля.
+    """
+
+    def __init__(self, registry: MetricsRegistry = METRICS, host: str = '127.0.0.1', port: int = 9108):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self._runner: Optional[Any] = None
+
+    async def start(self):
+        from aiohttp import web
+
+        app = web.Application()
+        app.router.add_get('/metrics', self._handle_metrics)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        # Порт 0 - свободный порт, выбранный системой
+        self.port = self._runner.addresses[0][1]
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _handle_metrics(self, request: Any) -> Any:
+        from aiohttp import web
+
+        return web.Response(
+            body=self.registry.render_prometheus().encode('utf-8'),
+            headers={'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+        )
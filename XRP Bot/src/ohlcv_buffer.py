@@ -0,0 +1,212 @@
+from typing import Any, Iterable, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+
+class OHLCVBuffer:
+    """Кольцевой буфер последних capacity свечей в колонках NumPy
+
+    Память выделяется один раз: время открытия (int64, мс) и пять колонок
+    OHLCV (float64 или float32). Каждая ячейка кольца хранится дважды -
+    в позиции p и p + capacity, поэтому окно последних свечей всегда
+    непрерывно, и колонки отдаются представлениями без копирования.
+    Добавление новой свечи и обновление формирующейся - O(1).
+
+    Представления (колонки, to_frame без copy) ссылаются на память
+    буфера и действительны до следующего изменения буфера.
+    """
+
+    __slots__ = ('capacity', 'dtype', '_timestamps', '_values', '_start', '_size')
+
+    def __init__(self, capacity: int, dtype: Any = np.float64):
+        if capacity <= 0:
+            raise ValueError(f"Емкость буфера должна быть положительной: {capacity}")
+        self.capacity = capacity
+        self.dtype = np.dtype(dtype)
+        self._timestamps = np.zeros(2 * capacity, dtype=np.int64)
+        self._values = np.zeros((len(COLUMNS), 2 * capacity), dtype=self.dtype)
+        self._start = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __repr__(self) -> str:
+        return f"OHLCVBuffer(capacity={self.capacity}, size={self._size}, dtype={self.dtype.name})"
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        """Время открытия свечей (мс), по возрастанию"""
+        return self._timestamps[self._start:self._start + self._size]
+
+    @property
+    def values(self) -> np.ndarray:
+        """Массив (5, len) колонок open, high, low, close, volume"""
+        return self._values[:, self._start:self._start + self._size]
+
+    @property
+    def last_timestamp(self) -> Optional[int]:
+        return int(self._timestamps[self._start + self._size - 1]) if self._size else None
+
+    def column(self, name: str) -> np.ndarray:
+        """Колонка по имени ('open', ..., 'volume') без копирования"""
+        try:
+            row = COLUMNS.index(name)
+        except ValueError:
+            raise KeyError(f"Неизвестная колонка: {name}")
+        return self._values[row, self._start:self._start + self._size]
+
+    @property
+    def open(self) -> np.ndarray:
+        return self.column('open')
+
+    @property
+    def high(self) -> np.ndarray:
+        return self.column('high')
+
+    @property
+    def low(self) -> np.ndarray:
+        return self.column('low')
+
+    @property
+    def close(self) -> np.ndarray:
+        return self.column('close')
+
+    @property
+    def volume(self) -> np.ndarray:
+        return self.column('volume')
+
+    def clear(self):
+        self._start = 0
+        self._size = 0
+
+    def append(self, timestamp: int, open_: float, high: float, low: float,
+               close: float, volume: float):
+        """Добавление свечи новее последней или замена последней (то же время)"""
+        last = self.last_timestamp
+        if last is not None and timestamp < last:
+            raise ValueError(f"Свеча {timestamp} старше последней в буфере ({last})")
+
+        if last is not None and timestamp == last:
+            position = (self._start + self._size - 1) % self.capacity
+        else:
+            position = (self._start + self._size) % self.capacity
+            if self._size < self.capacity:
+                self._size += 1
+            else:
+                self._start = (self._start + 1) % self.capacity
+
+        self._write(position, timestamp, (open_, high, low, close, volume))
+
+    def upsert(self, candle: Sequence[float]):
+        """Добавление или замена свечи [timestamp, open, high, low, close, volume]
+
+        Свеча внутри окна со временем, которого нет в буфере (догрузка
+        пропуска), вставляется пересборкой окна - O(capacity).
+        """
+        timestamp = int(candle[0])
+        last = self.last_timestamp
+        if last is None or timestamp >= last:
+            self.append(timestamp, *candle[1:6])
+            return
+
+        timestamps = self.timestamps
+        index = int(np.searchsorted(timestamps, timestamp))
+        if timestamps[index] == timestamp:
+            self._write((self._start + index) % self.capacity, timestamp, candle[1:6])
+        elif index > 0 or self._size < self.capacity:
+            self.extend([candle])
+
+    def extend(self, ohlcv: Iterable[Sequence[float]]):
+        """Слияние пачки свечей (список ccxt [timestamp, o, h, l, c, v] или массив)
+
+        Свечи с уже известным временем заменяются, более новые добавляются;
+        в буфере остаются последние capacity свечей.
+        """
+        rows = np.asarray(ohlcv, dtype=np.float64).reshape(-1, len(COLUMNS) + 1)
+        if not len(rows):
+            return
+        timestamps = rows[:, 0].astype(np.int64)
+        values = rows[:, 1:]
+
+        current = self.timestamps
+        increasing = len(timestamps) == 1 or bool(np.all(np.diff(timestamps) > 0))
+        if increasing and (not self._size or timestamps[0] > current[-1]):
+            self._append_rows(timestamps, values)
+            return
+
+        if increasing and timestamps[0] >= current[0]:
+            # Обычный ответ REST: известные бары плюс новые в конце
+            index = np.searchsorted(current, timestamps)
+            known = index < self._size
+            known_index = index[known]
+            if np.array_equal(current[known_index], timestamps[known]):
+                positions = (self._start + known_index) % self.capacity
+                self._values[:, positions] = values[known].T
+                self._values[:, positions + self.capacity] = values[known].T
+                self._append_rows(timestamps[~known], values[~known])
+                return
+
+        # Вставка внутрь окна или неупорядоченная пачка: пересборка
+        merged_timestamps = np.concatenate([current, timestamps])
+        merged_values = np.concatenate([self.values.T.astype(np.float64), values])
+        # При совпадении времени побеждает последняя (новая) свеча
+        reverse_unique, reverse_index = np.unique(merged_timestamps[::-1], return_index=True)
+        order = len(merged_timestamps) - 1 - reverse_index
+        self.clear()
+        self._append_rows(reverse_unique, merged_values[order])
+
+    def to_frame(self, copy: bool = False, limit: Optional[int] = None) -> pd.DataFrame:
+        """DataFrame последних limit свечей в формате TimeframeAnalyzer.fetch_data
+
+        Без copy колонки DataFrame ссылаются на память буфера (один блок
+        без копирования) и меняются вместе с ним.
+        """
+        start = self._start + self._size - min(limit, self._size) if limit is not None else self._start
+        end = self._start + self._size
+        index = pd.DatetimeIndex(
+            (self._timestamps[start:end] * 1_000_000).view('datetime64[ns]'),
+            name='timestamp'
+        )
+        values = self._values[:, start:end]
+        # Транспонированный массив (n, 5) становится единственным блоком DataFrame
+        return pd.DataFrame(
+            (values.copy() if copy else values).T,
+            columns=list(COLUMNS),
+            index=index,
+            copy=False
+        )
+
+    def _write(self, position: int, timestamp: int, values: Sequence[float]):
+        """Запись свечи в ячейку кольца и ее зеркальную копию"""
+        mirror = position + self.capacity
+        self._timestamps[position] = timestamp
+        self._timestamps[mirror] = timestamp
+        self._values[:, position] = values
+        self._values[:, mirror] = values
+
+    def _append_rows(self, timestamps: np.ndarray, values: np.ndarray):
+        """Добавление пачки более новых свечей (по возрастанию времени)"""
+        count = len(timestamps)
+        if not count:
+            return
+        if count > self.capacity:
+            timestamps = timestamps[-self.capacity:]
+            values = values[-self.capacity:]
+            count = self.capacity
+
+        positions = (self._start + self._size + np.arange(count)) % self.capacity
+        self._timestamps[positions] = timestamps
+        self._timestamps[positions + self.capacity] = timestamps
+        self._values[:, positions] = values.T
+        self._values[:, positions + self.capacity] = values.T
+
+        overflow = self._size + count - self.capacity
+        if overflow > 0:
+            self._start = (self._start + overflow) % self.capacity
+            self._size = self.capacity
+        else:
+            self._size += count
@@ -0,0 +1,34 @@
+import asyncio
+from typing import Optional
+
+
+class RateLimiter:
+    """Асинхронный ограничитель запросов к бирже
+
+    Не более max_concurrent одновременных запросов и не чаще rate_limit
+    запросов в минуту (старты запросов разносятся на 60 / rate_limit секунд).
+    """
+
+    def __init__(self, rate_limit: Optional[int] = None, max_concurrent: int = 4):
+        self.interval = 60.0 / rate_limit if rate_limit else 0.0
+        self.max_concurrent = max_concurrent
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._lock = asyncio.Lock()
+        self._next_slot = 0.0
+
+    async def __aenter__(self) -> 'RateLimiter':
+        await self._semaphore.acquire()
+        try:
+            async with self._lock:
+                now = asyncio.get_running_loop().time()
+                delay = self._next_slot - now
+                self._next_slot = max(now, self._next_slot) + self.interval
+            if delay > 0:
+                await asyncio.sleep(delay)
+        except BaseException:
+            self._semaphore.release()
+            raise
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self._semaphore.release()
@@ -0,0 +1,55 @@
+from multiprocessing import shared_memory
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+# Описание блока для передачи в процесс-воркер: (имя блока, число баров)
+FrameHandle = Tuple[str, int]
+
+
+def share_frame(data: pd.DataFrame) -> Tuple[shared_memory.SharedMemory, FrameHandle]:
+    """Копирование OHLCV в блок общей памяти
+
+    Блок содержит строку времени (int64, нс) и пять строк OHLCV (float64),
+    так что воркер получает данные без сериализации DataFrame. Владелец
+    блока (вызывающий код) должен вызвать close() и unlink() после
+    завершения расчета.
+    """
+    n = len(data)
+    shm = shared_memory.SharedMemory(create=True, size=max(1, n * 8 * (len(COLUMNS) + 1)))
+    try:
+        timestamps = np.ndarray((n,), dtype=np.int64, buffer=shm.buf)
+        timestamps[:] = data.index.asi8
+        values = np.ndarray((len(COLUMNS), n), dtype=np.float64, buffer=shm.buf, offset=n * 8)
+        for row, column in enumerate(COLUMNS):
+            values[row] = data[column].to_numpy(dtype=np.float64)
+        del timestamps, values
+    except BaseException:
+        shm.close()
+        shm.unlink()
+        raise
+    return shm, (shm.name, n)
+
+
+def attach_frame(handle: FrameHandle) -> Tuple[shared_memory.SharedMemory, pd.DataFrame]:
+    """DataFrame поверх блока общей памяти (без копирования колонок)
+
+    DataFrame ссылается на память блока: перед shm.close() все ссылки на
+    него и производные от него представления должны быть удалены.
+    """
+    name, n = handle
+    shm = shared_memory.SharedMemory(name=name)
+
+    timestamps = np.ndarray((n,), dtype=np.int64, buffer=shm.buf)
+    values = np.ndarray((len(COLUMNS), n), dtype=np.float64, buffer=shm.buf, offset=n * 8)
+    # Транспонированный массив (n, 5) становится единственным блоком DataFrame без копии
+    data = pd.DataFrame(
+        values.T,
+        columns=list(COLUMNS),
+        index=pd.DatetimeIndex(timestamps.copy(), name='timestamp'),
+        copy=False
+    )
+    return shm, data
@@ -6,28 +6,109 @@ from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
 import asyncio
 import os
+import time
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 
 # Добавление путей для импорта
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from indicators.rsi import RSIIndicator
-from indicators.macd import MACDIndicator
-from indicators.ema import EMAIndicator
-from indicators.bollinger_bands import BollingerBandsIndicator
-from indicators.stochastic import StochasticIndicator
-from indicators.adx import ADXIndicator
-from indicators.ichimoku import IchimokuIndicator
-from indicators.atr import ATRIndicator
-from indicators.vwap import VWAPIndicator
-from indicators.obv import OBVIndicator
-from indicators.mfi import MFIIndicator
-from indicators.williams_r import WilliamsRIndicator
-from indicators.parabolic_sar import ParabolicSARIndicator
-from indicators.cci import CCIIndicator
-from indicators.keltner_channels import KeltnerChannelsIndicator
-from indicators.volume_profile import VolumeProfileIndicator
+from indicators.feature_store import FeatureStore
+from indicators.registry import INDICATORS, create_indicator
+from indicators.base_indicator import LONG, SHORT, NEUTRAL
 from src.timeframe_analyzer import TimeframeAnalyzer
+from src.shared_frames import FrameHandle, share_frame, attach_frame
+from src.candle_scheduler import timeframe_seconds
+from src.metrics import METRICS
+from src.signal_journal import SignalJournal
+
+# Размер пула процессов без compute.workers в конфигурации (как в поставляемом конфиге)
+DEFAULT_COMPUTE_WORKERS = 4
+
+
+def create_indicators(config: Dict[str, Any], timeframe: str) -> Dict[str, Any]:
+    """Новый набор включенных индикаторов для таймфрейма (со своим состоянием)"""
+    indicators_config = config['indicators']
+
+    indicators = {}
+    for indicator_name in INDICATORS:
+        indicator_config = indicators_config.get(indicator_name)
+        if indicator_config and indicator_config['enabled'] and timeframe in indicator_config['timeframes']:
+            indicators[indicator_name] = create_indicator(indicator_name, indicator_config, timeframe)
+    return indicators
+
+
+def evaluate_indicators(indicators: Dict[str, Any], timeframe: str, data: pd.DataFrame,
+                        features: Optional[FeatureStore] = None,
+                        logger: Optional[logging.Logger] = None,
+                        timings: Optional[Dict[str, float]] = None) -> Dict[str, str]:
+    """Сигналы набора индикаторов на последнем баре данных таймфрейма
+
+    timings - словарь, в который записывается длительность generate_signal
+    каждого индикатора, секунды.
+    """
+    logger = logger or logging.getLogger(__name__)
+    signals = {}
+
+    # Примитивы (TR, типичная цена, EMA, ...) считаются один раз на таймфрейм
+    if features is None or not features.covers(data):
+        features = FeatureStore(data)
+
+    try:
+        for indicator_name, indicator in indicators.items():
+            indicator.feature_store = features
+            start = time.perf_counter()
+            try:
+                signal = indicator.generate_signal(data)
+                signals[indicator_name] = signal
+                logger.debug(f"{timeframe} - {indicator_name}: {signal}")
+            except Exception as e:
+                logger.error(f"Ошибка в {indicator_name} для {timeframe}: {e}")
+                signals[indicator_name] = "NEUTRAL"
+            finally:
+                indicator.feature_store = None
+                if timings is not None:
+                    timings[indicator_name] = time.perf_counter() - start
+    finally:
+        # Кэш живет только в пределах цикла
+        features.clear()
+
+    return signals
+
+
+# Индикаторы процесса-воркера (создаются один раз на процесс)
+_worker_indicators: Dict[str, Dict[str, Any]] = {}
+
+
+def _init_worker(config: Dict[str, Any]):
+    """Инициализация процесса-воркера: индикаторы всех таймфреймов"""
+    _worker_indicators.clear()
+    for timeframe in config['timeframes']:
+        _worker_indicators[timeframe] = create_indicators(config, timeframe)
+
+
+def _compute_timeframe_signals(timeframe: str,
+                               handle: FrameHandle) -> Tuple[Dict[str, str], Dict[str, float]]:
+    """Сигналы индикаторов таймфрейма по OHLCV из общей памяти (в процессе-воркере)
+
+    Возвращает сигналы и длительности расчета индикаторов: метрики
+    воркера записываются в реестр родительского процесса.
+    """
+    shm, data = attach_frame(handle)
+    try:
+        timings = {}
+        signals = evaluate_indicators(_worker_indicators.get(timeframe, {}), timeframe, data, timings=timings)
+        return signals, timings
+    finally:
+        del data
+        try:
+            shm.close()
+        except BufferError:
+            # Оставшиеся ссылки на буфер освободит сборщик мусора;
+            # сам блок удаляет (unlink) родительский процесс
+            pass
+
 
 class SignalEngine:
     """Движок генерации торговых сигналов"""
@@ -37,13 +118,38 @@ class SignalEngine:
         self.config = self._load_config(config_path)
         self.timeframe_analyzer = TimeframeAnalyzer(self.config)
 
-        # Инициализация индикаторов
-        self.indicators = {}
-        self._initialize_indicators()
+        # Индикаторы таймфреймов создаются при первом расчете (см. timeframe_indicators)
+        self.indicators: Dict[str, Dict[str, Any]] = {}
 
         # Параметры стратегии
         self.signal_threshold = self.config['signal_threshold']
         self.symbol = self.config['bot']['symbol']
+        self.symbols = self.config['bot'].get('symbols') or [self.symbol]
+
+        # Режим сканирования нескольких символов
+        scan_config = self.config.get('scan', {})
+        self.max_concurrent_symbols = scan_config.get('max_concurrent_symbols', 8)
+
+        # Пул процессов для расчета индикаторов: пакетов - по одному на
+        # таймфрейм, поэтому по умолчанию не больше DEFAULT_COMPUTE_WORKERS
+        compute_config = self.config.get('compute', {})
+        self.compute_workers = compute_config.get('workers', min(DEFAULT_COMPUTE_WORKERS, os.cpu_count() or 1))
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+
+        # Повторное использование результатов таймфреймов без новых баров
+        schedule_config = self.config.get('schedule', {})
+        self.reuse_timeframes = schedule_config.get('reuse_timeframes', True)
+        # Старшие таймфреймы считаются по закрытым барам: тики формирующегося
+        # бара 1D/4H не вызывают пересчет на каждом 15-минутном цикле
+        self.closed_bar_timeframes = set(schedule_config.get('closed_bar_timeframes', []))
+        self._timeframe_cache: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self.clock = time.time
+
+        # Гистограммы задержек этапов (общий реестр процесса)
+        self.metrics = METRICS
+
+        # Журнал сигналов (JSON Lines с ротацией, запись в фоновом потоке)
+        self.journal = SignalJournal.from_config(self.config)
 
     def _load_config(self, config_path: str) -> Dict[str, Any]:
         """Загрузка конфигурации"""
@@ -55,86 +161,68 @@ class SignalEngine:
         except json.JSONDecodeError as e:
             raise ValueError(f"Ошибка парсинга JSON: {e}")
 
-    def _initialize_indicators(self):
-        """Инициализация всех индикаторов"""
-        indicators_config = self.config['indicators']
-        timeframes = self.config['timeframes']
-
-        indicator_classes = {
-            'rsi': RSIIndicator,
-            'macd': MACDIndicator,
-            'ema_20': lambda config, tf: EMAIndicator(config, tf, 20),
-            'ema_50': lambda config, tf: EMAIndicator(config, tf, 50),
-            'ema_200': lambda config, tf: EMAIndicator(config, tf, 200),
-            'bollinger_bands': BollingerBandsIndicator,
-            'stochastic': StochasticIndicator,
-            'adx': ADXIndicator,
-            'ichimoku': IchimokuIndicator,
-            'atr': ATRIndicator,
-            'vwap': VWAPIndicator,
-            'obv': OBVIndicator,
-            'mfi': MFIIndicator,
-            'williams_r': WilliamsRIndicator,
-            'parabolic_sar': ParabolicSARIndicator,
-            'cci': CCIIndicator,
-            'keltner_channels': KeltnerChannelsIndicator,
-            'volume_profile': VolumeProfileIndicator
-        }
+    def timeframe_indicators(self, timeframe: str) -> Dict[str, Any]:
+        """Индикаторы таймфрейма движка (создаются при первом обращении)"""
+        indicators = self.indicators.get(timeframe)
+        if indicators is None:
+            if timeframe not in self.config['timeframes']:
+                return {}
+            indicators = self.indicators[timeframe] = self.create_indicators(timeframe)
+        return indicators
+
+    def create_indicators(self, timeframe: str) -> Dict[str, Any]:
+        """Новый набор включенных индикаторов для таймфрейма (со своим состоянием)"""
+        return create_indicators(self.config, timeframe)
+
+    async def analyze_all_timeframes(self, symbol: Optional[str] = None,
+                                     frames: Optional[Dict[str, pd.DataFrame]] = None) -> Dict[str, Any]:
+        """Анализ всех таймфреймов и генерация сигналов
+
+        frames - уже загруженные свечи по таймфреймам (режим потока
+        WebSocket); без них данные запрашиваются у биржи.
+        """
+        symbol = symbol or self.symbol
+        self.logger.info(f"Начало иерархического анализа таймфреймов {symbol}")
 
-        for timeframe in timeframes:
-            self.indicators[timeframe] = {}
-            for indicator_name, indicator_class in indicator_classes.items():
-                if indicator_name in indicators_config and indicators_config[indicator_name]['enabled']:
-                    if timeframe in indicators_config[indicator_name]['timeframes']:
-                        self.indicators[timeframe][indicator_name] = indicator_class(
-                            indicators_config[indicator_name],
-                            timeframe
-                        )
+        # Получение данных для всех таймфреймов
+        if frames is not None:
+            timeframe_data = self.timeframe_analyzer.analyze_frames(frames)
+        else:
+            timeframe_data = await self.timeframe_analyzer.analyze_timeframes(symbol)
 
-    async def analyze_all_timeframes(self) -> Dict[str, Any]:
-        """Анализ всех таймфреймов и генерация сигналов"""
-        self.logger.info("Начало иерархического анализа таймфреймов")
+        # Сигналы индикаторов для каждого таймфрейма (в пуле процессов, параллельно)
+        results = await self._timeframe_results(symbol, timeframe_data)
 
-        # Получение данных для всех таймфреймов
-        timeframe_data = await self.timeframe_analyzer.analyze_timeframes(self.symbol)
+        return self._build_analysis(symbol, timeframe_data, results)
 
-        # Анализ индикаторов для каждого таймфрейма
+    def _build_analysis(self, symbol: str, timeframe_data: Dict[str, Any],
+                        results: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """Сборка результата анализа по данным таймфреймов и их сигналам
+        (см. _timeframe_results)"""
         timeframe_signals = {}
 
         for timeframe, tf_data in timeframe_data.items():
-            if tf_data is None:
+            if tf_data is None or timeframe not in results:
                 continue
 
-            self.logger.info(f"Анализ индикаторов для таймфрейма {timeframe}")
-            # Получение сигналов от индикаторов
-            indicator_signals = await self._get_indicator_signals(
-                timeframe,
-                tf_data['data']
-            )
-
-            # Взвешенный анализ сигналов
-            weighted_signal = self._calculate_weighted_signal(
-                indicator_signals,
-                timeframe
-            )
-
             timeframe_signals[timeframe] = {
                 'weight': tf_data['weight'],
                 'trend': tf_data['trend'],
                 'structure': tf_data['structure'],
                 'levels': tf_data['levels'],
                 'volume': tf_data['volume'],
-                'indicator_signals': indicator_signals,
-                'weighted_signal': weighted_signal,
+                'indicator_signals': results[timeframe]['indicator_signals'],
+                'weighted_signal': results[timeframe]['weighted_signal'],
                 'current_price': float(tf_data['data']['close'].iloc[-1])
             }
 
         # Объединение сигналов с учетом иерархии
-        final_signal = self._generate_final_signal(timeframe_signals)
+        with self.metrics.span('consensus', stage='final'):
+            final_signal = self._generate_final_signal(timeframe_signals)
 
         return {
             'timestamp': datetime.now().isoformat(),
-            'symbol': self.symbol,
+            'symbol': symbol,
             'current_price': timeframe_signals.get('15m', {}).get('current_price') or
                            timeframe_signals.get('1H', {}).get('current_price') or
                            timeframe_signals.get('4H', {}).get('current_price') or
@@ -143,24 +231,228 @@ class SignalEngine:
             'final_signal': final_signal
         }
 
-    async def _get_indicator_signals(self, timeframe: str, data: pd.DataFrame) -> Dict[str, str]:
-        """Получение сигналов от всех индикаторов для таймфрейма"""
-        signals = {}
+    def _bar_signature(self, timeframe: str, data: pd.DataFrame) -> Tuple[int, bool, float, float]:
+        """Последний бар таймфрейма: (время открытия, мс; закрыт ли он; close; volume)
+
+        Сигнатура меняется при появлении нового бара, при закрытии
+        последнего и при любом обновлении цены или объема формирующегося бара.
+        Для closed_bar_timeframes в data только закрытые бары (см.
+        _closed_bars), поэтому их сигнатура меняется лишь с закрытием бара.
+        """
+        timestamp = int(data.index[-1].value // 1_000_000)
+        closed = timestamp + timeframe_seconds(timeframe) * 1000 <= self.clock() * 1000
+        last = data.iloc[-1]
+        return timestamp, closed, float(last['close']), float(last['volume'])
+
+    def _closed_bars(self, timeframe: str, data: pd.DataFrame) -> pd.DataFrame:
+        """Свечи без последнего бара, если он еще формируется"""
+        timestamp = int(data.index[-1].value // 1_000_000)
+        if timestamp + timeframe_seconds(timeframe) * 1000 <= self.clock() * 1000:
+            return data
+        return data.iloc[:-1]
+
+    async def _timeframe_results(self, symbol: str,
+                                 timeframe_data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """Сигналы индикаторов и взвешенный сигнал по доступным таймфреймам
+
+        Пересчитываются только таймфреймы, у которых с прошлого анализа
+        символа изменился последний бар: новый бар, закрытие или новая
+        цена/объем формирующегося (см. _bar_signature); для остальных
+        берется сохраненный результат. Таймфреймы schedule.closed_bar_timeframes
+        считаются без формирующегося бара: при цикле в 15 минут 1D и 4H
+        пересчитываются раз в сутки и раз в четыре часа.
+        schedule.reuse_timeframes = false отключает кэш.
+        """
+        results = {}
+        stale = {}
 
-        if timeframe not in self.indicators:
-            return signals
+        for timeframe, tf_data in timeframe_data.items():
+            if tf_data is None:
+                continue
+            data = tf_data['data']
+            if timeframe in self.closed_bar_timeframes and len(data) > 1:
+                data = self._closed_bars(timeframe, data)
+            signature = self._bar_signature(timeframe, data)
+            cached = self._timeframe_cache.get((symbol, timeframe))
+            if self.reuse_timeframes and cached is not None and cached['signature'] == signature:
+                results[timeframe] = cached
+            else:
+                stale[timeframe] = dict(tf_data, data=data, signature=signature)
 
-        for indicator_name, indicator in self.indicators[timeframe].items():
-            try:
-                signal = indicator.generate_signal(data)
-                signals[indicator_name] = signal
-                self.logger.debug(f"{timeframe} - {indicator_name}: {signal}")
-            except Exception as e:
-                self.logger.error(f"Ошибка в {indicator_name} для {timeframe}: {e}")
-                signals[indicator_name] = "NEUTRAL"
+        if results:
+            self.logger.debug(f"{symbol}: без пересчета {', '.join(results)}")
+
+        indicator_signals = await self._compute_indicator_signals(stale) if stale else {}
+        for timeframe, signals in indicator_signals.items():
+            # Взвешенный анализ сигналов
+            with self.metrics.span('consensus', stage='weighted', timeframe=timeframe):
+                weighted_signal = self._calculate_weighted_signal(signals, timeframe)
+            result = {
+                'signature': stale[timeframe]['signature'],
+                'indicator_signals': signals,
+                'weighted_signal': weighted_signal
+            }
+            if self.reuse_timeframes:
+                self._timeframe_cache[(symbol, timeframe)] = result
+            results[timeframe] = result
+
+        return results
+
+    def _get_process_pool(self) -> Optional[ProcessPoolExecutor]:
+        """Пул процессов для расчета индикаторов (None - расчет в текущем процессе)"""
+        if self.compute_workers <= 0:
+            return None
+        if self._process_pool is None:
+            self._process_pool = ProcessPoolExecutor(
+                max_workers=self.compute_workers,
+                initializer=_init_worker,
+                initargs=(self.config,)
+            )
+        return self._process_pool
+
+    async def _compute_indicator_signals(self, timeframe_data: Dict[str, Any]) -> Dict[str, Dict[str, str]]:
+        """Сигналы индикаторов по всем доступным таймфреймам
+
+        Пакет индикаторов каждого таймфрейма считается в отдельной задаче пула
+        процессов, таймфреймы - параллельно; OHLCV передается через общую
+        память, а не сериализацией DataFrame. Без пула (compute.workers = 0)
+        расчет идет в текущем процессе.
+        """
+        frames = {tf: tf_data for tf, tf_data in timeframe_data.items() if tf_data is not None}
+        pool = self._get_process_pool()
+
+        if pool is None:
+            indicator_signals = {}
+            for timeframe, tf_data in frames.items():
+                self.logger.info(f"Анализ индикаторов для таймфрейма {timeframe}")
+                indicator_signals[timeframe] = await self._get_indicator_signals(
+                    timeframe,
+                    tf_data['data'],
+                    tf_data.get('features')
+                )
+            return indicator_signals
+
+        loop = asyncio.get_running_loop()
+        blocks = {}
+        try:
+            for timeframe, tf_data in frames.items():
+                blocks[timeframe] = share_frame(tf_data['data'])
+
+            results = await asyncio.gather(
+                *(loop.run_in_executor(pool, _compute_timeframe_signals, timeframe, handle)
+                  for timeframe, (_, handle) in blocks.items()),
+                return_exceptions=True
+            )
+        finally:
+            for shm, _ in blocks.values():
+                shm.close()
+                shm.unlink()
+
+        indicator_signals = {}
+        for timeframe, result in zip(blocks, results):
+            if isinstance(result, BaseException):
+                self.logger.error(f"Ошибка расчета индикаторов для {timeframe}: {result!r}")
+                if isinstance(result, BrokenProcessPool):
+                    # Пул с упавшим воркером непригоден - пересоздаем при следующем вызове
+                    self.close()
+                continue
+            indicator_signals[timeframe], timings = result
+            self._observe_indicator_timings(timeframe, timings)
+
+        return indicator_signals
+
+    async def analyze_symbols(self, symbols: Optional[List[str]] = None,
+                              frames: Optional[Dict[str, Dict[str, pd.DataFrame]]] = None) -> List[Dict[str, Any]]:
+        """Анализ нескольких символов за один цикл
+
+        Загрузка данных идет не более чем по max_concurrent_symbols символам
+        одновременно (запросы к бирже дополнительно ограничены RateLimiter),
+        а расчет индикаторов выполняется в пуле процессов
+        (см. _compute_indicator_signals). Возвращает результаты
+        в порядке ранжирования (см. rank_results); символ, который не удалось
+        проанализировать, представлен словарем с ключом 'error'.
+        frames - уже загруженные свечи по символам и таймфреймам (режим
+        потока WebSocket).
+        """
+        symbols = symbols or self.symbols
+        semaphore = asyncio.Semaphore(self.max_concurrent_symbols)
+
+        async def analyze(symbol: str) -> Dict[str, Any]:
+            if frames is not None:
+                timeframe_data = self.timeframe_analyzer.analyze_frames(frames.get(symbol, {}))
+            else:
+                async with semaphore:
+                    timeframe_data = await self.timeframe_analyzer.analyze_timeframes(symbol)
 
+            if all(tf_data is None for tf_data in timeframe_data.values()):
+                raise ValueError(f"Нет данных ни по одному таймфрейму для {symbol}")
+
+            results = await self._timeframe_results(symbol, timeframe_data)
+            return self._build_analysis(symbol, timeframe_data, results)
+
+        results = await asyncio.gather(*(analyze(symbol) for symbol in symbols), return_exceptions=True)
+
+        analyses = []
+        for symbol, result in zip(symbols, results):
+            if isinstance(result, BaseException):
+                self.logger.error(f"Ошибка анализа {symbol}: {result!r}")
+                analyses.append({'symbol': symbol, 'error': str(result) or repr(result)})
+            else:
+                analyses.append(result)
+
+        return self.rank_results(analyses)
+
+    @staticmethod
+    def rank_results(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Ранжирование результатов: сначала сигналы LONG/SHORT по убыванию
+        уверенности, затем нейтральные по силе перевеса, в конце ошибки"""
+        def key(result):
+            if 'error' in result:
+                return (2, 0.0, 0.0)
+            final_signal = result['final_signal']
+            strength = max(final_signal['long_percentage'], final_signal['short_percentage'])
+            if final_signal['direction'] == "NEUTRAL":
+                return (1, -strength, -final_signal['total_signals'])
+            return (0, -final_signal['confidence'], -final_signal['total_signals'])
+
+        return sorted(results, key=key)
+
+    def close(self):
+        """Остановка пула процессов расчета индикаторов и запись журнала сигналов"""
+        if self._process_pool is not None:
+            self._process_pool.shutdown(cancel_futures=True)
+            self._process_pool = None
+        if self.journal is not None:
+            self.journal.close()
+
+    def record_signals(self, results: List[Dict[str, Any]]):
+        """Запись результатов анализа в журнал сигналов (без блокировки event loop)
+
+        Результаты с ошибкой анализа символа не записываются.
+        """
+        if self.journal is None:
+            return
+        for result in results:
+            if 'error' not in result:
+                self.journal.write(result)
+
+    async def _get_indicator_signals(self, timeframe: str, data: pd.DataFrame,
+                                     features: Optional[FeatureStore] = None) -> Dict[str, str]:
+        """Получение сигналов от всех индикаторов для таймфрейма"""
+        indicators = self.timeframe_indicators(timeframe)
+        if not indicators:
+            return {}
+
+        timings = {}
+        signals = evaluate_indicators(indicators, timeframe, data, features, self.logger, timings)
+        self._observe_indicator_timings(timeframe, timings)
         return signals
 
+    def _observe_indicator_timings(self, timeframe: str, timings: Dict[str, float]):
+        """Запись длительностей generate_signal индикаторов в метрики"""
+        for indicator_name, seconds in timings.items():
+            self.metrics.observe('indicator', seconds, indicator=indicator_name, timeframe=timeframe)
+
     def _calculate_weighted_signal(self, indicator_signals: Dict[str, str], timeframe: str) -> Dict[str, Any]:
         """Расчет взвешенного сигнала для таймфрейма"""
         long_count = sum(1 for signal in indicator_signals.values() if signal == "LONG")
@@ -239,6 +531,98 @@ class SignalEngine:
             'short_percentage': (weighted_short_score / total_signals) * 100 if total_signals > 0 else 0
         }
 
+    def get_indicator_signal_arrays(self, timeframe: str, data: pd.DataFrame,
+                                    indicators: Optional[Dict[str, Any]] = None) -> Dict[str, np.ndarray]:
+        """Сигналы всех индикаторов таймфрейма на каждом баре истории (массивы int8)"""
+        if indicators is None:
+            indicators = self.timeframe_indicators(timeframe)
+
+        features = FeatureStore(data)
+        signals = {}
+        for indicator_name, indicator in indicators.items():
+            indicator.feature_store = features
+            try:
+                signals[indicator_name] = indicator.generate_signals(data)
+            except Exception as e:
+                self.logger.error(f"Ошибка в {indicator_name} для {timeframe}: {e}")
+                signals[indicator_name] = np.zeros(len(data), dtype=np.int8)
+            finally:
+                indicator.feature_store = None
+
+        return signals
+
+    def calculate_weighted_signal_arrays(self, signal_arrays: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """Векторный аналог _calculate_weighted_signal: консенсус индикаторов на каждом баре"""
+        matrix = np.vstack(list(signal_arrays.values()))
+        total_indicators = matrix.shape[0]
+        long_count = (matrix == LONG).sum(axis=0)
+        short_count = (matrix == SHORT).sum(axis=0)
+        long_percentage = (long_count / total_indicators) * 100
+        short_percentage = (short_count / total_indicators) * 100
+
+        # Определение преобладающего направления
+        is_long = long_percentage > 60
+        is_short = ~is_long & (short_percentage > 60)
+        direction = np.select([is_long, is_short], [LONG, SHORT], NEUTRAL).astype(np.int8)
+        confidence = np.select([is_long, is_short], [long_percentage, short_percentage],
+                               np.maximum(long_percentage, short_percentage))
+
+        return {
+            'direction': direction,
+            'confidence': confidence,
+            'long_count': long_count,
+            'short_count': short_count,
+            'total_indicators': total_indicators
+        }
+
+    def generate_final_signal_arrays(self, timeframe_signals: Dict[str, Any]) -> Dict[str, np.ndarray]:
+        """Векторный аналог _generate_final_signal
+
+        Массивы weighted_signal всех таймфреймов должны быть выровнены по одним
+        и тем же барам; бары, на которых таймфрейм еще недоступен, задаются
+        нулевыми счетчиками.
+        """
+        weighted_long_score = 0.0
+        weighted_short_score = 0.0
+
+        for timeframe, signals in timeframe_signals.items():
+            if signals is None:
+                continue
+
+            weight = signals['weight']
+            weighted_signal = signals['weighted_signal']
+            direction = weighted_signal['direction']
+
+            weighted_long_score = weighted_long_score + np.where(
+                direction == LONG, weight * weighted_signal['long_count'], 0.0)
+            weighted_short_score = weighted_short_score + np.where(
+                direction == SHORT, weight * weighted_signal['short_count'], 0.0)
+
+        weighted_long_score = np.asarray(weighted_long_score, dtype=float)
+        weighted_short_score = np.asarray(weighted_short_score, dtype=float)
+
+        # Подсчет взвешенного количества сигналов
+        total_signals = weighted_long_score + weighted_short_score
+        threshold = self.signal_threshold
+        active = total_signals >= threshold
+
+        is_long = active & (weighted_long_score > weighted_short_score * 1.2)
+        is_short = active & ~is_long & (weighted_short_score > weighted_long_score * 1.2)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            long_percentage = np.where(total_signals > 0, weighted_long_score / total_signals * 100, 0.0)
+            short_percentage = np.where(total_signals > 0, weighted_short_score / total_signals * 100, 0.0)
+
+        return {
+            'direction': np.select([is_long, is_short], [LONG, SHORT], NEUTRAL).astype(np.int8),
+            'confidence': np.select([is_long, is_short], [long_percentage, short_percentage], 0.0),
+            'total_long_signals': weighted_long_score,
+            'total_short_signals': weighted_short_score,
+            'total_signals': total_signals,
+            'threshold': threshold,
+            'long_percentage': long_percentage,
+            'short_percentage': short_percentage
+        }
+
     def create_signal_report(self, analysis_result: Dict[str, Any]) -> str:
         """Создание подробного отчета о сигнале в стиле пользователя"""
         report = []
@@ -304,6 +688,60 @@ class SignalEngine:
 
         return "\n".join(report)
 
+    def create_scan_report(self, results: List[Dict[str, Any]]) -> str:
+        """Сводный отчет сканирования: один ранжированный список по всем символам"""
+        report = []
+        report.append("=" * 60)
+        report.append(f"     СКАНИРОВАНИЕ РЫНКА ({len(results)} символов)")
+        report.append("")
+
+        ordered_timeframes = ['1D', '4H', '1H', '15m']
+        failed = []
+        rank = 0
+
+        for result in results:
+            if 'error' in result:
+                failed.append(result)
+                continue
+
+            rank += 1
+            final_signal = result['final_signal']
+            if final_signal['direction'] == "LONG":
+                icon = "🟢"
+            elif final_signal['direction'] == "SHORT":
+                icon = "🔴"
+            else:
+                icon = "⚪️"
+
+            current_price = result.get('current_price') or 0
+            report.append(
+                f"{rank:>3}. {icon} {result['symbol']:<12} ${current_price:,.4f}  "
+                f"{final_signal['direction']:<7} {final_signal['confidence']:5.1f}%  "
+                f"(L {final_signal['total_long_signals']:.1f} / S {final_signal['total_short_signals']:.1f})"
+            )
+
+            timeframes = []
+            for timeframe in ordered_timeframes:
+                tf_data = result['timeframe_signals'].get(timeframe)
+                if not tf_data:
+                    continue
+                weighted_signal = tf_data['weighted_signal']
+                timeframes.append(
+                    f"{timeframe} {weighted_signal['long_count']}/{weighted_signal['short_count']}"
+                )
+            report.append(f"       {', '.join(timeframes)}")
+
+        if failed:
+            report.append("")
+            report.append("  Ошибки анализа:")
+            for result in failed:
+                report.append(f"  ❌ {result['symbol']}: {result['error']}")
+
+        report.append("")
+        report.append("=" * 60)
+
+        return "\n".join(report)
+
     async def run_continuous_analysis(self, interval_minutes: int = 15):
         """Запуск непрерывного анализа"""
         self.logger.info("Запуск непрерывного анализа сигналов")
@@ -317,13 +755,8 @@ class SignalEngine:
                 report = self.create_signal_report(result)
                 self.logger.info(report)
 
-                # Сохранение в файл
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                filename = f"logs/signal_report_{timestamp}.json"
-
-                os.makedirs(os.path.dirname(filename), exist_ok=True)
-                with open(filename, 'w') as f:
-                    json.dump(result, f, indent=2, default=str)
+                # Запись в журнал сигналов
+                self.record_signals([result])
 
                 # Ожидание следующего цикла
                 await asyncio.sleep(interval_minutes * 60)
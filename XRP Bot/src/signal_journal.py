@@ -0,0 +1,302 @@
+import gzip
+import json
+import logging
+import os
+import queue
+import re
+import shutil
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+# Сегменты журнала: signals-<первая запись, мс>.jsonl - текущий (дописывается),
+# signals-<первая>-<последняя>.jsonl[.gz] - закрытые ротацией
+SEGMENT_PATTERN = re.compile(r'^signals-(\d+)(?:-(\d+))?\.jsonl(\.gz)?$')
+# Каждая строка начинается с времени записи: {"ts":<мс>,...
+RECORD_PREFIX = b'{"ts":'
+
+# Ожидание писателя в flush() и close() по умолчанию, секунды
+WAIT_TIMEOUT = 10.0
+
+_FLUSH = object()
+_STOP = object()
+
+
+def _json_default(value: Any) -> Any:
+    """Значения вне JSON: скаляры и массивы numpy - числами и списками, прочее - строкой"""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    return str(value)
+
+
+def _segment_name(first: int, last: Optional[int] = None) -> str:
+    return f"signals-{first}.jsonl" if last is None else f"signals-{first}-{last}.jsonl"
+
+
+def list_segments(directory: str) -> List[Tuple[int, Optional[int], str]]:
+    """Сегменты журнала по возрастанию времени: (первая запись, последняя
+    запись или None для текущего сегмента, путь)"""
+    if not os.path.isdir(directory):
+        return []
+
+    segments = []
+    for name in os.listdir(directory):
+        match = SEGMENT_PATTERN.match(name)
+        if match:
+            last = int(match.group(2)) if match.group(2) else None
+            segments.append((int(match.group(1)), last, os.path.join(directory, name)))
+    # Текущий сегмент - после закрытых с тем же временем начала
+    return sorted(segments, key=lambda segment: (segment[0], segment[1] is None, segment[1] or 0))
+
+
+def read_records(directory: str, start: Optional[int] = None, end: Optional[int] = None,
+                 symbol: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Записи журнала со временем в [start, end) (мс эпохи), по порядку записи
+
+    Сегменты вне диапазона отбрасываются по именам файлов без чтения;
+    внутри сегмента время берется из префикса строки, и JSON разбирается
+    только у записей из диапазона. Записи идут по неубыванию времени,
+    поэтому чтение сегмента останавливается на первой записи после end.
+    """
+    for first, last, path in list_segments(directory):
+        if end is not None and first >= end:
+            break
+        if start is not None and last is not None and last < start:
+            continue
+
+        opener = gzip.open if path.endswith('.gz') else open
+        try:
+            with opener(path, 'rb') as f:
+                for line in f:
+                    if not line.startswith(RECORD_PREFIX):
+                        continue
+                    try:
+                        timestamp = int(line[len(RECORD_PREFIX):line.index(b',', len(RECORD_PREFIX))])
+                    except ValueError:
+                        continue
+                    if start is not None and timestamp < start:
+                        continue
+                    if end is not None and timestamp >= end:
+                        break
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # Недописанная строка (аварийная остановка процесса)
+                        continue
+                    if symbol is None or record.get('symbol') == symbol:
+                        yield record
+        except FileNotFoundError:
+            # Сегмент ротирован или сжат писателем во время чтения
+            continue
+
+
+class SignalJournal:
+    """Журнал сигналов: один поток JSON Lines вместо файла на каждый цикл
+
+    write() не блокирует event loop - запись ставится в очередь, а фоновый
+    поток пишет накопившиеся за время предыдущей записи строки одной
+    пачкой (до batch_size) компактным JSON, по строке на запись.
+    Текущий сегмент закрывается, когда превышает max_bytes или старше
+    max_age секунд; закрытый сегмент переименовывается с указанием
+    времени последней записи и при compress сжимается gzip. По времени
+    в именах сегментов read() выбирает файлы, не открывая лишних.
+
+    Незакрытый сегмент продолжается после перезапуска, поэтому в каталог
+    пишет один процесс: разовые запуски и проверка здоровья (main.py)
+    журнал не ведут, а параллельным ботам нужны разные journal.directory.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 64 * 1024 * 1024,
+                 max_age: float = 86_400, compress: bool = True,
+                 batch_size: int = 256, flush_interval: float = 1.0,
+                 clock: Callable[[], float] = time.time):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.compress = compress
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.clock = clock
+        self.logger = logging.getLogger(__name__)
+
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._closed = False
+        self._last_timestamp = 0
+
+        # Текущий сегмент (только в потоке писателя)
+        self._file = None
+        self._first: Optional[int] = None
+        self._last: Optional[int] = None
+        self._size = 0
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Optional['SignalJournal']:
+        """Журнал по секции journal конфигурации (None, если выключен)"""
+        journal_config = config.get('journal', {})
+        if not journal_config.get('enabled', False):
+            return None
+        return cls(
+            journal_config.get('directory', 'logs/signals'),
+            max_bytes=int(journal_config.get('max_mb', 64) * 1024 * 1024),
+            max_age=journal_config.get('max_age_hours', 24) * 3600,
+            compress=journal_config.get('compress', True),
+            batch_size=journal_config.get('batch_size', 256),
+            flush_interval=journal_config.get('flush_seconds', 1.0)
+        )
+
+    def write(self, record: Dict[str, Any]):
+        """Постановка записи в очередь на запись (время записи - поле ts, мс)"""
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Журнал сигналов закрыт")
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='signal-journal', daemon=True)
+                self._thread.start()
+            # Время не убывает даже при переводе системных часов назад
+            timestamp = max(int(self.clock() * 1000), self._last_timestamp)
+            self._last_timestamp = timestamp
+            self._queue.put((timestamp, record))
+
+    def flush(self, timeout: Optional[float] = WAIT_TIMEOUT) -> bool:
+        """Ожидание записи на диск всего, что поставлено в очередь
+
+        False - писатель не успел за timeout секунд или остановлен.
+        """
+        with self._lock:
+            if self._thread is None or self._closed:
+                return True
+            if not self._thread.is_alive():
+                return False
+            done = threading.Event()
+            self._queue.put((_FLUSH, done))
+        return done.wait(timeout)
+
+    def close(self, timeout: Optional[float] = WAIT_TIMEOUT) -> bool:
+        """Запись оставшихся записей и остановка фонового потока
+
+        False - писатель не завершился за timeout секунд (поток-демон
+        не задерживает выход процесса).
+        """
+        with self._lock:
+            if self._closed:
+                return True
+            self._closed = True
+            thread = self._thread
+            if thread is not None:
+                self._queue.put((_STOP, None))
+        if thread is None:
+            return True
+        thread.join(timeout)
+        if thread.is_alive():
+            self.logger.error(f"Журнал сигналов: запись не завершена за {timeout} с")
+            return False
+        return True
+
+    def read(self, start: Optional[int] = None, end: Optional[int] = None,
+             symbol: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Записи со временем в [start, end), мс эпохи (см. read_records)"""
+        return read_records(self.directory, start, end, symbol)
+
+    def _run(self):
+        """Цикл фонового писателя"""
+        stopping = False
+        while not stopping:
+            try:
+                items = [self._queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                continue
+            while len(items) < self.batch_size:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            waiters = []
+            for timestamp, payload in items:
+                if timestamp is _STOP:
+                    stopping = True
+                elif timestamp is _FLUSH:
+                    waiters.append(payload)
+                else:
+                    # Ошибка записи (диск заполнен, сбой ротации, несериализуемое
+                    # значение) теряет одну запись, а не останавливает писателя
+                    try:
+                        self._append(timestamp, payload)
+                    except Exception as e:
+                        self.logger.error(f"Журнал сигналов: запись {timestamp} пропущена: {e!r}")
+            try:
+                if self._file is not None:
+                    self._file.flush()
+            except OSError as e:
+                self.logger.error(f"Журнал сигналов: ошибка сброса на диск: {e!r}")
+            for done in waiters:
+                done.set()
+
+        if self._file is not None:
+            try:
+                self._file.close()
+            except OSError as e:
+                self.logger.error(f"Журнал сигналов: ошибка закрытия сегмента: {e!r}")
+            self._file = None
+
+    def _append(self, timestamp: int, record: Dict[str, Any]):
+        """Запись строки в текущий сегмент с ротацией по размеру и возрасту"""
+        line = json.dumps(
+            {'ts': timestamp, **{key: value for key, value in record.items() if key != 'ts'}},
+            separators=(',', ':'), ensure_ascii=False, default=_json_default
+        ).encode('utf-8') + b'\n'
+
+        if self._file is None:
+            self._open_segment(timestamp)
+        elif timestamp > self._last and (
+                self._size >= self.max_bytes or timestamp - self._first >= self.max_age * 1000):
+            # Ротация только на новой миллисекунде: интервалы сегментов не пересекаются
+            self._rotate()
+            self._open_segment(timestamp)
+
+        self._file.write(line)
+        self._size += len(line)
+        self._last = timestamp
+
+    def _open_segment(self, timestamp: int):
+        """Открытие текущего сегмента: продолжение незакрытого или новый"""
+        os.makedirs(self.directory, exist_ok=True)
+        current = [
+            (first, path) for first, last, path in list_segments(self.directory)
+            if last is None and not path.endswith('.gz')
+        ]
+        if current:
+            self._first, path = current[-1]
+            self._last = self._first
+        else:
+            self._first = self._last = timestamp
+            path = os.path.join(self.directory, _segment_name(timestamp))
+        self._file = open(path, 'ab')
+        self._size = self._file.tell()
+
+    def _rotate(self):
+        """Закрытие текущего сегмента: имя с временем последней записи и сжатие"""
+        self._file.close()
+        self._file = None
+        path = os.path.join(self.directory, _segment_name(self._first))
+        closed = os.path.join(self.directory, _segment_name(self._first, self._last))
+        os.replace(path, closed)
+
+        if self.compress:
+            try:
+                with open(closed, 'rb') as source, gzip.open(closed + '.gz.tmp', 'wb') as target:
+                    shutil.copyfileobj(source, target)
+                # Сжатый сегмент появляется под своим именем только целиком
+                os.replace(closed + '.gz.tmp', closed + '.gz')
+                os.remove(closed)
+            except OSError as e:
+                # Сегмент уже закрыт и читается несжатым
+                self.logger.error(f"Журнал сигналов: не удалось сжать {closed}: {e!r}")
+                if os.path.exists(closed + '.gz.tmp'):
+                    os.remove(closed + '.gz.tmp')
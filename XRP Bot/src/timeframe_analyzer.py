@@ -1,101 +1,349 @@
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Any, Optional
+from numpy.lib.stride_tricks import sliding_window_view
+from typing import Dict, List, Any, Optional, Tuple
 import logging
+import time
 from datetime import datetime, timedelta
-import ccxt
 import asyncio
 from concurrent.futures import ThreadPoolExecutor
 
+from indicators.feature_store import FeatureStore
+from src.rate_limiter import RateLimiter
+from src.candle_store import CandleStore
+from src.ohlcv_buffer import OHLCVBuffer
+from src.candle_aggregator import CandleAggregator
+from src.candle_scheduler import timeframe_seconds
+from src.metrics import METRICS
+
 class TimeframeAnalyzer:
     """Анализатор для иерархического анализа таймфреймов"""
 
-    def __init__(self, config: Dict[str, Any]):
+    # Сопоставление таймфреймов с корректными значениями для Binance API
+    TIMEFRAME_MAPPING = {
+        '1D': '1d',
+        '4H': '4h',
+        '1H': '1h',
+        '15m': '15m'
+    }
+
+    def __init__(self, config: Dict[str, Any], exchange: Optional[Any] = None):
         self.config = config
         self.logger = logging.getLogger(__name__)
-        self.exchange = ccxt.binance({
-            'enableRateLimit': True,
-            'sandbox': config['api']['testnet']
-        })
-
-        # Сопоставление таймфреймов с корректными значениями для Binance API
-        self.timeframe_mapping = {
-            '1D': '1d',
-            '4H': '4h',
-            '1H': '1h',
-            '15m': '15m'
-        }
+        # Клиент ccxt создается при первом запросе (импорт ccxt занимает ~0.6 с)
+        self._exchange = exchange
+
+        # Отдельный ограниченный пул для синхронного клиента ccxt
+        api_config = config['api']
+        self.max_concurrent_requests = api_config.get('max_concurrent_requests', 4)
+        self.fetch_timeout = api_config.get('fetch_timeout', 15)
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrent_requests,
+            thread_name_prefix='ohlcv-fetch'
+        )
+        self._rate_limiter: Optional[RateLimiter] = None
+        self._rate_limiter_loop = None
+
+        # Локальный кэш свечей: после первой загрузки запрашиваются только новые бары
+        data_config = config.get('data', {})
+        self.candle_store: Optional[CandleStore] = None
+        if data_config.get('cache_enabled', False):
+            self.candle_store = CandleStore(data_config.get('cache_path', 'data/candles.sqlite'))
+        self.cache_max_bars = data_config.get('cache_max_bars', 1000)
+
+        # Кольцевые буферы свечей по (символ, таймфрейм): память под ряды
+        # выделяется один раз, а не новым DataFrame на каждый цикл
+        self.buffer_dtype = np.dtype(data_config.get('buffer_dtype', 'float64'))
+        self._buffers: Dict[Tuple[str, str], OHLCVBuffer] = {}
+
+        # Старшие таймфреймы из свечей базового: один запрос к бирже за цикл
+        # вместо запроса на каждый таймфрейм (см. _fetch_derived)
+        self.derive_timeframes = data_config.get('derive_timeframes', False)
+        self.base_timeframe = data_config.get('base_timeframe', '15m')
+        self._aggregators: Dict[Tuple[str, str], CandleAggregator] = {}
+
+        # Гистограммы задержек загрузки и шагов анализа
+        self.metrics = METRICS
+
+        self.timeframe_mapping = dict(self.TIMEFRAME_MAPPING)
+
+    @property
+    def exchange(self) -> Any:
+        """Клиент биржи (ccxt.binance, если не передан явно)"""
+        if self._exchange is None:
+            import ccxt
+            self._exchange = ccxt.binance({
+                'enableRateLimit': True,
+                'sandbox': self.config['api']['testnet']
+            })
+        return self._exchange
+
+    @exchange.setter
+    def exchange(self, exchange: Any):
+        self._exchange = exchange
 
     async def fetch_data(self, symbol: str, timeframe: str, limit: int = 200) -> pd.DataFrame:
-        """Получение исторических данных для таймфрейма"""
+        """Получение исторических данных для таймфрейма
+
+        Возвращает копию свечей: вызывающий код может хранить ее сколько
+        угодно, следующие загрузки пары ее не меняют.
+        """
+        buffer = await self._fetch_buffer(symbol, timeframe, limit)
+        return buffer.to_frame(copy=True, limit=limit)
+
+    async def _fetch_buffer(self, symbol: str, timeframe: str, limit: int = 200) -> OHLCVBuffer:
+        """Загрузка свечей таймфрейма в кольцевой буфер символа (см. OHLCVBuffer)"""
+        start = time.perf_counter()
         try:
             # Преобразование таймфрейма в формат Binance
             binance_timeframe = self.timeframe_mapping.get(timeframe)
             if not binance_timeframe:
                 raise ValueError(f"Неизвестный таймфрейм: {timeframe}")
 
-            ohlcv = await asyncio.get_event_loop().run_in_executor(
-                None,
+            loop = asyncio.get_running_loop()
+            store = self.candle_store
+            since = None
+            if store is not None:
+                last_timestamp, count = await loop.run_in_executor(
+                    self.executor, store.state, symbol, binance_timeframe
+                )
+                # История уже есть - запрашиваем бары начиная с последнего
+                # сохраненного (он мог быть формирующимся и будет перезаписан)
+                if last_timestamp is not None and count >= limit:
+                    since = last_timestamp
+
+            ohlcv = await self._request_ohlcv(symbol, binance_timeframe, since, limit)
+            if since is not None and len(ohlcv) >= limit:
+                # Разрыв длиннее окна (например, после долгого простоя)
+                ohlcv = await self._request_ohlcv(symbol, binance_timeframe, None, limit)
+
+            if store is not None:
+                ohlcv = await loop.run_in_executor(
+                    self.executor, self._merge_cached, symbol, binance_timeframe, ohlcv, limit
+                )
+
+            buffer = self._buffer(symbol, timeframe, limit)
+            buffer.extend(ohlcv)
+            return buffer
+
+        except Exception as e:
+            self.logger.error(f"Ошибка при получении данных для {timeframe}: {e}")
+            raise
+        finally:
+            self.metrics.observe('fetch', time.perf_counter() - start, timeframe=timeframe)
+
+    async def _request_ohlcv(self, symbol: str, exchange_timeframe: str,
+                             since: Optional[int], limit: int) -> List[List[float]]:
+        """Запрос свечей у биржи с учетом ограничителя запросов"""
+        async with self._get_rate_limiter():
+            return await asyncio.get_running_loop().run_in_executor(
+                self.executor,
                 self.exchange.fetch_ohlcv,
                 symbol,
-                binance_timeframe,
-                None,
+                exchange_timeframe,
+                since,
                 limit
             )
 
-            df = pd.DataFrame(ohlcv, columns=[
-                'timestamp', 'open', 'high', 'low', 'close', 'volume'
-            ])
+    def _merge_cached(self, symbol: str, exchange_timeframe: str,
+                      ohlcv: List[List[float]], limit: int) -> List[Tuple]:
+        """Слияние новых свечей с локальным кэшем, возвращает последние limit свечей"""
+        store = self.candle_store
+        store.upsert(symbol, exchange_timeframe, ohlcv)
+        store.prune(symbol, exchange_timeframe, max(limit, self.cache_max_bars))
+        return store.load(symbol, exchange_timeframe, limit)
+
+    def _buffer(self, symbol: str, timeframe: str, limit: int) -> OHLCVBuffer:
+        """Буфер свечей пары; пересоздается, если не вмещает limit свечей"""
+        buffer = self._buffers.get((symbol, timeframe))
+        if buffer is None or buffer.capacity < limit:
+            buffer = OHLCVBuffer(limit, self.buffer_dtype)
+            self._buffers[(symbol, timeframe)] = buffer
+        return buffer
+
+    @staticmethod
+    def _to_frame(ohlcv: List[Any]) -> pd.DataFrame:
+        """DataFrame из списка свечей [timestamp, open, high, low, close, volume]"""
+        df = pd.DataFrame(ohlcv, columns=[
+            'timestamp', 'open', 'high', 'low', 'close', 'volume'
+        ])
+
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+        df.set_index('timestamp', inplace=True)
+
+        # Переименование колонок для соответствия формату
+        df.columns = ['open', 'high', 'low', 'close', 'volume']
+
+        return df
+
+    def _get_rate_limiter(self) -> RateLimiter:
+        """Ограничитель запросов, привязанный к текущему event loop"""
+        loop = asyncio.get_running_loop()
+        if self._rate_limiter is None or self._rate_limiter_loop is not loop:
+            self._rate_limiter = RateLimiter(
+                self.config['api'].get('rate_limit'),
+                self.max_concurrent_requests
+            )
+            self._rate_limiter_loop = loop
+        return self._rate_limiter
+
+    async def _fetch_with_timeout(self, symbol: str, timeframe: str, limit: int = 200) -> pd.DataFrame:
+        """Получение данных таймфрейма с ограничением по времени
+
+        DataFrame ссылается на память буфера без копирования и действителен
+        до следующей загрузки той же пары - только для анализа внутри цикла.
+        """
+        try:
+            buffer = await asyncio.wait_for(
+                self._fetch_buffer(symbol, timeframe, limit),
+                timeout=self.fetch_timeout
+            )
+        except asyncio.TimeoutError:
+            self.logger.error(f"Таймаут получения данных для {timeframe} ({self.fetch_timeout} с)")
+            raise
+        return buffer.to_frame(limit=limit)
+
+    async def analyze_timeframes(self, symbol: str) -> Dict[str, Any]:
+        """Иерархический анализ всех таймфреймов
 
-            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-            df.set_index('timestamp', inplace=True)
+        'data' в результате - представления буферов свечей без копирования,
+        действительные до следующего анализа символа.
+        """
+        if self.derive_timeframes:
+            return self.analyze_frames(await self._fetch_derived(symbol))
 
-            # Переименование колонок для соответствия формату
-            df.columns = ['open', 'high', 'low', 'close', 'volume']
+        sorted_timeframes = self._sorted_timeframes()
 
-            return df
+        # Данные всех таймфреймов запрашиваются параллельно;
+        # ошибка или таймаут одного таймфрейма не отменяет остальные
+        fetched = await asyncio.gather(
+            *(self._fetch_with_timeout(symbol, timeframe) for timeframe in sorted_timeframes),
+            return_exceptions=True
+        )
 
+        frames = {}
+        for timeframe, data in zip(sorted_timeframes, fetched):
+            if isinstance(data, BaseException):
+                self.logger.error(f"Ошибка получения данных для {timeframe}: {data!r}")
+                frames[timeframe] = None
+            else:
+                frames[timeframe] = data
+
+        return self.analyze_frames(frames)
+
+    async def _fetch_derived(self, symbol: str, limit: int = 200) -> Dict[str, Optional[pd.DataFrame]]:
+        """Свечи всех таймфреймов по одному запросу базового таймфрейма
+
+        Старшие таймфреймы строятся из свечей базового (CandleAggregator),
+        поэтому все таймфреймы цикла отражают один и тот же снимок цены.
+        Закрытая история старшего таймфрейма (200 свечей для EMA 200 на 1D)
+        загружается у биржи один раз - при первом цикле символа или после
+        разрыва длиннее окна базовых свечей.
+        """
+        base = self.base_timeframe
+        frames: Dict[str, Optional[pd.DataFrame]] = {timeframe: None for timeframe in self.config['timeframes']}
+        try:
+            frames[base] = await self._fetch_with_timeout(symbol, base, limit)
         except Exception as e:
-            self.logger.error(f"Ошибка при получении данных для {timeframe}: {e}")
-            raise
+            self.logger.error(f"Ошибка получения данных для {base}: {e!r}")
+            return frames
+
+        base_buffer = self._buffers[(symbol, base)]
+        derived = [timeframe for timeframe in self._sorted_timeframes() if timeframe != base]
+
+        stale = []
+        for timeframe in derived:
+            aggregator = self._aggregators.get((symbol, timeframe))
+            with self.metrics.span('aggregate', timeframe=timeframe):
+                updated = aggregator is not None and aggregator.update(base_buffer.timestamps, base_buffer.values)
+            if not updated:
+                stale.append(timeframe)
+
+        bootstrapped = await asyncio.gather(
+            *(self._fetch_with_timeout(symbol, timeframe, limit) for timeframe in stale),
+            return_exceptions=True
+        )
+        failed = set()
+        for timeframe, data in zip(stale, bootstrapped):
+            if isinstance(data, BaseException):
+                self.logger.error(f"Ошибка получения данных для {timeframe}: {data!r}")
+                self._aggregators.pop((symbol, timeframe), None)
+                failed.add(timeframe)
+                continue
+
+            aggregator = CandleAggregator(
+                self._buffer(symbol, timeframe, limit),
+                timeframe_seconds(timeframe),
+                timeframe_seconds(base)
+            )
+            aggregator.reset()
+            if aggregator.update(base_buffer.timestamps, base_buffer.values):
+                self._aggregators[(symbol, timeframe)] = aggregator
+            else:
+                # Окно базовых свечей не покрывает текущий период - в этом
+                # цикле свечи биржи, повторный bootstrap в следующем
+                self.logger.warning(f"Свечи {base} не покрывают текущий период {timeframe} {symbol}")
+                self._aggregators.pop((symbol, timeframe), None)
+
+        for timeframe in derived:
+            if timeframe not in failed:
+                frames[timeframe] = self._buffers[(symbol, timeframe)].to_frame(limit=limit)
+        return frames
+
+    def _sorted_timeframes(self) -> List[str]:
+        """Таймфреймы по приоритету (от высшего к низшему)"""
+        return [
+            timeframe for timeframe, _ in sorted(
+                self.config['timeframes'].items(),
+                key=lambda x: x[1]['priority']
+            )
+        ]
 
-    async def analyze_timeframes(self, symbol: str) -> Dict[str, Any]:
-        """Иерархический анализ всех таймфреймов"""
+    def analyze_frames(self, frames: Dict[str, Optional[pd.DataFrame]]) -> Dict[str, Any]:
+        """Анализ уже загруженных свечей (например, из потока WebSocket)
+
+        frames - свечи по таймфреймам; отсутствующий таймфрейм или None дает
+        None в результате, как и ошибка загрузки.
+        """
         timeframes = self.config['timeframes']
         results = {}
 
-        # Сортировка таймфреймов по приоритету (от высшего к низшему)
-        sorted_timeframes = sorted(
-            timeframes.items(),
-            key=lambda x: x[1]['priority']
-        )
+        for timeframe in self._sorted_timeframes():
+            data = frames.get(timeframe)
+            if data is None:
+                results[timeframe] = None
+                continue
 
-        for timeframe, tf_config in sorted_timeframes:
             try:
                 self.logger.info(f"Анализ таймфрейма {timeframe}")
 
-                # Получение данных
-                data = await self.fetch_data(symbol, timeframe)
+                # Общий кэш примитивов таймфрейма на этот цикл
+                features = FeatureStore(data)
 
                 # Анализ структуры рынка
-                structure = self._analyze_market_structure(data)
+                with self.metrics.span('analysis', step='market_structure', timeframe=timeframe):
+                    structure = self._analyze_market_structure(data)
 
                 # Определение тренда
-                trend = self._determine_trend(data)
+                with self.metrics.span('analysis', step='trend', timeframe=timeframe):
+                    trend = self._determine_trend(data, features)
 
                 # Расчет ключевых уровней
-                levels = self._calculate_key_levels(data)
+                with self.metrics.span('analysis', step='levels', timeframe=timeframe):
+                    levels = self._calculate_key_levels(data)
 
                 # Анализ объема
-                volume_analysis = self._analyze_volume(data)
+                with self.metrics.span('analysis', step='volume', timeframe=timeframe):
+                    volume_analysis = self._analyze_volume(data)
 
                 results[timeframe] = {
-                    'weight': tf_config['weight'],
+                    'weight': timeframes[timeframe]['weight'],
                     'trend': trend,
                     'structure': structure,
                     'levels': levels,
                     'volume': volume_analysis,
-                    'data': data
+                    'data': data,
+                    'features': features
                 }
 
             except Exception as e:
@@ -106,21 +354,23 @@ class TimeframeAnalyzer:
 
     def _analyze_market_structure(self, data: pd.DataFrame) -> Dict[str, Any]:
         """Анализ структуры рынка"""
-        close = data['close']
+        close = data['close'].to_numpy(dtype=float)
 
-        # Определение структуры через swing highs/lows
+        # Определение структуры через swing highs/lows:
+        # бар - swing high, если он равен максимуму центрированного окна 2*period+1
         period = 5
         highs = []
         lows = []
 
-        for i in range(period, len(close) - period):
-            if all(close.iloc[i] >= close.iloc[i-j] for j in range(1, period+1)) and \
-               all(close.iloc[i] >= close.iloc[i+j] for j in range(1, period+1)):
-                highs.append((i, close.iloc[i]))
+        if len(close) > 2 * period:
+            windows = sliding_window_view(close, 2 * period + 1)
+            center = close[period:len(close) - period]
+
+            high_idx = np.flatnonzero(center == windows.max(axis=1)) + period
+            low_idx = np.flatnonzero(center == windows.min(axis=1)) + period
 
-            if all(close.iloc[i] <= close.iloc[i-j] for j in range(1, period+1)) and \
-               all(close.iloc[i] <= close.iloc[i+j] for j in range(1, period+1)):
-                lows.append((i, close.iloc[i]))
+            highs = [(int(i), close[i]) for i in high_idx]
+            lows = [(int(i), close[i]) for i in low_idx]
 
         # Определение структуры
         structure = "ranging"  # По умолчанию
@@ -140,13 +390,16 @@ class TimeframeAnalyzer:
             'swing_lows': lows
         }
 
-    def _determine_trend(self, data: pd.DataFrame) -> Dict[str, Any]:
+    def _determine_trend(self, data: pd.DataFrame,
+                         features: Optional[FeatureStore] = None) -> Dict[str, Any]:
         """Определение направления тренда"""
         close = data['close']
+        if features is None:
+            features = FeatureStore(data)
 
         # Использование нескольких методов для определения тренда
-        ema_20 = close.ewm(span=20, adjust=False).mean()
-        ema_50 = close.ewm(span=50, adjust=False).mean()
+        ema_20 = features.ema('close', 20)
+        ema_50 = features.ema('close', 50)
 
         # Тренд на основе EMA
         if ema_20.iloc[-1] > ema_50.iloc[-1] and close.iloc[-1] > ema_20.iloc[-1]:
@@ -173,19 +426,20 @@ class TimeframeAnalyzer:
         """Расчет ключевых уровней поддержки и сопротивления"""
         high = data['high']
         low = data['low']
-        close = data['close']
-
-        # Уровни сопротивления (предыдущие максимумы)
-        resistance_levels = []
-        for i in range(1, len(high) - 1):
-            if high.iloc[i] > high.iloc[i-1] and high.iloc[i] > high.iloc[i+1]:
-                resistance_levels.append(high.iloc[i])
-
-        # Уровни поддержки (предыдущие минимумы)
-        support_levels = []
-        for i in range(1, len(low) - 1):
-            if low.iloc[i] < low.iloc[i-1] and low.iloc[i] < low.iloc[i+1]:
-                support_levels.append(low.iloc[i])
+        high_values = high.to_numpy(dtype=float)
+        low_values = low.to_numpy(dtype=float)
+
+        # Уровни сопротивления (локальные максимумы: выше обоих соседей)
+        inner_high = high_values[1:-1]
+        resistance_levels = list(inner_high[
+            (inner_high > high_values[:-2]) & (inner_high > high_values[2:])
+        ])
+
+        # Уровни поддержки (локальные минимумы: ниже обоих соседей)
+        inner_low = low_values[1:-1]
+        support_levels = list(inner_low[
+            (inner_low < low_values[:-2]) & (inner_low < low_values[2:])
+        ])
 
         # Фибоначчи уровни
         recent_high = high.tail(50).max()
@@ -0,0 +1,164 @@
+import pytest
+import pandas as pd
+import numpy as np
+import sys
+import os
+import json
+import asyncio
+
+# Добавление пути для импорта
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import make_ohlcv
+from src.signal_engine import SignalEngine
+from src.backtester import Backtester
+from indicators.base_indicator import signal_names
+
+CONFIG_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'config', 'strategy_config.json'
+)
+
+
+def make_engine(tmp_path, history_bars=None, **risk):
+    """SignalEngine с низким порогом сигнала, чтобы на коротких данных были сделки
+
+    По умолчанию бэктест по всей истории (быстрый режим); history_bars -
+    оценка каждого бара по окну, как в живом цикле.
+    """
+    with open(CONFIG_PATH, 'r') as f:
+        config = json.load(f)
+    config['signal_threshold'] = 1
+    config['data']['cache_enabled'] = False
+    config['backtest']['history_bars'] = history_bars
+    config['risk_management'].update(risk)
+    path = tmp_path / 'config.json'
+    path.write_text(json.dumps(config))
+    return SignalEngine(str(path))
+
+
+class TestBacktester:
+    """Тесты бэктестера"""
+    
+    @pytest.fixture
+    def sample_data(self):
+        """30 дней 15-минутных свечей с чередующимися трендами"""
+        n = 30 * 96
+        rng = np.random.default_rng(7)
+        drift = 0.0015 * np.sign(np.sin(np.arange(n) / 150))
+        close = 0.5 * np.exp(np.cumsum(drift + rng.normal(0, 0.002, n)))
+        open_ = np.concatenate(([0.5], close[:-1]))
+        spread = np.abs(rng.normal(0, 0.002, n)) * close
+        
+        data = make_ohlcv(n)
+        data['open'] = open_
+        data['high'] = np.maximum(open_, close) + spread
+        data['low'] = np.minimum(open_, close) - spread
+        data['close'] = close
+        return data
+    
+    def test_report(self, tmp_path, sample_data):
+        backtester = Backtester(make_engine(tmp_path))
+        report = backtester.run(sample_data, days=20)
+        
+        assert report['bars'] == len(sample_data)
+        assert report['trades'] > 0
+        assert report['trades'] == report['wins'] + report['losses']
+        assert 0 <= report['win_rate'] <= 100
+        assert report['max_drawdown'] >= 0
+        assert report['total_pnl'] == pytest.approx(sum(t['pnl'] for t in report['trade_log']))
+        assert report['bars_per_sec'] > 0
+        
+        # Торговля только в последние 20 дней
+        start = pd.Timestamp(report['start'])
+        assert all(t['entry_time'] >= start for t in report['trade_log'])
+        assert all(t['exit_time'] >= t['entry_time'] for t in report['trade_log'])
+        assert 'РЕЗУЛЬТАТЫ БЭКТЕСТА' in Backtester.format_report(report)
+    
+    def test_no_look_ahead(self, tmp_path, sample_data):
+        """Сигналы на префиксе данных не зависят от последующих свечей"""
+        backtester = Backtester(make_engine(tmp_path))
+        
+        def directions(data):
+            frames = {tf: backtester.resample(data, tf) for tf in backtester.timeframes}
+            return list(backtester._incremental_signals(frames))
+        
+        full = directions(sample_data)
+        prefix = directions(sample_data.iloc[:1500])
+        
+        assert len(prefix) == 1500
+        assert full[:1500] == prefix
+        assert set(full) > {"NEUTRAL"}
+    
+    def test_vectorized_matches_incremental(self, tmp_path, sample_data):
+        """Векторный и инкрементальный расчет сигналов дают одинаковые направления"""
+        engine = make_engine(tmp_path)
+        backtester = Backtester(engine)
+        frames = {tf: backtester.resample(sample_data, tf) for tf in backtester.timeframes}
+        
+        vectorized = backtester._vectorized_signals(frames)
+        incremental = list(backtester._incremental_signals(frames))
+        
+        assert vectorized.dtype == np.int8
+        assert list(signal_names(vectorized)) == incremental
+        
+        first = Backtester(engine, vectorized=True).run(sample_data)
+        second = Backtester(engine, vectorized=False).run(sample_data)
+        assert first['trade_log'] == second['trade_log']
+    
+    def test_window_matches_live_engine(self, tmp_path, sample_data):
+        """Сигнал бара в режиме окна совпадает с SignalEngine на тех же 200 свечах"""
+        engine = make_engine(tmp_path, history_bars=200)
+        backtester = Backtester(engine)
+        frame = backtester.resample(sample_data, '1H')
+        j = len(frame) - 1
+        
+        arrays = backtester._window_signal_arrays('1H', frame, j)
+        live = asyncio.run(engine._get_indicator_signals('1H', frame.iloc[j - 199:j + 1]))
+        assert {name: signal_names(array[j:])[0] for name, array in arrays.items()} == live
+        assert all(not array[:j].any() for array in arrays.values())
+        
+        report = backtester.run(sample_data, days=1)
+        assert report['bars'] == len(sample_data)
+        assert all(t['entry_time'] >= pd.Timestamp(report['start']) for t in report['trade_log'])
+    
+    def test_risk_limits(self, tmp_path, sample_data):
+        backtester = Backtester(make_engine(tmp_path, max_daily_trades=1, stop_loss_pct=0.5))
+        report = backtester.run(sample_data)
+        
+        assert report['trades'] > 0
+        entries = pd.Series([t['entry_time'].normalize() for t in report['trade_log']])
+        assert entries.value_counts().max() == 1
+        
+        stops = [t for t in report['trade_log'] if t['reason'] == 'stop_loss']
+        assert stops
+        for trade in stops:
+            move = abs(trade['exit_price'] / trade['entry_price'] - 1) * 100
+            # Выход по стопу, либо хуже - при гэпе через стоп на открытии бара
+            assert move >= 0.5 - 1e-9
+            assert trade['pnl'] < 0
+        
+        # Дневной лимит убытка ниже одного стопа - после первого стопа в день новых входов нет
+        backtester = Backtester(make_engine(tmp_path, max_daily_loss=1, stop_loss_pct=0.5))
+        report = backtester.run(sample_data)
+        by_day = {}
+        for trade in report['trade_log']:
+            by_day.setdefault(trade['entry_time'].normalize(), []).append(trade)
+        for trades in by_day.values():
+            for previous, trade in zip(trades, trades[1:]):
+                assert previous['reason'] != 'stop_loss'
+    
+    def test_load_candles(self, tmp_path, sample_data):
+        frame = sample_data.reset_index()
+        frame['timestamp'] = frame['timestamp'].astype('int64') // 10**6
+        csv_path = tmp_path / 'candles.csv'
+        frame.to_csv(csv_path, index=False)
+        json_path = tmp_path / 'candles.json'
+        json_path.write_text(json.dumps(frame.values.tolist()))
+        
+        for path in (csv_path, json_path):
+            loaded = Backtester.load_candles(str(path))
+            pd.testing.assert_frame_equal(loaded, sample_data, check_names=False, check_freq=False)
+        
+        with pytest.raises(FileNotFoundError):
+            Backtester.load_candles(str(tmp_path / 'missing.csv'))
@@ -0,0 +1,75 @@
+import pytest
+import sys
+import os
+import asyncio
+
+# Добавление пути для импорта
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.candle_scheduler import CandleScheduler, timeframe_seconds
+
+TIMEFRAMES = ['1D', '4H', '1H', '15m']
+# 2024-01-01 00:00:00 UTC
+MIDNIGHT = 1_704_067_200
+
+
+class FakeClock:
+    """Часы, которые двигает только sleep (плюс «дрейф» на каждый вызов)"""
+    
+    def __init__(self, now, drift=0.0):
+        self.now = now
+        self.drift = drift
+        self.sleeps = []
+    
+    def __call__(self):
+        return self.now
+    
+    async def sleep(self, delay):
+        self.sleeps.append(delay)
+        # Пробуждение чуть раньше срока, как после неточного таймера
+        self.now += delay - self.drift
+        self.drift = 0.0
+
+
+class TestCandleScheduler:
+    """Тесты планировщика по границам свечей"""
+    
+    def test_wakeups_aligned_to_candle_close(self):
+        clock = FakeClock(MIDNIGHT + 7 * 60 + 13.5)
+        scheduler = CandleScheduler(15 * 60, TIMEFRAMES, offset=2, clock=clock, sleep=clock.sleep)
+        
+        async def run():
+            wakeups = []
+            for _ in range(16):
+                wakeups.append(await scheduler.wait())
+                clock.now += 37.0  # время цикла анализа не сдвигает расписание
+            return wakeups
+        
+        wakeups = asyncio.run(run())
+        
+        boundaries = [boundary for boundary, _ in wakeups]
+        assert boundaries == [MIDNIGHT + 900 * i for i in range(1, 17)]
+        assert wakeups[0][1] == ['15m']
+        assert wakeups[3][1] == ['1H', '15m']
+        assert wakeups[15][1] == ['4H', '1H', '15m']
+    
+    def test_early_wakeup_and_offset(self):
+        clock = FakeClock(MIDNIGHT - 60, drift=5.0)
+        scheduler = CandleScheduler(60 * 60, TIMEFRAMES, offset=2, clock=clock, sleep=clock.sleep)
+        
+        boundary, due = asyncio.run(scheduler.wait())
+        
+        assert boundary == MIDNIGHT
+        assert due == TIMEFRAMES
+        assert clock.now == MIDNIGHT + 2
+        assert len(clock.sleeps) == 2
+        
+        # В пределах offset после границы ждем ее же, а не следующую
+        assert scheduler.next_boundary(MIDNIGHT + 1) == MIDNIGHT
+        assert scheduler.next_boundary(MIDNIGHT + 2) == MIDNIGHT + 3600
+    
+    def test_invalid_arguments(self):
+        with pytest.raises(ValueError):
+            CandleScheduler(0, TIMEFRAMES)
+        with pytest.raises(ValueError):
+            timeframe_seconds('3m')
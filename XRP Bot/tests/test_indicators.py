@@ -3,6 +3,7 @@ import pandas as pd
 import numpy as np
 import sys
 import os
+import subprocess
 
 # Добавление пути для импорта
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -12,6 +13,13 @@ from indicators.macd import MACDIndicator
 from indicators.ema import EMAIndicator
 from indicators.bollinger_bands import BollingerBandsIndicator
 from indicators.stochastic import StochasticIndicator
+from indicators.atr import ATRIndicator
+from indicators.keltner_channels import KeltnerChannelsIndicator
+from indicators.feature_store import FeatureStore
+from indicators.volume_profile import VolumeProfileIndicator
+from indicators.cci import CCIIndicator, rolling_mean_deviation
+from indicators.result import IndicatorResult
+from indicators.registry import INDICATORS, create_indicator
 
 class TestIndicators:
     """Тесты для индикаторов"""
@@ -48,7 +56,7 @@ class TestIndicators:
         
         assert 'rsi' in result
         assert 0 <= result['rsi'] <= 100
-        assert isinstance(result['values'], list)
+        assert isinstance(result['values'], np.ndarray)
         assert len(result['values']) == len(sample_data)
     
     def test_macd_calculation(self, sample_data):
@@ -65,7 +73,7 @@ class TestIndicators:
         assert 'macd_line' in result
         assert 'signal_line' in result
         assert 'histogram' in result
-        assert isinstance(result['macd_values'], list)
+        assert isinstance(result['macd_values'], np.ndarray)
     
     def test_ema_calculation(self, sample_data):
         """Тест расчета EMA"""
@@ -129,5 +137,129 @@ class TestIndicators:
         invalid_data = pd.DataFrame({'price': [1, 2, 3]})
         assert rsi_indicator.validate_data(invalid_data) == False
 
+    def test_feature_store_caching(self, sample_data):
+        """Тест кэширования общих примитивов"""
+        features = FeatureStore(sample_data)
+        
+        assert features.true_range() is features.true_range()
+        assert features.ema('close', 20) is features.ema('close', 20)
+        assert features.rolling_max('high', 14) is not features.rolling_max('high', 9)
+        
+        features.clear()
+        assert features.ema('close', 20).equals(
+            sample_data['close'].ewm(span=20, adjust=False).mean()
+        )
+    
+    def test_shared_feature_store(self, sample_data):
+        """Тест совпадения результатов с общим хранилищем примитивов"""
+        atr = ATRIndicator({'period': 10}, '1H')
+        keltner = KeltnerChannelsIndicator({'ema_period': 20, 'atr_period': 10}, '1H')
+        
+        standalone = keltner.calculate(sample_data)
+        
+        features = FeatureStore(sample_data)
+        atr.feature_store = features
+        keltner.feature_store = features
+        atr_result = atr.calculate(sample_data)
+        shared = keltner.calculate(sample_data)
+        
+        assert features.rolling_mean('true_range', 10).iloc[-1] == atr_result['atr']
+        assert shared['upper_band'] == standalone['upper_band']
+        assert shared['lower_band'] == standalone['lower_band']
+
+    def test_volume_profile(self, sample_data):
+        """Тест Volume Profile: весь объем распределен по bins"""
+        vp_indicator = VolumeProfileIndicator({'num_bins': 20}, '1H')
+        
+        result = vp_indicator.calculate(sample_data)
+        
+        assert len(result['volume_profile']) == 20
+        assert sum(result['volume_profile']) == pytest.approx(sample_data['volume'].sum())
+        assert result['bins'][0] <= result['poc'] <= result['bins'][-1]
+        assert len(result['high_volume_nodes']) <= 5
+
+    def test_cci_mean_deviation(self, sample_data):
+        """Тест CCI: векторное среднее отклонение совпадает с rolling().apply()"""
+        typical_price = (sample_data['high'] + sample_data['low'] + sample_data['close']) / 3
+        typical_price.iloc[50] = np.nan
+        
+        expected = typical_price.rolling(window=20).apply(
+            lambda x: np.mean(np.abs(x - np.mean(x)))
+        ).to_numpy()
+        actual = rolling_mean_deviation(typical_price.to_numpy(), 20)
+        
+        assert np.array_equal(actual, expected, equal_nan=True)
+        assert np.isnan(rolling_mean_deviation(typical_price.to_numpy()[:10], 20)).all()
+        
+        cci = CCIIndicator({'period': 20}, '1H').calculate(sample_data)
+        assert len(cci['values']) == len(sample_data)
+        assert not pd.isna(cci['cci'])
+    
+    def test_indicator_result_lazy_history(self, sample_data):
+        """История материализуется массивом только при обращении к ключу"""
+        calls = []
+        
+        def history():
+            calls.append(1)
+            return sample_data['close']
+        
+        result = IndicatorResult({'last': 1.0}, values=history)
+        assert set(result) == {'last', 'values'}
+        assert result.scalars() == {'last': 1.0}
+        assert calls == []
+        
+        values = result['values']
+        assert isinstance(values, np.ndarray) and values.dtype == np.float64
+        assert np.array_equal(values, sample_data['close'].to_numpy())
+        assert result['values'] is values
+        assert calls == [1]
+        
+        result['values'] = [1.0]
+        assert result['values'] == [1.0]
+        del result['last']
+        assert len(result) == 1
+        
+        # Сигнал считается по скалярам, без копирования истории в списки
+        macd = MACDIndicator({}, '1H').calculate(sample_data)
+        assert set(macd.scalars()) == {'macd_line', 'signal_line', 'histogram'}
+    
+    def test_registry_imports_enabled_only(self):
+        """Реестр импортирует модули только включенных индикаторов"""
+        ema = create_indicator('ema_50', {}, '1H')
+        assert isinstance(ema, EMAIndicator) and ema.period == 50
+        with pytest.raises(KeyError):
+            create_indicator('unknown', {}, '1H')
+        
+        # Чистый интерпретатор: конфигурация только с RSI
+        code = (
+            "import sys\n"
+            "from src.signal_engine import create_indicators\n"
+            "config = {'indicators': {'rsi': {'enabled': True, 'timeframes': ['1H']},"
+            " 'macd': {'enabled': False, 'timeframes': ['1H']}}}\n"
+            "assert list(create_indicators(config, '1H')) == ['rsi']\n"
+            "print(sorted(name for name in sys.modules if name.startswith('indicators.')))"
+        )
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        output = subprocess.run(
+            [sys.executable, '-c', code], cwd=root, capture_output=True, text=True, check=True
+        ).stdout
+        assert "'indicators.rsi'" in output
+        assert "'indicators.macd'" not in output
+        assert len(INDICATORS) == 18
+    
+    def test_cli_imports_engine_lazily(self):
+        """main.py без движка (--health-check, --help) не загружает pandas и индикаторы"""
+        code = (
+            "import sys\n"
+            "import main\n"
+            "print([name for name in ('pandas', 'src.signal_engine', 'indicators.registry')"
+            " if name in sys.modules])"
+        )
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        output = subprocess.run(
+            [sys.executable, '-c', code], cwd=root, capture_output=True, text=True, check=True
+        ).stdout
+        assert output.strip() == '[]'
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,204 @@
+import pytest
+import pandas as pd
+import numpy as np
+import sys
+import os
+import asyncio
+
+from aiohttp import web
+
+# Добавление пути для импорта
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.kline_stream import KlineStream, CandleSeries
+from test_timeframe_analyzer import FakeExchange, ResampledExchange, TIMEFRAME_MS
+
+CONFIG = {
+    'api': {'testnet': True},
+    'timeframes': {
+        '1H': {'weight': 0.6, 'priority': 1},
+        '15m': {'weight': 0.4, 'priority': 2}
+    },
+    'stream': {'history_bars': 200, 'reconnect_min_delay': 0.05, 'reconnect_max_delay': 0.2}
+}
+
+
+def kline_message(symbol, interval, candle, closed):
+    """Сообщение комбинированного потока Binance для свечи"""
+    timestamp, open_, high, low, close, volume = candle
+    return {
+        'stream': f"{symbol.lower()}@kline_{interval}",
+        'data': {
+            'e': 'kline',
+            's': symbol,
+            'k': {
+                't': timestamp,
+                'T': timestamp + TIMEFRAME_MS[interval] - 1,
+                's': symbol,
+                'i': interval,
+                'o': str(open_),
+                'h': str(high),
+                'l': str(low),
+                'c': str(close),
+                'v': str(volume),
+                'x': closed
+            }
+        }
+    }
+
+
+def replay(candles, symbol='XRPUSDT', interval='15m'):
+    """Сообщения потока для записанных свечей: обновление формирующейся свечи и закрытие"""
+    messages = []
+    for candle in candles:
+        forming = list(candle)
+        forming[4] = candle[1]
+        messages.append(kline_message(symbol, interval, forming, False))
+        messages.append(kline_message(symbol, interval, candle, True))
+    return messages
+
+
+class KlineReplayServer:
+    """Локальная замена потока Binance: каждое подключение воспроизводит свою сессию"""
+    
+    def __init__(self, sessions):
+        self.sessions = sessions
+        self.queries = []
+    
+    async def handler(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        session = len(self.queries)
+        self.queries.append(request.query.get('streams'))
+        
+        for message in self.sessions[min(session, len(self.sessions) - 1)]:
+            await ws.send_json(message)
+        
+        if session < len(self.sessions) - 1:
+            # Обрыв соединения после сессии
+            await ws.close()
+        else:
+            async for _ in ws:
+                pass
+        return ws
+    
+    async def start(self):
+        app = web.Application()
+        app.router.add_get('/stream', self.handler)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, '127.0.0.1', 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        return f"ws://127.0.0.1:{port}/stream"
+    
+    async def stop(self):
+        await self.runner.cleanup()
+
+
+def to_frame(candles):
+    from src.timeframe_analyzer import TimeframeAnalyzer
+    return TimeframeAnalyzer._to_frame(candles)
+
+
+class TestKlineStream:
+    """Тесты потока свечей WebSocket"""
+    
+    def test_candle_series(self):
+        series = CandleSeries(limit=3)
+        for timestamp in (1, 2, 3, 4):
+            series.upsert([timestamp, 1, 2, 0, 1, 10])
+        series.upsert([4, 1, 3, 0, 2, 20])
+        series.upsert([2, 1, 2, 0, 1, 10])
+        
+        assert [c[0] for c in series.candles] == [2, 3, 4]
+        assert series.candles[-1] == [4, 1.0, 3.0, 0.0, 2.0, 20.0]
+        assert series.last_timestamp == 4
+    
+    def test_stream_reconnect_and_gap_fill(self):
+        exchange = FakeExchange(bars=260)
+        candles = {tf: exchange.candles(tf) for tf in ('15m', '1h')}
+        
+        # Сессия 1: свечи 200-209, обрыв; свечи 210-214 закрываются без соединения;
+        # сессия 2: свечи 215-219
+        server = KlineReplayServer([replay(candles['15m'][200:210]), replay(candles['15m'][215:220])])
+        closes = []
+        fetches = []
+        
+        async def run():
+            url = await server.start()
+            done = asyncio.Event()
+            
+            async def rest_fetch(symbol, timeframe, limit):
+                interval = {'1H': '1h', '15m': '15m'}[timeframe]
+                upto = 200 if stream.connections <= 1 else 215
+                fetches.append((timeframe, stream.connections))
+                return to_frame(candles[interval][:upto][-limit:])
+            
+            async def on_close(symbol, timeframe):
+                closes.append((symbol, timeframe, stream.series[(symbol, timeframe)].last_timestamp))
+                if len(closes) == 15:
+                    done.set()
+            
+            stream = KlineStream(CONFIG, ['XRPUSDT'], rest_fetch, on_close, url=url)
+            task = asyncio.create_task(stream.run())
+            try:
+                await asyncio.wait_for(done.wait(), timeout=10)
+            finally:
+                stream.stop()
+                await asyncio.wait_for(task, timeout=5)
+                await server.stop()
+            return stream
+        
+        stream = asyncio.run(run())
+        
+        assert stream.connections == 2
+        assert server.queries[0] == 'xrpusdt@kline_1h/xrpusdt@kline_15m'
+        assert sorted(fetches) == [('15m', 1), ('15m', 2), ('1H', 1), ('1H', 2)]
+        
+        expected = [c[0] for c in candles['15m'][200:210] + candles['15m'][215:220]]
+        assert [c[2] for c in closes] == expected
+        assert all(c[:2] == ('XRPUSDT', '15m') for c in closes)
+        
+        # Ряд без разрывов: пропущенные во время обрыва свечи догружены через REST
+        frames = stream.frames('XRPUSDT')
+        pd.testing.assert_frame_equal(frames['15m'], to_frame(candles['15m'][20:220]))
+        assert len(frames['1H']) == 200
+        assert np.all(np.diff(frames['15m'].index.asi8) == TIMEFRAME_MS['15m'] * 1_000_000)
+    
+    def test_derived_timeframes(self):
+        """Подписка только на 15m; 4H строится из свечей потока"""
+        config = dict(CONFIG, timeframes={
+            '4H': {'weight': 0.6, 'priority': 1},
+            '15m': {'weight': 0.4, 'priority': 2}
+        }, data={'derive_timeframes': True, 'base_timeframe': '15m'})
+        exchange = ResampledExchange(bars=200 * 96 + 5)
+        closes = []
+        
+        async def rest_fetch(symbol, timeframe, limit):
+            interval = {'4H': '4h', '15m': '15m'}[timeframe]
+            return to_frame(exchange.candles(interval)[-limit:])
+        
+        async def on_close(symbol, timeframe):
+            closes.append(timeframe)
+        
+        stream = KlineStream(config, ['XRPUSDT'], rest_fetch, on_close)
+        assert stream.streams_url.endswith('?streams=xrpusdt@kline_15m')
+        
+        async def run():
+            await stream._fill_gaps()
+            # Последняя свеча 15m формировалась во время загрузки истории
+            start = exchange.visible - 1
+            exchange.visible += 40
+            for message in replay(exchange.candles('15m')[start:]):
+                await stream._handle_message(message)
+        
+        asyncio.run(run())
+        
+        frames = stream.frames('XRPUSDT')
+        expected = exchange.frame('4h').iloc[-200:]
+        np.testing.assert_allclose(frames['4H'].to_numpy(), expected.to_numpy())
+        assert frames['4H'].index.equals(expected.index)
+        # 41 закрытие 15m, из них два - на границах периодов 4H
+        assert closes.count('15m') == 41
+        assert closes.count('4H') == 2
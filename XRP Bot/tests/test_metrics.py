@@ -0,0 +1,112 @@
+import pytest
+import sys
+import os
+import asyncio
+
+import aiohttp
+
+# Добавление пути для импорта
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.metrics import MetricsRegistry, MetricsServer, Histogram, parse_summary, scrape_summary
+from test_signal_engine import make_engine, TIMEFRAMES
+
+
+def instrumented_engine(tmp_path, workers=0):
+    """SignalEngine со своим реестром метрик (не общим для процесса)"""
+    engine = make_engine(tmp_path, workers=workers)
+    engine.metrics = engine.timeframe_analyzer.metrics = MetricsRegistry()
+    return engine
+
+
+class TestMetrics:
+    """Тесты гистограмм задержек и экспорта метрик"""
+    
+    def test_histogram_quantiles(self):
+        histogram = Histogram(buckets=(0.01, 0.1), window=100)
+        assert histogram.quantile(0.5) is None
+        
+        for i in range(1, 201):
+            histogram.observe(i / 1000)
+        
+        # Квантили - по последним 100 наблюдениям (0.101 ... 0.200)
+        assert histogram.quantile(0.5) == pytest.approx(0.150)
+        assert histogram.quantile(0.95) == pytest.approx(0.195)
+        assert histogram.quantile(0.99) == pytest.approx(0.199)
+        assert histogram.counts == [10, 90, 100]
+        assert histogram.count == 200
+    
+    def test_prometheus_format(self):
+        registry = MetricsRegistry(buckets=(0.1, 1.0))
+        registry.observe('fetch', 0.05, timeframe='1H')
+        registry.observe('fetch', 0.5, timeframe='1H')
+        registry.observe('indicator', 2.0, indicator='rsi', timeframe='15m')
+        
+        lines = registry.render_prometheus().splitlines()
+        
+        assert '# TYPE xrpbot_fetch_seconds histogram' in lines
+        assert 'xrpbot_fetch_seconds_bucket{timeframe="1H",le="0.1"} 1' in lines
+        assert 'xrpbot_fetch_seconds_bucket{timeframe="1H",le="1.0"} 2' in lines
+        assert 'xrpbot_fetch_seconds_bucket{timeframe="1H",le="+Inf"} 2' in lines
+        assert 'xrpbot_fetch_seconds_count{timeframe="1H"} 2' in lines
+        assert 'xrpbot_indicator_latency_seconds{indicator="rsi",timeframe="15m",quantile="0.99"} 2.0' in lines
+        
+        # Самый медленный ряд - первым в сводке
+        summary = registry.summary()
+        assert summary[0]['labels'] == {'indicator': 'rsi', 'timeframe': '15m'}
+        assert 'indicator{indicator=rsi,timeframe=15m}' in registry.format_summary()
+    
+    @pytest.mark.parametrize('workers', [0, 2])
+    def test_engine_stages_observed(self, tmp_path, workers):
+        engine = instrumented_engine(tmp_path, workers)
+        try:
+            asyncio.run(engine.analyze_all_timeframes('XRPUSDT'))
+        finally:
+            engine.close()
+        
+        series = {(row['name'], tuple(sorted(row['labels'].items()))) for row in engine.metrics.summary()}
+        for timeframe in TIMEFRAMES:
+            assert ('fetch', (('timeframe', timeframe),)) in series
+            for step in ('market_structure', 'trend', 'levels', 'volume'):
+                assert ('analysis', (('step', step), ('timeframe', timeframe))) in series
+            assert ('indicator', (('indicator', 'rsi'), ('timeframe', timeframe))) in series
+            assert ('consensus', (('stage', 'weighted'), ('timeframe', timeframe))) in series
+        assert ('consensus', (('stage', 'final'),)) in series
+    
+    def test_metrics_endpoint(self):
+        registry = MetricsRegistry()
+        registry.observe('cycle', 0.25)
+        
+        async def scrape():
+            server = MetricsServer(registry, port=0)
+            await server.start()
+            try:
+                async with aiohttp.ClientSession() as session:
+                    async with session.get(f"http://127.0.0.1:{server.port}/metrics") as response:
+                        return response.status, response.headers['Content-Type'], await response.text()
+            finally:
+                await server.stop()
+        
+        status, content_type, text = asyncio.run(scrape())
+        
+        assert status == 200
+        assert content_type.startswith('text/plain; version=0.0.4')
+        assert 'xrpbot_cycle_seconds_count 1' in text
+    
+    def test_scrape_running_summary(self):
+        """Проверка здоровья читает сводку работающего бота с /metrics"""
+        registry = MetricsRegistry()
+        registry.observe('cycle', 0.25)
+        registry.observe('indicator', 0.002, indicator='rsi', timeframe='15m')
+        assert parse_summary(registry.render_prometheus()) == registry.summary()
+        assert parse_summary(MetricsRegistry().render_prometheus()) == []
+        
+        async def scrape():
+            server = MetricsServer(registry, port=0)
+            await server.start()
+            try:
+                return await asyncio.to_thread(scrape_summary, '127.0.0.1', server.port)
+            finally:
+                await server.stop()
+        
+        assert asyncio.run(scrape()) == registry.summary()
@@ -0,0 +1,95 @@
+import pytest
+import pandas as pd
+import numpy as np
+import sys
+import os
+
+# Добавление пути для импорта
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.ohlcv_buffer import OHLCVBuffer
+from src.timeframe_analyzer import TimeframeAnalyzer
+from test_timeframe_analyzer import FakeExchange
+
+
+def candles(start, count, step=60_000):
+    """Свечи [timestamp, o, h, l, c, v] с ценой, зависящей от номера бара"""
+    return [
+        [step * i, 1.0 + i, 2.0 + i, 0.5 + i, 1.5 + i, 100.0 + i]
+        for i in range(start, start + count)
+    ]
+
+
+class TestOHLCVBuffer:
+    """Тесты кольцевого буфера свечей"""
+    
+    def test_append_wraps_around(self):
+        buffer = OHLCVBuffer(5)
+        for candle in candles(0, 12):
+            buffer.append(*candle)
+        
+        assert len(buffer) == 5
+        assert buffer.timestamps.tolist() == [60_000 * i for i in range(7, 12)]
+        assert buffer.close.tolist() == [1.5 + i for i in range(7, 12)]
+        assert buffer.last_timestamp == 11 * 60_000
+        
+        # Обновление формирующейся свечи не сдвигает окно
+        buffer.append(11 * 60_000, 1.0, 2.0, 0.5, 42.0, 1.0)
+        assert len(buffer) == 5
+        assert buffer.close[-1] == 42.0
+        
+        with pytest.raises(ValueError):
+            buffer.append(0, 1.0, 1.0, 1.0, 1.0, 1.0)
+    
+    def test_views_share_memory(self):
+        buffer = OHLCVBuffer(8)
+        buffer.extend(candles(0, 20))
+        
+        frame = buffer.to_frame()
+        assert np.shares_memory(frame['close'].to_numpy(), buffer.close)
+        assert np.shares_memory(buffer.close, buffer.values)
+        assert buffer.close.flags['C_CONTIGUOUS']
+        
+        snapshot = buffer.to_frame(copy=True)
+        assert not np.shares_memory(snapshot['close'].to_numpy(), buffer.values)
+        pd.testing.assert_frame_equal(snapshot, frame)
+        pd.testing.assert_frame_equal(buffer.to_frame(limit=3), frame.iloc[-3:])
+    
+    def test_frame_matches_to_frame(self):
+        exchange = FakeExchange(bars=300)
+        history = exchange.candles('15m')
+        buffer = OHLCVBuffer(200)
+        
+        # Ответы REST перекрываются с уже загруженными барами
+        buffer.extend(history[:150])
+        buffer.extend(history[100:260])
+        buffer.extend(history[250:])
+        
+        pd.testing.assert_frame_equal(buffer.to_frame(), TimeframeAnalyzer._to_frame(history[-200:]))
+    
+    def test_upsert_fills_gap(self):
+        buffer = OHLCVBuffer(6)
+        history = candles(0, 8)
+        for candle in history[:3] + history[5:]:
+            buffer.upsert(candle)
+        
+        buffer.upsert(history[4])
+        buffer.upsert(history[3])
+        assert buffer.timestamps.tolist() == [60_000 * i for i in range(2, 8)]
+        
+        # Свеча старше полного окна отбрасывается
+        buffer.upsert(history[0])
+        assert buffer.timestamps.tolist() == [60_000 * i for i in range(2, 8)]
+        
+        # Повтор известной свечи заменяет ее
+        buffer.upsert([3 * 60_000, 0.0, 0.0, 0.0, 7.0, 0.0])
+        assert buffer.close.tolist()[1] == 7.0
+    
+    def test_float32_columns(self):
+        buffer = OHLCVBuffer(10, np.float32)
+        buffer.extend(candles(0, 4))
+        
+        frame = buffer.to_frame()
+        assert (frame.dtypes == np.float32).all()
+        assert frame.index.name == 'timestamp'
+        assert buffer.close.dtype == np.float32
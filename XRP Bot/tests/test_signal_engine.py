@@ -0,0 +1,280 @@
+import pytest
+import pandas as pd
+import numpy as np
+import sys
+import os
+import json
+import time
+import asyncio
+
+# Добавление пути для импорта
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.signal_engine import SignalEngine
+from test_timeframe_analyzer import FakeExchange, TIMEFRAME_MS
+
+CONFIG_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'config', 'strategy_config.json'
+)
+
+
+class ScanExchange(FakeExchange):
+    """Заглушка биржи со своими свечами для каждого символа"""
+    
+    def __init__(self, failing_symbols=(), **kwargs):
+        super().__init__(**kwargs)
+        self.failing_symbols = set(failing_symbols)
+        self.in_flight = 0
+        self.max_in_flight = 0
+    
+    def fetch_ohlcv(self, symbol, timeframe, since=None, limit=None):
+        if symbol in self.failing_symbols:
+            raise ConnectionError(f"{symbol} недоступен")
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            candles = super().fetch_ohlcv(symbol, timeframe, since, limit)
+        finally:
+            self.in_flight -= 1
+        
+        # Тренд, зависящий от символа, чтобы сигналы символов различались
+        drift = (sum(map(ord, symbol)) % 7 - 3) * 0.002
+        return [
+            [ts, o + drift * i, h + drift * i, l + drift * i, c + drift * i, v]
+            for i, (ts, o, h, l, c, v) in enumerate(candles)
+        ]
+
+
+class GrowingExchange(ScanExchange):
+    """Заглушка биржи, у которой последние бары таймфреймов можно «открыть»"""
+    
+    START = 1_700_000_000_000
+    BARS = 260
+    
+    def __init__(self, **kwargs):
+        super().__init__(bars=self.BARS, **kwargs)
+        # Число скрытых последних баров по таймфреймам биржи
+        self.hidden = {timeframe: 1 for timeframe in TIMEFRAME_MS}
+    
+    def candles(self, timeframe):
+        candles = super().candles(timeframe)
+        return candles[:len(candles) - self.hidden[timeframe]]
+
+
+def make_engine(tmp_path, workers=0, exchange=None, **scan):
+    """SignalEngine без кэша свечей с локальной заглушкой биржи"""
+    with open(CONFIG_PATH, 'r') as f:
+        config = json.load(f)
+    config['data']['cache_enabled'] = False
+    config['api']['rate_limit'] = None
+    config['scan'] = scan
+    config['compute'] = {'workers': workers}
+    config['journal'] = dict(config.get('journal', {}), directory=str(tmp_path / 'signals'))
+    path = tmp_path / 'config.json'
+    path.write_text(json.dumps(config))
+    
+    engine = SignalEngine(str(path))
+    engine.timeframe_analyzer.exchange = exchange or ScanExchange()
+    return engine
+
+
+TIMEFRAMES = ['1D', '4H', '1H', '15m']
+SYMBOLS = ['XRPUSDT', 'BTCUSDT', 'ETHUSDT', 'SOLUSDT', 'ADAUSDT', 'DOGEUSDT']
+
+
+class TestSignalEngine:
+    """Тесты SignalEngine"""
+    
+    def test_analyze_symbols_ranked(self, tmp_path):
+        engine = make_engine(tmp_path)
+        results = asyncio.run(engine.analyze_symbols(SYMBOLS))
+        
+        assert sorted(r['symbol'] for r in results) == sorted(SYMBOLS)
+        assert results == SignalEngine.rank_results(results)
+        
+        # Результат по символу совпадает с одиночным анализом
+        single = asyncio.run(engine.analyze_all_timeframes('BTCUSDT'))
+        scanned = next(r for r in results if r['symbol'] == 'BTCUSDT')
+        assert scanned['final_signal'] == single['final_signal']
+        
+        report = engine.create_scan_report(results)
+        assert report.count('USDT') >= len(SYMBOLS)
+        assert report.index(results[0]['symbol']) < report.index(results[-1]['symbol'])
+    
+    def test_process_pool_matches_inline(self, tmp_path):
+        inline = asyncio.run(make_engine(tmp_path).analyze_symbols(SYMBOLS))
+        
+        engine = make_engine(tmp_path, workers=2)
+        try:
+            pooled = asyncio.run(engine.analyze_symbols(SYMBOLS))
+        finally:
+            engine.close()
+        
+        assert [r['symbol'] for r in pooled] == [r['symbol'] for r in inline]
+        for a, b in zip(pooled, inline):
+            for timeframe in a['timeframe_signals']:
+                assert a['timeframe_signals'][timeframe]['indicator_signals'] == \
+                    b['timeframe_signals'][timeframe]['indicator_signals']
+    
+    def test_timeframes_in_process_pool(self, tmp_path):
+        """Расчет в пуле через общую память совпадает с расчетом в текущем процессе"""
+        inline = asyncio.run(make_engine(tmp_path).analyze_all_timeframes('XRPUSDT'))
+        
+        engine = make_engine(tmp_path, workers=2)
+        try:
+            pooled = asyncio.run(engine.analyze_all_timeframes('XRPUSDT'))
+        finally:
+            engine.close()
+        
+        assert set(pooled['timeframe_signals']) == {'1D', '4H', '1H', '15m'}
+        for timeframe, tf_signals in pooled['timeframe_signals'].items():
+            assert tf_signals['indicator_signals'] == inline['timeframe_signals'][timeframe]['indicator_signals']
+        assert pooled['final_signal'] == inline['final_signal']
+    
+    def test_event_loop_not_blocked(self, tmp_path):
+        """Во время расчета индикаторов event loop продолжает обслуживать корутины"""
+        engine = make_engine(tmp_path, workers=2)
+        
+        async def run():
+            timeframe_data = await engine.timeframe_analyzer.analyze_timeframes('XRPUSDT')
+            await engine._compute_indicator_signals(timeframe_data)  # запуск воркеров
+            
+            gaps = []
+            done = asyncio.Event()
+            
+            async def ticker():
+                last = time.monotonic()
+                while not done.is_set():
+                    await asyncio.sleep(0.005)
+                    now = time.monotonic()
+                    gaps.append(now - last)
+                    last = now
+            
+            task = asyncio.create_task(ticker())
+            signals = await engine._compute_indicator_signals(timeframe_data)
+            done.set()
+            await task
+            return signals, gaps
+        
+        try:
+            signals, gaps = asyncio.run(run())
+        finally:
+            engine.close()
+        
+        assert set(signals) == {'1D', '4H', '1H', '15m'}
+        assert len(gaps) > 1
+        assert max(gaps) < 0.1
+    
+    def test_failed_symbol_and_bounded_fetch(self, tmp_path):
+        exchange = ScanExchange(failing_symbols={'ETHUSDT'}, latency={tf: 0.02 for tf in TIMEFRAME_MS})
+        engine = make_engine(tmp_path, exchange=exchange, max_concurrent_symbols=2)
+        
+        results = asyncio.run(engine.analyze_symbols(SYMBOLS))
+        
+        assert results[-1]['symbol'] == 'ETHUSDT'
+        assert 'error' in results[-1]
+        assert all('final_signal' in r for r in results[:-1])
+        assert exchange.max_in_flight <= engine.timeframe_analyzer.max_concurrent_requests
+        assert 'ETHUSDT' in engine.create_scan_report(results)
+    
+    def test_unchanged_timeframes_reused(self, tmp_path):
+        """Пересчитываются только таймфреймы с новым или закрывшимся баром"""
+        exchange = GrowingExchange()
+        engine = make_engine(tmp_path, exchange=exchange)
+        computed = []
+        get_indicator_signals = engine._get_indicator_signals
+        
+        async def counting(timeframe, data, features=None):
+            computed.append(timeframe)
+            return await get_indicator_signals(timeframe, data, features)
+        
+        engine._get_indicator_signals = counting
+        
+        first = asyncio.run(engine.analyze_all_timeframes('XRPUSDT'))
+        assert sorted(computed) == sorted(TIMEFRAMES)
+        
+        computed.clear()
+        second = asyncio.run(engine.analyze_all_timeframes('XRPUSDT'))
+        assert computed == []
+        assert second['timeframe_signals'] == first['timeframe_signals']
+        assert second['final_signal'] == first['final_signal']
+        
+        # Новая свеча 15m: остальные таймфреймы берутся из кэша
+        exchange.hidden['15m'] = 0
+        computed.clear()
+        third = asyncio.run(engine.analyze_all_timeframes('XRPUSDT'))
+        assert computed == ['15m']
+        assert third['timeframe_signals']['1D'] == first['timeframe_signals']['1D']
+        
+        # Кэш привязан к символу
+        computed.clear()
+        asyncio.run(engine.analyze_all_timeframes('BTCUSDT'))
+        assert sorted(computed) == sorted(TIMEFRAMES)
+        
+        engine.reuse_timeframes = False
+        computed.clear()
+        asyncio.run(engine.analyze_all_timeframes('XRPUSDT'))
+        assert sorted(computed) == sorted(TIMEFRAMES)
+    
+    def test_closed_bar_recomputed(self, tmp_path):
+        """Закрытие последнего бара (без нового бара) приводит к пересчету"""
+        engine = make_engine(tmp_path, exchange=GrowingExchange())
+        last_open = (GrowingExchange.START + (GrowingExchange.BARS - 2) * TIMEFRAME_MS['1d']) / 1000
+        engine.clock = lambda: last_open + 3600  # дневной бар еще формируется
+        
+        computed = []
+        get_indicator_signals = engine._get_indicator_signals
+        
+        async def counting(timeframe, data, features=None):
+            computed.append(timeframe)
+            return await get_indicator_signals(timeframe, data, features)
+        
+        engine._get_indicator_signals = counting
+        asyncio.run(engine.analyze_all_timeframes('XRPUSDT'))
+        
+        computed.clear()
+        engine.clock = lambda: last_open + 86_400 + 2
+        asyncio.run(engine.analyze_all_timeframes('XRPUSDT'))
+        assert computed == ['1D']
+    
+    def test_forming_bar_ticks_reuse_closed_bar_timeframes(self, tmp_path):
+        """Тики формирующегося бара 1D не вызывают пересчет 1D, тики 15m - пересчет 15m"""
+        exchange = GrowingExchange()
+        engine = make_engine(tmp_path, exchange=exchange)
+        assert '1D' in engine.closed_bar_timeframes
+        last_open = (GrowingExchange.START + (GrowingExchange.BARS - 2) * TIMEFRAME_MS['1d']) / 1000
+        engine.clock = lambda: last_open + 3600  # дневной бар еще формируется
+        computed = []
+        get_indicator_signals = engine._get_indicator_signals
+        
+        async def counting(timeframe, data, features=None):
+            computed.append(timeframe)
+            return await get_indicator_signals(timeframe, data, features)
+        
+        engine._get_indicator_signals = counting
+        first = asyncio.run(engine.analyze_all_timeframes('XRPUSDT'))
+        
+        candles = exchange.candles
+        ticks = [0]
+        
+        def ticked(timeframe):
+            rows = candles(timeframe)
+            if timeframe in ('1d', '15m'):
+                shift = 1.0 + 0.01 * ticks[0]
+                rows[-1] = rows[-1][:4] + [rows[-1][4] * shift, rows[-1][5] + 50.0 * ticks[0]]
+            return rows
+        
+        exchange.candles = ticked
+        # Несколько 15-минутных опросов подряд, цена и объем бара 1D меняются
+        for poll in range(1, 4):
+            ticks[0] = poll
+            engine.clock = lambda poll=poll: last_open + 3600 + poll * 900
+            computed.clear()
+            result = asyncio.run(engine.analyze_all_timeframes('XRPUSDT'))
+            assert computed == ['15m']
+            assert result['timeframe_signals']['1D']['indicator_signals'] == \
+                first['timeframe_signals']['1D']['indicator_signals']
+            # Текущая цена - с формирующегося бара
+            assert result['timeframe_signals']['1D']['current_price'] != \
+                first['timeframe_signals']['1D']['current_price']
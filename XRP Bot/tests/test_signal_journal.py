@@ -0,0 +1,133 @@
+import pytest
+import sys
+import os
+import gzip
+import asyncio
+import logging
+
+import numpy as np
+
+# Добавление пути для импорта
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.signal_journal import SignalJournal, list_segments, read_records
+from test_signal_engine import make_engine
+
+
+class FakeClock:
+    """Управляемые часы журнала (секунды эпохи)"""
+    
+    def __init__(self, now=1_700_000_000.0):
+        self.now = now
+    
+    def __call__(self):
+        return self.now
+
+
+class TestSignalJournal:
+    """Тесты журнала сигналов"""
+    
+    def test_write_and_read_range(self, tmp_path):
+        clock = FakeClock()
+        journal = SignalJournal(str(tmp_path), clock=clock)
+        for i in range(10):
+            journal.write({'symbol': 'XRPUSDT' if i % 2 else 'BTCUSDT', 'i': i})
+            clock.now += 60
+        assert journal.flush(timeout=5)
+        
+        records = list(journal.read())
+        assert [r['i'] for r in records] == list(range(10))
+        assert records[0]['ts'] == 1_700_000_000_000
+        
+        # [start, end): с третьей по пятую запись
+        start = 1_700_000_000_000 + 2 * 60_000
+        end = 1_700_000_000_000 + 5 * 60_000
+        assert [r['i'] for r in journal.read(start, end)] == [2, 3, 4]
+        assert [r['i'] for r in journal.read(start, end, symbol='XRPUSDT')] == [3]
+        journal.close()
+        
+        # Одна компактная строка на запись
+        (segment,) = os.listdir(tmp_path)
+        lines = (tmp_path / segment).read_bytes().splitlines()
+        assert len(lines) == 10
+        assert lines[0].startswith(b'{"ts":1700000000000,"symbol":"BTCUSDT"')
+        
+        with pytest.raises(RuntimeError):
+            journal.write({'i': 10})
+    
+    def test_rotation_and_compression(self, tmp_path):
+        clock = FakeClock()
+        journal = SignalJournal(str(tmp_path), max_bytes=10_000, max_age=3600, clock=clock)
+        # Ротация по возрасту: сегмент на каждый час
+        for i in range(12):
+            journal.write({'symbol': 'XRPUSDT', 'i': i})
+            clock.now += 900
+        # Ротация по размеру
+        for i in range(12, 20):
+            journal.write({'symbol': 'XRPUSDT', 'i': i, 'payload': 'x' * 4000})
+            clock.now += 1
+        journal.close()
+        
+        segments = list_segments(str(tmp_path))
+        closed = [path for _, last, path in segments if last is not None]
+        assert all(path.endswith('.jsonl.gz') for path in closed)
+        assert len(closed) == 5
+        assert segments[-1][1] is None
+        with gzip.open(closed[0], 'rb') as f:
+            assert len(f.read().splitlines()) == 4
+        
+        assert [r['i'] for r in read_records(str(tmp_path))] == list(range(20))
+        # Второй час: записи 4..7, остальные сегменты не читаются
+        start = 1_700_000_000_000 + 3_600_000
+        assert [r['i'] for r in read_records(str(tmp_path), start, start + 3_600_000)] == [4, 5, 6, 7]
+    
+    def test_writer_survives_errors(self, tmp_path, caplog):
+        """Ошибка записи теряет одну запись: писатель продолжает работу, flush не зависает"""
+        class Unserializable:
+            def __str__(self):
+                raise ValueError("не сериализуется")
+        
+        clock = FakeClock()
+        journal = SignalJournal(str(tmp_path), clock=clock)
+        with caplog.at_level(logging.ERROR, logger='src.signal_journal'):
+            journal.write({'i': 0, 'bad': Unserializable()})
+            clock.now += 1
+            journal.write({'i': 1, 'flag': np.bool_(True), 'score': np.float64(0.5), 'n': np.int64(3)})
+            assert journal.flush(timeout=5)
+        assert 'пропущена' in caplog.text
+        
+        (record,) = journal.read()
+        assert record['i'] == 1
+        # Скаляры numpy - числами и логическими значениями JSON, не строками
+        assert record['flag'] is True and record['score'] == 0.5 and record['n'] == 3
+        assert journal.close(timeout=5)
+    
+    def test_reopen_continues_segment(self, tmp_path):
+        clock = FakeClock()
+        for run in range(2):
+            journal = SignalJournal(str(tmp_path), clock=clock)
+            journal.write({'run': run})
+            clock.now += 1
+            journal.close()
+        
+        assert len(os.listdir(tmp_path)) == 1
+        # Оборванная последняя строка не мешает чтению
+        (segment,) = os.listdir(tmp_path)
+        with open(tmp_path / segment, 'ab') as f:
+            f.write(b'{"ts":1700000000005,"run":')
+        assert [r['run'] for r in read_records(str(tmp_path))] == [0, 1]
+    
+    def test_engine_records_signals(self, tmp_path):
+        engine = make_engine(tmp_path)
+        try:
+            result = asyncio.run(engine.analyze_all_timeframes('XRPUSDT'))
+            engine.record_signals([result, {'symbol': 'BTCUSDT', 'error': 'нет данных'}])
+        finally:
+            engine.close()
+        
+        (record,) = read_records(str(tmp_path / 'signals'))
+        assert record['symbol'] == 'XRPUSDT'
+        assert record['final_signal']['direction'] == result['final_signal']['direction']
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,132 @@
+import pytest
+import pandas as pd
+import numpy as np
+import sys
+import os
+
+# Добавление пути для импорта
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from indicators.rsi import RSIIndicator
+from indicators.macd import MACDIndicator
+from indicators.ema import EMAIndicator
+from indicators.bollinger_bands import BollingerBandsIndicator
+from indicators.stochastic import StochasticIndicator
+from indicators.adx import ADXIndicator
+from indicators.ichimoku import IchimokuIndicator
+from indicators.atr import ATRIndicator
+from indicators.vwap import VWAPIndicator
+from indicators.obv import OBVIndicator
+from indicators.mfi import MFIIndicator
+from indicators.williams_r import WilliamsRIndicator
+from indicators.parabolic_sar import ParabolicSARIndicator
+from indicators.cci import CCIIndicator
+from indicators.keltner_channels import KeltnerChannelsIndicator
+from indicators.volume_profile import VolumeProfileIndicator
+from indicators.base_indicator import SIGNAL_CODES
+
+INDICATORS = {
+    'rsi': lambda: RSIIndicator({'period': 14}, '1H'),
+    'macd': lambda: MACDIndicator({'fast_period': 12, 'slow_period': 26, 'signal_period': 9}, '1H'),
+    'ema_20': lambda: EMAIndicator({'period': 20}, '1H', 20),
+    'bollinger_bands': lambda: BollingerBandsIndicator({'period': 20, 'std_dev': 2}, '1H'),
+    'stochastic': lambda: StochasticIndicator({'k_period': 14, 'd_period': 3}, '1H'),
+    'adx': lambda: ADXIndicator({'period': 14}, '1H'),
+    'ichimoku': lambda: IchimokuIndicator({'tenkan_period': 9, 'kijun_period': 26, 'senkou_b_period': 52}, '1H'),
+    'atr': lambda: ATRIndicator({'period': 14}, '1H'),
+    'vwap': lambda: VWAPIndicator({}, '1H'),
+    'obv': lambda: OBVIndicator({}, '1H'),
+    'mfi': lambda: MFIIndicator({'period': 14}, '1H'),
+    'williams_r': lambda: WilliamsRIndicator({'period': 14}, '1H'),
+    'parabolic_sar': lambda: ParabolicSARIndicator({'start': 0.02, 'increment': 0.02, 'max': 0.2}, '1H'),
+    'cci': lambda: CCIIndicator({'period': 20}, '1H'),
+    'keltner_channels': lambda: KeltnerChannelsIndicator({'ema_period': 20, 'atr_period': 10}, '1H'),
+    'volume_profile': lambda: VolumeProfileIndicator({'num_bins': 20, 'window': 50}, '1H'),
+}
+
+
+def assert_close(streamed, batch):
+    if pd.isna(batch):
+        assert pd.isna(streamed)
+    else:
+        assert streamed == pytest.approx(batch, rel=1e-9, abs=1e-9)
+
+
+class TestStreaming:
+    """Тесты эквивалентности update() и пакетного calculate()"""
+    
+    @pytest.fixture
+    def sample_data(self):
+        """Создание тестовых данных"""
+        np.random.seed(7)
+        n = 120
+        dates = pd.date_range(start='2023-01-01', periods=n, freq='1h')
+        close = 100 + np.cumsum(np.random.normal(0, 1, n))
+        
+        data = pd.DataFrame({
+            'timestamp': dates,
+            'open': close + np.random.normal(0, 0.3, n),
+            'high': close + np.random.uniform(0.1, 2, n),
+            'low': close - np.random.uniform(0.1, 2, n),
+            'close': close,
+            'volume': np.random.uniform(1000, 5000, n)
+        })
+        
+        data.set_index('timestamp', inplace=True)
+        return data
+    
+    @pytest.mark.parametrize('name', sorted(INDICATORS))
+    def test_update_matches_calculate(self, sample_data, name):
+        """Значения и сигналы update() совпадают с calculate() на каждом баре"""
+        indicator = INDICATORS[name]()
+        window = indicator.config.get('window')
+        
+        for i, (_, bar) in enumerate(sample_data.iterrows()):
+            streamed = indicator.update(bar)
+            start = max(0, i + 1 - window) if window else 0
+            history = sample_data.iloc[start:i + 1]
+            
+            batch = indicator.calculate(history)
+            for key, value in batch.items():
+                if np.isscalar(value):
+                    assert_close(streamed[key], value)
+            
+            try:
+                expected_signal = indicator.generate_signal(history)
+            except IndexError:
+                # Недостаточно истории для пакетного сигнала
+                continue
+            assert streamed['signal'] == expected_signal
+    
+    @pytest.mark.parametrize('name', sorted(INDICATORS))
+    def test_generate_signals_matches_generate_signal(self, sample_data, name):
+        """Векторные сигналы совпадают с generate_signal() на каждом префиксе истории"""
+        indicator = INDICATORS[name]()
+        window = indicator.config.get('window')
+        signals = indicator.generate_signals(sample_data)
+        
+        assert signals.dtype == np.int8
+        assert len(signals) == len(sample_data)
+        
+        for i in range(len(sample_data)):
+            start = max(0, i + 1 - window) if window else 0
+            try:
+                expected = SIGNAL_CODES[indicator.generate_signal(sample_data.iloc[start:i + 1])]
+            except IndexError:
+                expected = SIGNAL_CODES["NEUTRAL"]
+            assert signals[i] == expected
+    
+    def test_reset(self, sample_data):
+        """Сброс состояния начинает расчет заново"""
+        indicator = RSIIndicator({'period': 14}, '1H')
+        for _, bar in sample_data.iterrows():
+            first = indicator.update(bar)
+        
+        indicator.reset()
+        for _, bar in sample_data.iterrows():
+            second = indicator.update(bar)
+        
+        assert first == second
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
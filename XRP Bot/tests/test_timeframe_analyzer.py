@@ -0,0 +1,295 @@
+import pytest
+import pandas as pd
+import numpy as np
+import sys
+import os
+import time
+import asyncio
+
+# Добавление пути для импорта
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.timeframe_analyzer import TimeframeAnalyzer
+
+CONFIG = {
+    'api': {'testnet': True, 'rate_limit': 1200},
+    'timeframes': {
+        '1D': {'weight': 0.4, 'priority': 1},
+        '4H': {'weight': 0.3, 'priority': 2},
+        '1H': {'weight': 0.2, 'priority': 3},
+        '15m': {'weight': 0.1, 'priority': 4}
+    }
+}
+
+
+TIMEFRAME_MS = {'1d': 86_400_000, '4h': 14_400_000, '1h': 3_600_000, '15m': 900_000}
+
+
+class FakeExchange:
+    """Локальная заглушка биржи с искусственной задержкой ответа"""
+    
+    def __init__(self, latency=None, failures=(), bars=200):
+        self.latency = latency or {}
+        self.failures = set(failures)
+        self.bars = bars
+        self.calls = []
+    
+    def candles(self, timeframe):
+        """Вся доступная на бирже история таймфрейма"""
+        rng = np.random.default_rng(len(timeframe))
+        close = 0.5 + np.cumsum(rng.normal(0, 0.01, self.bars))
+        start = 1_700_000_000_000
+        step = TIMEFRAME_MS[timeframe]
+        return [
+            [start + i * step, c, c + 0.01, c - 0.01, c, 1000.0 + i]
+            for i, c in enumerate(close)
+        ]
+    
+    def fetch_ohlcv(self, symbol, timeframe, since=None, limit=None):
+        self.calls.append((timeframe, since, limit, time.monotonic()))
+        time.sleep(self.latency.get(timeframe, 0.0))
+        if timeframe in self.failures:
+            raise ConnectionError(f"{timeframe} недоступен")
+        
+        candles = self.candles(timeframe)
+        if since is None:
+            return candles[-limit:]
+        return [c for c in candles if c[0] >= since][:limit]
+
+
+class ResampledExchange(FakeExchange):
+    """Заглушка биржи, у которой старшие таймфреймы - агрегаты свечей 15m
+
+    visible - число уже открывшихся свечей 15m (последняя формируется).
+    """
+    
+    RULES = {'1h': '1h', '4h': '4h', '1d': '1D'}
+    
+    def __init__(self, bars=200 * 96 + 37):
+        super().__init__()
+        self.visible = bars
+        rng = np.random.default_rng(7)
+        total = 210 * 96
+        close = 1.0 + np.cumsum(rng.normal(0, 0.002, total))
+        # Начало - граница суток UTC, как у свечей Binance
+        index = pd.date_range('2023-11-01', periods=total, freq='15min', name='timestamp')
+        self.base = pd.DataFrame({
+            'open': np.r_[close[0], close[:-1]],
+            'high': close + rng.uniform(0, 0.01, total),
+            'low': close - rng.uniform(0, 0.01, total),
+            'close': close,
+            'volume': rng.uniform(100, 1000, total)
+        }, index=index)
+        self.base['high'] = self.base[['open', 'high']].max(axis=1)
+        self.base['low'] = self.base[['open', 'low']].min(axis=1)
+    
+    def frame(self, timeframe):
+        """Свечи таймфрейма, видимые на бирже сейчас"""
+        base = self.base.iloc[:self.visible]
+        if timeframe == '15m':
+            return base
+        return base.resample(self.RULES[timeframe]).agg({
+            'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'
+        })
+    
+    def candles(self, timeframe):
+        data = self.frame(timeframe)
+        timestamps = data.index.asi8 // 1_000_000
+        return [[int(t)] + row for t, row in zip(timestamps, data.to_numpy().tolist())]
+
+
+def make_config(**api):
+    config = dict(CONFIG)
+    config['api'] = {**CONFIG['api'], **api}
+    return config
+
+
+def reference_swings(close, period=5):
+    """Эталонный поиск swing highs/lows прямым перебором"""
+    highs, lows = [], []
+    for i in range(period, len(close) - period):
+        neighbours = [close.iloc[i - j] for j in range(1, period + 1)] + \
+                     [close.iloc[i + j] for j in range(1, period + 1)]
+        if all(close.iloc[i] >= v for v in neighbours):
+            highs.append((i, close.iloc[i]))
+        if all(close.iloc[i] <= v for v in neighbours):
+            lows.append((i, close.iloc[i]))
+    return highs, lows
+
+
+class TestTimeframeAnalyzer:
+    """Тесты для TimeframeAnalyzer"""
+    
+    @pytest.fixture
+    def analyzer(self):
+        return TimeframeAnalyzer(CONFIG)
+    
+    @pytest.fixture
+    def sample_data(self):
+        """Создание тестовых данных (с округлением, чтобы были равные значения)"""
+        np.random.seed(11)
+        n = 300
+        close = np.round(100 + np.cumsum(np.random.normal(0, 1, n)), 0)
+        
+        data = pd.DataFrame({
+            'open': close,
+            'high': np.round(close + np.random.uniform(0, 2, n), 0),
+            'low': np.round(close - np.random.uniform(0, 2, n), 0),
+            'close': close,
+            'volume': np.random.uniform(1000, 5000, n)
+        }, index=pd.date_range(start='2023-01-01', periods=n, freq='1h'))
+        return data
+    
+    def test_market_structure_swings(self, analyzer, sample_data):
+        """Swing highs/lows совпадают с прямым перебором"""
+        structure = analyzer._analyze_market_structure(sample_data)
+        highs, lows = reference_swings(sample_data['close'])
+        
+        assert structure['swing_highs'] == highs
+        assert structure['swing_lows'] == lows
+        assert structure['type'] in ('uptrend', 'downtrend', 'ranging')
+    
+    def test_market_structure_short_history(self, analyzer, sample_data):
+        """На короткой истории swing-точек нет"""
+        structure = analyzer._analyze_market_structure(sample_data.iloc[:10])
+        
+        assert structure == {'type': 'ranging', 'swing_highs': [], 'swing_lows': []}
+    
+    def test_key_levels(self, analyzer, sample_data):
+        """Уровни поддержки/сопротивления совпадают с прямым перебором"""
+        high, low = sample_data['high'], sample_data['low']
+        resistance = [high.iloc[i] for i in range(1, len(high) - 1)
+                      if high.iloc[i] > high.iloc[i - 1] and high.iloc[i] > high.iloc[i + 1]]
+        support = [low.iloc[i] for i in range(1, len(low) - 1)
+                   if low.iloc[i] < low.iloc[i - 1] and low.iloc[i] < low.iloc[i + 1]]
+        
+        levels = analyzer._calculate_key_levels(sample_data)
+        
+        assert levels['resistance'] == resistance[-5:]
+        assert levels['support'] == support[-5:]
+        assert len(levels['fibonacci']) == 7
+
+    def test_concurrent_fetch(self):
+        """Таймфреймы запрашиваются параллельно, а не последовательно"""
+        exchange = FakeExchange(latency={'1d': 0.3, '4h': 0.3, '1h': 0.3, '15m': 0.3})
+        analyzer = TimeframeAnalyzer(make_config(rate_limit=None), exchange=exchange)
+        
+        started = time.monotonic()
+        results = asyncio.run(analyzer.analyze_timeframes('XRP/USDT'))
+        elapsed = time.monotonic() - started
+        
+        assert set(results) == {'1D', '4H', '1H', '15m'}
+        assert all(results[tf] is not None for tf in results)
+        assert elapsed < 0.9  # последовательно было бы >= 1.2 с
+    
+    def test_partial_results(self):
+        """Ошибка и таймаут одного таймфрейма не ломают остальные"""
+        exchange = FakeExchange(latency={'1h': 2.0}, failures={'4h'})
+        analyzer = TimeframeAnalyzer(make_config(rate_limit=None, fetch_timeout=0.5), exchange=exchange)
+        
+        results = asyncio.run(analyzer.analyze_timeframes('XRP/USDT'))
+        
+        assert results['4H'] is None
+        assert results['1H'] is None
+        assert results['1D'] is not None
+        assert results['15m'] is not None
+        assert len(results['15m']['data']) == 200
+    
+    def test_rate_limit_spacing(self):
+        """Старты запросов разнесены согласно api.rate_limit"""
+        exchange = FakeExchange()
+        analyzer = TimeframeAnalyzer(make_config(rate_limit=600), exchange=exchange)  # 0.1 с на запрос
+        
+        asyncio.run(analyzer.analyze_timeframes('XRP/USDT'))
+        
+        starts = sorted(call[-1] for call in exchange.calls)
+        assert len(starts) == 4
+        assert all(b - a >= 0.09 for a, b in zip(starts, starts[1:]))
+
+    def test_candle_cache_delta_fetch(self, tmp_path):
+        """Повторная загрузка запрашивает только новые бары и переживает перезапуск"""
+        config = make_config(rate_limit=None)
+        config['data'] = {'cache_enabled': True, 'cache_path': str(tmp_path / 'candles.sqlite')}
+        exchange = FakeExchange(bars=200)
+        
+        analyzer = TimeframeAnalyzer(config, exchange=exchange)
+        first = asyncio.run(analyzer.fetch_data('XRP/USDT', '15m'))
+        assert exchange.calls[-1][1] is None
+        assert len(first) == 200
+        
+        # Появились три новых бара
+        exchange.bars = 203
+        second = asyncio.run(analyzer.fetch_data('XRP/USDT', '15m'))
+        last_stored = first.index[-1].value // 1_000_000
+        assert exchange.calls[-1][1] == last_stored
+        
+        expected = TimeframeAnalyzer._to_frame(exchange.candles('15m')[-200:])
+        pd.testing.assert_frame_equal(second, expected)
+        
+        # Перезапуск: кэш на диске, снова только дельта
+        restarted = TimeframeAnalyzer(config, exchange=exchange)
+        third = asyncio.run(restarted.fetch_data('XRP/USDT', '15m'))
+        assert exchange.calls[-1][1] == second.index[-1].value // 1_000_000
+        pd.testing.assert_frame_equal(third, expected)
+    
+    def test_fetch_data_returns_copy(self):
+        """Результат fetch_data не меняется при следующих загрузках пары"""
+        exchange = FakeExchange(bars=200)
+        analyzer = TimeframeAnalyzer(make_config(rate_limit=None), exchange=exchange)
+        first = asyncio.run(analyzer.fetch_data('XRP/USDT', '15m'))
+        expected = first.copy()
+        
+        exchange.bars = 203
+        asyncio.run(analyzer.fetch_data('XRP/USDT', '15m'))
+        pd.testing.assert_frame_equal(first, expected)
+    
+    def test_candle_cache_long_gap(self, tmp_path):
+        """После разрыва длиннее окна загружаются последние бары целиком"""
+        config = make_config(rate_limit=None)
+        config['data'] = {'cache_enabled': True, 'cache_path': str(tmp_path / 'candles.sqlite')}
+        exchange = FakeExchange(bars=200)
+        analyzer = TimeframeAnalyzer(config, exchange=exchange)
+        asyncio.run(analyzer.fetch_data('XRP/USDT', '1H'))
+        
+        exchange.bars = 700
+        data = asyncio.run(analyzer.fetch_data('XRP/USDT', '1H'))
+        
+        assert exchange.calls[-1][1] is None
+        expected = TimeframeAnalyzer._to_frame(exchange.candles('1h')[-200:])
+        pd.testing.assert_frame_equal(data, expected)
+    
+    def test_derived_timeframes(self):
+        """Старшие таймфреймы из свечей 15m: один запрос за цикл, те же свечи, что у биржи"""
+        config = make_config(rate_limit=None)
+        config['data'] = {'derive_timeframes': True, 'base_timeframe': '15m'}
+        exchange = ResampledExchange()
+        analyzer = TimeframeAnalyzer(config, exchange=exchange)
+        
+        def check(frames):
+            for timeframe, interval in TimeframeAnalyzer.TIMEFRAME_MAPPING.items():
+                expected = exchange.frame(interval).iloc[-200:]
+                np.testing.assert_allclose(frames[timeframe].to_numpy(), expected.to_numpy())
+                assert frames[timeframe].index.equals(expected.index)
+        
+        # Первый цикл: базовый таймфрейм и bootstrap истории старших (200 свечей 1D)
+        check(asyncio.run(analyzer._fetch_derived('XRP/USDT')))
+        assert sorted(call[0] for call in exchange.calls) == ['15m', '1d', '1h', '4h']
+        
+        # Следующие циклы (в том числе через границу суток): только 15m
+        for _ in range(4):
+            exchange.calls.clear()
+            exchange.visible += 23
+            check(asyncio.run(analyzer._fetch_derived('XRP/USDT')))
+            assert [call[0] for call in exchange.calls] == ['15m']
+        
+        # Разрыв длиннее окна базовых свечей - повторный bootstrap
+        exchange.calls.clear()
+        exchange.visible += 300
+        check(asyncio.run(analyzer._fetch_derived('XRP/USDT')))
+        assert sorted(call[0] for call in exchange.calls) == ['15m', '1d', '1h', '4h']
+        
+        results = asyncio.run(analyzer.analyze_timeframes('XRP/USDT'))
+        assert all(results[timeframe] is not None for timeframe in CONFIG['timeframes'])
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,129 @@
+"""
+Бенчмарк логирования MOEXbot: прежний setup_logger (FileHandler и
+StreamHandler в вызывающем потоке, сообщения f-строками) против очереди
+QueueHandler/QueueListener с ленивым форматированием.
+
+Нагрузка — сообщения цикла: ТОП-10 тикеров и словарь цен. Меряется
+задержка вызова логгера в вызывающем потоке (среднее, p50, p99, максимум),
+пропускная способность до записи всех сообщений на диск, стоимость
+отключенного DEBUG-вызова. Консольный вывод идет в /dev/null.
+
+Запуск из каталога moexbot-app:
+    python -m benchmarks.bench_logging [--records 20000]
+"""
+import argparse
+import contextlib
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.logger import setup_logger, stop_logging
+
+TICKERS = ["SBER", "GAZP", "LKOH", "MTSS", "NVTK", "ROSN", "TATN", "YDEX", "ALRS", "MGNT"]
+PRICES = {ticker: 100.0 + i * 12.34 for i, ticker in enumerate(TICKERS)}
+
+
+def legacy_logger(log_file: str) -> logging.Logger:
+    """setup_logger до перехода на очередь"""
+    logger = logging.getLogger("MOEXbot")
+    logger.setLevel(logging.INFO)
+    logger.handlers.clear()
+    logger.propagate = True
+    formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s', datefmt='%Y-%m-%d %H:%M:%S')
+    file_handler = logging.FileHandler(log_file, encoding='utf-8')
+    file_handler.setFormatter(formatter)
+    logger.addHandler(file_handler)
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(formatter)
+    logger.addHandler(console_handler)
+    return logger
+
+
+def legacy_calls(logger: logging.Logger):
+    logger.info(f"Получен динамический ТОП-10: {TICKERS}")
+    logger.info(f"Получены цены: {PRICES}")
+
+
+def queue_calls(logger: logging.Logger):
+    logger.info("Получен динамический ТОП-10: %s", TICKERS)
+    logger.info("Получены цены: %s", PRICES)
+
+
+def legacy_debug(logger: logging.Logger):
+    logger.debug(f"Получены цены: {PRICES}")
+
+
+def lazy_debug(logger: logging.Logger):
+    logger.debug("Получены цены: %s", PRICES)
+
+
+def measure(logger: logging.Logger, calls, records: int, drain):
+    """Задержки пар вызовов и время до записи всех сообщений на диск"""
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(records // 2):
+        call_started = time.perf_counter_ns()
+        calls(logger)
+        latencies.append((time.perf_counter_ns() - call_started) / 2 / 1000)
+    drain()
+    total = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "mean": statistics.fmean(latencies),
+        "p50": latencies[len(latencies) // 2],
+        "p99": latencies[int(len(latencies) * 0.99)],
+        "max": latencies[-1],
+        "rate": records / total,
+    }
+
+
+def disabled_cost(logger: logging.Logger, call, repeat: int = 100_000) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        call(logger)
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+def run(records: int):
+    rows = []
+    with tempfile.TemporaryDirectory() as directory, open(os.devnull, "w") as devnull:
+        with contextlib.redirect_stderr(devnull):
+            logger = legacy_logger(os.path.join(directory, "legacy.log"))
+
+        def close_legacy():
+            for handler in logger.handlers:
+                handler.flush()
+
+        rows.append(("legacy", measure(logger, legacy_calls, records, close_legacy),
+                     disabled_cost(logger, legacy_debug)))
+        for handler in logger.handlers:
+            handler.close()
+
+        for name, json_lines in (("queue", False), ("queue-json", True)):
+            with contextlib.redirect_stderr(devnull):
+                logger = setup_logger(os.path.join(directory, f"{name}.log"), json_lines=json_lines)
+            rows.append((name, measure(logger, queue_calls, records, stop_logging),
+                         disabled_cost(logger, lazy_debug)))
+
+    print(f"{records} записей; задержка вызова в вызывающем потоке, us")
+    print(f"{'':>11}{'mean':>8}{'p50':>8}{'p99':>8}{'max':>10}{'records/s':>12}{'debug off, us':>15}")
+    for name, stats, debug in rows:
+        print(f"{name:>11}{stats['mean']:>8.2f}{stats['p50']:>8.2f}{stats['p99']:>8.2f}"
+              f"{stats['max']:>10.1f}{stats['rate']:>12.0f}{debug:>15.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Бенчмарк логирования')
+    parser.add_argument('--records', type=int, default=20_000, help='Число сообщений')
+    args = parser.parse_args()
+
+    run(args.records)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,4 +5,4 @@ __version__ = "1.0.0"
 __author__ = "shkoda_y"
 __license__ = "MIT"
 
-__all__ = ["data_parser", "technical_analyzer", "signal_generator", "logger"]
+__all__ = ["iss_client", "turnover_ranking", "data_parser", "indicators", "technical_analyzer", "signal_generator", "scheduler", "logger"]
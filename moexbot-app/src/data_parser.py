@@ -1,17 +1,28 @@
 """
 Парсер данных с открытых источников.
 Получает динамический ТОП-10 и цены.
+
+fetch_market_data — данные цикла из ISS Московской биржи (src.iss_client);
+синхронные fetch_* — офлайн-имитация только для тестов и отладки без сети,
+в работе бота не используются.
 """
+import logging
 import random
-from typing import List, Dict
+import zlib
+from typing import List, Dict, Sequence, Tuple
+
+import numpy as np
+
+from src.iss_client import IssClient, TIMEFRAME_MINUTES
+from src.turnover_ranking import RankingChange, TurnoverRanking
 
 __version__ = "1.0.0"
 
 
 def fetch_top10_tickers() -> List[str]:
     """
-    Имитация получения ТОП-10 тикеров по обороту.
-    В реальности — парсинг с moex.com или investing.com.
+    Имитация получения ТОП-10 тикеров по обороту (только для тестов).
+    В работе бота ТОП ведет refresh_top по снимку ISS.
 
     Returns:
         Список тикеров.
@@ -23,9 +34,18 @@ def fetch_top10_tickers() -> List[str]:
     return random.sample(all_tickers, 10)
 
 
+BASE_PRICES = {
+    "SBER": 300, "GAZP": 150, "LKOH": 7000, "MTSS": 270,
+    "NVTK": 2000, "ROSN": 1200, "TATN": 1400, "YNDX": 5000,
+    "ALRS": 20, "MGNT": 300, "AFKS": 60, "FEES": 500,
+    "PIKK": 2500, "MOEX": 120, "CHMF": 6000
+}
+
+
 def fetch_latest_prices(tickers: List[str]) -> Dict[str, float]:
     """
-    Получает текущие цены.
+    Имитация текущих цен (только для тестов).
+    В работе бота цены запрашивает IssClient.fetch_prices.
 
     Args:
         tickers: Список тикеров.
@@ -33,15 +53,91 @@ def fetch_latest_prices(tickers: List[str]) -> Dict[str, float]:
     Returns:
         Словарь: {тикер: цена}
     """
-    base_prices = {
-        "SBER": 300, "GAZP": 150, "LKOH": 7000, "MTSS": 270,
-        "NVTK": 2000, "ROSN": 1200, "TATN": 1400, "YNDX": 5000,
-        "ALRS": 20, "MGNT": 300, "AFKS": 60, "FEES": 500,
-        "PIKK": 2500, "MOEX": 120, "CHMF": 6000
-    }
     prices = {}
     for ticker in tickers:
-        base = base_prices.get(ticker, 100)
+        base = BASE_PRICES.get(ticker, 100)
         noise = random.uniform(0.98, 1.02)
         prices[ticker] = round(base * noise, 2)
     return prices
+
+
+def fetch_candles(tickers: List[str], timeframes: List[str], bars: int = 250) -> np.ndarray:
+    """
+    Имитация получения свечей OHLCV по тикерам и таймфреймам (для тестов
+    и анализа без сети). В работе бота — IssClient.fetch_candle_batch.
+
+    Свечи детерминированы для пары (тикер, таймфрейм): случайное
+    блуждание вокруг базовой цены с волатильностью по длительности свечи.
+
+    Args:
+        tickers: Список тикеров.
+        timeframes: Таймфреймы ("15m", "1h", "4h", "1d").
+        bars: Число свечей на ряд.
+
+    Returns:
+        Массив (тикеры, таймфреймы, bars, 5): open, high, low, close, volume.
+    """
+    candles = np.empty((len(tickers), len(timeframes), bars, 5))
+    for i, ticker in enumerate(tickers):
+        for j, tf in enumerate(timeframes):
+            rng = np.random.default_rng(zlib.crc32(f"{ticker}:{tf}".encode()))
+            sigma = 0.002 * np.sqrt(TIMEFRAME_MINUTES[tf] / 15)
+            close = BASE_PRICES.get(ticker, 100) * np.exp(np.cumsum(rng.normal(0, sigma, bars)))
+            open_ = np.concatenate([close[:1], close[:-1]])
+            spread = close * rng.uniform(0, sigma, bars)
+            candles[i, j, :, 0] = open_
+            candles[i, j, :, 1] = np.maximum(open_, close) + spread
+            candles[i, j, :, 2] = np.minimum(open_, close) - spread
+            candles[i, j, :, 3] = close
+            candles[i, j, :, 4] = rng.uniform(1e5, 1e6, bars)
+    return candles
+
+
+async def refresh_top(client: IssClient, ranking: TurnoverRanking) -> Tuple[RankingChange, Dict[str, Dict[str, float]]]:
+    """
+    Обновление ТОПа по обороту из снимка рынка.
+
+    Args:
+        client: Клиент ISS.
+        ranking: Рейтинг, который живет между обновлениями.
+
+    Returns:
+        (изменение состава ТОПа, снимок рынка).
+    """
+    snapshot = await client.fetch_snapshot()
+    change = ranking.update({ticker: data["turnover"] for ticker, data in snapshot.items()}, full=True)
+    if change:
+        logging.getLogger("MOEXbot").info("ТОП-%d: вошли %s, вышли %s", ranking.size, change.entered, change.left)
+    return change, snapshot
+
+
+async def fetch_market_data(client: IssClient, ranking: TurnoverRanking,
+                            timeframes: Sequence[str] = ("15m", "1h", "4h", "1d"),
+                            bars: int = 250, refresh: bool = True) -> Tuple[List[str], Dict[str, float], np.ndarray]:
+    """
+    Данные цикла анализа из ISS.
+
+    При обновлении ТОП и цены берутся из одного снимка всего режима торгов.
+    Без обновления состав ТОПа прежний, и запрашиваются только цены его
+    тикеров. Затем свечи всех тикеров и таймфреймов запрашиваются параллельно.
+
+    Args:
+        client: Клиент ISS.
+        ranking: Рейтинг по обороту (размер ТОПа — ranking.size).
+        timeframes: Таймфреймы свечей.
+        bars: Число свечей на ряд.
+        refresh: Обновить ТОП по снимку рынка (всегда, если ТОП еще пуст
+            или у его тикера нет цены).
+
+    Returns:
+        (тикеры ТОПа по убыванию оборота, {тикер: цена}, свечи (тикеры, таймфреймы, bars, 5)).
+    """
+    tickers = ranking.members
+    prices = {} if refresh or not tickers else await client.fetch_prices(tickers)
+    if not tickers or len(prices) < len(tickers):
+        # Без сделок по тикеру ТОПа цены нет: ТОП пересобирается по снимку
+        _, snapshot = await refresh_top(client, ranking)
+        tickers = ranking.members
+        prices = {ticker: snapshot[ticker]["last"] for ticker in tickers}
+    candles = await client.fetch_candle_batch(tickers, timeframes, bars)
+    return tickers, prices, candles
@@ -0,0 +1,361 @@
+"""
+Векторный расчет 16 индикаторов по пакету свечей.
+
+Все тикеры и таймфреймы считаются одним проходом: свечи передаются
+массивом (..., бары, 5) с колонками open, high, low, close, volume,
+и каждый индикатор считается сразу для всех рядов пакета.
+Голос индикатора на последнем баре: 1 — BUY, -1 — SELL, 0 — нет сигнала.
+"""
+from typing import Any, Callable, Dict, List, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+__version__ = "1.0.0"
+
+BUY = 1
+SELL = -1
+NEUTRAL = 0
+
+# Колонки массива свечей
+OPEN, HIGH, LOW, CLOSE, VOLUME = range(5)
+
+# Пороги стохастика и период сигнальной линии OBV (нет в конфигурации)
+STOCHASTIC_OVERBOUGHT = 80
+STOCHASTIC_OVERSOLD = 20
+OBV_SIGNAL_PERIOD = 20
+
+
+def ewm(x: np.ndarray, alpha: Any) -> np.ndarray:
+    """
+    Экспоненциальное сглаживание по последней оси (как pandas ewm(adjust=False)).
+
+    Рекурсия идет циклом по барам, но каждый шаг — одна операция NumPy
+    над всеми рядами и всеми коэффициентами сразу.
+
+    Args:
+        x: Ряды (..., бары).
+        alpha: Коэффициент сглаживания, число или массив, совместимый
+            по форме с x[..., 0] (например, (K, 1) — K сглаживаний сразу).
+
+    Returns:
+        Массив формы broadcast(x[..., 0], alpha) + (бары,).
+    """
+    alpha = np.asarray(alpha, dtype=float)
+    shape = np.broadcast_shapes(x.shape[:-1], alpha.shape)
+    # Ось времени — первой: каждый шаг читает и пишет непрерывный блок
+    weighted = np.moveaxis(np.broadcast_to(alpha[..., np.newaxis] * x, shape + x.shape[-1:]), -1, 0).copy()
+    decay = 1.0 - alpha
+    weighted[0] = np.broadcast_to(x[..., 0], shape)
+    for i in range(1, len(weighted)):
+        weighted[i] += decay * weighted[i - 1]
+    return np.moveaxis(weighted, 0, -1)
+
+
+def _vote(buy: np.ndarray, sell: np.ndarray) -> np.ndarray:
+    """Голоса из масок BUY и SELL (BUY побеждает при совпадении)"""
+    return np.where(buy, BUY, np.where(sell, SELL, NEUTRAL)).astype(np.int8)
+
+
+class BatchContext:
+    """
+    Общие промежуточные ряды пакета: EMA, сглаживания Уайлдера.
+
+    Каждый ряд считается один раз на пакет, даже если нужен нескольким
+    индикаторам (EMA 21 — двум парам EMA, ATR 14 — ATR и ADX).
+    """
+
+    def __init__(self, candles: np.ndarray):
+        self.open = candles[..., OPEN]
+        self.high = candles[..., HIGH]
+        self.low = candles[..., LOW]
+        self.close = candles[..., CLOSE]
+        self.volume = candles[..., VOLUME]
+        self._ema: Dict[int, np.ndarray] = {}
+        self._wilder: Dict[int, Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+
+    def prepare_ema(self, periods: List[int]):
+        """EMA цены закрытия для всех periods одним проходом"""
+        missing = sorted(set(periods) - set(self._ema))
+        if not missing:
+            return
+        alphas = 2.0 / (np.array(missing, dtype=float) + 1.0)
+        smoothed = ewm(self.close[np.newaxis], alphas.reshape((-1,) + (1,) * (self.close.ndim - 1)))
+        for period, series in zip(missing, smoothed):
+            self._ema[period] = series
+
+    def ema(self, period: int) -> np.ndarray:
+        """EMA цены закрытия (ряды целиком)"""
+        self.prepare_ema([period])
+        return self._ema[period]
+
+    def wilder(self, period: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """ATR, +DM и -DM, сглаженные по Уайлдеру (alpha = 1/period), без первого бара"""
+        if period not in self._wilder:
+            high, low, close = self.high, self.low, self.close
+            prev_close = close[..., :-1]
+            true_range = np.maximum(
+                high[..., 1:] - low[..., 1:],
+                np.maximum(np.abs(high[..., 1:] - prev_close), np.abs(low[..., 1:] - prev_close))
+            )
+            up = high[..., 1:] - high[..., :-1]
+            down = low[..., :-1] - low[..., 1:]
+            plus_dm = np.where((up > down) & (up > 0), up, 0.0)
+            minus_dm = np.where((down > up) & (down > 0), down, 0.0)
+            atr, plus, minus = ewm(np.stack([true_range, plus_dm, minus_dm]), 1.0 / period)
+            self._wilder[period] = (atr, plus, minus)
+        return self._wilder[period]
+
+    def window(self, series: np.ndarray, length: int, count: int = 1) -> np.ndarray:
+        """Последние count окон длины length: массив (..., count, length)"""
+        return sliding_window_view(series[..., -(length + count - 1):], length, axis=-1)
+
+
+def ema_cross(ctx: BatchContext, params: Dict[str, Any]) -> np.ndarray:
+    """Пересечение EMA: быстрая выше медленной — BUY, ниже — SELL"""
+    fast = ctx.ema(params["fast"])[..., -1]
+    slow = ctx.ema(params["slow"])[..., -1]
+    return _vote(fast > slow, fast < slow)
+
+
+def macd(ctx: BatchContext, params: Dict[str, Any]) -> np.ndarray:
+    """MACD выше сигнальной линии — BUY, ниже — SELL"""
+    line = ctx.ema(params["fast"]) - ctx.ema(params["slow"])
+    signal = ewm(line, 2.0 / (params["signal"] + 1.0))
+    return _vote(line[..., -1] > signal[..., -1], line[..., -1] < signal[..., -1])
+
+
+def rsi(ctx: BatchContext, params: Dict[str, Any]) -> np.ndarray:
+    """RSI ниже уровня перепроданности — BUY, выше перекупленности — SELL"""
+    delta = np.diff(ctx.close, axis=-1)
+    gain, loss = ewm(np.stack([np.maximum(delta, 0.0), np.maximum(-delta, 0.0)]), 1.0 / params["period"])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        value = np.where(loss[..., -1] > 0, 100.0 - 100.0 / (1.0 + gain[..., -1] / loss[..., -1]), 100.0)
+    return _vote(value < params["oversold"], value > params["overbought"])
+
+
+def stochastic(ctx: BatchContext, params: Dict[str, Any]) -> np.ndarray:
+    """%K выше %D вне зоны перекупленности — BUY, ниже вне зоны перепроданности — SELL"""
+    k, d, smooth = params["k"], params["d"], params["smooth"]
+    count = smooth + d - 1
+    highest = ctx.window(ctx.high, k, count).max(axis=-1)
+    lowest = ctx.window(ctx.low, k, count).min(axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        raw = np.where(highest > lowest, 100.0 * (ctx.close[..., -count:] - lowest) / (highest - lowest), 50.0)
+    slow_k = sliding_window_view(raw, smooth, axis=-1).mean(axis=-1)
+    k_value, d_value = slow_k[..., -1], slow_k.mean(axis=-1)
+    return _vote(
+        (k_value > d_value) & (k_value < STOCHASTIC_OVERBOUGHT),
+        (k_value < d_value) & (k_value > STOCHASTIC_OVERSOLD)
+    )
+
+
+def williams_r(ctx: BatchContext, params: Dict[str, Any]) -> np.ndarray:
+    """Williams %R ниже -80 — BUY, выше -20 — SELL"""
+    highest = ctx.window(ctx.high, params["period"])[..., -1, :].max(axis=-1)
+    lowest = ctx.window(ctx.low, params["period"])[..., -1, :].min(axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        value = np.where(highest > lowest, -100.0 * (highest - ctx.close[..., -1]) / (highest - lowest), -50.0)
+    return _vote(value < -80.0, value > -20.0)
+
+
+def obv(ctx: BatchContext, params: Dict[str, Any]) -> np.ndarray:
+    """OBV выше своей средней — BUY, ниже — SELL"""
+    flow = np.sign(np.diff(ctx.close[..., -(OBV_SIGNAL_PERIOD + 1):], axis=-1)) * ctx.volume[..., -OBV_SIGNAL_PERIOD:]
+    # Уровень OBV важен только относительно своей средней: считаем с начала окна
+    balance = np.cumsum(flow, axis=-1)
+    average = balance.mean(axis=-1)
+    return _vote(balance[..., -1] > average, balance[..., -1] < average)
+
+
+def volume_ma(ctx: BatchContext, params: Dict[str, Any]) -> np.ndarray:
+    """Объем выше средней подтверждает направление последней свечи"""
+    active = ctx.volume[..., -1] > ctx.volume[..., -params["period"]:].mean(axis=-1)
+    return _vote(active & (ctx.close[..., -1] > ctx.open[..., -1]), active & (ctx.close[..., -1] < ctx.open[..., -1]))
+
+
+def atr(ctx: BatchContext, params: Dict[str, Any]) -> np.ndarray:
+    """Движение цены за period баров больше ATR — голос по его направлению"""
+    period = params["period"]
+    value = ctx.wilder(period)[0][..., -1]
+    move = ctx.close[..., -1] - ctx.close[..., -1 - period]
+    return _vote(move > value, move < -value)
+
+
+def bollinger_bands(ctx: BatchContext, params: Dict[str, Any]) -> np.ndarray:
+    """Закрытие ниже нижней полосы — BUY, выше верхней — SELL"""
+    window = ctx.close[..., -params["period"]:]
+    middle = window.mean(axis=-1)
+    width = params["stdev"] * window.std(axis=-1)
+    close = ctx.close[..., -1]
+    return _vote(close < middle - width, close > middle + width)
+
+
+def keltner_channel(ctx: BatchContext, params: Dict[str, Any]) -> np.ndarray:
+    """Пробой канала Кельтнера вверх — BUY, вниз — SELL"""
+    period = params["period"]
+    middle = ctx.ema(period)[..., -1]
+    width = params["multiplier"] * ctx.wilder(period)[0][..., -1]
+    close = ctx.close[..., -1]
+    return _vote(close > middle + width, close < middle - width)
+
+
+def ichimoku(ctx: BatchContext, params: Dict[str, Any]) -> np.ndarray:
+    """Цена над облаком и Тенкан выше Киджуна — BUY, под облаком и ниже — SELL"""
+    tenkan, kijun, senkou_b = params["tenkan"], params["kijun"], params["senkou_b"]
+
+    def midpoint(period: int, shift: int = 0) -> np.ndarray:
+        end = ctx.high.shape[-1] - shift
+        return (ctx.high[..., end - period:end].max(axis=-1) + ctx.low[..., end - period:end].min(axis=-1)) / 2
+
+    conversion, base = midpoint(tenkan), midpoint(kijun)
+    # Облако на текущем баре построено kijun баров назад
+    span_a = (midpoint(tenkan, kijun) + midpoint(kijun, kijun)) / 2
+    span_b = midpoint(senkou_b, kijun)
+    close = ctx.close[..., -1]
+    return _vote(
+        (close > np.maximum(span_a, span_b)) & (conversion > base),
+        (close < np.minimum(span_a, span_b)) & (conversion < base)
+    )
+
+
+def pivot_points(ctx: BatchContext, params: Dict[str, Any]) -> np.ndarray:
+    """Закрытие выше классического пивота предыдущего бара — BUY, ниже — SELL"""
+    method = params.get("method", "standard")
+    if method != "standard":
+        raise ValueError(f"Неподдерживаемый метод Pivot Points: {method}")
+    pivot = (ctx.high[..., -2] + ctx.low[..., -2] + ctx.close[..., -2]) / 3
+    close = ctx.close[..., -1]
+    return _vote(close > pivot, close < pivot)
+
+
+def fibonacci_retracement(ctx: BatchContext, params: Dict[str, Any]) -> np.ndarray:
+    """Откат в зону уровней Фибоначчи: в восходящем движении — BUY, в нисходящем — SELL"""
+    high = ctx.high[..., -params["lookback"]:]
+    low = ctx.low[..., -params["lookback"]:]
+    highest, lowest = high.max(axis=-1), low.min(axis=-1)
+    span = highest - lowest
+    # Движение вверх, если максимум окна обновлен позже минимума
+    rising = high.argmax(axis=-1) > low.argmin(axis=-1)
+    shallow, deep = min(params["levels"]), max(params["levels"])
+    close = ctx.close[..., -1]
+    in_up_zone = (close <= highest - shallow * span) & (close >= highest - deep * span)
+    in_down_zone = (close >= lowest + shallow * span) & (close <= lowest + deep * span)
+    return _vote(rising & in_up_zone & (span > 0), ~rising & in_down_zone & (span > 0))
+
+
+def adx(ctx: BatchContext, params: Dict[str, Any]) -> np.ndarray:
+    """ADX выше порога: +DI выше -DI — BUY, ниже — SELL; слабый тренд — без голоса"""
+    period = params["period"]
+    true_range, plus, minus = ctx.wilder(period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        plus_di = np.where(true_range > 0, 100.0 * plus / true_range, 0.0)
+        minus_di = np.where(true_range > 0, 100.0 * minus / true_range, 0.0)
+        total = plus_di + minus_di
+        dx = np.where(total > 0, 100.0 * np.abs(plus_di - minus_di) / total, 0.0)
+    strength = ewm(dx, 1.0 / period)[..., -1]
+    trending = strength > params["threshold"]
+    return _vote(trending & (plus_di[..., -1] > minus_di[..., -1]), trending & (plus_di[..., -1] < minus_di[..., -1]))
+
+
+# Расчет голоса по типу индикатора из config/indicators.json
+INDICATOR_VOTES: Dict[str, Callable[[BatchContext, Dict[str, Any]], np.ndarray]] = {
+    "EMA": ema_cross,
+    "MACD": macd,
+    "RSI": rsi,
+    "Stochastic": stochastic,
+    "Williams %R": williams_r,
+    "OBV": obv,
+    "Volume MA": volume_ma,
+    "ATR": atr,
+    "Bollinger Bands": bollinger_bands,
+    "Keltner Channel": keltner_channel,
+    "Ichimoku": ichimoku,
+    "Pivot Points": pivot_points,
+    "Fibonacci Retracement": fibonacci_retracement,
+    "ADX": adx,
+}
+
+
+def indicator_bars(params: Dict[str, Any]) -> int:
+    """
+    Число последних баров, которые читает индикатор.
+
+    EMA и сглаживания Уайлдера считаются на любой длине, но сходятся
+    только на истории в несколько своих периодов: пересечение EMA голосует
+    не раньше медленного периода, MACD — медленного периода и сигнальной линии.
+    """
+    kind = params["type"]
+    if kind == "EMA":
+        return max(params["fast"], params["slow"])
+    if kind == "MACD":
+        return max(params["fast"], params["slow"]) + params["signal"]
+    if kind == "Ichimoku":
+        return params["kijun"] + params["senkou_b"]
+    if kind == "Stochastic":
+        return params["k"] + params["smooth"] + params["d"]
+    if kind == "OBV":
+        return OBV_SIGNAL_PERIOD + 1
+    return max([2] + [params[key] + 1 for key in ("period", "lookback") if key in params])
+
+
+def required_bars(indicators: List[Dict[str, Any]]) -> int:
+    """Минимальная длина истории для всех индикаторов конфигурации"""
+    return max([2] + [indicator_bars(params) for params in indicators])
+
+
+def finite_tail(candles: np.ndarray) -> np.ndarray:
+    """Число последних баров каждого ряда без пропусков (NaN, inf)"""
+    bad = ~np.isfinite(candles).all(axis=-1)
+    bars = candles.shape[-2]
+    # Индекс последнего бара с пропуском; -1, если пропусков нет
+    last_bad = bars - 1 - np.argmax(bad[..., ::-1], axis=-1)
+    return np.where(bad.any(axis=-1), bars - 1 - last_bad, bars)
+
+
+def compute_votes(candles: np.ndarray, indicators: List[Dict[str, Any]]) -> np.ndarray:
+    """
+    Голоса всех индикаторов конфигурации на последнем баре.
+
+    Args:
+        candles: Свечи (..., бары, 5): open, high, low, close, volume.
+            Короткие ряды дополнены спереди NaN: индикатор голосует 0,
+            если пропуск попадает в окно его последних indicator_bars баров.
+        indicators: Описания индикаторов (список "indicators" из indicators.json).
+
+    Returns:
+        Массив int8 (..., число индикаторов) из BUY/SELL/NEUTRAL.
+
+    Raises:
+        ValueError: Истории меньше required_bars или неизвестный тип индикатора.
+    """
+    candles = np.asarray(candles, dtype=float)
+    bars = candles.shape[-2]
+    if bars < required_bars(indicators):
+        raise ValueError(f"Недостаточно баров для индикаторов: {bars} < {required_bars(indicators)}")
+
+    unknown = [params["type"] for params in indicators if params["type"] not in INDICATOR_VOTES]
+    if unknown:
+        raise ValueError(f"Неизвестные индикаторы: {unknown}")
+
+    # Бары до последнего пропуска заменяются первым полным баром: рекурсивные
+    # ряды (EMA, Уайлдер) стартуют с него, как на ряде без дополнения
+    tail = finite_tail(candles)
+    bars_index = np.arange(bars)
+    first = np.minimum(bars - tail, bars - 1)[..., np.newaxis]
+    filled = np.take_along_axis(candles, np.maximum(bars_index, first)[..., np.newaxis], axis=-2)
+
+    ctx = BatchContext(filled)
+    # Все EMA цены закрытия — одним проходом по барам
+    periods = []
+    for params in indicators:
+        if params["type"] in ("EMA", "MACD"):
+            periods += [params["fast"], params["slow"]]
+        elif params["type"] == "Keltner Channel":
+            periods.append(params["period"])
+    ctx.prepare_ema(periods)
+
+    votes = np.stack([INDICATOR_VOTES[params["type"]](ctx, params) for params in indicators], axis=-1)
+    needed = np.array([indicator_bars(params) for params in indicators])
+    votes[tail[..., np.newaxis] < needed] = NEUTRAL
+    return votes
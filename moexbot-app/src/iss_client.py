@@ -0,0 +1,376 @@
+"""
+Асинхронный клиент ISS Московской биржи (REST/JSON, iss.moex.com).
+
+Все запросы идут через одну сессию aiohttp с пулом keep-alive соединений
+и выполняются параллельно: время цикла определяется самым медленным
+запросом, а не суммой. Снимок рынка — один запрос на весь режим торгов,
+цены тикеров — запросы на несколько бумаг сразу (параметр securities),
+свечи — по запросу на страницу истории бумаги. Ответы кэшируются с TTL.
+"""
+import asyncio
+import logging
+import math
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import aiohttp
+import numpy as np
+
+__version__ = "1.0.0"
+
+ISS_URL = "https://iss.moex.com/iss"
+BOARD = "TQBR"
+
+# Интервалы свечей ISS и их длительность, минуты
+ISS_INTERVALS = {1: 1, 10: 10, 60: 60, 24: 1440}
+# Длительность свечей таймфреймов бота, минуты
+TIMEFRAME_MINUTES = {"15m": 15, "1h": 60, "4h": 240, "1d": 1440}
+# Интервал ISS, из свечей которого собирается таймфрейм: самый крупный,
+# на который делится длительность (15m и 4h в ISS нет; 15 не кратно 10,
+# поэтому 15m — из минутных). Полная история минуток грузится один раз,
+# дальше каждый цикл догружает одну свежую страницу
+TIMEFRAME_SOURCES = {"15m": 1, "1h": 60, "4h": 60, "1d": 24}
+
+# Поля marketdata ISS -> ключи снимка рынка
+MARKETDATA_FIELDS = {"LAST": "last", "VALTODAY": "turnover", "VOLTODAY": "volume"}
+CANDLE_COLUMNS = ("begin", "open", "high", "low", "close", "volume")
+# Строк свечей на странице ответа ISS
+PAGE_SIZE = 500
+
+
+class IssError(Exception):
+    """Ошибка запроса к ISS."""
+
+
+def parse_table(payload: Dict[str, Any], block: str) -> List[Dict[str, Any]]:
+    """
+    Блок ответа ISS ({"columns": [...], "data": [[...]]}) в список словарей.
+
+    Args:
+        payload: Разобранный JSON ответа.
+        block: Имя блока (marketdata, candles, ...).
+
+    Returns:
+        Строки блока.
+
+    Raises:
+        IssError: В ответе нет блока.
+    """
+    try:
+        table = payload[block]
+        columns = table["columns"]
+        return [dict(zip(columns, row)) for row in table["data"]]
+    except (KeyError, TypeError) as e:
+        raise IssError(f"В ответе ISS нет блока {block}") from e
+
+
+def parse_candles(payload: Dict[str, Any]) -> np.ndarray:
+    """
+    Свечи ответа ISS в массив (n, 6): время начала (с эпохи, МСК), open, high, low, close, volume.
+
+    Args:
+        payload: Разобранный JSON ответа candles.
+
+    Returns:
+        Массив свечей в порядке ответа.
+    """
+    rows = parse_table(payload, "candles")
+    candles = np.empty((len(rows), 6))
+    if rows:
+        candles[:, 0] = np.array([row["begin"] for row in rows], dtype="datetime64[s]").astype(np.int64)
+        candles[:, 1:] = [[row[column] for column in CANDLE_COLUMNS[1:]] for row in rows]
+    return candles
+
+
+def resample(candles: np.ndarray, minutes: int) -> np.ndarray:
+    """
+    Свечи старшего таймфрейма из свечей младшего.
+
+    Границы периодов отсчитываются от полуночи, поэтому 15m и 4h
+    совпадают с сеткой свечей в терминалах.
+
+    Args:
+        candles: Массив (n, 6) по возрастанию времени, как у parse_candles.
+        minutes: Длительность свечи результата, минуты.
+
+    Returns:
+        Массив (m, 6) того же формата; первая свеча может быть неполной.
+    """
+    if not len(candles):
+        return candles
+    periods = candles[:, 0] - candles[:, 0] % (minutes * 60)
+    first = np.flatnonzero(np.concatenate([[True], np.diff(periods) != 0]))
+    last = np.concatenate([first[1:] - 1, [len(candles) - 1]])
+
+    result = np.empty((len(first), 6))
+    result[:, 0] = periods[first]
+    result[:, 1] = candles[first, 1]
+    result[:, 2] = np.maximum.reduceat(candles[:, 2], first)
+    result[:, 3] = np.minimum.reduceat(candles[:, 3], first)
+    result[:, 4] = candles[last, 4]
+    result[:, 5] = np.add.reduceat(candles[:, 5], first)
+    return result
+
+
+class IssClient:
+    """
+    Клиент ISS с пулом соединений и кэшем ответов.
+
+    Одинаковые запросы в пределах TTL (в том числе одновременные) делят
+    один HTTP-запрос. Свечи запрашиваются в обратном порядке
+    (iss.reverse), поэтому все страницы нужной глубины истории известны
+    заранее и уходят параллельно. История бумаг хранится между циклами:
+    повторный запрос догружает только новые свечи.
+
+    Args:
+        base_url: Адрес ISS.
+        board: Режим торгов.
+        ttl: Время жизни ответов в кэше, секунды.
+        batch_size: Бумаг в одном запросе цен.
+        max_connections: Размер пула соединений.
+        timeout: Таймаут запроса, секунды.
+        page_size: Строк на странице свечей (как у сервера).
+        clock: Источник времени для TTL.
+    """
+
+    def __init__(self, base_url: str = ISS_URL, board: str = BOARD, ttl: float = 30.0,
+                 batch_size: int = 50, max_connections: int = 20, timeout: float = 10.0,
+                 page_size: int = PAGE_SIZE, clock: Callable[[], float] = time.monotonic):
+        self.base_url = base_url.rstrip("/")
+        self.board = board
+        self.ttl = ttl
+        self.batch_size = batch_size
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.page_size = page_size
+        self.clock = clock
+        self.logger = logging.getLogger("MOEXbot")
+
+        self._session: Optional[aiohttp.ClientSession] = None
+        # (путь, параметры) -> (момент истечения, задача запроса)
+        self._cache: Dict[Tuple[str, Tuple], Tuple[float, asyncio.Task]] = {}
+        # (бумага, интервал ISS) -> свечи по возрастанию времени
+        self._history: Dict[Tuple[str, int], np.ndarray] = {}
+
+    async def __aenter__(self) -> "IssClient":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """Сессия создается при первом запросе — внутри работающего event loop."""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_connections, ttl_dns_cache=300),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                raise_for_status=False,
+            )
+        return self._session
+
+    async def close(self):
+        """Закрытие сессии и пула соединений."""
+        for _, task in self._cache.values():
+            task.cancel()
+        self._cache.clear()
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def get_json(self, path: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        GET-запрос к ISS с кэшем ответов на ttl секунд.
+
+        Args:
+            path: Путь относительно base_url (например, "/engines/stock/...json").
+            params: Параметры запроса.
+
+        Returns:
+            Разобранный JSON.
+
+        Raises:
+            IssError: Ошибка сети, таймаут или статус ответа не 200.
+        """
+        params = {"iss.meta": "off", **(params or {})}
+        key = (path, tuple(sorted(params.items())))
+        now = self.clock()
+
+        cached = self._cache.get(key)
+        if cached is not None and cached[0] > now:
+            task = cached[1]
+        else:
+            task = asyncio.ensure_future(self._request(path, params))
+            self._cache[key] = (now + self.ttl, task)
+            self._evict(now)
+
+        try:
+            return await asyncio.shield(task)
+        except IssError:
+            # Ошибки не кэшируются
+            if self._cache.get(key, (None, None))[1] is task:
+                del self._cache[key]
+            raise
+
+    async def _request(self, path: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        url = self.base_url + path
+        try:
+            async with self.session.get(url, params=params) as response:
+                if response.status != 200:
+                    raise IssError(f"ISS ответил {response.status}: {url}")
+                return await response.json(content_type=None)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            raise IssError(f"Запрос к ISS не выполнен: {url}: {e!r}") from e
+
+    def _evict(self, now: float):
+        """Удаление истекших ответов, когда кэш заметно вырос."""
+        if len(self._cache) > 1024:
+            for key in [key for key, (expires, task) in self._cache.items() if expires <= now and task.done()]:
+                del self._cache[key]
+
+    def _marketdata(self, payload: Dict[str, Any]) -> Dict[str, Dict[str, float]]:
+        snapshot = {}
+        for row in parse_table(payload, "marketdata"):
+            if row.get("LAST") is None:
+                # Сделок по бумаге сегодня не было
+                continue
+            snapshot[row["SECID"]] = {
+                key: float(row.get(field) or 0.0) for field, key in MARKETDATA_FIELDS.items()
+            }
+        return snapshot
+
+    async def fetch_snapshot(self) -> Dict[str, Dict[str, float]]:
+        """
+        Снимок всего режима торгов одним запросом.
+
+        Returns:
+            {тикер: {"last": цена, "turnover": оборот, руб., "volume": объем, шт.}}
+            по бумагам со сделками сегодня.
+        """
+        payload = await self.get_json(
+            f"/engines/stock/markets/shares/boards/{self.board}/securities.json",
+            {"iss.only": "marketdata", "marketdata.columns": ",".join(["SECID", *MARKETDATA_FIELDS])},
+        )
+        return self._marketdata(payload)
+
+    async def fetch_prices(self, tickers: Sequence[str]) -> Dict[str, float]:
+        """
+        Последние цены тикеров: запросы по batch_size бумаг, параллельно.
+
+        Args:
+            tickers: Тикеры.
+
+        Returns:
+            {тикер: цена} по тикерам, для которых есть сделки.
+        """
+        batches = [tickers[i:i + self.batch_size] for i in range(0, len(tickers), self.batch_size)]
+        payloads = await asyncio.gather(*(
+            self.get_json(
+                f"/engines/stock/markets/shares/boards/{self.board}/securities.json",
+                {
+                    "iss.only": "marketdata",
+                    "marketdata.columns": ",".join(["SECID", *MARKETDATA_FIELDS]),
+                    "securities": ",".join(batch),
+                },
+            )
+            for batch in batches
+        ))
+        prices = {}
+        for payload in payloads:
+            prices.update({ticker: data["last"] for ticker, data in self._marketdata(payload).items()})
+        return {ticker: prices[ticker] for ticker in tickers if ticker in prices}
+
+    async def _candle_page(self, ticker: str, interval: int, page: int) -> np.ndarray:
+        payload = await self.get_json(
+            f"/engines/stock/markets/shares/boards/{self.board}/securities/{ticker}/candles.json",
+            {
+                "interval": interval,
+                "iss.reverse": "true",
+                "start": page * self.page_size,
+                "candles.columns": ",".join(CANDLE_COLUMNS),
+            },
+        )
+        return parse_candles(payload)
+
+    async def fetch_candles(self, ticker: str, interval: int, rows: int) -> np.ndarray:
+        """
+        Последние rows свечей бумаги (последняя может быть формирующейся).
+
+        Первый запрос грузит все страницы истории параллельно; далее
+        догружается только первая (самая свежая) страница — если она
+        перекрывается с сохраненной историей.
+
+        Args:
+            ticker: Тикер.
+            interval: Интервал ISS (1, 10, 60, 24).
+            rows: Число свечей.
+
+        Returns:
+            Массив (n, 6) по возрастанию времени, n <= rows (меньше — если
+            история бумаги короче).
+        """
+        if interval not in ISS_INTERVALS:
+            raise ValueError(f"Интервал ISS {interval} не поддерживается: {sorted(ISS_INTERVALS)}")
+        key = (ticker, interval)
+        history = self._history.get(key)
+
+        if history is not None and len(history) >= rows:
+            latest = (await self._candle_page(ticker, interval, 0))[::-1]
+            if len(latest) and latest[0, 0] <= history[-1, 0]:
+                history = np.concatenate([history[history[:, 0] < latest[0, 0]], latest])
+                self._history[key] = history[-rows:]
+                return self._history[key]
+
+        pages = await asyncio.gather(*(
+            self._candle_page(ticker, interval, page) for page in range(math.ceil(rows / self.page_size))
+        ))
+        history = np.concatenate(pages)[::-1] if pages else np.empty((0, 6))
+        self._history[key] = history[-rows:]
+        return self._history[key]
+
+    async def fetch_candle_batch(self, tickers: Sequence[str], timeframes: Sequence[str],
+                                 bars: int) -> np.ndarray:
+        """
+        Свечи тикеров по таймфреймам бота — все ряды параллельно.
+
+        Таймфреймы с общим интервалом ISS (1h и 4h) грузятся одним рядом.
+        Ряд, который не удалось получить, заполняется NaN (индикаторы по
+        нему нейтральны), и ошибка пишется в лог.
+
+        Args:
+            tickers: Тикеры.
+            timeframes: Таймфреймы ("15m", "1h", "4h", "1d").
+            bars: Число свечей на ряд.
+
+        Returns:
+            Массив (тикеры, таймфреймы, bars, 5): open, high, low, close, volume;
+            при короткой истории начало ряда — NaN.
+        """
+        rows: Dict[int, int] = {}
+        for tf in timeframes:
+            interval = TIMEFRAME_SOURCES[tf]
+            # +1 свеча таймфрейма: первая собранная может быть неполной
+            needed = (bars + 1) * TIMEFRAME_MINUTES[tf] // ISS_INTERVALS[interval]
+            rows[interval] = max(rows.get(interval, 0), needed)
+
+        series = [(ticker, interval) for ticker in tickers for interval in rows]
+        results = await asyncio.gather(
+            *(self.fetch_candles(ticker, interval, rows[interval]) for ticker, interval in series),
+            return_exceptions=True,
+        )
+        loaded = dict(zip(series, results))
+
+        candles = np.full((len(tickers), len(timeframes), bars, 5), np.nan)
+        for i, ticker in enumerate(tickers):
+            for j, tf in enumerate(timeframes):
+                interval = TIMEFRAME_SOURCES[tf]
+                history = loaded[(ticker, interval)]
+                if isinstance(history, BaseException):
+                    self.logger.warning("Свечи %s (%s) не получены: %s", ticker, tf, history)
+                    continue
+                if TIMEFRAME_MINUTES[tf] != ISS_INTERVALS[interval]:
+                    history = resample(history, TIMEFRAME_MINUTES[tf])
+                history = history[-bars:]
+                if len(history):
+                    candles[i, j, bars - len(history):] = history[:, 1:]
+        return candles
@@ -1,39 +1,164 @@
 """
 Модуль логирования для MOEXbot.
+
+Вызов логгера только ставит запись в очередь (QueueHandler); форматирование
+и запись в файл и консоль выполняет фоновый поток QueueListener, поэтому
+ввод-вывод логов не задерживает цикл анализа.
 """
+import atexit
+import json
 import logging
+import logging.handlers
+import os
+import queue
+import time
+from datetime import datetime
 from pathlib import Path
+from typing import Callable, Optional
 
 __version__ = "1.0.0"
 
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class RotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """
+    Файл логов с ротацией по размеру и по времени.
+
+    Файл закрывается в moexbot.log.1 (старые сдвигаются до backup_count),
+    когда достигает max_bytes или наступает граница интервала от полуночи.
+    Размер проверяется по позиции в файле без повторного форматирования
+    записи, как в logging.handlers.RotatingFileHandler.
 
-def setup_logger(log_file: str = "logs/moexbot.log") -> logging.Logger:
+    Args:
+        filename: Путь к файлу логов.
+        max_bytes: Размер файла для ротации (0 — без ротации по размеру).
+        backup_count: Число хранимых закрытых файлов.
+        interval: Период ротации, секунды (None — без ротации по времени).
+        clock: Источник времени.
+    """
+
+    def __init__(self, filename: str, max_bytes: int = 0, backup_count: int = 0,
+                 interval: Optional[float] = None, encoding: str = "utf-8",
+                 clock: Callable[[], float] = time.time):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count,
+                         encoding=encoding, delay=True)
+        self.interval = interval
+        self.clock = clock
+        self.rollover_at = self._next_rollover()
+
+    def _next_rollover(self) -> Optional[float]:
+        if not self.interval:
+            return None
+        now = self.clock()
+        midnight = datetime.fromtimestamp(now).replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
+        return midnight + ((now - midnight) // self.interval + 1) * self.interval
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if self.rollover_at is not None and self.clock() >= self.rollover_at:
+            return True
+        if self.maxBytes <= 0:
+            return False
+        if self.stream is None:
+            self.stream = self._open()
+        return self.stream.tell() >= self.maxBytes and os.path.isfile(self.baseFilename)
+
+    def doRollover(self):
+        super().doRollover()
+        self.rollover_at = self._next_rollover()
+
+
+class JsonFormatter(logging.Formatter):
+    """Запись лога — строка JSON: время, уровень, логгер, сообщение, исключение."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": self.formatTime(record, self.datefmt),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class LazyQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler без форматирования в вызывающем потоке.
+
+    Стандартный prepare() склеивает сообщение с аргументами до постановки в
+    очередь — то есть в цикле анализа. Здесь запись уходит в очередь как
+    есть (очередь внутри процесса, pickle не нужен), а сообщение собирается
+    в потоке QueueListener. Поэтому аргументы записи не должны меняться
+    после вызова логгера.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def stop_logging():
+    """Запись оставшихся в очереди сообщений и остановка фонового потока."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+def setup_logger(log_file: str = "logs/moexbot.log", max_bytes: int = 10 * 1024 * 1024,
+                 backup_count: int = 5, rotate_hours: Optional[float] = 24,
+                 json_lines: bool = False, level: int = logging.INFO) -> logging.Logger:
     """
     Настраивает логгер с цветным выводом в консоль и записью в файл.
 
     Args:
         log_file: Путь к файлу логов.
+        max_bytes: Размер файла для ротации, байты (0 — без ротации по размеру).
+        backup_count: Число хранимых закрытых файлов логов.
+        rotate_hours: Период ротации, часы от полуночи (None — без ротации по времени).
+        json_lines: Писать файл в формате JSON Lines вместо текста.
+        level: Уровень логгера.
 
     Returns:
         Настроенный экземпляр Logger.
     """
+    global _listener
     logger = logging.getLogger("MOEXbot")
-    logger.setLevel(logging.INFO)
+    logger.setLevel(level)
+    # Все записи уходят в очередь: обработчики корневого логгера форматировали
+    # бы их повторно в вызывающем потоке
+    logger.propagate = False
 
     if logger.handlers:
         logger.handlers.clear()
+    stop_logging()
 
     formatter = logging.Formatter(
         '%(asctime)s - %(levelname)s - %(message)s',
         datefmt='%Y-%m-%d %H:%M:%S'
     )
 
-    file_handler = logging.FileHandler(log_file, encoding='utf-8')
-    file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
+    Path(log_file).parent.mkdir(parents=True, exist_ok=True)
+    file_handler = RotatingFileHandler(
+        log_file, max_bytes=max_bytes, backup_count=backup_count,
+        interval=rotate_hours * 3600 if rotate_hours else None
+    )
+    file_handler.setFormatter(JsonFormatter(datefmt='%Y-%m-%dT%H:%M:%S') if json_lines else formatter)
 
     console_handler = logging.StreamHandler()
     console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    logger.addHandler(LazyQueueHandler(log_queue))
+    _listener = logging.handlers.QueueListener(
+        log_queue, file_handler, console_handler, respect_handler_level=True
+    )
+    _listener.start()
 
     return logger
+
+
+atexit.register(stop_logging)
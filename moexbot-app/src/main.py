@@ -1,47 +1,84 @@
 """
 MOEXbot — бот-аналитик ТОП-10 Московской биржи.
 """
-import time
+import asyncio
 import logging
+from typing import Dict, List, Tuple
+
+import numpy as np
+
 from src.logger import setup_logger
-from src.data_parser import fetch_top10_tickers, fetch_latest_prices
-from src.technical_analyzer import analyze_ticker
+from src.data_parser import fetch_market_data
+from src.iss_client import IssClient
+from src.scheduler import CycleScheduler
+from src.turnover_ranking import TurnoverRanking
+from src.technical_analyzer import analyze_batch, TIMEFRAMES, HISTORY_BARS
 from src.signal_generator import generate_signal
 
 __version__ = "1.0.0"
 
+# ТОП по обороту обновляется раз в столько циклов (снимок всего режима
+# торгов); в остальных циклах запрашиваются только цены тикеров ТОПа
+TOP_REFRESH_CYCLES = 4
 
-def main():
-    logger = setup_logger()
-    logger.info("Бот запущен. Начинаем цикл анализа каждые 15 минут.")
 
-    while True:
-        try:
-            logger.info("=== Начинаем новый цикл анализа ===")
+def analyze(data: Tuple[List[str], Dict[str, float], np.ndarray]) -> str:
+    """
+    Стадия анализа: все тикеры и таймфреймы — одним векторным проходом.
+
+    Args:
+        data: (тикеры, цены, свечи) из fetch_market_data.
 
-            tickers = fetch_top10_tickers()
-            logger.info(f"Получен динамический ТОП-10: {tickers}")
+    Returns:
+        Текст сигнала.
+    """
+    tickers, prices, candles = data
+    analysis = analyze_batch(candles, tickers)
+    logging.getLogger("MOEXbot").info("Технический анализ завершён.")
+    return generate_signal(analysis, prices)
 
-            prices = fetch_latest_prices(tickers)
-            logger.info(f"Получены цены: {prices}")
 
-            analysis = {}
-            for s in tickers:
-                analysis[s] = analyze_ticker(s)
-            logger.info("Технический анализ завершён.")
+async def run(scheduler: CycleScheduler):
+    """
+    Работа бота: циклы по расписанию сессий биржи.
 
-            signal = generate_signal(analysis, prices)
-            print(signal)
+    Args:
+        scheduler: Планировщик циклов.
+    """
+    logger = logging.getLogger("MOEXbot")
+    # Сессия ISS и ее пул соединений живут всё время работы
+    client = IssClient()
+    ranking = TurnoverRanking(10)
+    cycles = 0
 
-            logger.info("=== Цикл завершён. Ожидание 15 минут... ===")
-            time.sleep(15 * 60)
+    async def fetch():
+        nonlocal cycles
+        logger.info("=== Начинаем новый цикл анализа ===")
+        data = await fetch_market_data(client, ranking, TIMEFRAMES, HISTORY_BARS,
+                                       refresh=cycles % TOP_REFRESH_CYCLES == 0)
+        cycles += 1
+        # Аргументы форматируются в потоке логов, цены — только при DEBUG
+        logger.info("Получен динамический ТОП-10: %s", data[0])
+        logger.debug("Получены цены: %s", data[1])
+        return data
+
+    try:
+        await scheduler.run(fetch, analyze, print)
+    finally:
+        await client.close()
+        logger.info("Метрики циклов: %s", scheduler.metrics.summary())
+
+
+def main():
+    logger = setup_logger()
+    scheduler = CycleScheduler.from_config()
+    logger.info("Бот запущен. Циклы анализа каждые %.0f минут в торговые сессии Мосбиржи.",
+                scheduler.interval / 60)
 
-        except KeyboardInterrupt:
-            logger.info("Работа бота остановлена пользователем.")
-            break
-        except Exception as e:
-            logger.error(f"Ошибка: {e}")
-            time.sleep(60)
+    try:
+        asyncio.run(run(scheduler))
+    except KeyboardInterrupt:
+        logger.info("Работа бота остановлена пользователем.")
 
 
 if __name__ == "__main__":
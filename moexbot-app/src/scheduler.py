@@ -0,0 +1,373 @@
+"""
+Планировщик циклов анализа по торговому календарю Московской биржи.
+
+Циклы запускаются на границах свечей (по умолчанию 15 минут) только
+внутри торговых сессий; ночи, выходные и праздники пропускаются.
+Загрузка, анализ и отчет — отдельные стадии конвейера, связанные
+очередями: загрузка следующего цикла не ждет отчета предыдущего.
+"""
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from concurrent.futures import Executor
+from datetime import date, datetime, time as dtime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterable, List, Optional, Sequence, Tuple
+
+__version__ = "1.0.0"
+
+CONFIG_DIR = Path(__file__).parent.parent / "config"
+with open(CONFIG_DIR / "schedule.json", "r", encoding="utf-8") as f:
+    SCHEDULE_CONFIG = json.load(f)
+
+# Дальше этого горизонта торговый день ищется как ошибка календаря
+MAX_LOOKAHEAD_DAYS = 31
+
+_FAILED = object()
+
+
+def _parse_time(value: str) -> dtime:
+    hours, minutes = value.split(":")
+    return dtime(int(hours), int(minutes))
+
+
+class SessionCalendar:
+    """
+    Торговые сессии биржи и границы свечей цикла.
+
+    Границы свечей отсчитываются от полуночи по времени биржи. Граница t
+    — момент цикла, если свеча (t - интервал, t] пересекается с сессией:
+    первая граница дня — после открытия, последняя — закрывает свечу с
+    концом сессии.
+
+    Args:
+        sessions: Сессии торгового дня [(начало, конец)] по времени биржи.
+        interval_minutes: Длительность свечи цикла, минуты.
+        trading_weekdays: Торговые дни недели (0 — понедельник).
+        holidays: Неторговые даты среди торговых дней недели.
+        workdays: Торговые даты среди выходных.
+        tz: Часовой пояс биржи.
+    """
+
+    def __init__(self, sessions: Sequence[Tuple[dtime, dtime]], interval_minutes: int = 15,
+                 trading_weekdays: Iterable[int] = range(5), holidays: Iterable[date] = (),
+                 workdays: Iterable[date] = (), tz: timezone = timezone(timedelta(hours=3))):
+        if 1440 % interval_minutes:
+            raise ValueError(f"Интервал {interval_minutes} мин не делит сутки на равные свечи")
+        self.sessions = sorted(sessions)
+        self.step = timedelta(minutes=interval_minutes)
+        self.trading_weekdays = set(trading_weekdays)
+        self.holidays = set(holidays)
+        self.workdays = set(workdays)
+        self.tz = tz
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "SessionCalendar":
+        """
+        Календарь по config/schedule.json.
+
+        Args:
+            config: Разобранный конфиг расписания.
+
+        Returns:
+            Календарь сессий.
+        """
+        return cls(
+            [(_parse_time(start), _parse_time(end)) for start, end in config["sessions"]],
+            interval_minutes=config.get("interval_minutes", 15),
+            trading_weekdays=config.get("trading_weekdays", range(5)),
+            holidays=[date.fromisoformat(day) for day in config.get("holidays", [])],
+            workdays=[date.fromisoformat(day) for day in config.get("workdays", [])],
+            tz=timezone(timedelta(hours=config.get("utc_offset_hours", 3))),
+        )
+
+    def is_trading_day(self, day: date) -> bool:
+        if day in self.workdays:
+            return True
+        return day.weekday() in self.trading_weekdays and day not in self.holidays
+
+    def sessions_on(self, day: date) -> List[Tuple[datetime, datetime]]:
+        """Сессии даты day: [(начало, конец)] с часовым поясом биржи."""
+        if not self.is_trading_day(day):
+            return []
+        return [
+            (datetime.combine(day, start, self.tz), datetime.combine(day, end, self.tz))
+            for start, end in self.sessions
+        ]
+
+    def is_open(self, moment: datetime) -> bool:
+        """Идут ли торги в момент moment."""
+        moment = moment.astimezone(self.tz)
+        return any(start <= moment < end for start, end in self.sessions_on(moment.date()))
+
+    def next_cycle(self, after: datetime) -> datetime:
+        """
+        Первая граница свечи цикла строго после after.
+
+        Args:
+            after: Момент времени (с часовым поясом).
+
+        Returns:
+            Граница свечи с часовым поясом биржи.
+
+        Raises:
+            RuntimeError: Торговых сессий нет на MAX_LOOKAHEAD_DAYS дней вперед.
+        """
+        after = after.astimezone(self.tz)
+        for offset in range(MAX_LOOKAHEAD_DAYS):
+            day = after.date() + timedelta(days=offset)
+            midnight = datetime.combine(day, dtime(), self.tz)
+            for start, end in self.sessions_on(day):
+                first = midnight + self.step * ((start - midnight) // self.step + 1)
+                last = midnight - self.step * ((midnight - end) // self.step)
+                candidate = max(first, midnight + self.step * ((after - midnight) // self.step + 1))
+                if candidate <= last:
+                    return candidate
+        raise RuntimeError(f"Нет торговых сессий в ближайшие {MAX_LOOKAHEAD_DAYS} дней после {after}")
+
+
+class CycleMetrics:
+    """
+    Метрики циклов: длительности стадий, опоздание старта, переполнения.
+
+    Длительности хранятся за последние window циклов (по умолчанию —
+    торговый день 15-минутных циклов).
+    """
+
+    STAGES = ("lag", "fetch", "analyze", "report", "cycle")
+
+    def __init__(self, window: int = 96):
+        self.cycles = 0
+        self.overruns = 0
+        self.skipped = 0
+        self.errors = 0
+        self.durations: Dict[str, Deque[float]] = {stage: deque(maxlen=window) for stage in self.STAGES}
+
+    def record(self, stage: str, seconds: float):
+        self.durations[stage].append(seconds)
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Сводка для логов и мониторинга.
+
+        Returns:
+            Счетчики и {стадия: {"last", "mean", "max"}} в секундах.
+        """
+        result: Dict[str, Any] = {
+            "cycles": self.cycles, "overruns": self.overruns,
+            "skipped": self.skipped, "errors": self.errors,
+        }
+        for stage, values in self.durations.items():
+            if values:
+                result[stage] = {
+                    "last": values[-1], "mean": sum(values) / len(values), "max": max(values),
+                }
+        return result
+
+
+class Cycle:
+    """Данные одного цикла между стадиями конвейера."""
+
+    __slots__ = ("number", "scheduled", "data", "result", "timings")
+
+    def __init__(self, number: int, scheduled: float, data: Any, timings: Dict[str, float]):
+        self.number = number
+        self.scheduled = scheduled
+        self.data = data
+        self.result: Any = None
+        # Длительности стадий этого цикла (циклы на стадиях перекрываются)
+        self.timings = timings
+
+
+class CycleScheduler:
+    """
+    Асинхронный конвейер загрузка → анализ → отчет по календарю сессий.
+
+    Цикл стартует через grace секунд после границы свечи (свеча успевает
+    закрыться в источнике данных). Стадии связаны очередями на один
+    элемент: пока анализируется цикл N, загрузка уже может ждать цикл
+    N + 1, а анализ в пуле потоков не блокирует event loop. Если цикл не
+    успел до следующей границы, он считается переполнением, а пропущенные
+    границы не наверстываются — следующий цикл берет свежие данные.
+
+    Args:
+        calendar: Календарь сессий.
+        grace: Задержка старта после границы свечи, секунды.
+        retry: Пауза перед повтором неудачной загрузки, секунды.
+        run_on_start: Первый цикл сразу при запуске, если торги идут.
+        clock: Источник времени (секунды эпохи).
+        sleep: Асинхронное ожидание (подменяется в тестах).
+        max_sleep: Максимальный шаг ожидания: переход часов или пробуждение
+            после сна системы не сдвигает расписание дольше, чем на шаг.
+        executor: Пул для стадии анализа (по умолчанию — пул потоков event loop).
+    """
+
+    def __init__(self, calendar: SessionCalendar, grace: float = 5.0, retry: float = 60.0,
+                 run_on_start: bool = True, clock: Callable[[], float] = time.time,
+                 sleep: Callable[[float], Awaitable[None]] = asyncio.sleep, max_sleep: float = 60.0,
+                 executor: Optional[Executor] = None):
+        self.calendar = calendar
+        self.grace = grace
+        self.retry = retry
+        self.run_on_start = run_on_start
+        self.clock = clock
+        self.sleep = sleep
+        self.max_sleep = max_sleep
+        self.executor = executor
+        self.metrics = CycleMetrics()
+        self.logger = logging.getLogger("MOEXbot")
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any] = SCHEDULE_CONFIG) -> "CycleScheduler":
+        """
+        Планировщик по config/schedule.json.
+
+        Args:
+            config: Разобранный конфиг расписания.
+
+        Returns:
+            Планировщик.
+        """
+        return cls(
+            SessionCalendar.from_config(config),
+            grace=config.get("grace_seconds", 5.0),
+            retry=config.get("retry_seconds", 60.0),
+            run_on_start=config.get("run_on_start", True),
+        )
+
+    @property
+    def interval(self) -> float:
+        return self.calendar.step.total_seconds()
+
+    def next_tick(self, after: float) -> float:
+        """Момент старта следующего цикла (секунды эпохи) строго после after."""
+        boundary = self.calendar.next_cycle(datetime.fromtimestamp(after - self.grace, self.calendar.tz))
+        return boundary.timestamp() + self.grace
+
+    async def run(self, fetch: Callable[[], Awaitable[Any]], analyze: Callable[[Any], Any],
+                  report: Callable[[Any], None], stop: Optional[asyncio.Event] = None):
+        """
+        Работа конвейера до установки stop.
+
+        Args:
+            fetch: Загрузка данных цикла (корутина).
+            analyze: Анализ данных (синхронный, выполняется в пуле потоков).
+            report: Отчет по результату анализа (синхронный).
+            stop: Событие остановки; после него дорабатывают начатые циклы.
+        """
+        stop = stop or asyncio.Event()
+        fetched: asyncio.Queue = asyncio.Queue(maxsize=1)
+        analyzed: asyncio.Queue = asyncio.Queue(maxsize=1)
+        consumers = [
+            asyncio.ensure_future(self._analyze_stage(analyze, fetched, analyzed)),
+            asyncio.ensure_future(self._report_stage(report, analyzed)),
+        ]
+        try:
+            await self._fetch_stage(fetch, fetched, stop)
+            await fetched.join()
+            await analyzed.join()
+        finally:
+            for task in consumers:
+                task.cancel()
+            await asyncio.gather(*consumers, return_exceptions=True)
+
+    async def _wait_until(self, moment: float, stop: asyncio.Event) -> bool:
+        """Ожидание момента шагами до max_sleep; False — если установлен stop."""
+        while not stop.is_set():
+            delay = moment - self.clock()
+            if delay <= 0:
+                return True
+            await self.sleep(min(delay, self.max_sleep))
+        return False
+
+    async def _fetch_stage(self, fetch: Callable[[], Awaitable[Any]], output: asyncio.Queue,
+                           stop: asyncio.Event):
+        now = self.clock()
+        opened = self.calendar.is_open(datetime.fromtimestamp(now, self.calendar.tz))
+        tick = now if self.run_on_start and opened else self.next_tick(now)
+        number = 0
+
+        while await self._wait_until(tick, stop):
+            if not opened:
+                self.logger.info("Торги открыты: циклы по расписанию сессии")
+                opened = True
+            number += 1
+            started = self.clock()
+            data = await self._fetch(fetch, tick, stop)
+            if data is not _FAILED:
+                timings = {"lag": started - tick, "fetch": self.clock() - started}
+                # Ждет, пока анализ заберет предыдущий цикл
+                await output.put(Cycle(number, tick, data, timings))
+
+            expected = self.next_tick(tick)
+            tick = self.next_tick(max(tick, self.clock()))
+            while expected < tick:
+                self.metrics.skipped += 1
+                self.logger.warning("Пропущен цикл %s: предыдущий не успел",
+                                    datetime.fromtimestamp(expected, self.calendar.tz))
+                expected = self.next_tick(expected)
+            if tick - self.clock() > self.interval:
+                self.logger.info("Торги закрыты, следующий цикл %s",
+                                 datetime.fromtimestamp(tick, self.calendar.tz))
+                opened = False
+
+    async def _fetch(self, fetch: Callable[[], Awaitable[Any]], tick: float, stop: asyncio.Event) -> Any:
+        """Загрузка с повторами, пока повтор успевает до следующего цикла."""
+        deadline = self.next_tick(tick)
+        while True:
+            try:
+                return await fetch()
+            except Exception as e:
+                self.metrics.errors += 1
+                self.logger.error("Ошибка загрузки данных: %s", e)
+                retry_at = self.clock() + self.retry
+                if retry_at >= deadline or not await self._wait_until(retry_at, stop):
+                    return _FAILED
+
+    async def _analyze_stage(self, analyze: Callable[[Any], Any], source: asyncio.Queue,
+                             output: asyncio.Queue):
+        loop = asyncio.get_running_loop()
+        while True:
+            cycle = await source.get()
+            try:
+                started = self.clock()
+                cycle.result = await loop.run_in_executor(self.executor, analyze, cycle.data)
+                cycle.timings["analyze"] = self.clock() - started
+                await output.put(cycle)
+            except Exception as e:
+                self.metrics.errors += 1
+                self.logger.error("Ошибка анализа цикла %d: %s", cycle.number, e)
+            finally:
+                source.task_done()
+
+    async def _report_stage(self, report: Callable[[Any], None], source: asyncio.Queue):
+        while True:
+            cycle = await source.get()
+            try:
+                started = self.clock()
+                report(cycle.result)
+                finished = self.clock()
+                cycle.timings["report"] = finished - started
+                self._finish(cycle, finished)
+            except Exception as e:
+                self.metrics.errors += 1
+                self.logger.error("Ошибка отчета цикла %d: %s", cycle.number, e)
+            finally:
+                source.task_done()
+
+    def _finish(self, cycle: Cycle, finished: float):
+        timings = cycle.timings
+        timings["cycle"] = duration = finished - cycle.scheduled
+        self.metrics.cycles += 1
+        for stage, seconds in timings.items():
+            self.metrics.record(stage, seconds)
+        if duration > self.interval:
+            self.metrics.overruns += 1
+            self.logger.warning("Цикл %d длился %.1f с — дольше интервала %.0f с",
+                                cycle.number, duration, self.interval)
+        self.logger.info(
+            "Цикл %d: %.2f с (опоздание %.2f, загрузка %.2f, анализ %.2f, отчет %.2f)",
+            cycle.number, duration, timings["lag"], timings["fetch"], timings["analyze"], timings["report"]
+        )
@@ -3,7 +3,11 @@
 """
 import json
 from pathlib import Path
-from typing import Dict, Tuple
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.indicators import BUY, SELL, compute_votes
 
 __version__ = "1.0.0"
 
@@ -12,36 +16,80 @@ with open(CONFIG_DIR / "indicators.json", "r", encoding="utf-8") as f:
     INDICATORS_CONFIG = json.load(f)
 
 TIMEFRAMES = INDICATORS_CONFIG["timeframes"]
+INDICATORS = INDICATORS_CONFIG["indicators"]
+MINIMUM_AGREEMENT = INDICATORS_CONFIG["confirmation"]["minimum_agreement"]
+
+# История на ряд: EMA 200 должна успеть сойтись
+HISTORY_BARS = 250
+
+
+def classify(buy: int, sell: int) -> str:
+    """
+    Текстовый сигнал таймфрейма по числу голосов.
+
+    Args:
+        buy: Число индикаторов за покупку.
+        sell: Число индикаторов за продажу.
+
+    Returns:
+        Сигнал для отчета.
+    """
+    if buy >= MINIMUM_AGREEMENT:
+        return "🟢 СИЛЬНЫЙ КОНСЕНСУС: ПОКУПКИ"
+    if sell >= MINIMUM_AGREEMENT:
+        return "🔴 СИЛЬНЫЙ КОНСЕНСУС: ПРОДАЖИ"
+    if buy > sell:
+        return "🟢 Растёт, но с коррекцией"
+    if sell > buy:
+        return "🔴 ПРОДАЖИ доминируют"
+    return "⚪️ Нейтрально / Шум"
 
 
-def analyze_ticker(symbol: str) -> Dict[str, Tuple[int, int, str]]:
+def analyze_batch(candles: np.ndarray, tickers: List[str],
+                  timeframes: Optional[List[str]] = None) -> Dict[str, Dict[str, Tuple[int, int, str]]]:
+    """
+    Анализ всех тикеров и таймфреймов одним векторным проходом.
+
+    Args:
+        candles: Свечи (тикеры, таймфреймы, бары, 5): open, high, low, close, volume.
+        tickers: Тикеры в порядке первой оси.
+        timeframes: Таймфреймы в порядке второй оси (по умолчанию TIMEFRAMES).
+
+    Returns:
+        {тикер: {таймфрейм: (BUY, SELL, сигнал)}}
+    """
+    timeframes = timeframes or TIMEFRAMES
+    if candles.shape[:2] != (len(tickers), len(timeframes)):
+        raise ValueError(
+            f"Форма свечей {candles.shape[:2]} не совпадает с "
+            f"({len(tickers)} тикеров, {len(timeframes)} таймфреймов)"
+        )
+
+    votes = compute_votes(candles, INDICATORS)
+    buys = (votes == BUY).sum(axis=-1).tolist()
+    sells = (votes == SELL).sum(axis=-1).tolist()
+
+    return {
+        symbol: {
+            tf: (buys[i][j], sells[i][j], classify(buys[i][j], sells[i][j]))
+            for j, tf in enumerate(timeframes)
+        }
+        for i, symbol in enumerate(tickers)
+    }
+
+
+def analyze_ticker(symbol: str, candles: Optional[np.ndarray] = None) -> Dict[str, Tuple[int, int, str]]:
     """
     Анализ тикера.
 
     Args:
         symbol: Тикер.
+        candles: Свечи тикера (таймфреймы, бары, 5); по умолчанию — из data_parser.
 
     Returns:
         {таймфрейм: (BUY, SELL, сигнал)}
     """
-    patterns = {
-        "SBER": {"trend": "up", "volatility": "medium"},
-        "YNDX": {"trend": "up", "volatility": "high"},
-        "GAZP": {"trend": "down", "volatility": "low"},
-        "TATN": {"trend": "up", "volatility": "low"},
-    }
-    pattern = patterns.get(symbol, {"trend": "neutral"})
-
-    result = {}
-    for tf in TIMEFRAMES:
-        if pattern["trend"] == "up":
-            buy, sell = (14, 2) if tf == "4h" else (9, 7)
-            signal = "🟢 СИЛЬНЫЙ КОНСЕНСУС: ПОКУПКИ" if tf == "4h" else "🟢 Растёт, но с коррекцией"
-        elif pattern["trend"] == "down":
-            buy, sell = 5, 11
-            signal = "🔴 ПРОДАЖИ доминируют"
-        else:
-            buy, sell = 8, 8
-            signal = "⚪️ Нейтрально / Шум"
-        result[tf] = (buy, sell, signal)
-    return result
+    if candles is None:
+        from src.data_parser import fetch_candles
+        candles = fetch_candles([symbol], TIMEFRAMES, HISTORY_BARS)[0]
+    return analyze_batch(np.asarray(candles)[np.newaxis], [symbol])[symbol]
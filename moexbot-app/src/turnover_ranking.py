@@ -0,0 +1,185 @@
+"""
+Инкрементальный ТОП-N инструментов по обороту.
+"""
+import heapq
+import itertools
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Set, Tuple
+
+__version__ = "1.0.0"
+
+
+class RankingChange(NamedTuple):
+    """Изменение состава ТОПа: вошедшие и выбывшие тикеры."""
+    entered: List[str]
+    left: List[str]
+
+    def __bool__(self) -> bool:
+        return bool(self.entered or self.left)
+
+
+class TurnoverRanking:
+    """
+    ТОП-N по обороту без пересортировки всего рынка.
+
+    Участники ТОПа хранятся в min-куче (наверху — худший участник),
+    остальные инструменты — в max-куче (наверху — лучший претендент).
+    Обновление оборота кладет в кучу новую запись, старая становится
+    недействительной по метке и выбрасывается при выходе наверх; затем
+    худший участник и лучший претендент меняются местами, пока претендент
+    больше. Пакет из k изменений стоит O(k log U) для U инструментов,
+    неизменившиеся обороты полного снимка в кучи не попадают.
+
+    При равном обороте место остается за прежним участником — состав не
+    «дребезжит» на равных значениях.
+
+    Args:
+        size: Размер ТОПа.
+    """
+
+    def __init__(self, size: int = 10):
+        if size < 1:
+            raise ValueError(f"Размер ТОПа должен быть положительным: {size}")
+        self.size = size
+        self._values: Dict[str, float] = {}
+        self._members: Set[str] = set()
+        # Действующая метка записи тикера в куче; записи с другой меткой устарели
+        self._stamps: Dict[str, int] = {}
+        self._counter = itertools.count()
+        self._top: List[Tuple[float, str, int]] = []
+        self._rest: List[Tuple[float, str, int]] = []
+
+    def __len__(self) -> int:
+        return len(self._members)
+
+    def __contains__(self, ticker: str) -> bool:
+        return ticker in self._members
+
+    @property
+    def members(self) -> List[str]:
+        """Участники ТОПа по убыванию оборота."""
+        return sorted(self._members, key=lambda ticker: (-self._values[ticker], ticker))
+
+    def turnover(self, ticker: str) -> float:
+        """Последний известный оборот тикера."""
+        return self._values[ticker]
+
+    def update(self, turnover: Mapping[str, float], full: bool = False) -> RankingChange:
+        """
+        Учет оборотов снимка или дельты.
+
+        Args:
+            turnover: {тикер: оборот} — изменившиеся инструменты или весь рынок.
+            full: turnover — полный снимок: инструменты, которых в нем нет,
+                выбывают из рейтинга.
+
+        Returns:
+            Итоговое изменение состава ТОПа за вызов.
+        """
+        entered: Dict[str, None] = {}
+        left: Dict[str, None] = {}
+
+        known = self._values.get
+        changed = [(ticker, value) for ticker, value in turnover.items() if known(ticker) != value]
+        for ticker, value in changed:
+            self._values[ticker] = value
+            self._push(ticker)
+
+        # Все известные тикеры есть в снимке — размеры совпадают
+        if full and len(self._values) != len(turnover):
+            for ticker in self._values.keys() - turnover.keys():
+                self._discard(ticker, entered, left)
+
+        self._rebalance(entered, left)
+        self._compact()
+        return RankingChange(list(entered), list(left))
+
+    def remove(self, tickers: Iterable[str]) -> RankingChange:
+        """
+        Исключение инструментов из рейтинга (делистинг, приостановка торгов).
+
+        Args:
+            tickers: Тикеры.
+
+        Returns:
+            Изменение состава ТОПа.
+        """
+        entered: Dict[str, None] = {}
+        left: Dict[str, None] = {}
+        for ticker in tickers:
+            self._discard(ticker, entered, left)
+        self._rebalance(entered, left)
+        self._compact()
+        return RankingChange(list(entered), list(left))
+
+    def _push(self, ticker: str):
+        """Новая запись тикера в кучу его текущей группы."""
+        stamp = next(self._counter)
+        self._stamps[ticker] = stamp
+        value = self._values[ticker]
+        if ticker in self._members:
+            heapq.heappush(self._top, (value, ticker, stamp))
+        else:
+            heapq.heappush(self._rest, (-value, ticker, stamp))
+
+    def _peek(self, heap: List[Tuple[float, str, int]]):
+        """Верх кучи без устаревших записей (None — куча пуста)."""
+        while heap and self._stamps.get(heap[0][1]) != heap[0][2]:
+            heapq.heappop(heap)
+        return heap[0] if heap else None
+
+    def _discard(self, ticker: str, entered: Dict[str, None], left: Dict[str, None]):
+        if ticker not in self._values:
+            return
+        del self._values[ticker]
+        del self._stamps[ticker]
+        if ticker in self._members:
+            self._leave(ticker, entered, left)
+
+    def _enter(self, ticker: str, entered: Dict[str, None], left: Dict[str, None]):
+        self._members.add(ticker)
+        if ticker in left:
+            # Выбыл и вернулся за один вызов — изменения нет
+            del left[ticker]
+        else:
+            entered[ticker] = None
+
+    def _leave(self, ticker: str, entered: Dict[str, None], left: Dict[str, None]):
+        self._members.discard(ticker)
+        if ticker in entered:
+            del entered[ticker]
+        else:
+            left[ticker] = None
+
+    def _rebalance(self, entered: Dict[str, None], left: Dict[str, None]):
+        """Обмен худших участников на лучших претендентов."""
+        while True:
+            best = self._peek(self._rest)
+            if best is None:
+                return
+            if len(self._members) < self.size:
+                heapq.heappop(self._rest)
+                self._enter(best[1], entered, left)
+                self._push(best[1])
+                continue
+
+            worst = self._peek(self._top)
+            if -best[0] <= worst[0]:
+                return
+            heapq.heappop(self._rest)
+            heapq.heappop(self._top)
+            self._enter(best[1], entered, left)
+            self._leave(worst[1], entered, left)
+            self._push(best[1])
+            self._push(worst[1])
+
+    def _compact(self):
+        """Пересборка куч, когда устаревших записей больше, чем действующих."""
+        if len(self._top) + len(self._rest) <= 2 * len(self._values) + 64:
+            return
+        self._top = [(self._values[ticker], ticker, self._stamps[ticker]) for ticker in self._members]
+        self._rest = [
+            (-value, ticker, self._stamps[ticker])
+            for ticker, value in self._values.items() if ticker not in self._members
+        ]
+        heapq.heapify(self._top)
+        heapq.heapify(self._rest)
@@ -1,4 +1,110 @@
 """
 Общие фикстуры для тестов.
 """
+import asyncio
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
 import pytest
+from aiohttp import web
+
+START = np.datetime64("2025-01-06T10:00:00")
+
+
+class IssStandIn:
+    """
+    Локальный HTTP-сервер в формате ISS: снимок режима TQBR и свечи бумаг.
+
+    Ответы — как у iss.moex.com с iss.meta=off: блоки {"columns", "data"},
+    свечи страницами по page_size строк (iss.reverse — от свежих к старым).
+    Каждый запрос ждет delay секунд; запросы пишутся в requests.
+    """
+
+    def __init__(self, tickers: Sequence[str], rows: int = 1200, delay: float = 0.0,
+                 page_size: int = 500, failing: Sequence[str] = ()):
+        self.delay = delay
+        self.page_size = page_size
+        self.failing = set(failing)
+        self.requests: List[Tuple[str, Dict[str, str]]] = []
+        self.url = ""
+
+        rng = np.random.default_rng(0)
+        # Оборот по убыванию порядка тикеров; у последнего нет сделок
+        self.market = {
+            ticker: (round(100 + 10 * i + rng.random(), 2) if i < len(tickers) - 1 else None,
+                     1e9 / (i + 1), 1e6 * (i + 1))
+            for i, ticker in enumerate(tickers)
+        }
+        self.candles: Dict[Tuple[str, int], List[list]] = {}
+        for ticker in tickers:
+            for interval, minutes in ((1, 1), (60, 60), (24, 1440)):
+                begin = START + np.arange(rows) * np.timedelta64(minutes, "m")
+                close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, rows)))
+                open_ = np.concatenate([close[:1], close[:-1]])
+                high = np.maximum(open_, close) * 1.001
+                low = np.minimum(open_, close) * 0.999
+                volume = rng.integers(1, 1000, rows)
+                # Порядок колонок ISS: open, close, high, low, value, volume, begin, end
+                self.candles[(ticker, interval)] = [
+                    [open_[k], close[k], high[k], low[k], close[k] * volume[k], int(volume[k]),
+                     str(begin[k]).replace("T", " "), str(begin[k]).replace("T", " ")]
+                    for k in range(rows)
+                ]
+        self._runner: Optional[web.AppRunner] = None
+
+    def count(self, marker: str) -> int:
+        """Число запросов, путь которых содержит marker."""
+        return sum(marker in path for path, _ in self.requests)
+
+    async def _securities(self, request: web.Request) -> web.Response:
+        await self._log(request)
+        wanted = request.query.get("securities")
+        wanted = set(wanted.split(",")) if wanted else None
+        data = [
+            [turnover, ticker, last, volume]
+            for ticker, (last, turnover, volume) in self.market.items()
+            if wanted is None or ticker in wanted
+        ]
+        return web.json_response({"marketdata": {"columns": ["VALTODAY", "SECID", "LAST", "VOLTODAY"],
+                                                  "data": data}})
+
+    async def _candles(self, request: web.Request) -> web.Response:
+        await self._log(request)
+        ticker = request.match_info["secid"]
+        if ticker in self.failing:
+            return web.Response(status=500, text="Internal Server Error")
+        rows = self.candles.get((ticker, int(request.query["interval"])), [])
+        if request.query.get("iss.reverse") == "true":
+            rows = rows[::-1]
+        start = int(request.query.get("start", 0))
+        return web.json_response({"candles": {
+            "columns": ["open", "close", "high", "low", "value", "volume", "begin", "end"],
+            "data": rows[start:start + self.page_size],
+        }})
+
+    async def _log(self, request: web.Request):
+        self.requests.append((request.path, dict(request.query)))
+        if self.delay:
+            await asyncio.sleep(self.delay)
+
+    async def __aenter__(self) -> "IssStandIn":
+        app = web.Application()
+        board = "/iss/engines/stock/markets/shares/boards/TQBR"
+        app.router.add_get(board + "/securities.json", self._securities)
+        app.router.add_get(board + "/securities/{secid}/candles.json", self._candles)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        self.url = f"http://127.0.0.1:{port}/iss"
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self._runner.cleanup()
+
+
+@pytest.fixture
+def iss_stand_in():
+    """Класс локального сервера ISS: async with iss_stand_in(tickers) as server."""
+    return IssStandIn
@@ -2,7 +2,8 @@
 Тесты для data_parser.py
 """
 import pytest
-from src.data_parser import fetch_top10_tickers, fetch_latest_prices
+import numpy as np
+from src.data_parser import fetch_top10_tickers, fetch_latest_prices, fetch_candles
 
 
 def test_fetch_top10_tickers():
@@ -19,3 +20,12 @@ def test_fetch_latest_prices():
     assert len(prices) == 2
     assert "SBER" in prices
     assert isinstance(prices["SBER"], float)
+
+
+def test_fetch_candles():
+    candles = fetch_candles(["SBER", "GAZP"], ["15m", "1d"], bars=100)
+    assert candles.shape == (2, 2, 100, 5)
+    opens, highs, lows, closes = (candles[..., i] for i in range(4))
+    assert np.all(highs >= np.maximum(opens, closes))
+    assert np.all(lows <= np.minimum(opens, closes))
+    assert np.array_equal(candles, fetch_candles(["SBER", "GAZP"], ["15m", "1d"], bars=100))
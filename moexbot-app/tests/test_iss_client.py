@@ -0,0 +1,145 @@
+"""
+Тесты для iss_client.py и fetch_market_data на локальном сервере ISS
+"""
+import asyncio
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data_parser import fetch_market_data
+from src.turnover_ranking import TurnoverRanking
+from src.iss_client import IssClient, IssError, resample
+
+TICKERS = ["SBER", "GAZP", "LKOH", "MTSS", "NVTK", "ROSN", "TATN", "YDEX",
+           "ALRS", "MGNT", "AFKS", "FEES"]
+
+
+def test_market_data(iss_stand_in):
+    async def scenario():
+        async with iss_stand_in(TICKERS) as server, IssClient(server.url) as client:
+            snapshot = await client.fetch_snapshot()
+            data = await fetch_market_data(client, TurnoverRanking(10), ["15m", "1h", "4h", "1d"], bars=50)
+            return server, snapshot, data
+
+    server, snapshot, (tickers, prices, candles) = asyncio.run(scenario())
+    # У последнего тикера нет сделок — его нет в снимке
+    assert set(snapshot) == set(TICKERS[:-1])
+    assert snapshot["SBER"] == {"last": server.market["SBER"][0], "turnover": 1e9, "volume": 1e6}
+    assert tickers == TICKERS[:10]
+    assert prices == {ticker: server.market[ticker][0] for ticker in tickers}
+    assert candles.shape == (10, 4, 50, 5)
+    assert not np.isnan(candles).any()
+    # Снимок запрошен один раз: второй вызов — из кэша
+    assert server.count("securities.json") == 1
+
+
+def test_market_data_without_top_refresh(iss_stand_in):
+    async def scenario():
+        async with iss_stand_in(TICKERS) as server, IssClient(server.url) as client:
+            ranking = TurnoverRanking(10)
+            first = await fetch_market_data(client, ranking, ["1h"], bars=20)
+            second = await fetch_market_data(client, ranking, ["1h"], bars=20, refresh=False)
+            return server, first, second
+
+    server, first, second = asyncio.run(scenario())
+    assert second[0] == first[0] and second[1] == first[1]
+    # Второй цикл: только цены тикеров ТОПа, без снимка всего режима
+    queries = [query for path, query in server.requests if "securities.json" in path]
+    assert len(queries) == 2 and "securities" not in queries[0]
+    assert queries[1]["securities"].split(",") == first[0]
+
+
+def test_fetch_prices_batches(iss_stand_in):
+    async def scenario():
+        async with iss_stand_in(TICKERS) as server, IssClient(server.url, batch_size=5) as client:
+            return server, await client.fetch_prices(TICKERS)
+
+    server, prices = asyncio.run(scenario())
+    assert list(prices) == TICKERS[:-1]
+    batches = [query["securities"].split(",") for _, query in server.requests]
+    assert [len(batch) for batch in batches] == [5, 5, 2]
+
+
+def test_requests_are_concurrent(iss_stand_in):
+    delay = 0.3
+
+    async def scenario(delay):
+        async with iss_stand_in(TICKERS[:10], delay=delay) as server, \
+                IssClient(server.url, max_connections=100) as client:
+            started = time.perf_counter()
+            await client.fetch_candle_batch(TICKERS[:10], ["15m", "1h", "4h", "1d"], bars=50)
+            return server, time.perf_counter() - started
+
+    _, baseline = asyncio.run(scenario(0.0))
+    server, elapsed = asyncio.run(scenario(delay))
+    # 10 тикеров × 3 интервала ISS (1h и 4h — один ряд), 15m — 2 страницы по 1m
+    assert len(server.requests) == 40
+    # Задержка сервера добавляется один раз, а не 40
+    assert elapsed - baseline < 2 * delay
+
+
+def test_candles_cache_and_incremental(iss_stand_in):
+    now = [0.0]
+
+    async def scenario():
+        async with iss_stand_in(["SBER"], rows=1200) as server, \
+                IssClient(server.url, ttl=60, clock=lambda: now[0]) as client:
+            first = await client.fetch_candles("SBER", 1, 700)
+            cached = await client.fetch_candles("SBER", 1, 700)
+            requests_cached = len(server.requests)
+
+            # Новая минутная свеча на сервере и истечение TTL
+            rows = server.candles[("SBER", 1)]
+            last = rows[-1]
+            begin = str(np.datetime64(last[6].replace(" ", "T")) + np.timedelta64(1, "m")).replace("T", " ")
+            rows.append([last[1], 101.0, 101.5, 99.5, 1010.0, 10, begin, begin])
+            now[0] = 61.0
+            updated = await client.fetch_candles("SBER", 1, 700)
+            return server, first, cached, requests_cached, updated
+
+    server, first, cached, requests_cached, updated = asyncio.run(scenario())
+    assert first.shape == (700, 6)
+    assert np.all(np.diff(first[:, 0]) == 60)
+    assert np.array_equal(first, cached)
+    assert requests_cached == 2
+    # Догружена только свежая страница
+    assert len(server.requests) == 3
+    assert np.array_equal(updated[:-1], first[1:])
+    assert updated[-1, 4] == 101.0
+
+
+def test_resample_matches_pandas():
+    rng = np.random.default_rng(1)
+    begin = np.datetime64("2025-01-06T09:50:00") + np.arange(500) * np.timedelta64(1, "m")
+    # Пропуски минут без сделок
+    keep = np.sort(rng.choice(500, 420, replace=False))
+    close = 100 + np.cumsum(rng.normal(0, 0.1, 500))[keep]
+    candles = np.column_stack([
+        begin[keep].astype("datetime64[s]").astype(np.int64), close + 0.05,
+        close + 0.2, close - 0.2, close, rng.integers(1, 100, len(keep))
+    ]).astype(float)
+
+    frame = pd.DataFrame(candles[:, 1:], index=pd.to_datetime(begin[keep]),
+                         columns=["open", "high", "low", "close", "volume"])
+    expected = frame.resample("15min").agg(
+        {"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"}
+    ).dropna()
+
+    result = resample(candles, 15)
+    assert np.array_equal(result[:, 0], expected.index.values.astype("datetime64[s]").astype(np.int64))
+    assert np.allclose(result[:, 1:], expected.values)
+
+
+def test_failed_series_is_nan(iss_stand_in):
+    async def scenario():
+        async with iss_stand_in(TICKERS[:3], failing=["GAZP"]) as server, IssClient(server.url) as client:
+            candles = await client.fetch_candle_batch(TICKERS[:3], ["1h", "1d"], bars=30)
+            with pytest.raises(IssError):
+                await client.fetch_candles("GAZP", 24, 30)
+            return candles
+
+    candles = asyncio.run(scenario())
+    assert np.isnan(candles[1]).all()
+    assert not np.isnan(candles[[0, 2]]).any()
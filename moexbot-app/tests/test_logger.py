@@ -0,0 +1,79 @@
+"""
+Тесты для logger.py
+"""
+import json
+import logging
+import threading
+
+from src.logger import RotatingFileHandler, setup_logger, stop_logging
+
+
+class ThreadRecorder:
+    """Аргумент лога, который запоминает поток форматирования"""
+
+    def __init__(self):
+        self.threads = []
+
+    def __str__(self):
+        self.threads.append(threading.current_thread().name)
+        return "аргумент"
+
+
+def test_queue_logging_formats_in_background(tmp_path):
+    log_file = tmp_path / "logs" / "moexbot.log"
+    logger = setup_logger(str(log_file))
+    argument = ThreadRecorder()
+    logger.info("Цикл %d: %s", 7, argument)
+    logger.debug("Не пишется: %s", argument)
+    stop_logging()
+
+    lines = log_file.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 1 and lines[0].endswith("- INFO - Цикл 7: аргумент")
+    # Сообщение собрано в потоке слушателя очереди (файл и консоль), не в вызывающем
+    assert argument.threads and threading.current_thread().name not in argument.threads
+
+
+def test_json_lines(tmp_path):
+    log_file = tmp_path / "moexbot.jsonl"
+    logger = setup_logger(str(log_file), json_lines=True)
+    logger.warning("ТОП-%d: вошли %s", 10, ["SBER"])
+    try:
+        raise ValueError("нет данных")
+    except ValueError:
+        logger.exception("Ошибка цикла")
+    stop_logging()
+
+    entries = [json.loads(line) for line in log_file.read_text(encoding="utf-8").splitlines()]
+    assert entries[0]["message"] == "ТОП-10: вошли ['SBER']"
+    assert entries[0]["level"] == "WARNING" and entries[0]["logger"] == "MOEXbot"
+    assert "ValueError: нет данных" in entries[1]["exception"]
+
+
+def make_record(message: str) -> logging.LogRecord:
+    return logging.LogRecord("MOEXbot", logging.INFO, __file__, 1, message, None, None)
+
+
+def test_rotation_by_size(tmp_path):
+    log_file = tmp_path / "moexbot.log"
+    handler = RotatingFileHandler(str(log_file), max_bytes=100, backup_count=2)
+    for i in range(20):
+        handler.handle(make_record(f"запись {i:02d} " + "x" * 20))
+    handler.close()
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["moexbot.log", "moexbot.log.1", "moexbot.log.2"]
+    assert all(path.stat().st_size <= 100 + 40 for path in tmp_path.iterdir())
+    assert log_file.read_text(encoding="utf-8").splitlines()[-1].startswith("запись 19")
+
+
+def test_rotation_by_time(tmp_path):
+    log_file = tmp_path / "moexbot.log"
+    now = [1_736_000_000.0]
+    handler = RotatingFileHandler(str(log_file), backup_count=3, interval=3600, clock=lambda: now[0])
+    handler.handle(make_record("до границы часа"))
+    now[0] = handler.rollover_at + 1
+    handler.handle(make_record("после границы"))
+    handler.close()
+
+    assert (tmp_path / "moexbot.log.1").read_text(encoding="utf-8") == "до границы часа\n"
+    assert log_file.read_text(encoding="utf-8") == "после границы\n"
+    assert handler.rollover_at - now[0] <= 3600
@@ -0,0 +1,182 @@
+"""
+Тесты для scheduler.py
+"""
+import asyncio
+import threading
+from concurrent.futures import Executor, Future
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from src.scheduler import SCHEDULE_CONFIG, CycleScheduler, SessionCalendar
+
+MSK = timezone(timedelta(hours=3))
+CALENDAR = SessionCalendar.from_config(SCHEDULE_CONFIG)
+
+
+def msk(*args) -> datetime:
+    return datetime(*args, tzinfo=MSK)
+
+
+def test_calendar_boundaries():
+    # 2025-01-10 — пятница
+    assert CALENDAR.is_open(msk(2025, 1, 10, 10, 0))
+    assert not CALENDAR.is_open(msk(2025, 1, 10, 18, 55))
+    assert not CALENDAR.is_open(msk(2025, 1, 11, 12, 0))
+
+    assert CALENDAR.next_cycle(msk(2025, 1, 10, 9, 0)) == msk(2025, 1, 10, 10, 15)
+    assert CALENDAR.next_cycle(msk(2025, 1, 10, 10, 15)) == msk(2025, 1, 10, 10, 30)
+    # Свеча 18:45–19:00 закрывает основную сессию, 19:00–19:15 — первая вечерняя
+    assert CALENDAR.next_cycle(msk(2025, 1, 10, 18, 50)) == msk(2025, 1, 10, 19, 0)
+    assert CALENDAR.next_cycle(msk(2025, 1, 10, 19, 0)) == msk(2025, 1, 10, 19, 15)
+    # После вечерней сессии пятницы — понедельник
+    assert CALENDAR.next_cycle(msk(2025, 1, 10, 23, 50)) == msk(2025, 1, 11, 0, 0)
+    assert CALENDAR.next_cycle(msk(2025, 1, 11, 0, 0)) == msk(2025, 1, 13, 10, 15)
+    # Время в другом поясе приводится к московскому
+    assert CALENDAR.next_cycle(datetime(2025, 1, 10, 6, 1, tzinfo=timezone.utc)) == msk(2025, 1, 10, 10, 15)
+
+
+def test_calendar_holidays_and_workdays():
+    calendar = SessionCalendar(
+        CALENDAR.sessions, holidays=[date(2025, 1, 13)], workdays=[date(2025, 1, 11)]
+    )
+    assert calendar.next_cycle(msk(2025, 1, 11, 0, 0)) == msk(2025, 1, 11, 10, 15)
+    assert calendar.next_cycle(msk(2025, 1, 12, 0, 0)) == msk(2025, 1, 14, 10, 15)
+    with pytest.raises(ValueError):
+        SessionCalendar(CALENDAR.sessions, interval_minutes=7)
+    with pytest.raises(RuntimeError):
+        SessionCalendar(CALENDAR.sessions, trading_weekdays=[]).next_cycle(msk(2025, 1, 10))
+
+
+class FakeClock:
+    def __init__(self, start: datetime):
+        self.now = start.timestamp()
+        self.sleeps = 0
+
+    def __call__(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float):
+        # Сначала дорабатывают остальные стадии конвейера, затем идет время
+        for _ in range(10):
+            await asyncio.sleep(0)
+        self.sleeps += 1
+        self.now += seconds
+
+
+class InlineExecutor(Executor):
+    """Анализ в потоке event loop: поддельное время не идет во время анализа"""
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        future.set_result(fn(*args, **kwargs))
+        return future
+
+
+def run_cycles(clock, cycles, fetch=None, analyze=lambda data: data, retry=60.0,
+               executor=InlineExecutor()):
+    """Работа планировщика до cycles успешных загрузок"""
+    scheduler = CycleScheduler(CALENDAR, grace=5.0, retry=retry, clock=clock, sleep=clock.sleep,
+                               executor=executor)
+    ticks = []
+
+    async def default_fetch():
+        ticks.append(datetime.fromtimestamp(clock(), MSK))
+        return len(ticks)
+
+    async def scenario():
+        stop = asyncio.Event()
+        fetched = []
+
+        async def counted_fetch():
+            result = await (fetch or default_fetch)()
+            fetched.append(result)
+            if len(fetched) >= cycles:
+                stop.set()
+            return result
+
+        await scheduler.run(counted_fetch, analyze, lambda result: None, stop)
+
+    asyncio.run(scenario())
+    return scheduler, ticks
+
+
+def test_cycles_follow_sessions():
+    # Пятница, вечерняя сессия: сразу, 23:45, 00:00 (закрытие), затем понедельник
+    clock = FakeClock(msk(2025, 1, 10, 23, 31))
+    scheduler, ticks = run_cycles(clock, 4)
+    assert ticks == [
+        msk(2025, 1, 10, 23, 31), msk(2025, 1, 10, 23, 45, 5),
+        msk(2025, 1, 11, 0, 0, 5), msk(2025, 1, 13, 10, 15, 5),
+    ]
+    summary = scheduler.metrics.summary()
+    assert summary["cycles"] == 4 and summary["overruns"] == 0 and summary["skipped"] == 0
+    assert summary["lag"]["max"] == 0
+    # Ожидание выходных идет шагами max_sleep
+    assert clock.sleeps > 2 * 24 * 60
+
+
+def test_overrun_skips_missed_ticks():
+    clock = FakeClock(msk(2025, 1, 13, 12, 0, 5))
+    calls = []
+
+    async def fetch():
+        calls.append(datetime.fromtimestamp(clock(), MSK))
+        if len(calls) == 2:
+            # Загрузка дольше двух интервалов
+            clock.now += 35 * 60
+        return len(calls)
+
+    scheduler, _ = run_cycles(clock, 3, fetch=fetch)
+    assert calls == [msk(2025, 1, 13, 12, 0, 5), msk(2025, 1, 13, 12, 15, 5), msk(2025, 1, 13, 13, 0, 5)]
+    assert scheduler.metrics.overruns == 1
+    assert scheduler.metrics.skipped == 2
+    assert scheduler.metrics.durations["cycle"][1] == 35 * 60
+
+
+def test_fetch_retry_and_failed_cycle():
+    clock = FakeClock(msk(2025, 1, 13, 12, 0, 5))
+    calls = []
+
+    async def fetch():
+        calls.append(datetime.fromtimestamp(clock(), MSK))
+        if len(calls) <= 16:
+            raise ConnectionError("ISS недоступен")
+        return len(calls)
+
+    scheduler, _ = run_cycles(clock, 1, fetch=fetch, retry=60.0)
+    # Повторы раз в минуту до следующей границы, затем цикл 12:15 с повторами
+    assert calls[1] - calls[0] == timedelta(minutes=1)
+    assert calls[14] == msk(2025, 1, 13, 12, 14, 5)
+    assert calls[15] == msk(2025, 1, 13, 12, 15, 5)
+    assert scheduler.metrics.errors == 16
+    assert scheduler.metrics.cycles == 1
+
+
+def test_fetch_overlaps_analysis():
+    clock = FakeClock(msk(2025, 1, 13, 12, 0, 5))
+    analysis_running = threading.Event()
+    release = threading.Event()
+    events = []
+
+    async def fetch():
+        events.append(("fetch", analysis_running.is_set()))
+        return len(events)
+
+    def analyze(data):
+        if data == 1:
+            analysis_running.set()
+            # Первый анализ ждет, пока загрузка второго цикла пройдет
+            release.wait(5)
+        analysis_running.clear()
+        return data
+
+    async def fetch_then_release():
+        result = await fetch()
+        if len(events) == 2:
+            release.set()
+        return result
+
+    scheduler, _ = run_cycles(clock, 2, fetch=fetch_then_release, analyze=analyze, executor=None)
+    assert events == [("fetch", False), ("fetch", True)]
+    assert scheduler.metrics.cycles == 2
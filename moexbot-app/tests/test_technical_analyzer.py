@@ -1,7 +1,15 @@
 """
 Тесты для technical_analyzer.py
 """
-from src.technical_analyzer import analyze_ticker
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data_parser import fetch_candles
+from src.indicators import compute_votes, ewm
+from src.technical_analyzer import (
+    HISTORY_BARS, INDICATORS, TIMEFRAMES, analyze_batch, analyze_ticker, classify
+)
 
 
 def test_analyze_ticker():
@@ -14,3 +22,89 @@ def test_analyze_ticker():
         assert isinstance(signal, str)
         assert 0 <= buy <= 16
         assert 0 <= sell <= 16
+
+
+def make_candles(closes: np.ndarray) -> np.ndarray:
+    """Свечи (..., бары, 5) по ценам закрытия"""
+    candles = np.empty(closes.shape + (5,))
+    opens = np.concatenate([closes[..., :1], closes[..., :-1]], axis=-1)
+    candles[..., 0] = opens
+    candles[..., 1] = np.maximum(opens, closes) * 1.001
+    candles[..., 2] = np.minimum(opens, closes) * 0.999
+    candles[..., 3] = closes
+    candles[..., 4] = 1000.0
+    return candles
+
+
+def test_ewm_matches_pandas():
+    x = np.random.default_rng(0).normal(size=(3, 250)).cumsum(axis=-1)
+    smoothed = ewm(x[np.newaxis], np.array([[2 / 9], [2 / 22]]))
+    expected = pd.Series(x[1]).ewm(span=21, adjust=False).mean().to_numpy()
+    assert smoothed.shape == (2, 3, 250)
+    assert np.allclose(smoothed[1, 1], expected)
+
+
+def test_analyze_batch_trends():
+    bars = np.arange(HISTORY_BARS)
+    wave = np.sin(bars / 3)
+    closes = np.stack([
+        100 * 1.01 ** bars + wave,        # устойчивый рост
+        100 * 0.99 ** bars + wave,        # устойчивое падение
+    ])
+    candles = np.repeat(make_candles(closes)[:, np.newaxis], len(TIMEFRAMES), axis=1)
+    result = analyze_batch(candles, ["UP", "DOWN"])
+
+    for buy, sell, _ in result["UP"].values():
+        assert buy > sell
+    for buy, sell, _ in result["DOWN"].values():
+        assert sell > buy
+
+
+def test_analyze_batch_matches_single():
+    tickers = ["SBER", "GAZP", "LKOH"]
+    candles = fetch_candles(tickers, TIMEFRAMES, HISTORY_BARS)
+    batch = analyze_batch(candles, tickers)
+    for i, symbol in enumerate(tickers):
+        assert batch[symbol] == analyze_ticker(symbol, candles[i])
+    assert batch["SBER"] == analyze_ticker("SBER")
+
+
+def test_analyze_batch_validation():
+    candles = fetch_candles(["SBER"], TIMEFRAMES, HISTORY_BARS)
+    with pytest.raises(ValueError):
+        analyze_batch(candles, ["SBER", "GAZP"])
+    with pytest.raises(ValueError):
+        analyze_batch(candles[:, :, -50:], ["SBER"])
+
+    # Ряд с пропуском не голосует
+    candles[0, 0, -1, 3] = np.nan
+    buy, sell, signal = analyze_batch(candles, ["SBER"])["SBER"][TIMEFRAMES[0]]
+    assert (buy, sell) == (0, 0)
+    assert signal == classify(0, 0)
+
+
+def test_compute_votes_padded_history():
+    # Короткая история тикера дополнена спереди NaN (как в fetch_candle_batch)
+    closes = 100.0 * np.exp(np.linspace(0.0, 0.5, HISTORY_BARS))
+    candles = make_candles(closes)
+    padded = candles.copy()
+    padded[:-60] = np.nan
+
+    votes = compute_votes(padded, INDICATORS)
+    kinds = [params["type"] for params in INDICATORS]
+    # Окна Ichimoku (78 баров) и EMA 50/200 не помещаются в 60 полных баров
+    full = compute_votes(candles, INDICATORS)
+    assert full[kinds.index("Ichimoku")] != 0
+    assert votes[kinds.index("Ichimoku")] == 0
+    long_ema = next(i for i, params in enumerate(INDICATORS) if params["type"] == "EMA" and params["slow"] == 200)
+    assert full[long_ema] != 0
+    assert votes[long_ema] == 0
+
+    # Оконные индикаторы голосуют так же, как на истории без дополнения
+    windowed = [params for params in INDICATORS
+                if params["type"] in ("Stochastic", "Williams %R", "OBV", "Volume MA",
+                                      "Bollinger Bands", "Pivot Points", "Fibonacci Retracement")
+                or params["type"] == "EMA" and params["slow"] <= 60]
+    expected = compute_votes(candles[-60:], windowed)
+    assert [votes[INDICATORS.index(params)] for params in windowed] == expected.tolist()
+    assert np.count_nonzero(votes) > 0
@@ -0,0 +1,80 @@
+"""
+Тесты для turnover_ranking.py
+"""
+import random
+
+import pytest
+
+from src.turnover_ranking import RankingChange, TurnoverRanking
+
+
+def brute_force(values, size):
+    return set(sorted(values, key=lambda ticker: -values[ticker])[:size])
+
+
+def test_matches_full_sort_on_random_stream():
+    rng = random.Random(7)
+    tickers = [f"T{i:04d}" for i in range(2000)]
+    values = {ticker: rng.uniform(0, 1e6) for ticker in tickers}
+    ranking = TurnoverRanking(10)
+    change = ranking.update(values, full=True)
+    assert set(change.entered) == brute_force(values, 10) and change.left == []
+
+    for _ in range(300):
+        previous = set(ranking.members)
+        # Оборот за день растет; изредка тикер выпадает из снимка
+        deltas = {ticker: values[ticker] + rng.expovariate(1e-5) for ticker in rng.sample(sorted(values), 50)}
+        values.update(deltas)
+        if rng.random() < 0.1:
+            gone = rng.choice(list(values))
+            del values[gone]
+            change = ranking.update(values, full=True)
+        else:
+            change = ranking.update(deltas)
+
+        members = set(ranking.members)
+        assert members == brute_force(values, 10)
+        assert set(change.entered) == members - previous
+        assert set(change.left) == previous - members
+
+    # Пересборка не дает куче расти без ограничения
+    assert len(ranking._top) + len(ranking._rest) <= 2 * len(values) + 64 + 2 * 50
+
+
+def test_members_order_and_unchanged_update():
+    ranking = TurnoverRanking(2)
+    assert ranking.update({"A": 1.0, "B": 3.0, "C": 2.0}) == RankingChange(["B", "C"], [])
+    assert ranking.members == ["B", "C"]
+    assert not ranking.update({"A": 1.0, "B": 3.0})
+    assert ranking.update({"A": 5.0}) == RankingChange(["A"], ["C"])
+    assert ranking.members == ["A", "B"]
+    assert "C" not in ranking and len(ranking) == 2
+
+
+def test_tie_keeps_incumbent():
+    ranking = TurnoverRanking(1)
+    ranking.update({"A": 2.0, "B": 1.0})
+    assert not ranking.update({"B": 2.0})
+    assert ranking.members == ["A"]
+    assert ranking.update({"B": 2.5}) == RankingChange(["B"], ["A"])
+
+
+def test_enter_and_leave_in_one_update_cancel_out():
+    ranking = TurnoverRanking(1)
+    ranking.update({"A": 2.0, "B": 1.0})
+    # B обгоняет A, но A в том же пакете снова впереди
+    assert not ranking.update({"B": 3.0, "A": 4.0})
+
+
+def test_remove_refills_from_rest():
+    ranking = TurnoverRanking(2)
+    ranking.update({"A": 3.0, "B": 2.0, "C": 1.0})
+    assert ranking.remove(["A", "X"]) == RankingChange(["C"], ["A"])
+    assert ranking.members == ["B", "C"]
+    assert ranking.remove(["B", "C"]) == RankingChange([], ["B", "C"])
+    assert len(ranking) == 0
+
+
+def test_invalid_size():
+    with pytest.raises(ValueError):
+        TurnoverRanking(0)